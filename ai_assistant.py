@@ -6,8 +6,18 @@ import logging
 import subprocess
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
-import openai
-import aiohttp
+
+from arbitrage import build_scanner
+from http_client import get_session
+from price_oracle import TON_USD, TUXIDO_TON, get_price_oracle
+from lazy_imports import lazy_import
+from profit_report import ProfitReportEmitter
+from rate_limiter import BACKGROUND, priority_context
+from runtime_config import config_store, ConfigSnapshot
+from resource_governor import DISK, ELEVATED, HIGH, MEMORY, get_governor
+from supervisor import Supervisor
+
+openai = lazy_import("openai")
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -28,16 +38,13 @@ class ProfitOptimizedAIAssistant:
         self.github_token = os.getenv("GITHUB_TOKEN")
         self.github_repo = os.getenv("GITHUB_REPO", "TuxidoMineBot")
         
-        # Enhanced AI Assistant Configuration for Maximum Profitability
+        # Shared typed configuration (model, intervals, daily targets, ...)
+        self.settings = config_store.current
+        config_store.subscribe(self.apply_settings)
+        
+        # Enhanced AI Assistant feature switches for Maximum Profitability
         self.assistant_config = {
-            "model": "gpt-3.5-turbo",
-            "max_tokens": 3000,
-            "temperature": 0.2,  # Lower for more focused profit optimization
-            "upgrade_interval": 900,  # 15 minutes for faster optimization
-            "monitoring_interval": 60,  # 1 minute for real-time monitoring
-            "auto_commit": True,
             "auto_deploy": True,
-            "optimization_enabled": True,
             "profit_maximization": True,
             "market_analysis": True,
             "automated_trading": True
@@ -49,7 +56,7 @@ class ProfitOptimizedAIAssistant:
             "mining_efficiency": 0.0,
             "trading_profits": 0.0,
             "daily_targets": {
-                "tokens": 15000,  # Increased target
+                "tokens": self.settings.p2e.daily_limit,
                 "revenue_usd": 100.0,
                 "efficiency_score": 85.0
             },
@@ -79,6 +86,20 @@ class ProfitOptimizedAIAssistant:
             "gas_fee_optimization": True
         }
         
+        # Incremental arbitrage scanner fed with StonFi pool reserves
+        self.arbitrage = build_scanner(self.settings.arbitrage)
+        
+        # Data gathered once per optimization cycle and shared by every step
+        self._cycle_cache: Dict = {}
+        # Miner's BlockHistory and MetricsEngine when running alongside it (set by ProfitMaximizedAIManager)
+        self.block_history = None
+        self.metrics = None
+        self.report_emitter = ProfitReportEmitter.from_env()
+        
+        # Optional analysis yields to mining and trading when resources run short
+        self.analysis_paused = False
+        self.register_resource_responders()
+        
     async def start_profit_maximization(self):
         """Start autonomous profit maximization system"""
         logger.info("💰 Profit-Optimized AI Assistant Starting...")
@@ -97,6 +118,12 @@ class ProfitOptimizedAIAssistant:
         # Main profit optimization loop
         while True:
             try:
+                if self.analysis_paused:
+                    await asyncio.sleep(self.settings.ai.monitoring_interval)
+                    continue
+                    
+                self.begin_cycle()
+                
                 # Core profit optimization
                 await self.optimize_for_maximum_profit()
                 
@@ -122,12 +149,50 @@ class ProfitOptimizedAIAssistant:
                 # Generate profit reports
                 await self.generate_profit_report()
                 
-                await asyncio.sleep(self.assistant_config["monitoring_interval"])
+                await asyncio.sleep(self.settings.ai.monitoring_interval)
                 
             except Exception as e:
                 logger.error(f"Profit optimization error: {e}")
                 await asyncio.sleep(30)
                 
+    def apply_settings(self, settings: ConfigSnapshot):
+        """Adopt a hot-reloaded configuration snapshot"""
+        if settings.arbitrage != self.settings.arbitrage:
+            self.arbitrage = build_scanner(settings.arbitrage)
+        self.settings = settings
+        self.profit_metrics["daily_targets"]["tokens"] = settings.p2e.daily_limit
+        
+    def register_resource_responders(self):
+        """Graded responses to memory and disk pressure from the resource governor"""
+        governor = get_governor()
+        governor.register("ai_cache_trim", MEMORY, ELEVATED, self.shrink_caches)
+        governor.register("ai_history_downsample", MEMORY, HIGH, self.downsample_history)
+        governor.register("ai_analysis_pause", MEMORY, HIGH,
+                          lambda: setattr(self, "analysis_paused", True),
+                          lambda: setattr(self, "analysis_paused", False))
+        governor.register("profit_stream_compact", DISK, ELEVATED,
+                          lambda: self.report_emitter.compact_stream(1000))
+        governor.register("profit_stream_pause", DISK, HIGH,
+                          lambda: setattr(self.report_emitter, "stream_paused", True),
+                          lambda: setattr(self.report_emitter, "stream_paused", False))
+        
+    def shrink_caches(self):
+        """Drop per-cycle data and cap the in-memory optimization history"""
+        self._cycle_cache.clear()
+        self.market_data["trading_opportunities"] = []
+        history = self.profit_metrics["optimization_history"]
+        del history[:-100]
+        
+    def downsample_history(self):
+        """Keep every other history entry except the most recent 50"""
+        history = self.profit_metrics["optimization_history"]
+        if len(history) > 50:
+            history[:-50] = history[:-50:2]
+        
+    def begin_cycle(self):
+        """Start a new optimization cycle, dropping data gathered in the previous one"""
+        self._cycle_cache.clear()
+        
     async def optimize_for_maximum_profit(self):
         """AI-driven profit maximization"""
         if not self.ai_enabled:
@@ -251,10 +316,10 @@ class ProfitOptimizedAIAssistant:
             if "increase_rate" in optimization.get("action", ""):
                 # Update mining configuration for higher profits
                 config_update = {
-                    "min_hash_rate": 5,  # Increased
-                    "max_hash_rate": 20,  # Increased
-                    "mining_delay": 0.5,  # Faster mining
-                    "bonus_multiplier": 1.5  # Higher rewards
+                    "min_hash_rate": self.settings.mining.min_hash_rate,
+                    "max_hash_rate": self.settings.mining.max_hash_rate,
+                    "block_rate": self.settings.mining.block_rate,
+                    "bonus_multiplier": self.settings.p2e.bonus_multiplier
                 }
                 
                 await self.update_mining_config(config_update)
@@ -284,6 +349,9 @@ class ProfitOptimizedAIAssistant:
             
     async def collect_performance_data(self) -> Dict:
         """Collect comprehensive performance data"""
+        if "performance" in self._cycle_cache:
+            return self._cycle_cache["performance"]
+            
         try:
             # Load current mining data
             mining_data = {}
@@ -293,9 +361,14 @@ class ProfitOptimizedAIAssistant:
             
             # Calculate profit metrics
             runtime_hours = mining_data.get("runtime_seconds", 0) / 3600
-            tokens_per_hour = mining_data.get("total_mined", 0) / max(runtime_hours, 1)
-            
-            return {
+            snapshot = self.metrics.snapshot() if self.metrics is not None else None
+            if snapshot:
+                # Live windowed rate from the miner instead of a since-start average
+                tokens_per_hour = snapshot["tokens_per_hour"]["15m"]
+            else:
+                tokens_per_hour = mining_data.get("total_mined", 0) / max(runtime_hours, 1)
+            
+            performance_data = {
                 "tokens_mined": mining_data.get("total_mined", 0),
                 "blocks_mined": mining_data.get("blocks_mined", 0),
                 "tokens_per_hour": tokens_per_hour,
@@ -303,6 +376,12 @@ class ProfitOptimizedAIAssistant:
                 "runtime_hours": runtime_hours,
                 "profit_multiplier": self.profit_metrics.get("performance_multipliers", 1.0)
             }
+            if snapshot:
+                performance_data["rates"] = snapshot
+            if self.block_history is not None and len(self.block_history):
+                performance_data["recent_blocks"] = self.block_history.summary()
+            self._cycle_cache["performance"] = performance_data
+            return performance_data
             
         except Exception as e:
             logger.error(f"Performance data collection error: {e}")
@@ -310,17 +389,18 @@ class ProfitOptimizedAIAssistant:
             
     async def get_market_data(self) -> Dict:
         """Get real-time market data"""
+        if "market" in self._cycle_cache:
+            return self._cycle_cache["market"]
+            
         try:
-            # Fetch TON price
-            async with aiohttp.ClientSession() as session:
-                # Get TON price from CoinGecko
-                url = "https://api.coingecko.com/api/v3/simple/price?ids=the-open-network&vs_currencies=usd"
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        ton_price = data.get("the-open-network", {}).get("usd", 0)
-                        self.market_data["ton_price_usd"] = ton_price
-                        
+            # TON and TUXIDO prices agreed on by several sources
+            readings = await get_price_oracle().prices([TON_USD, TUXIDO_TON])
+            if readings[TON_USD]:
+                self.market_data["ton_price_usd"] = readings[TON_USD].price
+            if readings[TUXIDO_TON]:
+                self.market_data["tuxido_price_ton"] = readings[TUXIDO_TON].price
+            
+            self._cycle_cache["market"] = self.market_data
             return self.market_data
             
         except Exception as e:
@@ -376,16 +456,16 @@ class ProfitOptimizedAIAssistant:
                     "estimated_value_usd": estimated_token_value,
                     "efficiency_score": performance_data.get("efficiency_score", 0),
                     "profit_multiplier": self.profit_metrics.get("performance_multipliers", 1.0),
-                    "daily_progress": f"{tokens_mined}/15000"
+                    "daily_progress": f"{tokens_mined}/{self.settings.p2e.daily_limit}"
                 },
                 "ai_optimizations": len(self.profit_metrics.get("optimization_history", [])),
                 "active_strategies": list(self.profit_strategies.keys())
             }
             
-            # Save report
-            os.makedirs("data", exist_ok=True)
-            with open("data/profit_report.json", "w") as f:
-                json.dump(profit_report, f, indent=2)
+            # Save report only when its content changed
+            if not self.report_emitter.emit(profit_report):
+                logger.debug("Profit report unchanged, skipping write")
+                return
                 
             # Log key metrics
             logger.info(f"💰 Profit Report Generated:")
@@ -408,7 +488,7 @@ class ProfitOptimizedAIAssistant:
         
         try:
             response = openai.ChatCompletion.create(
-                model=self.assistant_config["model"],
+                model=self.settings.ai.model,
                 messages=[
                     {
                         "role": "system", 
@@ -416,8 +496,8 @@ class ProfitOptimizedAIAssistant:
                     },
                     {"role": "user", "content": prompt}
                 ],
-                max_tokens=self.assistant_config["max_tokens"],
-                temperature=self.assistant_config["temperature"]
+                max_tokens=self.settings.ai.max_tokens,
+                temperature=self.settings.ai.temperature
             )
             
             return response.choices[0].message.content
@@ -501,8 +581,29 @@ class ProfitOptimizedAIAssistant:
         pass
         
     async def execute_arbitrage_strategy(self, optimization: Dict):
-        """Execute arbitrage strategy"""
-        pass
+        """Scan StonFi pools for profitable swap cycles; only changed pools are re-examined"""
+        try:
+            session = await get_session()
+            url = f"{self.settings.stonfi.api_endpoint}/pools"
+            async with session.get(url, trace_request_ctx=priority_context(BACKGROUND)) as response:
+                if response.status != 200:
+                    logger.warning("Arbitrage scan skipped: StonFi pools returned %d", response.status)
+                    return []
+                pools = (await response.json()).get("pool_list", [])
+            
+            self.arbitrage.update_pools(pool for pool in pools if pool.get("address"))
+            opportunities = self.arbitrage.opportunities()
+            self.market_data["trading_opportunities"] = [o.to_dict() for o in opportunities[:10]]
+            for opportunity in opportunities[:3]:
+                logger.info(
+                    "🔺 Arbitrage: %d-hop cycle, %d in -> %d out (%.1f bps)",
+                    len(opportunity.hops), opportunity.amount_in, opportunity.amount_out, opportunity.profit_bps
+                )
+            return opportunities
+        
+        except Exception as e:
+            logger.error(f"Arbitrage scan error: {e}")
+            return []
 
 # Enhanced AI Manager for Maximum Profitability
 class ProfitMaximizedAIManager:
@@ -517,18 +618,22 @@ class ProfitMaximizedAIManager:
         logger.info("📈 Advanced trading, yield farming, and optimization enabled")
         logger.info("🎯 Target: $100+ daily revenue")
         
-        # Start profit-optimized AI assistant
-        ai_task = asyncio.create_task(self.assistant.start_profit_maximization())
+        # Start profit-optimized AI assistant; a crash restarts it instead of ending it
+        supervisor = Supervisor("ai-manager")
+        supervisor.add("ai_assistant", self.assistant.start_profit_maximization)
+        supervisor.start()
         
         # Import and start enhanced mining bot
-        from main import TuxidoMiner
-        self.mining_bot = TuxidoMiner()
+        from main import AdvancedTuxidoMiner
+        self.mining_bot = AdvancedTuxidoMiner()
+        self.assistant.block_history = self.mining_bot.block_history
+        self.assistant.metrics = self.mining_bot.metrics
         
-        # Start mining with profit optimization
-        mining_task = asyncio.create_task(self.mining_bot.start_mining())
-        
-        # Run both concurrently for maximum profit
-        await asyncio.gather(ai_task, mining_task, return_exceptions=True)
+        # Mining runs in the foreground; the assistant is drained when it stops
+        try:
+            await self.mining_bot.start_mining()
+        finally:
+            await supervisor.stop()
 
 if __name__ == "__main__":
     ai_manager = ProfitMaximizedAIManager()
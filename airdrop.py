@@ -0,0 +1,327 @@
+"""
+Tuxido Mining Bot - Airdrop Engine
+Bulk jetton distribution: recipients stream from a CSV (address,amount) with
+validation and dedup, transfers are packed into multi-message wallet
+externals and spread across one or more sending wallets, each pipelining
+its own seqnos. Progress survives crashes through the wallet journals plus a
+per-drop checkpoint, so re-running a drop only sends what is left
+
+    python airdrop.py send recipients.csv --drop-id launch --jetton-wallet EQ...
+    python airdrop.py bench --recipients 20000 --wallets 8
+"""
+
+import os
+import csv
+import time
+import base64
+import asyncio
+import argparse
+import logging
+import tempfile
+from decimal import MAX_EMAX, MAX_PREC, MIN_EMIN, Context, Decimal, InvalidOperation
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from boc import Cell, address_bits, coins_bits, format_address, parse_address, serialize_boc
+from metrics_engine import WindowedCounter
+from runtime_config import config_store, AirdropSettings
+from storage_utils import atomic_write_json, load_json
+from swap_builder import JETTON_TRANSFER_OP
+from wallet_sender import OutboundMessage, WalletSender, build_wallet_sender
+
+logger = logging.getLogger(__name__)
+
+RATE_WINDOW = 300.0  # seconds behind the "sustained" transfers/minute figure
+MAX_JETTON_UNITS = 2 ** 120  # amounts are VarUInteger 16 (Coins) in a TEP-74 transfer
+# Shifting a decimal point under this context never rounds, however long the amount
+_EXACT = Context(prec=MAX_PREC, Emax=MAX_EMAX, Emin=MIN_EMIN)
+
+
+class Recipient:
+    """One validated, deduplicated CSV row"""
+
+    __slots__ = ("line", "address", "amount", "account")
+
+    def __init__(self, line: int, address: str, amount: int, account: bytes):
+        self.line = line
+        self.address = address
+        self.amount = amount      # jetton units
+        self.account = account    # workchain byte + account id, the dedup key
+
+
+def to_units(amount: str, decimals: int) -> int:
+    """Jetton units from a decimal token amount such as "12.5"; ValueError unless it fits a transfer"""
+    units = Decimal(amount.strip()).scaleb(decimals, _EXACT)
+    if not units.is_finite():
+        raise ValueError(f"{amount} is not a finite amount")
+    if units != units.to_integral_value():
+        raise ValueError(f"{amount} has more than {decimals} decimals")
+    if not 0 < units < MAX_JETTON_UNITS:
+        raise ValueError(f"{amount} is not between 0 and 2^120 units")
+    return int(units)
+
+
+def stream_recipients(path: str, decimals: int = 9, stats: Optional[Dict[str, int]] = None) -> Iterator[Recipient]:
+    """Valid recipients of a CSV in file order; later rows for an address already seen are dropped
+
+    Rows are address,amount with amounts in tokens; blank lines, # comments
+    and a header row are skipped. Invalid rows are counted in stats and logged
+    at debug level instead of aborting the drop.
+    """
+    stats = stats if stats is not None else {}
+    for name in ("rows", "invalid", "duplicates"):
+        stats.setdefault(name, 0)
+    seen = set()
+    with open(path, newline="") as f:
+        for line, row in enumerate(csv.reader(f), 1):
+            if not row or not row[0].strip() or row[0].lstrip().startswith("#"):
+                continue
+            stats["rows"] += 1
+            try:
+                address = row[0].strip()
+                workchain, account_id = parse_address(address)
+                amount = to_units(row[1], decimals)
+            except (ValueError, IndexError, InvalidOperation, OverflowError) as e:
+                if line == 1:
+                    stats["rows"] -= 1  # header
+                    continue
+                stats["invalid"] += 1
+                logger.debug("Skipping line %d of %s: %s", line, path, e)
+                continue
+            account = bytes((workchain & 0xFF,)) + account_id
+            if account in seen:
+                stats["duplicates"] += 1
+                continue
+            seen.add(account)
+            yield Recipient(line, address, amount, account)
+
+
+class JettonTransferBuilder:
+    """TEP-74 transfer bodies from one owner, with the constant tail encoded once"""
+
+    def __init__(self, owner_address: str, forward_amount: int = 0):
+        owner, owner_len = address_bits(owner_address)
+        forward, forward_len = coins_bits(forward_amount)
+        # response_destination:owner custom_payload:nothing forward_ton_amount forward_payload:(Either left, empty)
+        self._tail = (((owner << 1) << forward_len | forward) << 1, owner_len + 1 + forward_len + 1)
+
+    def build(self, query_id: int, amount: int, destination: str) -> Cell:
+        """transfer#0f8a7ea5 query_id amount destination response custom forward_amount forward_payload"""
+        value, value_len = coins_bits(amount)
+        dest, dest_len = address_bits(destination)
+        tail, tail_len = self._tail
+        bits = ((((JETTON_TRANSFER_OP << 64 | query_id) << value_len | value) << dest_len | dest) << tail_len) | tail
+        return Cell(96 + value_len + dest_len + tail_len, bits)
+
+
+class AirdropWallet:
+    """A sending wallet and its jetton wallet for the dropped token"""
+
+    def __init__(self, sender: WalletSender, jetton_wallet: str, forward_amount: int = 0):
+        self.sender = sender
+        self.jetton_wallet = jetton_wallet
+        self.builder = JettonTransferBuilder(sender.wallet_address, forward_amount)
+
+
+class AirdropEngine:
+    """Feeds one drop across sending wallets with bounded backlog per wallet
+
+    Each transfer's idempotency key is derived from the drop id and the
+    recipient account, so a recipient is paid at most once per drop no matter
+    how often the drop is restarted or which wallet picked it up before.
+    """
+
+    def __init__(self, wallets: Sequence[AirdropWallet], drop_id: str, settings: AirdropSettings,
+                 clock=time.monotonic):
+        if not wallets:
+            raise ValueError("An airdrop needs at least one sending wallet")
+        self.wallets = list(wallets)
+        self.drop_id = drop_id
+        self.settings = settings
+        self.clock = clock
+        self.checkpoint_path = os.path.join(settings.checkpoint_dir, f"airdrop_{drop_id}.json")
+        self.stats: Dict[str, int] = {"queued": 0, "confirmed": 0, "already_sent": 0}
+        self.rate = WindowedCounter(RATE_WINDOW)
+        self._progress = asyncio.Event()
+        self._started = 0.0
+        self._last_report = 0.0
+        prefix = self._key_prefix = f"airdrop:{drop_id}:"
+
+        def on_confirmed(keys: List[str]):
+            count = sum(1 for key in keys if key.startswith(prefix))
+            if count:
+                self.stats["confirmed"] += count
+                self.rate.add(count, self.clock())
+                self._progress.set()
+
+        for wallet in self.wallets:
+            wallet.sender.subscribe(on_confirmed)
+
+    def _key(self, recipient: Recipient) -> str:
+        return self._key_prefix + recipient.account.hex()
+
+    def _message(self, wallet: AirdropWallet, recipient: Recipient) -> OutboundMessage:
+        body = wallet.builder.build(recipient.line, recipient.amount, recipient.address)
+        return OutboundMessage(self._key(recipient), wallet.jetton_wallet, self.settings.transfer_value,
+                               base64.b64encode(serialize_boc([body])).decode())
+
+    def _pick_wallet(self) -> Optional[AirdropWallet]:
+        """Least loaded wallet with room in its backlog window"""
+        wallet = min(self.wallets, key=lambda w: w.sender.backlog)
+        return wallet if wallet.sender.backlog < self.settings.window else None
+
+    def transfers_per_minute(self) -> Dict[str, float]:
+        now = self.clock()
+        elapsed = max(now - self._started, 1e-9)
+        return {"sustained": self.rate.rate(now) * 60, "average": self.stats["confirmed"] * 60 / elapsed}
+
+    def save_checkpoint(self, source: str, done: bool = False):
+        atomic_write_json(self.checkpoint_path, {
+            "drop_id": self.drop_id, "source": os.path.abspath(source), "done": done,
+            "updated": time.time(), "stats": self.stats, "rates": self.transfers_per_minute()
+        }, indent=2)
+
+    def _report(self, total_rows: int, force: bool = False):
+        now = self.clock()
+        if not force and now - self._last_report < self.settings.report_interval:
+            return
+        self._last_report = now
+        rates = self.transfers_per_minute()
+        backlog = sum(w.sender.backlog + (len(w.sender.in_flight.messages) if w.sender.in_flight else 0)
+                      for w in self.wallets)
+        logger.info("🪂 Airdrop %s: %d/%d confirmed, %d pending, %.0f transfers/min (avg %.0f)",
+                    self.drop_id, self.stats["confirmed"] + self.stats["already_sent"], total_rows,
+                    backlog, rates["sustained"], rates["average"])
+
+    async def run(self, path: str, run_senders: bool = True) -> Dict:
+        """Distribute the CSV at path; returns final stats
+
+        run_senders starts each wallet's send loop for the duration of the
+        drop; pass False when the senders already run under a supervisor.
+        """
+        checkpoint = load_json(self.checkpoint_path, default=None)
+        if checkpoint and checkpoint.get("source") != os.path.abspath(path):
+            raise ValueError(f"Drop {self.drop_id} was started from {checkpoint.get('source')}")
+        if checkpoint:
+            logger.info("♻️ Resuming airdrop %s (%s confirmed before)", self.drop_id,
+                        checkpoint.get("stats", {}).get("confirmed", 0))
+
+        self._started = self._last_report = self.clock()
+        tasks = [asyncio.ensure_future(w.sender.run()) for w in self.wallets] if run_senders else []
+        row_stats: Dict[str, int] = {}
+        try:
+            for recipient in stream_recipients(path, self.settings.decimals, row_stats):
+                key = self._key(recipient)
+                if any(key in w.sender.known for w in self.wallets):
+                    # Already queued or confirmed by an earlier run; its journal owns it
+                    self.stats["already_sent"] += any(key in w.sender.done for w in self.wallets)
+                    continue
+                wallet = self._pick_wallet()
+                while wallet is None:
+                    self._progress.clear()
+                    self._report(row_stats["rows"])
+                    try:
+                        await asyncio.wait_for(self._progress.wait(), self.settings.report_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    self._raise_failed(tasks)
+                    wallet = self._pick_wallet()
+                wallet.sender.enqueue(self._message(wallet, recipient))
+                self.stats["queued"] += 1
+                if self.stats["queued"] % 1000 == 0:
+                    self.save_checkpoint(path)
+                    self._report(row_stats["rows"])
+
+            self.save_checkpoint(path)
+            while not all(w.sender.idle for w in self.wallets):
+                self._progress.clear()
+                try:
+                    await asyncio.wait_for(self._progress.wait(), self.settings.report_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._raise_failed(tasks)
+                self._report(row_stats["rows"])
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        self._report(row_stats["rows"], force=True)
+        self.save_checkpoint(path, done=True)
+        return {**row_stats, **self.stats, "transfers_per_minute": self.transfers_per_minute()}
+
+    @staticmethod
+    def _raise_failed(tasks: List[asyncio.Task]):
+        for task in tasks:
+            if task.done() and not task.cancelled() and task.exception():
+                raise task.exception()
+
+
+def airdrop_wallets_from_config(jetton_wallet: str) -> List[AirdropWallet]:
+    """The configured wallet as the single sender"""
+    sender = build_wallet_sender(config_store.current)
+    if sender is None:
+        raise RuntimeError("Wallet sender unavailable: set TON_WALLET_ADDRESS and TON_PRIVATE_KEY "
+                           "and install PyNaCl or cryptography")
+    return [AirdropWallet(sender, jetton_wallet, config_store.current.airdrop.forward_amount)]
+
+
+async def run_bench(recipients: int, wallet_count: int, latency: float, drop_rate: float) -> Dict:
+    """Drop to generated recipients through a fake toncenter; returns the engine stats"""
+    import hashlib
+    from fake_toncenter import FakeToncenter
+
+    workdir = tempfile.mkdtemp(prefix="airdrop-bench-")
+    path = os.path.join(workdir, "recipients.csv")
+    with open(path, "w") as f:
+        f.write("address,amount\n")
+        for i in range(recipients):
+            f.write(f"{format_address(0, hashlib.sha256(b'%d' % i).digest())},{1 + i % 100}.5\n")
+        f.write("not-an-address,1\n")
+        f.write(f"{format_address(0, hashlib.sha256(b'0').digest())},1\n")  # duplicate
+
+    fake = FakeToncenter(latency=latency, drop_rate=drop_rate, seed=7)
+    signer = lambda data: hashlib.sha512(data).digest()  # the fake does not verify signatures
+    wallets = []
+    for n in range(wallet_count):
+        address = format_address(0, bytes([n + 1]) * 32)
+        fake.add_wallet(address)
+        sender = WalletSender(fake, address, signer, journal_path=os.path.join(workdir, f"wallet{n}.jsonl"),
+                              message_ttl=max(10 * latency, 1.0), poll_interval=latency / 4)
+        wallets.append(AirdropWallet(sender, format_address(0, bytes([0x80 + n]) * 32)))
+    settings = config_store.current.airdrop.replace(checkpoint_dir=workdir, report_interval=2.0)
+    engine = AirdropEngine(wallets, "bench", settings)
+    started = time.perf_counter()
+    result = await engine.run(path)
+    result["seconds"] = time.perf_counter() - started
+    result["landed_transfers"] = sum(len(m["messages"]) for m in fake.sent)
+    result["workdir"] = workdir
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk jetton airdrops")
+    commands = parser.add_subparsers(dest="command", required=True)
+    send = commands.add_parser("send", help="distribute a CSV of address,amount rows")
+    send.add_argument("csv")
+    send.add_argument("--drop-id", required=True, help="stable name; re-running the same id resumes it")
+    send.add_argument("--jetton-wallet", required=True, help="our jetton wallet for the dropped token")
+    bench = commands.add_parser("bench", help="run a generated drop against a local fake toncenter")
+    bench.add_argument("--recipients", type=int, default=5000)
+    bench.add_argument("--wallets", type=int, default=4)
+    bench.add_argument("--latency", type=float, default=0.2, help="seconds until a message lands")
+    bench.add_argument("--drop-rate", type=float, default=0.0, help="fraction of sends silently lost")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.command == "send":
+        engine = AirdropEngine(airdrop_wallets_from_config(args.jetton_wallet), args.drop_id,
+                               config_store.current.airdrop)
+        result = asyncio.run(engine.run(args.csv))
+    else:
+        result = asyncio.run(run_bench(args.recipients, args.wallets, args.latency, args.drop_rate))
+    for name, value in result.items():
+        print(f"{name + ':':22} {value}")
+
+
+if __name__ == "__main__":
+    main()
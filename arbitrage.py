@@ -0,0 +1,433 @@
+"""
+Tuxido Mining Bot - Arbitrage Scanner
+Token graph over constant-product pools with edge weights -log(rate after
+fees); a negative cycle is a loop of swaps returning more than it started
+with. Cycles are found incrementally: a hop-bounded Bellman-Ford re-runs
+only from edges whose reserves changed. Each cycle is sized exactly by
+composing the per-hop swap functions
+
+    python arbitrage.py --tokens 1500 --pools 5000 --updates 2000
+"""
+
+import math
+import time
+import random
+import argparse
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from runtime_config import ArbitrageSettings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FEE_BPS = 30  # StonFi v1: 0.2% LP + 0.1% protocol
+FEE_DENOMINATOR = 10000
+EPSILON = 1e-12       # ignore float noise when comparing path weights
+
+
+class Pool:
+    """Reserves and fee of one constant-product pool"""
+
+    __slots__ = ("address", "token0", "token1", "reserve0", "reserve1", "fee_bps")
+
+    def __init__(self, address: str, token0: str, token1: str, reserve0: int, reserve1: int,
+                 fee_bps: int = DEFAULT_FEE_BPS):
+        self.address = address
+        self.token0 = token0
+        self.token1 = token1
+        self.reserve0 = reserve0
+        self.reserve1 = reserve1
+        self.fee_bps = fee_bps
+
+    @classmethod
+    def from_api(cls, data: Dict) -> "Pool":
+        """Pool from a StonFi /pools entry"""
+        fee = int(data.get("lp_fee") or 20) + int(data.get("protocol_fee") or 10)
+        return cls(data["address"], data["token0_address"], data["token1_address"],
+                   int(data.get("reserve0") or 0), int(data.get("reserve1") or 0), fee)
+
+    def reserves(self, direction: int) -> Tuple[int, int]:
+        """(reserve in, reserve out) for swapping token0->token1 (0) or token1->token0 (1)"""
+        return (self.reserve0, self.reserve1) if direction == 0 else (self.reserve1, self.reserve0)
+
+    def amount_out(self, amount_in: int, direction: int) -> int:
+        reserve_in, reserve_out = self.reserves(direction)
+        with_fee = amount_in * (FEE_DENOMINATOR - self.fee_bps)
+        return with_fee * reserve_out // (reserve_in * FEE_DENOMINATOR + with_fee)
+
+    def weight(self, direction: int) -> float:
+        """-log of the marginal rate after fees"""
+        reserve_in, reserve_out = self.reserves(direction)
+        if reserve_in <= 0 or reserve_out <= 0:
+            return math.inf
+        return -math.log((FEE_DENOMINATOR - self.fee_bps) * reserve_out / (FEE_DENOMINATOR * reserve_in))
+
+
+class Opportunity:
+    """A profitable cycle sized for maximum profit in its start token"""
+
+    __slots__ = ("tokens", "hops", "amount_in", "amount_out", "log_gain", "found_at")
+
+    def __init__(self, tokens: List[str], hops: List[Tuple[Pool, int]], amount_in: int, amount_out: int,
+                 log_gain: float, found_at: float):
+        self.tokens = tokens      # start token first, cycle closes back to it
+        self.hops = hops          # (pool, direction) per swap
+        self.amount_in = amount_in
+        self.amount_out = amount_out
+        self.log_gain = log_gain  # -sum(weights): marginal gain of an infinitesimal trade
+        self.found_at = found_at
+
+    @property
+    def profit(self) -> int:
+        return self.amount_out - self.amount_in
+
+    @property
+    def profit_bps(self) -> float:
+        return self.profit * FEE_DENOMINATOR / self.amount_in if self.amount_in else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            "path": self.tokens + [self.tokens[0]],
+            "pools": [pool.address for pool, _ in self.hops],
+            "amount_in": self.amount_in,
+            "amount_out": self.amount_out,
+            "profit": self.profit,
+            "profit_bps": round(self.profit_bps, 2)
+        }
+
+
+def size_cycle(hops: List[Tuple[Pool, int]]) -> Tuple[int, int]:
+    """(optimal amount in, amount out) for a cycle of swaps, exact in integers
+
+    One hop maps x to a*x / (b + c*x) with a = g*R_out, b = D*R_in, c = g
+    (g = D - fee). Composing two such maps gives the same form with
+    a = a1*a2, b = b1*b2, c = b2*c1 + c2*a1, so the whole cycle is one map
+    and profit f(x) - x peaks where f'(x) = a*b / (b + c*x)^2 = 1.
+    """
+    a, b, c = 1, 1, 0
+    for pool, direction in hops:
+        reserve_in, reserve_out = pool.reserves(direction)
+        g = FEE_DENOMINATOR - pool.fee_bps
+        ha, hb, hc = g * reserve_out, FEE_DENOMINATOR * reserve_in, g
+        a, b, c = a * ha, b * hb, hb * c + hc * a
+    if a <= b or c == 0:
+        return 0, 0
+    amount_in = (math.isqrt(a * b) - b) // c
+    if amount_in <= 0:
+        return 0, 0
+    # Per-hop integer rounding as the pools apply it
+    amount = amount_in
+    for pool, direction in hops:
+        amount = pool.amount_out(amount, direction)
+    return amount_in, amount
+
+
+class ArbitrageScanner:
+    """Incremental detection of profitable swap cycles of up to max_hops pools
+
+    Nothing but the updated pools changes between two updates, so every cycle
+    that became profitable passes through an edge of an updated pool. For
+    each such edge u->v a hop-bounded Bellman-Ford from v finds the cheapest
+    way back to u; cycles already open are re-sized or dropped when one of
+    their pools changes. An update therefore touches only the neighbourhood
+    of the pools it changed.
+    """
+
+    def __init__(self, start_tokens: Iterable[str] = (), min_profit_bps: float = 0.0,
+                 gas_per_hop: int = 0, max_hops: int = 3, clock=time.monotonic):
+        if not 2 <= max_hops <= 4:
+            raise ValueError("max_hops must be between 2 and 4")
+        self.start_tokens = list(start_tokens)  # preferred tokens to express profit in (e.g. pTON)
+        self.min_profit_bps = min_profit_bps
+        self.gas_per_hop = gas_per_hop          # in units of the first start token
+        self.max_hops = max_hops
+        self.clock = clock
+
+        self.token_index: Dict[str, int] = {}
+        self.tokens: List[str] = []
+        self.out_edges: List[List[int]] = []
+        self.in_edges: List[List[int]] = []
+        # Edges in parallel arrays; edge 2i is pool i token0->token1, 2i+1 the reverse
+        self.edge_from: List[int] = []
+        self.edge_to: List[int] = []
+        self.weight: List[float] = []
+        self.pools: List[Pool] = []
+        self.pool_index: Dict[str, int] = {}
+
+        self.cycles: Dict[Tuple[int, ...], Opportunity] = {}
+        self.cycles_by_pool: Dict[int, set] = {}
+        self.stats = {"updates": 0, "relaxations": 0, "cycles_found": 0, "cycles_closed": 0}
+
+    # --- Graph maintenance -----------------------------------------------------
+
+    def _node(self, token: str) -> int:
+        index = self.token_index.get(token)
+        if index is None:
+            index = self.token_index[token] = len(self.tokens)
+            self.tokens.append(token)
+            self.out_edges.append([])
+            self.in_edges.append([])
+        return index
+
+    def _add_pool(self, pool: Pool) -> int:
+        index = self.pool_index[pool.address] = len(self.pools)
+        self.pools.append(pool)
+        u, v = self._node(pool.token0), self._node(pool.token1)
+        for tail, head, direction in ((u, v, 0), (v, u, 1)):
+            edge = len(self.edge_to)
+            self.out_edges[tail].append(edge)
+            self.in_edges[head].append(edge)
+            self.edge_from.append(tail)
+            self.edge_to.append(head)
+            self.weight.append(pool.weight(direction))
+        return index
+
+    def update_pools(self, pools: Iterable) -> List[Opportunity]:
+        """Apply new reserves (Pool objects or StonFi /pools dicts); returns cycles opened by this update"""
+        changed: List[int] = []
+        for pool in pools:
+            if isinstance(pool, dict):
+                pool = Pool.from_api(pool)
+            index = self.pool_index.get(pool.address)
+            if index is None:
+                index = self._add_pool(pool)
+            else:
+                current = self.pools[index]
+                if (current.reserve0, current.reserve1, current.fee_bps) == \
+                        (pool.reserve0, pool.reserve1, pool.fee_bps):
+                    continue
+                current.reserve0, current.reserve1, current.fee_bps = pool.reserve0, pool.reserve1, pool.fee_bps
+                self.weight[2 * index] = current.weight(0)
+                self.weight[2 * index + 1] = current.weight(1)
+            changed.append(index)
+        if not changed:
+            return []
+        self.stats["updates"] += 1
+        probe = [edge for index in changed for edge in (2 * index, 2 * index + 1)]
+        probe.extend(self._revisit_cycles(changed))
+
+        found = []
+        for edge in dict.fromkeys(probe):
+            cycle = self._best_cycle_through(edge)
+            if cycle:
+                opportunity = self._record_cycle(cycle)
+                if opportunity:
+                    found.append(opportunity)
+        return found
+
+    def update_reserves(self, address: str, reserve0: int, reserve1: int) -> List[Opportunity]:
+        pool = self.pools[self.pool_index[address]]
+        return self.update_pools([Pool(address, pool.token0, pool.token1, reserve0, reserve1, pool.fee_bps)])
+
+    def _revisit_cycles(self, changed_pools: List[int]) -> List[int]:
+        """Re-size open cycles through changed pools and drop the ones that closed
+
+        Returns the edges of closed cycles: each was only the best cycle
+        through its edges, and a runner-up through them may still be open.
+        """
+        released = []
+        keys = set()
+        for index in changed_pools:
+            keys.update(self.cycles_by_pool.get(index, ()))
+        for key in keys:
+            if sum(self.weight[edge] for edge in key) < -EPSILON:
+                self.cycles[key] = self._opportunity(key)
+                continue
+            self.cycles.pop(key, None)
+            for edge in key:
+                self.cycles_by_pool[edge // 2].discard(key)
+            released.extend(key)
+            self.stats["cycles_closed"] += 1
+        return released
+
+    # --- Detection ---------------------------------------------------------------
+
+    def _best_cycle_through(self, edge: int) -> Optional[List[int]]:
+        """Most negative cycle of at most max_hops edges starting with edge
+
+        Bellman-Ford from the edge's head bounded to max_hops - 2 layers, then
+        closed with an edge back into the tail: checking the smaller of the
+        last layer and the tail's in-edges keeps hub tokens cheap.
+        """
+        weight, edge_to, edge_from = self.weight, self.edge_to, self.edge_from
+        tail, head = edge_from[edge], edge_to[edge]
+        budget = -weight[edge] - EPSILON  # the return path must cost less than this
+        if budget <= -math.inf:
+            return None
+        pool = edge // 2
+        in_edges = self.in_edges[tail]
+        best_cost, best_path = budget, None
+        # layer: node -> (cost from head, path of edges)
+        layer: Dict[int, Tuple[float, Tuple[int, ...]]] = {head: (0.0, ())}
+        relaxations = 0
+        for hops in range(1, self.max_hops):
+            # Close the cycle: one more edge from a node of this layer into tail
+            if len(layer) < len(in_edges):
+                for node, (cost, path) in layer.items():
+                    for back in self.out_edges[node]:
+                        if edge_to[back] == tail and back // 2 != pool and cost + weight[back] < best_cost:
+                            best_cost, best_path = cost + weight[back], path + (back,)
+            else:
+                for back in in_edges:
+                    entry = layer.get(edge_from[back])
+                    if entry and back // 2 != pool and entry[0] + weight[back] < best_cost:
+                        best_cost, best_path = entry[0] + weight[back], entry[1] + (back,)
+            if hops == self.max_hops - 1:
+                break
+            next_layer: Dict[int, Tuple[float, Tuple[int, ...]]] = {}
+            for node, (cost, path) in layer.items():
+                for step in self.out_edges[node]:
+                    target = edge_to[step]
+                    if target == tail or target == head:
+                        continue
+                    candidate = cost + weight[step]
+                    entry = next_layer.get(target)
+                    if entry is None or candidate < entry[0]:
+                        relaxations += 1
+                        next_layer[target] = (candidate, path + (step,))
+            layer = next_layer
+        self.stats["relaxations"] += relaxations
+        return [edge] + list(best_path) if best_path is not None else None
+
+    def _record_cycle(self, edges: List[int]) -> Optional[Opportunity]:
+        # Canonical rotation so one cycle always maps to one key
+        start = edges.index(min(edges))
+        key = tuple(edges[start:] + edges[:start])
+        if key in self.cycles:
+            return None
+        opportunity = self.cycles[key] = self._opportunity(key)
+        for edge in key:
+            self.cycles_by_pool.setdefault(edge // 2, set()).add(key)
+        self.stats["cycles_found"] += 1
+        return opportunity
+
+    def _opportunity(self, key: Tuple[int, ...]) -> Opportunity:
+        edges = list(key)
+        # Express profit in a preferred start token when the cycle passes through one
+        for token in self.start_tokens:
+            node = self.token_index.get(token)
+            starts = [i for i, edge in enumerate(edges) if self.edge_from[edge] == node]
+            if starts:
+                edges = edges[starts[0]:] + edges[:starts[0]]
+                break
+        hops = [(self.pools[edge // 2], edge % 2) for edge in edges]
+        amount_in, amount_out = size_cycle(hops)
+        return Opportunity(
+            [self.tokens[self.edge_from[edge]] for edge in edges], hops, amount_in, amount_out,
+            -sum(self.weight[edge] for edge in edges), self.clock()
+        )
+
+    # --- Results ---------------------------------------------------------------
+
+    def opportunities(self) -> List[Opportunity]:
+        """Open cycles worth trading after gas, best profit first"""
+        result = []
+        preferred = self.start_tokens[0] if self.start_tokens else None
+        for opportunity in self.cycles.values():
+            if opportunity.amount_in <= 0:
+                continue
+            profit = opportunity.profit
+            if opportunity.tokens[0] == preferred:
+                profit -= self.gas_per_hop * len(opportunity.hops)
+            if profit > 0 and profit * FEE_DENOMINATOR >= self.min_profit_bps * opportunity.amount_in:
+                result.append(opportunity)
+        result.sort(key=lambda o: o.profit, reverse=True)
+        return result
+
+
+def build_scanner(settings: ArbitrageSettings) -> ArbitrageScanner:
+    return ArbitrageScanner(start_tokens=[settings.base_token], min_profit_bps=settings.min_profit_bps,
+                            gas_per_hop=settings.gas_per_hop, max_hops=settings.max_hops)
+
+
+def synthetic_pools(tokens: int, pools: int, hubs: int = 5, seed: int = 1) -> List[Pool]:
+    """Pools priced consistently from a hidden price per token, so only fees separate rates"""
+    rng = random.Random(seed)
+    prices = [math.exp(rng.uniform(-5, 5)) for _ in range(tokens)]
+    names = [f"T{i}" for i in range(tokens)]
+    seen = set()
+    result = []
+    while len(result) < pools:
+        # Mostly hub pairs (X/TON, X/USDT, ...) like real DEX graphs, plus long-tail pairs
+        a = rng.randrange(hubs) if rng.random() < 0.6 else rng.randrange(tokens)
+        b = rng.randrange(tokens)
+        if a == b or (a, b) in seen or (b, a) in seen:
+            continue
+        seen.add((a, b))
+        depth = 10 ** rng.uniform(3, 6)
+        reserve0 = int(depth / prices[a] * 1e9)
+        reserve1 = int(depth / prices[b] * 1e9)
+        result.append(Pool(f"P{len(result)}", names[a], names[b], reserve0, reserve1))
+    return result
+
+
+def execute_cycle(opportunity: Opportunity) -> List[Pool]:
+    """Reserves of the cycle's pools after trading it at its optimal size"""
+    amount = opportunity.amount_in
+    result = []
+    for pool, direction in opportunity.hops:
+        out = pool.amount_out(amount, direction)
+        if direction == 0:
+            reserves = (pool.reserve0 + amount, pool.reserve1 - out)
+        else:
+            reserves = (pool.reserve0 - out, pool.reserve1 + amount)
+        result.append(Pool(pool.address, pool.token0, pool.token1, *reserves, pool.fee_bps))
+        amount = out
+    return result
+
+
+def run_benchmark(tokens: int, pools: int, updates: int, shock: float, max_hops: int = 3, seed: int = 1):
+    """Per-update detection latency on a synthetic graph
+
+    Each step a random trade moves one pool by up to +-shock; arbitrageurs
+    then trade the best open cycle, as they would on chain, and that trade
+    is fed back as another update.
+    """
+    rng = random.Random(seed)
+    graph = synthetic_pools(tokens, pools, seed=seed)
+    scanner = ArbitrageScanner(start_tokens=["T0"], max_hops=max_hops)
+    started = time.perf_counter()
+    scanner.update_pools(Pool(p.address, p.token0, p.token1, p.reserve0, p.reserve1) for p in graph)
+    initial = time.perf_counter() - started
+
+    latencies = []
+    found = executed = 0
+    for _ in range(updates):
+        pool = scanner.pools[rng.randrange(len(scanner.pools))]
+        move = math.sqrt(math.exp(rng.uniform(-shock, shock)))
+        started = time.perf_counter()
+        found += len(scanner.update_reserves(pool.address, int(pool.reserve0 * move), int(pool.reserve1 / move)))
+        latencies.append(time.perf_counter() - started)
+
+        best = scanner.opportunities()[:1]
+        if best:
+            executed += 1
+            started = time.perf_counter()
+            found += len(scanner.update_pools(execute_cycle(best[0])))
+            latencies.append(time.perf_counter() - started)
+
+    latencies.sort()
+    print(f"Graph:               {tokens:,} tokens, {pools:,} pools, cycles up to {max_hops} hops")
+    print(f"Initial scan:        {initial * 1000:.1f} ms")
+    print(f"Updates:             {len(latencies):,} ({updates:,} random trades up to {shock:.1%}, "
+          f"{executed:,} arbitrage trades)")
+    print(f"Latency p50/p99/max: {latencies[len(latencies) // 2] * 1000:.3f} / "
+          f"{latencies[int(len(latencies) * 0.99)] * 1000:.3f} / {latencies[-1] * 1000:.3f} ms")
+    print(f"Cycles found:        {found:,} ({len(scanner.cycles):,} open at the end)")
+    print(f"Relaxations/update:  {scanner.stats['relaxations'] / max(scanner.stats['updates'], 1):.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Arbitrage scanner benchmark on a synthetic pool graph")
+    parser.add_argument("--tokens", type=int, default=1500)
+    parser.add_argument("--pools", type=int, default=5000)
+    parser.add_argument("--updates", type=int, default=2000)
+    parser.add_argument("--shock", type=float, default=0.02, help="max log price move per update")
+    parser.add_argument("--max-hops", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    run_benchmark(args.tokens, args.pools, args.updates, args.shock, args.max_hops, args.seed)
+
+
+if __name__ == "__main__":
+    main()
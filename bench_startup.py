@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Tuxido Mining Bot - Startup Benchmark
+Measures entry-point import time and wall-clock time to the first mined block
+
+Usage: python bench_startup.py [--runs N]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import subprocess
+import statistics
+
+ENTRY_MODULES = ["main", "ai_assistant", "stonfi_integration", "start_ai_mode"]
+FIRST_BLOCK_MARKER = "FIRST_BLOCK"
+
+
+def measure_import(module: str, runs: int) -> list:
+    """Import time of a module in fresh interpreters, in milliseconds"""
+    code = (
+        "import time; t = time.perf_counter(); "
+        f"import {module}; "
+        "print((time.perf_counter() - t) * 1000)"
+    )
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+        if result.returncode != 0:
+            return []
+        samples.append(float(result.stdout.strip().splitlines()[-1]))
+    return samples
+
+
+def measure_first_block(fast_start: bool, runs: int) -> list:
+    """Wall-clock time from process spawn to the first mined block, in milliseconds"""
+    env = dict(os.environ, FAST_START="true" if fast_start else "false",
+               TELEGRAM_BOT_TOKEN="", TELEGRAM_NOTIFICATIONS="false")
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--child"],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, env=env,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+        for line in process.stdout:
+            if line.startswith(FIRST_BLOCK_MARKER):
+                samples.append((time.perf_counter() - started) * 1000)
+                break
+        process.kill()
+        process.wait()
+    return samples
+
+
+async def run_child():
+    """Start the miner and report as soon as the first block is mined"""
+    from main import AdvancedTuxidoMiner
+
+    miner = AdvancedTuxidoMiner()
+    mining = asyncio.create_task(miner.start_mining())
+    while miner.blocks_mined == 0 and not mining.done():
+        await asyncio.sleep(0.001)
+    print(FIRST_BLOCK_MARKER, flush=True)
+    os._exit(0)
+
+
+def summarize(label: str, samples: list):
+    if not samples:
+        print(f"{label:<32} unavailable (import failed or no block mined)")
+        return
+    print(f"{label:<32} median {statistics.median(samples):8.1f} ms"
+          f"   min {min(samples):8.1f} ms   runs {len(samples)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tuxido startup benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        asyncio.run(run_child())
+        return
+
+    print("Import time (fresh interpreter)")
+    for module in ENTRY_MODULES:
+        summarize(f"  import {module}", measure_import(module, args.runs))
+
+    print("Time to first block (spawn -> block #1)")
+    summarize("  fast start", measure_first_block(True, args.runs))
+    summarize("  sequential start", measure_first_block(False, args.runs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+Tuxido Mining Bot - Block History
+Fixed-capacity, struct-of-arrays ring buffer of recent blocks. Appends are
+O(1), recent windows are exposed as zero-copy views (NumPy arrays when NumPy
+is installed, memoryviews otherwise), and evicted segments can be spilled to
+an append-only binary file
+"""
+
+import os
+import struct
+import logging
+import weakref
+import statistics
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from storage_utils import append_bytes
+
+logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+# Column name -> array typecode (8-byte columns keep segments aligned)
+FIELDS: Tuple[Tuple[str, str], ...] = (
+    ("timestamp", "d"),
+    ("hash_rate", "q"),
+    ("reward", "q"),
+    ("market_multiplier", "d"),
+    ("total_multiplier", "d"),
+)
+FIELD_NAMES = tuple(name for name, _ in FIELDS)
+
+SEGMENT_MAGIC = b"TXBH"
+SEGMENT_HEADER = struct.Struct("<4sI")  # magic, row count; columns follow in FIELDS order
+
+# Live histories by name, for in-process readers such as the web dashboard
+_registry: "weakref.WeakValueDictionary[str, BlockHistory]" = weakref.WeakValueDictionary()
+
+
+class BlockHistory:
+    """Ring buffer of per-block records
+
+    Columns are allocated at 2 x capacity up front and every row is stored
+    twice (at i and i + capacity), so any window of up to capacity rows is
+    one contiguous slice. Storage never resizes: views handed to other
+    threads (the web dashboard) stay valid while the miner appends. A
+    segment is spilled as a whole when its first row is overwritten.
+    """
+
+    __slots__ = ("capacity", "segment_size", "spill_path", "spill_enabled", "max_spill_bytes",
+                 "_columns", "_head", "_size", "appended", "spilled", "__weakref__")
+
+    def __init__(self, capacity: int = 7200, segment_size: int = 600,
+                 spill_path: Optional[str] = None, max_spill_mb: int = 64):
+        self.segment_size = max(1, segment_size)
+        self.capacity = self._round_capacity(capacity)
+        self.spill_path = spill_path
+        self.spill_enabled = spill_path is not None
+        self.max_spill_bytes = max_spill_mb * 1024 * 1024
+        self._columns = self._allocate(self.capacity)
+        self._head = 0
+        self._size = 0
+        self.appended = 0
+        self.spilled = 0
+
+    def _round_capacity(self, capacity: int) -> int:
+        """Capacity in whole segments, so evictions happen segment by segment"""
+        segments = max(1, -(-int(capacity) // self.segment_size))
+        return segments * self.segment_size
+
+    @staticmethod
+    def _allocate(capacity: int) -> Dict[str, array]:
+        return {name: array(code, bytes(array(code).itemsize * 2 * capacity)) for name, code in FIELDS}
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, timestamp: float, hash_rate: int, reward: int,
+               market_multiplier: float, total_multiplier: float):
+        """Record one block in O(1)"""
+        row = (timestamp, hash_rate, reward, market_multiplier, total_multiplier)
+        columns = self._columns
+        head = self._head
+        full = self._size == self.capacity
+        if full and head % self.segment_size == 0:
+            self._spill_range(head, head + self.segment_size)
+        mirror = head + self.capacity
+        for name, value in zip(FIELD_NAMES, row):
+            column = columns[name]
+            column[head] = value
+            column[mirror] = value
+        # Publish the row only once written, for readers on other threads
+        self._head = (head + 1) % self.capacity
+        if not full:
+            self._size += 1
+        self.appended += 1
+
+    def _bounds(self, n: Optional[int] = None) -> Tuple[int, int]:
+        n = self._size if n is None else max(0, min(n, self._size))
+        # The newest row sits just before head + capacity, whether or not the ring has wrapped
+        end = self._head + self.capacity
+        return end - n, end
+
+    def window(self, field: str, n: Optional[int] = None):
+        """Zero-copy view of the newest n values of field, oldest first"""
+        start, end = self._bounds(n)
+        column = self._columns[field]
+        if NUMPY_AVAILABLE:
+            return np.frombuffer(column, dtype=column.typecode)[start:end]
+        return memoryview(column)[start:end]
+
+    def rows(self, n: Optional[int] = None) -> List[Dict]:
+        """Newest n records as dicts (copies; for JSON endpoints and reports)"""
+        start, end = self._bounds(n)
+        columns = [self._columns[name][start:end] for name in FIELD_NAMES]
+        return [dict(zip(FIELD_NAMES, values)) for values in zip(*columns)]
+
+    def moving_average(self, field: str, n: int) -> float:
+        values = self.window(field, n)
+        if not len(values):
+            return 0.0
+        return float(np.mean(values)) if NUMPY_AVAILABLE else statistics.fmean(values)
+
+    def percentile(self, field: str, q: float, n: Optional[int] = None) -> float:
+        """q-th percentile (0-100) of field over the newest n blocks"""
+        values = self.window(field, n)
+        if not len(values):
+            return 0.0
+        if NUMPY_AVAILABLE:
+            return float(np.percentile(values, q))
+        ordered = sorted(values)
+        rank = (len(ordered) - 1) * q / 100.0
+        low = int(rank)
+        high = min(low + 1, len(ordered) - 1)
+        return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+    def block_rate(self, n: int) -> float:
+        """Blocks per second over the newest n blocks"""
+        timestamps = self.window("timestamp", n)
+        if len(timestamps) < 2:
+            return 0.0
+        span = timestamps[-1] - timestamps[0]
+        return (len(timestamps) - 1) / span if span > 0 else 0.0
+
+    def summary(self, n: int = 600) -> Dict:
+        """Windowed statistics for dashboards and the AI assistant"""
+        return {
+            "blocks": min(n, self._size),
+            "block_rate": self.block_rate(n),
+            "avg_reward": self.moving_average("reward", n),
+            "p50_reward": self.percentile("reward", 50, n),
+            "p95_reward": self.percentile("reward", 95, n),
+            "avg_hash_rate": self.moving_average("hash_rate", n),
+            "avg_market_multiplier": self.moving_average("market_multiplier", n),
+            "avg_total_multiplier": self.moving_average("total_multiplier", n),
+        }
+
+    def memory_bytes(self) -> int:
+        return sum(len(column) * column.itemsize for column in self._columns.values())
+
+    def resize(self, capacity: int):
+        """Change capacity, keeping the newest rows (older ones are spilled if enabled)"""
+        capacity = self._round_capacity(capacity)
+        start, end = self._bounds()
+        keep = min(self._size, capacity)
+        if self._size > keep:
+            # The rest of the segment under the head was spilled when its first row was overwritten
+            already_spilled = (-self._head) % self.segment_size if self._size == self.capacity else 0
+            self._spill_range(start + already_spilled, end - keep)
+        # New storage rather than resizing the old: views over it may still be in use elsewhere
+        columns = self._allocate(capacity)
+        for name in FIELD_NAMES:
+            rows = self._columns[name][end - keep:end]
+            columns[name][0:keep] = rows
+            columns[name][capacity:capacity + keep] = rows
+        self._columns = columns
+        self.capacity = capacity
+        self._size = keep
+        self._head = keep % capacity
+
+    def _spill_range(self, start: int, end: int):
+        """Append rows [start, end) of the storage to the spill file"""
+        if not self.spill_enabled or end <= start:
+            return
+        try:
+            payload = [SEGMENT_HEADER.pack(SEGMENT_MAGIC, end - start)]
+            payload.extend(self._columns[name][start:end].tobytes() for name in FIELD_NAMES)
+            self._rotate_spill_file()
+            append_bytes(self.spill_path, b"".join(payload))
+            self.spilled += end - start
+        except Exception as e:
+            logger.error("Block history spill failed: %s", e)
+
+    def _rotate_spill_file(self):
+        try:
+            if os.path.getsize(self.spill_path) >= self.max_spill_bytes:
+                os.replace(self.spill_path, f"{self.spill_path}.1")
+        except FileNotFoundError:
+            pass
+
+
+def read_spilled(path: str) -> Iterator[Dict[str, array]]:
+    """Yield spilled segments as {field: array} in the order they were evicted"""
+    with open(path, "rb") as f:
+        while True:
+            header = f.read(SEGMENT_HEADER.size)
+            if len(header) < SEGMENT_HEADER.size:
+                return
+            magic, rows = SEGMENT_HEADER.unpack(header)
+            if magic != SEGMENT_MAGIC:
+                raise ValueError(f"Corrupt block history segment in {path}")
+            segment = {}
+            for name, code in FIELDS:
+                column = array(code)
+                column.frombytes(f.read(rows * column.itemsize))
+                segment[name] = column
+            yield segment
+
+
+def register_history(name: str, history: BlockHistory):
+    _registry[name] = history
+
+
+def get_history(name: Optional[str] = None) -> Optional[BlockHistory]:
+    """History registered under name, or the only/first one when name is omitted"""
+    if name is not None:
+        return _registry.get(name)
+    for history in _registry.values():
+        return history
+    return None
+
+
+def history_names() -> List[str]:
+    return list(_registry.keys())
@@ -0,0 +1,531 @@
+"""
+Tuxido Mining Bot - TON Cells and Bag of Cells
+Native-Python TL-B cell builder, cell hashing and BOC (de)serialization, enough
+to build jetton transfers and StonFi swaps without an external TON SDK
+
+    python boc.py --check    # verify against known-good fixtures
+"""
+
+import base64
+import struct
+import hashlib
+import logging
+import argparse
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import crc32c as _crc32c_ext
+    CRC32C_NATIVE = True
+except ImportError:
+    _crc32c_ext = None
+    CRC32C_NATIVE = False
+
+BOC_MAGIC = b"\xb5\xee\x9c\x72"
+MAX_BITS = 1023
+MAX_REFS = 4
+
+# Known-good fixtures from an independent implementation (pytoniq-core):
+# name -> (BOC hex, representation hash of the root)
+FIXTURES: Dict[str, Tuple[str, str]] = {
+    "empty": (
+        "b5ee9c724101010100020000004cacb9cd",
+        "96a296d224f285c67bee93c30f8a309157f0daa35dc5b87e410b78630a09cfc7"),
+    # A basechain and a masterchain addr_std, then addr_none
+    "address": (
+        "b5ee9c72410101010045000086801622753296a04942ce33ed2272651d6eb2b2d87144beb2051628dfd9b86c43bfd3fccccc"
+        "ccccccccccccccccccccccccccccccccccccccccccccccccccccccccccccc5e65bc8",
+        "2d03ac7ef15628a6af27cc42e2e8db9346bd5a0d0301e61b674febd0b8a183b3"),
+    # Coins 0, 1, 10^9 and 2^120 - 1
+    "coins": (
+        "b5ee9c7241010101001800002c010143b9aca00fffffffffffffffffffffffffffffffbfeb858f",
+        "2f372589ec22fa5c707a6f2e70ede6ffd78fdd472c99f97b823fd698392d50df"),
+    # Three refs, one cell referenced from two parents
+    "refs": (
+        "b5ee9c72410104010013000301c00102030201b002020008deadbeef000065ff66b8",
+        "6020c73cd018cde261bb0a622cd8bc1db8d349bd50556cfa61cbc047161421a0"),
+    # Either X ^X holding a text comment, inline (left) and by reference (right)
+    "either_inline": (
+        "b5ee9c7241010101000d000015000000003a3abc34b237c0a7e9fb48",
+        "55b7a9b7e2db4a47110fb53120ac736042f59d4f4fc30af6794880c0bd301d85"),
+    "either_ref": (
+        "b5ee9c72410102010010000101c00100140000000074757869646f2b199412",
+        "8cd238b6aa7c7d2b2bc33c760bbc219285bd3d891e093dcd0a6148d8286053a9"),
+    # TEP-74 transfer of 15 jettons with an inline comment
+    "tep74_transfer": (
+        "b5ee9c724101010100620000c00f8a7ea500000000000000075037e11d600800dededededededededededededededededede"
+        "dedededededededededededededf001bdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbc20200"
+        "00000074757869646fc53f1805",
+        "de649c774232750fd7e326488590bddeae110479ec934af805acec96b746c0ef"),
+    # StonFi v1 jetton -> TON swap: transfer to the router carrying swap#25938561 for pTON
+    "stonfi_v1_swap": (
+        "b5ee9c724101020100a90001b00f8a7ea50000011f71fb04cb4b2d05e00800ef3b9902a271b2a01c8938a523cfe24e71847a"
+        "aeb6a620001ed44a77ac0e709d001bdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbc80ee6b2"
+        "810100972593856180119b83aec815abdc64ca4ff835a0a29e8d1661b909602e7e1c2abe8a369c23ef880eb79a2b001bdbdb"
+        "dbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbd07e2e8e7f",
+        "67eefc5fa8ec2fa90def255c16a677f72e3af37a34baab3148b8e037b5218a92"),
+    # StonFi v1 jetton -> jetton swap with a referral address
+    "stonfi_v1_swap_referral": (
+        "b5ee9c724101020100cb0001b80f8a7ea5000000000000002a80de0b6b3a7640000800ef3b9902a271b2a01c8938a523cfe2"
+        "4e71847aaeb6a620001ed44a77ac0e709d001bdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdb"
+        "c818701a810100d325938561801622753296a04942ce33ed2272651d6eb2b2d87144beb2051628dfd9b86c43bfc203001bdb"
+        "dbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbdbf001de77320544e365403912714a479fc49ce308"
+        "f55d6d4c40003da894ef581ce13af2cc7d0a",
+        "58b388fe90c84a04305cecf4b060ff4464d8a61e1ee33ade03b4c5044e4a08ed"),
+}
+
+
+def _crc32c_tables() -> Tuple[List[int], ...]:
+    """Byte table plus the three extra tables for slicing-by-4"""
+    base = []
+    for n in range(256):
+        crc = n
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0x82F63B78 if crc & 1 else crc >> 1
+        base.append(crc)
+    tables = [base]
+    for _ in range(3):
+        previous = tables[-1]
+        tables.append([(previous[i] >> 8) ^ base[previous[i] & 0xFF] for i in range(256)])
+    return tuple(tables)
+
+
+_T0, _T1, _T2, _T3 = _crc32c_tables()
+
+
+def crc32c(data: bytes) -> int:
+    """CRC-32C (Castagnoli) as used by BOC checksums"""
+    if CRC32C_NATIVE:
+        return _crc32c_ext.crc32c(data)
+    crc = 0xFFFFFFFF
+    words = len(data) & ~3
+    # Slicing-by-4: one table round per 32-bit word instead of per byte
+    for (word,) in struct.iter_unpack("<I", data[:words]):
+        crc ^= word
+        crc = _T3[crc & 0xFF] ^ _T2[(crc >> 8) & 0xFF] ^ _T1[(crc >> 16) & 0xFF] ^ _T0[crc >> 24]
+    for byte in data[words:]:
+        crc = _T0[(crc ^ byte) & 0xFF] ^ (crc >> 8)
+    return crc ^ 0xFFFFFFFF
+
+
+def _crc16(data: bytes) -> int:
+    """CRC-16/XMODEM, the checksum in user-friendly addresses"""
+    crc = 0
+    for byte in data:
+        crc ^= byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) & 0xFFFF if crc & 0x8000 else (crc << 1) & 0xFFFF
+    return crc
+
+
+class Cell:
+    """Immutable ordinary cell: up to 1023 data bits and 4 references"""
+
+    __slots__ = ("bits", "value", "refs", "_hash", "_depth", "_descriptor")
+
+    def __init__(self, bits: int = 0, value: int = 0, refs: Sequence["Cell"] = ()):
+        if bits > MAX_BITS or len(refs) > MAX_REFS:
+            raise ValueError(f"Cell overflow: {bits} bits, {len(refs)} refs")
+        self.bits = bits      # number of data bits
+        self.value = value    # data bits as a big-endian integer
+        self.refs = tuple(refs)
+        self._hash: Optional[bytes] = None
+        self._depth: Optional[int] = None
+        self._descriptor: Optional[bytes] = None
+
+    def descriptor(self) -> bytes:
+        """d1, d2 followed by the data padded with the completion tag"""
+        if self._descriptor is None:
+            bits = self.bits
+            full, rest = divmod(bits, 8)
+            value = self.value
+            if rest:
+                # Completion tag: one 1-bit then zeros up to the byte boundary
+                pad = 8 - rest
+                value = (value << pad) | (1 << (pad - 1))
+            size = full + (1 if rest else 0)
+            self._descriptor = bytes((len(self.refs), full + size)) + value.to_bytes(size, "big")
+        return self._descriptor
+
+    def depth(self) -> int:
+        if self._depth is None:
+            for cell in _references_first(self, "_depth"):
+                cell._depth = 1 + max(ref._depth for ref in cell.refs) if cell.refs else 0
+        return self._depth
+
+    def hash(self) -> bytes:
+        """Representation hash (level 0 ordinary cell)"""
+        if self._hash is None:
+            for cell in _references_first(self, "_hash"):
+                parts = [cell.descriptor()]
+                parts.extend(ref.depth().to_bytes(2, "big") for ref in cell.refs)
+                parts.extend(ref._hash for ref in cell.refs)
+                cell._hash = hashlib.sha256(b"".join(parts)).digest()
+        return self._hash
+
+    def to_boc(self, has_crc32c: bool = True) -> bytes:
+        return serialize_boc([self], has_crc32c)
+
+    def begin_parse(self) -> "Slice":
+        return Slice(self)
+
+    def __eq__(self, other):
+        return isinstance(other, Cell) and self.hash() == other.hash()
+
+    def __hash__(self):
+        return hash(self.hash())
+
+    def __repr__(self):
+        return f"Cell(bits={self.bits}, refs={len(self.refs)}, hash={self.hash().hex()[:16]})"
+
+
+def _references_first(root: Cell, slot: str) -> Iterator[Cell]:
+    """Cells under root whose cached slot is unset, each after the cells it references
+
+    Iterative, so chains deeper than the recursion limit are fine; the caller
+    fills the slot of each cell as it is yielded.
+    """
+    stack = [root]
+    while stack:
+        cell = stack[-1]
+        if getattr(cell, slot) is not None:
+            stack.pop()
+            continue
+        pending = [ref for ref in cell.refs if getattr(ref, slot) is None]
+        if pending:
+            stack.extend(pending)
+            continue
+        stack.pop()
+        yield cell
+
+
+class Builder:
+    """Appends TL-B fields to a cell
+
+    The bit buffer is a Python int shifted left per field: one big-int
+    operation per field instead of per-bit bytearray twiddling.
+    """
+
+    __slots__ = ("_value", "_bits", "_refs")
+
+    def __init__(self):
+        self._value = 0
+        self._bits = 0
+        self._refs: List[Cell] = []
+
+    @property
+    def bits(self) -> int:
+        return self._bits
+
+    def store_uint(self, value: int, bits: int) -> "Builder":
+        if value < 0 or value >> bits:
+            raise ValueError(f"{value} does not fit in uint{bits}")
+        self._value = (self._value << bits) | value
+        self._bits += bits
+        if self._bits > MAX_BITS:
+            raise ValueError("Cell data overflow")
+        return self
+
+    def store_int(self, value: int, bits: int) -> "Builder":
+        if not -(1 << (bits - 1)) <= value < (1 << (bits - 1)):
+            raise ValueError(f"{value} does not fit in int{bits}")
+        return self.store_uint(value & ((1 << bits) - 1), bits)
+
+    def store_bit(self, bit: bool) -> "Builder":
+        return self.store_uint(1 if bit else 0, 1)
+
+    def store_bits(self, value: int, bits: int) -> "Builder":
+        """Append a pre-encoded bit string (e.g. a cached address)"""
+        return self.store_uint(value, bits)
+
+    def store_bytes(self, data: bytes) -> "Builder":
+        return self.store_uint(int.from_bytes(data, "big"), len(data) * 8)
+
+    def store_coins(self, amount: int) -> "Builder":
+        """VarUInteger 16: 4-bit byte length then the amount"""
+        return self.store_bits(*coins_bits(amount))
+
+    def store_address(self, address: Optional[str]) -> "Builder":
+        """MsgAddress: addr_std, or addr_none for None/empty"""
+        if not address:
+            return self.store_uint(0, 2)
+        return self.store_bits(*address_bits(address))
+
+    def store_ref(self, cell: Cell) -> "Builder":
+        if len(self._refs) >= MAX_REFS:
+            raise ValueError("Cell reference overflow")
+        self._refs.append(cell)
+        return self
+
+    def store_maybe_ref(self, cell: Optional[Cell]) -> "Builder":
+        self.store_bit(cell is not None)
+        if cell is not None:
+            self.store_ref(cell)
+        return self
+
+    def store_cell(self, cell: Cell) -> "Builder":
+        """Inline another cell's bits and refs"""
+        self.store_bits(cell.value, cell.bits)
+        for ref in cell.refs:
+            self.store_ref(ref)
+        return self
+
+    def end_cell(self) -> Cell:
+        return Cell(self._bits, self._value, self._refs)
+
+
+def begin_cell() -> Builder:
+    return Builder()
+
+
+class Slice:
+    """Reads TL-B fields back out of a cell, front to back"""
+
+    __slots__ = ("cell", "_pos", "_ref")
+
+    def __init__(self, cell: Cell):
+        self.cell = cell
+        self._pos = 0
+        self._ref = 0
+
+    @property
+    def remaining_bits(self) -> int:
+        return self.cell.bits - self._pos
+
+    def load_uint(self, bits: int) -> int:
+        if bits > self.remaining_bits:
+            raise ValueError(f"Cell underflow: {bits} bits wanted, {self.remaining_bits} left")
+        self._pos += bits
+        return (self.cell.value >> (self.cell.bits - self._pos)) & ((1 << bits) - 1)
+
+    def load_int(self, bits: int) -> int:
+        value = self.load_uint(bits)
+        return value - (1 << bits) if value >> (bits - 1) else value
+
+    def load_bit(self) -> bool:
+        return bool(self.load_uint(1))
+
+    def load_coins(self) -> int:
+        return self.load_uint(self.load_uint(4) * 8)
+
+    def load_address(self) -> Optional[str]:
+        """MsgAddress: addr_std as a user-friendly address, None for addr_none"""
+        tag = self.load_uint(2)
+        if tag == 0b00:
+            return None
+        if tag != 0b10 or self.load_bit():
+            raise ValueError("Only addr_std without anycast is supported")
+        workchain = self.load_int(8)
+        return format_address(workchain, self.load_uint(256).to_bytes(32, "big"))
+
+    def load_ref(self) -> Cell:
+        if self._ref >= len(self.cell.refs):
+            raise ValueError("Cell reference underflow")
+        self._ref += 1
+        return self.cell.refs[self._ref - 1]
+
+
+def coins_bits(amount: int) -> Tuple[int, int]:
+    """(value, bit length) of a Coins / VarUInteger 16 field"""
+    if amount < 0:
+        raise ValueError("Coins cannot be negative")
+    size = (amount.bit_length() + 7) // 8
+    if size > 15:
+        raise ValueError("Coins amount too large")
+    return (size << (size * 8)) | amount, 4 + size * 8
+
+
+def parse_address(address: str) -> Tuple[int, bytes]:
+    """(workchain, account id) from raw "wc:hex" or user-friendly base64 form"""
+    if ":" in address:
+        workchain, account = address.split(":", 1)
+        account_id = bytes.fromhex(account)
+        if len(account_id) != 32:
+            raise ValueError(f"Invalid raw address: {address}")
+        return int(workchain), account_id
+    try:
+        data = base64.urlsafe_b64decode(address.replace("+", "-").replace("/", "_") + "==")
+    except ValueError:
+        raise ValueError(f"Invalid address: {address}")
+    if len(data) != 36:
+        raise ValueError(f"Invalid address length: {address}")
+    if _crc16(data[:34]) != int.from_bytes(data[34:], "big"):
+        raise ValueError(f"Address checksum mismatch: {address}")
+    workchain = data[1] - 256 if data[1] > 127 else data[1]
+    return workchain, data[2:34]
+
+
+def format_address(workchain: int, account_id: bytes, bounceable: bool = True,
+                   testnet: bool = False) -> str:
+    """User-friendly url-safe base64 form"""
+    tag = (0x11 if bounceable else 0x51) | (0x80 if testnet else 0)
+    data = bytes((tag, workchain & 0xFF)) + account_id
+    return base64.urlsafe_b64encode(data + _crc16(data).to_bytes(2, "big")).decode()
+
+
+@lru_cache(maxsize=4096)
+def address_bits(address: str) -> Tuple[int, int]:
+    """addr_std$10 anycast:nothing$0 workchain:int8 address:bits256, cached per address"""
+    workchain, account_id = parse_address(address)
+    value = (0b100 << 264) | ((workchain & 0xFF) << 256) | int.from_bytes(account_id, "big")
+    return value, 267
+
+
+def _topological_order(roots: Sequence[Cell], dedup: bool) -> Tuple[List[Cell], Dict]:
+    """Unique cells with every cell before the cells it references, and the key of each
+
+    Reversed post-order over references taken last first: a tree comes out
+    in pre-order with references in order, the layout other TON libraries
+    produce. Iterative, so chains deeper than the recursion limit are fine.
+    """
+    order: List[Cell] = []
+    keys: Dict[int, object] = {}
+    seen = set()
+    stack = [(root, False) for root in roots]
+    while stack:
+        cell, expanded = stack.pop()
+        if expanded:
+            order.append(cell)
+            continue
+        key = cell.hash() if dedup else id(cell)
+        keys[id(cell)] = key
+        if key in seen:
+            continue
+        seen.add(key)
+        stack.append((cell, True))
+        stack.extend((ref, False) for ref in cell.refs)
+    order.reverse()
+    return order, keys
+
+
+def serialize_boc(roots: Sequence[Cell], has_crc32c: bool = True, dedup: bool = False) -> bytes:
+    """Bag of cells; shared sub-cell objects are stored once
+
+    With dedup, equal cells built separately are merged too, at the cost of
+    hashing every cell.
+    """
+    cells, keys = _topological_order(roots, dedup)
+    position = {keys[id(cell)]: i for i, cell in enumerate(cells)}
+    index = {cell_id: position[key] for cell_id, key in keys.items()}
+    count = len(cells)
+    size_bytes = max(1, (count.bit_length() + 7) // 8)
+
+    body = bytearray()
+    for cell in cells:
+        body += cell.descriptor()
+        for ref in cell.refs:
+            body += index[id(ref)].to_bytes(size_bytes, "big")
+    total = len(body)
+    offset_bytes = max(1, (total.bit_length() + 7) // 8)
+
+    out = bytearray(BOC_MAGIC)
+    out.append((0x40 if has_crc32c else 0) | size_bytes)
+    out.append(offset_bytes)
+    out += count.to_bytes(size_bytes, "big")
+    out += len(roots).to_bytes(size_bytes, "big")
+    out += bytes(size_bytes)  # absent cells
+    out += total.to_bytes(offset_bytes, "big")
+    for root in roots:
+        out += index[id(root)].to_bytes(size_bytes, "big")
+    out += body
+    if has_crc32c:
+        out += crc32c(bytes(out)).to_bytes(4, "little")
+    return bytes(out)
+
+
+def serialize_many(roots: Iterable[Cell], has_crc32c: bool = True) -> List[bytes]:
+    """One BOC per root; descriptors of shared sub-cells are encoded once"""
+    return [serialize_boc([root], has_crc32c) for root in roots]
+
+
+def deserialize_boc(data: bytes) -> List[Cell]:
+    """Root cells of a serialized bag of cells (ordinary cells only)"""
+    if data[:4] != BOC_MAGIC:
+        raise ValueError("Not a bag of cells")
+    flags = data[4]
+    has_idx, has_crc = flags & 0x80, flags & 0x40
+    size_bytes = flags & 0x07
+    offset_bytes = data[5]
+    pos = 6
+
+    def read(n: int) -> int:
+        nonlocal pos
+        value = int.from_bytes(data[pos:pos + n], "big")
+        pos += n
+        return value
+
+    count, root_count, _absent = read(size_bytes), read(size_bytes), read(size_bytes)
+    total = read(offset_bytes)
+    root_indexes = [read(size_bytes) for _ in range(root_count)]
+    if has_idx:
+        pos += count * offset_bytes
+    if has_crc:
+        if crc32c(data[:-4]) != int.from_bytes(data[-4:], "little"):
+            raise ValueError("BOC checksum mismatch")
+    end = pos + total
+
+    raw = []
+    while pos < end:
+        d1, d2 = data[pos], data[pos + 1]
+        pos += 2
+        if d1 & 0x08:
+            raise ValueError("Exotic cells are not supported")
+        size = (d2 + 1) // 2
+        payload = int.from_bytes(data[pos:pos + size], "big")
+        pos += size
+        bits = size * 8
+        if d2 & 1:
+            # Strip the completion tag
+            trailing = (payload & -payload).bit_length()
+            payload >>= trailing
+            bits -= trailing
+        refs = [read(size_bytes) for _ in range(d1 & 0x07)]
+        raw.append((bits, payload, refs))
+
+    cells: List[Optional[Cell]] = [None] * len(raw)
+    for i in range(len(raw) - 1, -1, -1):
+        bits, payload, refs = raw[i]
+        cells[i] = Cell(bits, payload, [cells[ref] for ref in refs])
+    return [cells[i] for i in root_indexes]
+
+
+def check_fixtures() -> bool:
+    """Round-trip every known-good fixture and compare hashes and bytes"""
+    ok = crc32c(b"123456789") == 0xE3069283
+    for boc_hex, expected_hash in FIXTURES.values():
+        boc = bytes.fromhex(boc_hex)
+        root = deserialize_boc(boc)[0]
+        ok &= root.hash().hex() == expected_hash
+        ok &= root.to_boc() == boc
+        ok &= serialize_boc([root], dedup=True) == boc
+    return bool(ok)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TON cell / BOC utilities")
+    parser.add_argument("--check", action="store_true", help="verify known-good fixtures")
+    parser.add_argument("--decode", metavar="BOC", help="print the cells of a hex or base64 BOC")
+    args = parser.parse_args()
+
+    if args.decode:
+        try:
+            data = bytes.fromhex(args.decode)
+        except ValueError:
+            data = base64.b64decode(args.decode)
+        for root in deserialize_boc(data):
+            stack = [(root, 0)]
+            while stack:
+                cell, indent = stack.pop()
+                print(f"{'  ' * indent}{cell.bits} bits {cell.descriptor()[2:].hex()} hash={cell.hash().hex()}")
+                stack.extend((ref, indent + 1) for ref in reversed(cell.refs))
+    if args.check or not args.decode:
+        ok = check_fixtures()
+        print(f"{'✅' if ok else '❌'} BOC fixtures {'match' if ok else 'MISMATCH'} "
+              f"(crc32c {'native' if CRC32C_NATIVE else 'pure Python'})")
+        raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,470 @@
+"""
+Tuxido Mining Bot - Throughput Controllers
+Closed-loop control of the block rate: steer the measured reward rate toward
+what is still needed to reach p2e.daily_limit by the control deadline, with
+anti-windup, bounded steps and an offline tuner that sweeps gains against a
+simulated miner in accelerated time
+
+    python controllers.py tune --daily-limit 5000000 --deadline-hours 6
+"""
+
+import sys
+import math
+import json
+import random
+import logging
+import argparse
+import itertools
+from typing import Dict, List, Optional, Sequence
+
+from metrics_engine import WindowedCounter
+from runtime_config import config_store, ControlSettings
+
+logger = logging.getLogger(__name__)
+
+# Commanded rate counts as out of reach when the loop achieves less than this share of it
+KEEP_UP_RATIO = 0.9
+# Changes smaller than this share of max_step are not worth a pacer reschedule
+DEADBAND = 0.2
+
+
+class ControlObservation:
+    """What the controller sees each period (rates per second)"""
+
+    __slots__ = ("remaining", "seconds_left", "reward_rate", "block_rate", "achieved_rate", "target_rate")
+
+    def __init__(self, remaining: float, seconds_left: float, reward_rate: float,
+                 block_rate: float, achieved_rate: float, target_rate: float):
+        self.remaining = remaining          # tokens still needed today
+        self.seconds_left = seconds_left    # until the control deadline
+        self.reward_rate = reward_rate      # measured tokens/s
+        self.block_rate = block_rate        # measured blocks/s over the same window
+        self.achieved_rate = achieved_rate  # blocks/s over the last few seconds of pacing
+        self.target_rate = target_rate      # currently commanded blocks/s
+
+    @property
+    def keeping_up(self) -> bool:
+        return self.achieved_rate >= KEEP_UP_RATIO * self.target_rate
+
+    @property
+    def reward_per_block(self) -> float:
+        return self.reward_rate / self.block_rate if self.block_rate > 0 else 0.0
+
+
+class ThroughputController:
+    """Base class: turns an observation into the next block rate"""
+
+    name = "base"
+
+    def __init__(self, min_rate: float, max_rate: float, max_step: float,
+                 headroom: float = 0.1, min_horizon: float = 300.0):
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.max_step = max_step
+        self.headroom = headroom
+        self.min_horizon = min_horizon
+        self.saturated = False
+        self.updates = 0
+
+    def reset(self):
+        """Forget accumulated state, e.g. at the start of a mining day"""
+        self.saturated = False
+
+    def setpoint(self, obs: ControlObservation) -> float:
+        """Reward rate (tokens/s) that reaches the target by the deadline, plus headroom"""
+        if obs.remaining <= 0:
+            return 0.0
+        return obs.remaining / max(obs.seconds_left, self.min_horizon) * (1 + self.headroom)
+
+    def feed_forward(self, obs: ControlObservation, setpoint: float) -> float:
+        """Block rate that would deliver setpoint at the current reward per block"""
+        if obs.reward_per_block <= 0:
+            return obs.target_rate
+        return setpoint / obs.reward_per_block
+
+    def limit(self, proposed: float, obs: ControlObservation) -> float:
+        """Clamp to the configured range, bound the step, and stay near what the loop achieves"""
+        ceiling = self.max_rate
+        if not obs.keeping_up:
+            # Commanding far past what the loop sustains only builds lag and dropped ticks
+            ceiling = min(ceiling, max(self.min_rate, obs.achieved_rate))
+        bounded = min(max(proposed, self.min_rate), ceiling)
+        current = obs.target_rate
+        stepped = min(max(bounded, current - self.max_step), current + self.max_step)
+        self.saturated = stepped != proposed
+        if abs(stepped - current) < DEADBAND * self.max_step and self.min_rate <= current <= ceiling:
+            return current
+        return stepped
+
+    def update(self, obs: ControlObservation, dt: float) -> float:
+        raise NotImplementedError
+
+    def state(self) -> Dict:
+        return {"controller": self.name, "saturated": self.saturated, "updates": self.updates}
+
+
+class FixedStepController(ThroughputController):
+    """The original rule: one step up below the efficiency threshold, one down above 95%"""
+
+    name = "fixed_step"
+
+    def __init__(self, min_rate: float, max_rate: float, max_step: float,
+                 efficiency_threshold: float = 80.0, **kwargs):
+        super().__init__(min_rate, max_rate, max_step, **kwargs)
+        self.efficiency_threshold = efficiency_threshold
+
+    def update(self, obs: ControlObservation, dt: float) -> float:
+        self.updates += 1
+        efficiency = min(obs.reward_rate * 3600 / 1000, 1.0) * 100
+        rate = obs.target_rate
+        if efficiency < self.efficiency_threshold:
+            if obs.keeping_up:
+                rate += self.max_step
+        elif efficiency > 95:
+            rate -= self.max_step
+        return min(max(rate, self.min_rate), self.max_rate)
+
+
+class PIDController(ThroughputController):
+    """Feed-forward plus PID on the relative reward-rate error
+
+    The feed-forward term asks for the block rate that would meet the
+    setpoint at today's reward per block; the PID terms correct for what the
+    estimate misses. The integral only accumulates while the output is not
+    pinned (conditional integration) and is clamped, so time spent at the
+    rate ceiling does not wind it up.
+    """
+
+    name = "pid"
+
+    def __init__(self, min_rate: float, max_rate: float, max_step: float,
+                 kp: float = 0.5, ki: float = 0.0005, kd: float = 0.0,
+                 integral_limit: float = 1.0, **kwargs):
+        super().__init__(min_rate, max_rate, max_step, **kwargs)
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+        self.integral_limit = integral_limit
+        self.integral = 0.0
+        self.previous_error: Optional[float] = None
+
+    def reset(self):
+        super().reset()
+        self.integral = 0.0
+        self.previous_error = None
+
+    def update(self, obs: ControlObservation, dt: float) -> float:
+        self.updates += 1
+        setpoint = self.setpoint(obs)
+        if setpoint <= 0:
+            self.reset()
+            return self.min_rate
+
+        error = (setpoint - obs.reward_rate) / setpoint
+        derivative = 0.0
+        if self.previous_error is not None and dt > 0:
+            derivative = (error - self.previous_error) / dt
+        self.previous_error = error
+
+        integral = self.integral + error * dt
+        if self.ki:
+            bound = self.integral_limit / self.ki
+            integral = min(max(integral, -bound), bound)
+        correction = self.kp * error + self.ki * integral + self.kd * derivative
+        proposed = self.feed_forward(obs, setpoint) * max(0.0, 1 + correction)
+        output = self.limit(proposed, obs)
+
+        # Anti-windup: keep the new integral only if it is not pushing further into a limit
+        if not self.saturated or (output - proposed) * error > 0:
+            self.integral = integral
+        return output
+
+    def state(self) -> Dict:
+        state = super().state()
+        state.update({"integral": self.integral, "error": self.previous_error})
+        return state
+
+
+class BanditController(ThroughputController):
+    """Discounted UCB1 over multipliers of the feed-forward block rate
+
+    Each period is one pull; the payoff is how close the measured reward
+    rate came to the setpoint, minus a penalty when the loop could not keep
+    up. Discounting lets it follow drift in capacity and rewards.
+    """
+
+    name = "bandit"
+
+    def __init__(self, min_rate: float, max_rate: float, max_step: float,
+                 arms: Sequence[float] = (0.8, 1.0, 1.2, 1.5), exploration: float = 0.3,
+                 discount: float = 0.95, overload_penalty: float = 0.5, seed: Optional[int] = None,
+                 **kwargs):
+        super().__init__(min_rate, max_rate, max_step, **kwargs)
+        self.arms = tuple(arms)
+        self.exploration = exploration
+        self.discount = discount
+        self.overload_penalty = overload_penalty
+        self.random = random.Random(seed)
+        self.reset()
+
+    def reset(self):
+        super().reset()
+        self.pulls = [0.0] * len(self.arms)
+        self.payoffs = [0.0] * len(self.arms)
+        self.current: Optional[int] = None
+
+    def _payoff(self, obs: ControlObservation, setpoint: float) -> float:
+        payoff = 1.0 - min(1.0, abs(obs.reward_rate - setpoint) / setpoint)
+        if not obs.keeping_up:
+            payoff -= self.overload_penalty
+        return max(0.0, payoff)
+
+    def _select(self) -> int:
+        untried = [i for i, pulls in enumerate(self.pulls) if pulls == 0]
+        if untried:
+            return self.random.choice(untried)
+        total = sum(self.pulls)
+        return max(
+            range(len(self.arms)),
+            key=lambda i: self.payoffs[i] / self.pulls[i]
+            + self.exploration * math.sqrt(math.log(max(total, 1.0)) / self.pulls[i])
+        )
+
+    def update(self, obs: ControlObservation, dt: float) -> float:
+        self.updates += 1
+        setpoint = self.setpoint(obs)
+        if setpoint <= 0:
+            return self.min_rate
+
+        if self.current is not None:
+            self.pulls = [pulls * self.discount for pulls in self.pulls]
+            self.payoffs = [payoff * self.discount for payoff in self.payoffs]
+            self.pulls[self.current] += 1
+            self.payoffs[self.current] += self._payoff(obs, setpoint)
+        self.current = self._select()
+        return self.limit(self.feed_forward(obs, setpoint) * self.arms[self.current], obs)
+
+    def state(self) -> Dict:
+        state = super().state()
+        state.update({
+            "arm": self.arms[self.current] if self.current is not None else None,
+            "mean_payoffs": {
+                arm: (payoff / pulls if pulls else None)
+                for arm, payoff, pulls in zip(self.arms, self.payoffs, self.pulls)
+            }
+        })
+        return state
+
+
+CONTROLLER_TYPES = {
+    FixedStepController.name: FixedStepController,
+    PIDController.name: PIDController,
+    BanditController.name: BanditController,
+}
+
+
+def build_controller(settings: ControlSettings, **overrides) -> ThroughputController:
+    """Controller described by the control config section"""
+    common = {
+        "min_rate": settings.min_block_rate,
+        "max_rate": settings.max_block_rate,
+        "max_step": settings.max_step,
+        "headroom": settings.headroom,
+        "min_horizon": settings.interval,
+    }
+    specific = {
+        PIDController.name: {"kp": settings.kp, "ki": settings.ki, "kd": settings.kd},
+        BanditController.name: {"exploration": settings.exploration},
+    }
+    kind = overrides.pop("controller", settings.controller)
+    if kind not in CONTROLLER_TYPES:
+        logger.warning("Unknown controller %s, using pid", kind)
+        kind = PIDController.name
+    options = {**common, **specific.get(kind, {}), **overrides}
+    return CONTROLLER_TYPES[kind](**options)
+
+
+# --- Offline tuning ---------------------------------------------------------
+
+class SimulatedMiner:
+    """Plant model: capacity that dips under load and a drifting reward per block"""
+
+    def __init__(self, reward_per_block: float, capacity: float = 3.0, seed: int = 0):
+        self.random = random.Random(seed)
+        self.base_reward = reward_per_block
+        self.base_capacity = capacity
+        self.market = 1.0
+        self.dip_left = 0.0
+        self.dip_factor = 1.0
+
+    def capacity(self) -> float:
+        return self.base_capacity * (self.dip_factor if self.dip_left > 0 else 1.0)
+
+    def step(self, target_rate: float, dt: float):
+        """Advance dt seconds at target_rate; returns (blocks, tokens, overloaded)"""
+        rng = self.random
+        # Occasional 5-30 minute slowdowns (GC, noisy neighbours, slow RPC)
+        if self.dip_left <= 0 and rng.random() < dt / 7200:
+            self.dip_left = rng.uniform(300, 1800)
+            self.dip_factor = rng.uniform(0.4, 0.7)
+        self.dip_left -= dt
+        # Mean-reverting market multiplier, as in get_market_multiplier's 1.0-1.5 range
+        self.market += 0.02 * (1.2 - self.market) * dt / 60 + rng.gauss(0, 0.01) * math.sqrt(dt / 60)
+        self.market = min(max(self.market, 1.0), 1.5)
+
+        capacity = self.capacity()
+        blocks = min(target_rate, capacity) * dt
+        tokens = blocks * self.base_reward * self.market * rng.uniform(0.9, 1.1)
+        return blocks, tokens, target_rate > capacity
+
+
+def simulate(controller: ThroughputController, daily_limit: float, deadline_hours: float,
+             interval: float, initial_rate: float, reward_per_block: float,
+             window: float = 900.0, step: float = 10.0, seed: int = 0) -> Dict:
+    """Run one simulated mining day; times are simulated seconds, not wall time"""
+    plant = SimulatedMiner(reward_per_block, seed=seed)
+    tokens_window = WindowedCounter(window)
+    blocks_window = WindowedCounter(window)
+    recent_blocks = WindowedCounter(60.0)
+    controller.reset()
+
+    now = 0.0
+    mined = 0.0
+    rate = initial_rate
+    next_control = interval
+    finished_at = None
+    variation = 0.0
+    reversals = 0
+    last_direction = 0
+    overloaded = 0.0
+    rate_seconds = 0.0
+    deadline = deadline_hours * 3600
+
+    while now < 86400:
+        blocks, tokens, overload = plant.step(rate, step)
+        now += step
+        mined += tokens
+        tokens_window.add(tokens, now)
+        blocks_window.add(blocks, now)
+        recent_blocks.add(blocks, now)
+        rate_seconds += rate * step
+        if overload:
+            overloaded += step
+        if mined >= daily_limit:
+            finished_at = now
+            break
+        if now >= next_control:
+            next_control += interval
+            obs = ControlObservation(
+                daily_limit - mined, deadline - now,
+                tokens_window.rate(now), blocks_window.rate(now), recent_blocks.rate(now), rate
+            )
+            new_rate = controller.update(obs, interval)
+            change = new_rate - rate
+            if abs(change) > 1e-9:
+                direction = 1 if change > 0 else -1
+                if last_direction and direction != last_direction:
+                    reversals += 1
+                last_direction = direction
+            variation += abs(change)
+            rate = new_rate
+
+    finish_hours = (finished_at or 86400) / 3600
+    shortfall = max(0.0, 1 - mined / daily_limit)
+    lateness = max(0.0, finish_hours - deadline_hours) + shortfall * 24
+    return {
+        "finish_hours": finish_hours,
+        "reached": finished_at is not None,
+        "shortfall": shortfall,
+        "lateness_hours": lateness,
+        "rate_variation": variation,
+        "reversals": reversals,
+        "overload_hours": overloaded / 3600,
+        "mean_rate": rate_seconds / (finish_hours * 3600)
+    }
+
+
+def score(result: Dict) -> float:
+    """Lower is better: finish early, never late, without thrash or overload"""
+    return (result["finish_hours"] + 4 * result["lateness_hours"]
+            + 0.5 * result["rate_variation"] + 0.1 * result["reversals"]
+            + 2 * result["overload_hours"])
+
+
+def candidate_grid(settings: ControlSettings) -> List[Dict]:
+    """Controller variants to compare: the old fixed step, a PID gain sweep and bandits"""
+    candidates = [{"controller": FixedStepController.name}]
+    for kp, ki, kd in itertools.product((0.25, 0.5, 1.0, 2.0), (0.0, 0.0002, 0.0005, 0.002), (0.0, 60.0)):
+        candidates.append({"controller": PIDController.name, "kp": kp, "ki": ki, "kd": kd})
+    for exploration in (0.1, 0.3, 1.0):
+        candidates.append({"controller": BanditController.name, "exploration": exploration})
+    return candidates
+
+
+def tune(settings: ControlSettings, daily_limit: float, reward_per_block: float,
+         initial_rate: float, seeds: int = 3, window: float = 900.0) -> List[Dict]:
+    """Simulate every candidate over several seeded days; best first"""
+    results = []
+    for candidate in candidate_grid(settings):
+        runs = []
+        for seed in range(seeds):
+            controller = build_controller(settings, **dict(candidate))
+            runs.append(simulate(
+                controller, daily_limit, settings.deadline_hours, settings.interval,
+                initial_rate, reward_per_block, window=window, seed=seed
+            ))
+        summary = {key: sum(run[key] for run in runs) / len(runs) for key in runs[0]}
+        summary["score"] = sum(score(run) for run in runs) / len(runs)
+        summary["reached"] = sum(run["reached"] for run in runs)
+        results.append({"candidate": candidate, **summary})
+    results.sort(key=lambda result: result["score"])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune throughput controller gains offline")
+    sub = parser.add_subparsers(dest="command", required=True)
+    tune_parser = sub.add_parser("tune", help="sweep controller gains over simulated mining days")
+    settings = config_store.current
+    p2e = settings.p2e
+    mining = settings.mining
+    avg_hash = (mining.min_hash_rate + mining.max_hash_rate) / 2
+    tune_parser.add_argument("--daily-limit", type=float, default=p2e.daily_limit)
+    tune_parser.add_argument("--deadline-hours", type=float, default=settings.control.deadline_hours)
+    tune_parser.add_argument("--interval", type=float, default=settings.control.interval)
+    tune_parser.add_argument("--reward-per-block", type=float,
+                             default=avg_hash * p2e.bonus_multiplier * p2e.rewards_per_block)
+    tune_parser.add_argument("--initial-rate", type=float, default=mining.block_rate)
+    tune_parser.add_argument("--window", type=float, default=900.0, help="reward-rate window in seconds")
+    tune_parser.add_argument("--seeds", type=int, default=3)
+    tune_parser.add_argument("--top", type=int, default=10)
+    tune_parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    control = settings.control.replace(deadline_hours=args.deadline_hours, interval=args.interval)
+    results = tune(control, args.daily_limit, args.reward_per_block, args.initial_rate,
+                   seeds=args.seeds, window=args.window)
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+        return
+
+    baseline = next(r for r in results if r["candidate"]["controller"] == FixedStepController.name)
+    print(f"{'rank':>4} {'score':>7} {'finish h':>8} {'late h':>7} {'variation':>9} "
+          f"{'reversals':>9} {'overload h':>10}  candidate")
+    shown = results[:args.top] + ([baseline] if baseline not in results[:args.top] else [])
+    for result in shown:
+        print(f"{results.index(result) + 1:>4} {result['score']:>7.2f} {result['finish_hours']:>8.2f} "
+              f"{result['lateness_hours']:>7.2f} {result['rate_variation']:>9.2f} "
+              f"{result['reversals']:>9.1f} {result['overload_hours']:>10.2f}  {result['candidate']}")
+
+    best = results[0]["candidate"]
+    print("\nSuggested environment:")
+    print(f"CONTROLLER={best['controller']}")
+    for key in ("kp", "ki", "kd", "exploration"):
+        if key in best:
+            print(f"CONTROL_{key.upper()}={best[key]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,394 @@
+"""
+Tuxido Mining Bot - DEX Adapters and Router
+Venues implement DexAdapter: they report the constant-product pool for a
+token pair and build swap messages for it. DexRouter asks every venue
+concurrently under a concurrency budget and a latency deadline, caches
+pool snapshots briefly, and picks the single venue or split across venues
+with the best output net of per-swap gas
+
+    python dex.py --venues 8 --latency 0.05
+"""
+
+import math
+import time
+import random
+import asyncio
+import argparse
+import logging
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from arbitrage import FEE_DENOMINATOR, Pool
+from boc import parse_address
+from runtime_config import DexSettings
+from swap_builder import JETTON_TO_JETTON_GAS, JETTON_TO_TON_GAS
+
+logger = logging.getLogger(__name__)
+
+TON = "TON"
+# Jetton masters that stand for TON inside pools (StonFi v1 pTON)
+TON_PROXIES = ("EQCM3B12QK1e4yZSf8GtBRT0aLMNyEsBc_DhVfRRtOEffLez",)
+
+
+@lru_cache(maxsize=4096)
+def token_key(token: str):
+    """Comparable form of a token: TON for TON and its proxies, else the raw (workchain, account)"""
+    if token == TON:
+        return TON
+    try:
+        raw = parse_address(token)
+    except ValueError:
+        return token
+    return TON if raw in _TON_PROXY_KEYS else raw
+
+
+_TON_PROXY_KEYS = frozenset(parse_address(proxy) for proxy in TON_PROXIES)
+
+
+class Leg:
+    """Part of a route: amount_in swapped on one venue's pool"""
+
+    __slots__ = ("venue", "pool", "direction", "amount_in", "amount_out", "gas")
+
+    def __init__(self, venue: str, pool: Pool, direction: int, amount_in: int, amount_out: int, gas: int):
+        self.venue = venue
+        self.pool = pool
+        self.direction = direction
+        self.amount_in = amount_in
+        self.amount_out = amount_out
+        self.gas = gas  # nanoTON attached to the swap message
+
+    def to_dict(self) -> Dict:
+        return {"venue": self.venue, "pool": self.pool.address, "amount_in": self.amount_in,
+                "amount_out": self.amount_out, "gas": self.gas}
+
+
+class Route:
+    """One or more legs selling the same token for the same token"""
+
+    def __init__(self, offer_token: str, ask_token: str, legs: List[Leg], ask_per_ton: float):
+        self.offer_token = offer_token
+        self.ask_token = ask_token
+        self.legs = legs
+        self.ask_per_ton = ask_per_ton  # converts gas into ask-token units
+
+    @property
+    def amount_in(self) -> int:
+        return sum(leg.amount_in for leg in self.legs)
+
+    @property
+    def amount_out(self) -> int:
+        return sum(leg.amount_out for leg in self.legs)
+
+    @property
+    def net_out(self) -> float:
+        """Output minus the gas of every leg, in ask-token units"""
+        return self.amount_out - sum(leg.gas for leg in self.legs) * self.ask_per_ton
+
+    def to_dict(self) -> Dict:
+        return {"offer": self.offer_token, "ask": self.ask_token, "amount_in": self.amount_in,
+                "amount_out": self.amount_out, "net_out": int(self.net_out),
+                "legs": [leg.to_dict() for leg in self.legs]}
+
+
+class DexAdapter:
+    """A venue the router can quote and trade on"""
+
+    name = "dex"
+
+    def swap_gas(self, offer_token: str, ask_token: str) -> int:
+        return JETTON_TO_TON_GAS if ask_token == TON else JETTON_TO_JETTON_GAS
+
+    async def get_pool(self, offer_token: str, ask_token: str) -> Optional[Pool]:
+        """Current reserves of the venue's pool for the pair, None when it has none"""
+        raise NotImplementedError
+
+    async def build_swap(self, leg: Leg, offer_token: str, ask_token: str, min_out: int) -> Optional[Dict]:
+        """Swap message for a leg (to, amount, payload, query_id), None when it cannot be built"""
+        raise NotImplementedError
+
+
+class StonFiAdapter(DexAdapter):
+    """StonFi v1 through StonFiIntegration; the pair index is refreshed from /pools occasionally"""
+
+    name = "stonfi"
+
+    def __init__(self, stonfi, index_ttl: float = 600.0, clock: Callable[[], float] = time.monotonic):
+        self.stonfi = stonfi
+        self.index_ttl = index_ttl
+        self.clock = clock
+        self._index: Dict[frozenset, Tuple[str, str, str]] = {}  # pair -> (pool, token0, token1)
+        self._indexed_at = -math.inf
+        self._index_lock = asyncio.Lock()
+
+    async def _pool_entry(self, offer_token: str, ask_token: str) -> Optional[Tuple[str, str, str]]:
+        async with self._index_lock:
+            if self.clock() - self._indexed_at > self.index_ttl:
+                pools = await self.stonfi.get_all_pools()
+                if pools is not None:
+                    self._index = {
+                        frozenset((token_key(p["token0_address"]), token_key(p["token1_address"]))):
+                            (p["address"], p["token0_address"], p["token1_address"])
+                        for p in pools if p.get("address") and p.get("token0_address") and p.get("token1_address")
+                    }
+                    self._indexed_at = self.clock()
+        return self._index.get(frozenset((token_key(offer_token), token_key(ask_token))))
+
+    async def get_pool(self, offer_token: str, ask_token: str) -> Optional[Pool]:
+        entry = await self._pool_entry(offer_token, ask_token)
+        if not entry:
+            return None
+        # On chain the pool only knows the router's jetton wallets; the listing knows the masters
+        address, token0, token1 = entry
+        return await self.stonfi.get_pool(address, tokens=(token0, token1))
+
+    async def build_swap(self, leg: Leg, offer_token: str, ask_token: str, min_out: int) -> Optional[Dict]:
+        swap_data = await self.stonfi.create_swap_transaction(offer_token, ask_token, leg.amount_in, min_out)
+        return swap_data and swap_data.get("message")
+
+
+class MockDexAdapter(DexAdapter):
+    """In-memory venue for tests and benchmarks, with configurable latency and failures"""
+
+    def __init__(self, name: str, pools: Sequence[Pool], latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, gas: int = JETTON_TO_TON_GAS, seed: Optional[int] = None):
+        self.name = name
+        self.pools = {frozenset((p.token0, p.token1)): p for p in pools}
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.gas = gas
+        self.random = random.Random(seed)
+
+    def swap_gas(self, offer_token: str, ask_token: str) -> int:
+        return self.gas
+
+    async def get_pool(self, offer_token: str, ask_token: str) -> Optional[Pool]:
+        delay = self.latency + self.random.expovariate(1 / self.jitter) if self.jitter else self.latency
+        if delay:
+            await asyncio.sleep(delay)
+        if self.random.random() < self.error_rate:
+            raise ConnectionError(f"{self.name} unavailable")
+        pool = self.pools.get(frozenset((offer_token, ask_token)))
+        return Pool(pool.address, pool.token0, pool.token1, pool.reserve0, pool.reserve1, pool.fee_bps) if pool else None
+
+    def swap(self, leg: Leg) -> int:
+        """Execute a leg against the in-memory reserves"""
+        pool = self.pools[frozenset((leg.pool.token0, leg.pool.token1))]
+        out = pool.amount_out(leg.amount_in, leg.direction)
+        if leg.direction == 0:
+            pool.reserve0, pool.reserve1 = pool.reserve0 + leg.amount_in, pool.reserve1 - out
+        else:
+            pool.reserve1, pool.reserve0 = pool.reserve1 + leg.amount_in, pool.reserve0 - out
+        return out
+
+    async def build_swap(self, leg: Leg, offer_token: str, ask_token: str, min_out: int) -> Optional[Dict]:
+        return {"to": leg.pool.address, "amount": leg.gas, "payload": None, "query_id": 0,
+                "amount_in": leg.amount_in, "min_out": min_out}
+
+
+def split_amounts(pools: Sequence[Tuple[Pool, int]], amount: int) -> List[int]:
+    """Inputs per pool that maximize total output, by equalizing marginal rates
+
+    For out_i(x) = g*x*Ro/(Ri + g*x) the marginal rate is g*Ri*Ro/(Ri + g*x)^2,
+    so at a common rate L every active pool gets x_i = (s*sqrt(Ri*Ro/g) - Ri/g)
+    with s = 1/sqrt(L); s follows from the inputs summing to amount. Pools
+    whose marginal rate is already below L get nothing.
+    """
+    terms = []
+    for pool, direction in pools:
+        reserve_in, reserve_out = pool.reserves(direction)
+        g = (FEE_DENOMINATOR - pool.fee_bps) / FEE_DENOMINATOR
+        terms.append((math.sqrt(reserve_in * reserve_out / g), reserve_in / g))
+    active = set(range(len(terms)))
+    while active:
+        s = (amount + sum(terms[i][1] for i in active)) / sum(terms[i][0] for i in active)
+        inactive = {i for i in active if s * terms[i][0] <= terms[i][1]}
+        if not inactive:
+            break
+        active -= inactive
+    amounts = [int(s * terms[i][0] - terms[i][1]) if i in active else 0 for i in range(len(terms))]
+    if active:
+        amounts[max(active, key=lambda i: amounts[i])] += amount - sum(amounts)  # rounding
+    return amounts
+
+
+class DexRouter:
+    """Best route over several venues with bounded quoting latency
+
+    At most `concurrency` venues are queried at once and venues that have
+    not answered by `timeout` are left out of the route. Pool snapshots are
+    reused for `quote_ttl` seconds, so quoting several amounts back to back
+    costs one round of requests.
+    """
+
+    def __init__(self, adapters: Sequence[DexAdapter], quote_ttl: float = 2.0, concurrency: int = 4,
+                 timeout: float = 1.5, clock: Callable[[], float] = time.monotonic):
+        self.adapters = {adapter.name: adapter for adapter in adapters}
+        self.quote_ttl = quote_ttl
+        self.timeout = timeout
+        self.clock = clock
+        self._budget = asyncio.Semaphore(concurrency)
+        self._cache: Dict[Tuple[str, str, str], Tuple[float, Optional[Pool]]] = {}
+        self.stats = {name: {"requests": 0, "cache_hits": 0, "errors": 0, "timeouts": 0, "latency_ms": 0.0}
+                      for name in self.adapters}
+
+    async def _venue_pool(self, adapter: DexAdapter, offer_token: str, ask_token: str) -> Optional[Pool]:
+        key = (adapter.name, offer_token, ask_token)
+        stats = self.stats[adapter.name]
+        cached = self._cache.get(key)
+        if cached and self.clock() - cached[0] < self.quote_ttl:
+            stats["cache_hits"] += 1
+            return cached[1]
+        async with self._budget:
+            started = time.perf_counter()
+            stats["requests"] += 1
+            try:
+                pool = await adapter.get_pool(offer_token, ask_token)
+            except Exception as e:
+                stats["errors"] += 1
+                logger.debug("%s pool lookup failed: %s", adapter.name, e)
+                return None
+            finally:
+                # Exponential moving average of the venue's response time
+                elapsed = (time.perf_counter() - started) * 1000
+                stats["latency_ms"] += (elapsed - stats["latency_ms"]) * 0.2
+        self._cache[key] = (self.clock(), pool)
+        return pool
+
+    async def pools(self, offer_token: str, ask_token: str) -> List[Tuple[DexAdapter, Pool, int]]:
+        """(venue, pool, direction) for every venue that answered within the deadline"""
+        # Historically faster venues take the concurrency budget first
+        ordered = sorted(self.adapters.values(), key=lambda adapter: self.stats[adapter.name]["latency_ms"])
+        tasks = {asyncio.ensure_future(self._venue_pool(adapter, offer_token, ask_token)): adapter
+                 for adapter in ordered}
+        done, pending = await asyncio.wait(tasks, timeout=self.timeout)
+        for task in pending:
+            task.cancel()
+            self.stats[tasks[task].name]["timeouts"] += 1
+        found = []
+        offer, ask = token_key(offer_token), token_key(ask_token)
+        for task in done:
+            pool = task.result()
+            if pool is None or pool.reserve0 <= 0 or pool.reserve1 <= 0:
+                continue
+            # Pools name tokens by master address (pTON for TON), in either address form
+            pair = (token_key(pool.token0), token_key(pool.token1))
+            if pair == (offer, ask):
+                found.append((tasks[task], pool, 0))
+            elif pair == (ask, offer):
+                found.append((tasks[task], pool, 1))
+            else:
+                logger.debug("%s pool %s is %s/%s, not the pair asked for", tasks[task].name, pool.address,
+                             pool.token0, pool.token1)
+        return found
+
+    def _leg(self, adapter: DexAdapter, pool: Pool, direction: int, amount: int,
+             offer_token: str, ask_token: str) -> Leg:
+        return Leg(adapter.name, pool, direction, amount, pool.amount_out(amount, direction),
+                   adapter.swap_gas(offer_token, ask_token))
+
+    async def best_route(self, offer_token: str, ask_token: str, amount: int,
+                         ask_per_ton: Optional[float] = None) -> Optional[Route]:
+        """Route with the highest output after gas; ask_per_ton prices gas for non-TON asks"""
+        if amount <= 0:
+            return None
+        venues = await self.pools(offer_token, ask_token)
+        if not venues:
+            return None
+        if ask_per_ton is None:
+            ask_per_ton = 1.0 if ask_token == TON else 0.0
+
+        candidates = [Route(offer_token, ask_token,
+                            [self._leg(adapter, pool, direction, amount, offer_token, ask_token)], ask_per_ton)
+                      for adapter, pool, direction in venues]
+        if len(venues) > 1:
+            # Optimal split, then drop its smallest leg while that saves more gas than it costs in output
+            legs = venues
+            while len(legs) > 1:
+                amounts = split_amounts([(pool, direction) for _, pool, direction in legs], amount)
+                split = Route(offer_token, ask_token, [
+                    self._leg(adapter, pool, direction, part, offer_token, ask_token)
+                    for (adapter, pool, direction), part in zip(legs, amounts) if part > 0
+                ], ask_per_ton)
+                candidates.append(split)
+                smallest = min(range(len(legs)), key=lambda i: amounts[i])
+                legs = [venue for i, venue in enumerate(legs) if i != smallest]
+        return max(candidates, key=lambda route: route.net_out)
+
+    async def build_swaps(self, route: Route, min_out: int) -> List[Dict]:
+        """Swap messages for every leg, sharing min_out in proportion to each leg's quote"""
+        messages = []
+        for leg in route.legs:
+            leg_min_out = min_out * leg.amount_out // route.amount_out if route.amount_out else 0
+            message = await self.adapters[leg.venue].build_swap(leg, route.offer_token, route.ask_token, leg_min_out)
+            if not message:
+                return []
+            messages.append(message)
+        return messages
+
+    def status(self) -> Dict:
+        return {name: dict(stats, latency_ms=round(stats["latency_ms"], 1)) for name, stats in self.stats.items()}
+
+
+def build_router(settings: DexSettings, adapters: Sequence[DexAdapter]) -> DexRouter:
+    return DexRouter(adapters, quote_ttl=settings.quote_ttl, concurrency=settings.concurrency,
+                     timeout=settings.timeout)
+
+
+def run_benchmark(venues: int, latency: float, jitter: float, error_rate: float, concurrency: int,
+                  timeout: float, rounds: int, seed: int = 1):
+    rng = random.Random(seed)
+    unit = 10**9
+    adapters = []
+    for i in range(venues):
+        depth = rng.uniform(0.2, 1.0)
+        reserve_in = int(1_000_000 * depth * unit)
+        reserve_out = int(5_000 * depth * rng.uniform(0.98, 1.02) * unit)
+        pool = Pool(f"pool-{i}", "JETTON", TON, reserve_in, reserve_out, rng.choice((20, 30, 30, 50)))
+        adapters.append(MockDexAdapter(f"venue-{i}", [pool], latency, jitter, error_rate, seed=seed + i))
+    router = DexRouter(adapters, quote_ttl=0.0, concurrency=concurrency, timeout=timeout)
+
+    async def run():
+        latencies, gains, splits = [], [], 0
+        for _ in range(rounds):
+            amount = int(rng.uniform(1_000, 20_000) * unit)
+            started = time.perf_counter()
+            route = await router.best_route("JETTON", TON, amount)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if route is None:
+                continue
+            singles = [router._leg(a, a.pools[frozenset(("JETTON", TON))], 0, amount, "JETTON", TON)
+                       for a in adapters]
+            best_single = max(leg.amount_out - leg.gas for leg in singles)
+            gains.append((route.net_out - best_single) / best_single * FEE_DENOMINATOR)
+            splits += len(route.legs) > 1
+        return latencies, gains, splits
+
+    latencies, gains, splits = asyncio.run(run())
+    latencies.sort()
+    print(f"Venues:          {venues} (latency {latency * 1000:.0f} ms + exp({jitter * 1000:.0f} ms), "
+          f"{error_rate:.0%} errors), concurrency {concurrency}, deadline {timeout * 1000:.0f} ms")
+    print(f"Routing latency: p50 {latencies[len(latencies) // 2]:.1f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99)]:.1f} ms, max {latencies[-1]:.1f} ms")
+    print(f"Split routes:    {splits} of {len(gains)}; mean gain over best single venue "
+          f"{sum(gains) / max(len(gains), 1):.1f} bps net of gas")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark best-route selection over mock DEX venues")
+    parser.add_argument("--venues", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.05, help="base seconds per venue response")
+    parser.add_argument("--jitter", type=float, default=0.05, help="mean of the extra exponential delay")
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--timeout", type=float, default=0.3)
+    parser.add_argument("--rounds", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    run_benchmark(args.venues, args.latency, args.jitter, args.error_rate, args.concurrency,
+                  args.timeout, args.rounds, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,552 @@
+"""
+Tuxido Mining Bot - Sliced Execution
+Sells large amounts of a jetton into a constant-product pool as a schedule
+of slices instead of one swap. Each slice is sized from the pool's current
+reserves so its price impact stays within a budget, and the schedule paces
+an order over a time window so arbitrageurs can refill the pool between
+slices. Orders, slices and fills are event-sourced in a JSON-lines journal
+
+    python execution.py --hours 24 --order 50000 --every 3600
+"""
+
+import os
+import json
+import math
+import time
+import random
+import tempfile
+import asyncio
+import argparse
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from arbitrage import FEE_DENOMINATOR, Pool
+from runtime_config import ExecutionSettings
+from storage_utils import append_bytes, atomic_write_bytes
+
+logger = logging.getLogger(__name__)
+
+COMPACT_EVERY_EVENTS = 5000
+
+
+def marginal_price(pool: Pool, direction: int) -> float:
+    """Output per unit of input for an infinitesimal swap, after fees"""
+    reserve_in, reserve_out = pool.reserves(direction)
+    return (FEE_DENOMINATOR - pool.fee_bps) * reserve_out / (FEE_DENOMINATOR * reserve_in) if reserve_in else 0.0
+
+
+def impact_cap(pool: Pool, direction: int, impact_bps: float) -> int:
+    """Largest input whose average price is at most impact_bps below the marginal price
+
+    Selling x after fee factor g gets g*x*Rout/(Rin + g*x) instead of
+    g*x*Rout/Rin, a shortfall of g*x/(Rin + g*x); solved for x.
+    """
+    reserve_in, _ = pool.reserves(direction)
+    if impact_bps <= 0 or impact_bps >= FEE_DENOMINATOR:
+        return 0
+    return int(impact_bps * reserve_in * FEE_DENOMINATOR
+               / ((FEE_DENOMINATOR - pool.fee_bps) * (FEE_DENOMINATOR - impact_bps)))
+
+
+class ParentOrder:
+    """An amount to sell by a deadline and what has been sold so far"""
+
+    __slots__ = ("order_id", "amount", "created_at", "deadline", "reference_price",
+                 "filled", "received", "pending")
+
+    def __init__(self, order_id: str, amount: int, created_at: float, deadline: float,
+                 reference_price: Optional[float] = None, filled: int = 0, received: int = 0):
+        self.order_id = order_id
+        self.amount = amount
+        self.created_at = created_at
+        self.deadline = deadline
+        self.reference_price = reference_price  # marginal price when planning started
+        self.filled = filled
+        self.received = received
+        self.pending = 0  # sent in slices that have not filled yet
+
+    @property
+    def remaining(self) -> int:
+        return self.amount - self.filled - self.pending
+
+    def to_dict(self) -> Dict:
+        return {"id": self.order_id, "amount": self.amount, "at": self.created_at, "deadline": self.deadline,
+                "price": self.reference_price, "filled": self.filled, "received": self.received}
+
+
+class Slice:
+    """One swap of part of an order"""
+
+    __slots__ = ("slice_id", "order_id", "amount", "quoted", "min_out", "sent_at")
+
+    def __init__(self, slice_id: str, order_id: str, amount: int, quoted: int, min_out: int, sent_at: float):
+        self.slice_id = slice_id
+        self.order_id = order_id
+        self.amount = amount
+        self.quoted = quoted      # output at the reserves the slice was planned on
+        self.min_out = min_out
+        self.sent_at = sent_at
+
+    def to_dict(self) -> Dict:
+        return {"id": self.slice_id, "order": self.order_id, "amount": self.amount,
+                "quoted": self.quoted, "min_out": self.min_out, "at": self.sent_at}
+
+
+class ExecutionEngine:
+    """Plans slices against live reserves and records their fills
+
+    pool_source() returns the pool's current reserves. executor(slice)
+    sends a slice and returns its output when known at once, or None when
+    the fill arrives later through settle(). Only one slice is in flight at
+    a time, so every slice is planned on reserves that include the last one.
+    A slice unsettled after slice_timeout seconds is checked with
+    reconcile(slice): "done" settles it, "pending" (still with the wallet)
+    keeps waiting, and "unknown" (never sent) fails it so it is planned again.
+    A fill settled without its output is booked at the quote until
+    refund() reports the swap returned part of it.
+    """
+
+    def __init__(self, pool_source: Callable[[], Awaitable[Optional[Pool]]],
+                 executor: Callable[[Slice], Awaitable[Optional[int]]], sell_token: str,
+                 impact_bps: float = 50, window: float = 3600, interval: float = 60,
+                 slippage_bps: float = 100, max_price_drop_bps: float = 1000, min_slice: int = 1,
+                 slice_timeout: float = 600, reconcile: Optional[Callable[[Slice], str]] = None,
+                 journal_path: str = "data/execution_journal.jsonl", clock: Callable[[], float] = time.time):
+        self.pool_source = pool_source
+        self.executor = executor
+        self.sell_token = sell_token
+        self.impact_bps = impact_bps
+        self.window = window
+        self.interval = interval
+        self.slippage_bps = slippage_bps
+        self.max_price_drop_bps = max_price_drop_bps
+        self.min_slice = min_slice
+        self.slice_timeout = slice_timeout
+        self.reconcile = reconcile
+        self.journal_path = journal_path
+        self.clock = clock
+
+        self.orders: Dict[str, ParentOrder] = {}  # open orders, oldest first
+        self.in_flight: Dict[str, Slice] = {}
+        self.totals = {"orders": 0, "sold": 0, "received": 0, "quoted": 0}
+        # Fills booked at their quote, open to a refund until slice_timeout after they settled
+        self.estimated: Dict[str, Dict] = {}
+        self.stats = {"slices": 0, "fills": 0, "failures": 0, "paused": 0, "capped": 0, "timeouts": 0,
+                      "refunds": 0}
+        self._next_order = self._next_slice = 1  # ids double as wallet idempotency keys, never reuse them
+        self._journal_events = 0
+        self._wakeup = asyncio.Event()
+        self._restore()
+
+    # --- Journal ---------------------------------------------------------
+
+    def _journal(self, event: str, **fields):
+        fields["e"] = event
+        self._journal_events += 1
+        append_bytes(self.journal_path, json.dumps(fields, separators=(",", ":")).encode() + b"\n")
+
+    def _restore(self):
+        """Replay the journal into open orders, in-flight slices and totals, then compact it"""
+        try:
+            with open(self.journal_path, "rb") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # torn final line after a crash
+                    self._apply(record)
+        except FileNotFoundError:
+            return
+        for item in self.in_flight.values():
+            self.orders[item.order_id].pending += item.amount
+        self._compact()
+        logger.info("📒 Execution journal restored: %d open orders, %d slices in flight",
+                    len(self.orders), len(self.in_flight))
+
+    def _apply(self, record: Dict):
+        event = record["e"]
+        if event == "order":
+            order = ParentOrder(record["id"], record["amount"], record["at"], record["deadline"],
+                                record.get("price"), record.get("filled", 0), record.get("received", 0))
+            self.orders[order.order_id] = order
+            self._next_order = max(self._next_order, int(order.order_id.rsplit("-", 1)[-1]) + 1)
+        elif event == "priced":
+            self.orders[record["id"]].reference_price = record["price"]
+        elif event == "slice":
+            self.in_flight[record["id"]] = Slice(record["id"], record["order"], record["amount"],
+                                                 record["quoted"], record["min_out"], record["at"])
+            self._next_slice = max(self._next_slice, int(record["id"].rsplit(":", 1)[-1]) + 1)
+        elif event == "fill":
+            item = self.in_flight.pop(record["id"], None)
+            if item:
+                order = self.orders[item.order_id]
+                if record.get("estimated"):
+                    self._estimate(item, order, record["out"], record.get("at", 0.0))
+                self._fill(order, item.amount, record["out"])
+        elif event == "estimated":
+            self.estimated[record["id"]] = {name: value for name, value in record.items() if name != "e"}
+        elif event == "refund":
+            self._reverse(record["id"], record["amount"])
+        elif event == "fail":
+            self.in_flight.pop(record["id"], None)
+        elif event == "totals":
+            self.totals.update(record["totals"])
+            self._next_order = max(self._next_order, record["next_order"])
+            self._next_slice = max(self._next_slice, record["next_slice"])
+
+    def _compact(self):
+        lines = [{"e": "totals", "totals": self.totals,
+                  "next_order": self._next_order, "next_slice": self._next_slice}]
+        lines += [{"e": "order", **order.to_dict()} for order in self.orders.values()]
+        lines += [{"e": "slice", **item.to_dict()} for item in self.in_flight.values()]
+        lines += [{"e": "estimated", **record} for record in self.estimated.values()]
+        atomic_write_bytes(self.journal_path, "".join(
+            json.dumps(line, separators=(",", ":")) + "\n" for line in lines
+        ).encode())
+        self._journal_events = 0
+
+    def _fill(self, order: ParentOrder, amount: int, out: int):
+        order.filled += amount
+        order.received += out
+        if order.filled >= order.amount:
+            del self.orders[order.order_id]
+            self.totals["orders"] += 1
+            self.totals["sold"] += order.filled
+            self.totals["received"] += order.received
+            self.totals["quoted"] += int(order.filled * (order.reference_price or 0))
+
+    # --- Orders and fills ------------------------------------------------------
+
+    def submit(self, amount: int, window: Optional[float] = None) -> Optional[str]:
+        """Schedule amount (raw jetton units, like pool reserves) for sale over window seconds; returns the order id"""
+        if amount <= 0:
+            return None
+        now = self.clock()
+        order = ParentOrder(f"order-{self._next_order}", amount, now, now + (window or self.window))
+        self._next_order += 1
+        self.orders[order.order_id] = order
+        self._journal("order", **order.to_dict())
+        self._wakeup.set()
+        return order.order_id
+
+    def settle(self, slice_id: str, amount_out: Optional[int] = None):
+        """Record a slice's fill; without amount_out its quote is booked as the fill"""
+        item = self.in_flight.pop(slice_id, None)
+        if item is None:
+            return
+        out = item.quoted if amount_out is None else amount_out
+        now = self.clock()
+        self._journal("fill", id=slice_id, out=out, estimated=amount_out is None, at=now)
+        order = self.orders[item.order_id]
+        if amount_out is None:
+            self._estimate(item, order, out, now)
+        order.pending -= item.amount
+        self._fill(order, item.amount, out)
+        self.stats["fills"] += 1
+        self._wakeup.set()
+
+    def fail(self, slice_id: str, reason: str = ""):
+        """Return a slice's amount to its order so it is planned again"""
+        item = self.in_flight.pop(slice_id, None)
+        if item is None:
+            return
+        self._journal("fail", id=slice_id, reason=reason)
+        self.orders[item.order_id].pending -= item.amount
+        self.stats["failures"] += 1
+
+    def refund(self, amount: int) -> Optional[str]:
+        """Take back amount of a fill booked at its quote, after the swap returned it unsold
+
+        Charged to the oldest estimated fill of exactly that amount, else the
+        oldest one at least as large; returns its slice id, None if none fits.
+        """
+        self._expire_estimates(self.clock())
+        candidates = [record for record in self.estimated.values() if record["amount"] >= amount > 0]
+        record = next((r for r in candidates if r["amount"] == amount), candidates[0] if candidates else None)
+        if record is None:
+            return None
+        slice_id = record["id"]
+        self._journal("refund", id=slice_id, amount=amount)
+        reopened = self._reverse(slice_id, amount)
+        self.stats["refunds"] += 1
+        logger.warning("↩️ Slice %s returned %d units unsold%s", slice_id, amount,
+                       "; planning them again" if reopened else "; its order had closed, they stay in the wallet")
+        self._wakeup.set()
+        return slice_id
+
+    def _estimate(self, item: Slice, order: ParentOrder, out: int, at: float):
+        self.estimated[item.slice_id] = {"id": item.slice_id, "order": order.order_id, "amount": item.amount,
+                                         "out": out, "at": at, "price": order.reference_price}
+
+    def _reverse(self, slice_id: str, amount: int) -> bool:
+        """Undo amount of an estimated fill; True if its order was still open to sell it again"""
+        record = self.estimated.get(slice_id)
+        if record is None:
+            return False
+        out = record["out"] * amount // record["amount"]
+        record["amount"] -= amount
+        record["out"] -= out
+        if record["amount"] <= 0:
+            del self.estimated[slice_id]
+        order = self.orders.get(record["order"])
+        if order:
+            order.filled -= amount
+            order.received -= out
+            return True
+        self.totals["sold"] -= amount
+        self.totals["received"] -= out
+        self.totals["quoted"] -= int(amount * (record["price"] or 0))
+        return False
+
+    def _expire_estimates(self, now: float):
+        for slice_id in [s for s, record in self.estimated.items() if now - record["at"] > self.slice_timeout]:
+            del self.estimated[slice_id]
+
+    def _reconcile_overdue(self, now: float):
+        """Settle or fail slices unsettled past slice_timeout, as reconcile reports them"""
+        for item in list(self.in_flight.values()):
+            if now - item.sent_at < self.slice_timeout:
+                continue
+            state = self.reconcile(item) if self.reconcile else "unknown"
+            if state == "done":
+                self.settle(item.slice_id)
+            elif state == "unknown":
+                self.stats["timeouts"] += 1
+                logger.warning("⏱️ Slice %s unsettled after %.0fs and never sent, planning it again",
+                               item.slice_id, now - item.sent_at)
+                self.fail(item.slice_id, "timed out")
+            else:
+                logger.debug("⏳ Slice %s still waiting on the wallet after %.0fs", item.slice_id,
+                             now - item.sent_at)
+
+    # --- Planning ---------------------------------------------------------------
+
+    def _due(self, order: ParentOrder, now: float) -> int:
+        """How far the order is behind a linear schedule one interval ahead"""
+        span = max(order.deadline - order.created_at, 1e-9)
+        progress = min(1.0, (now - order.created_at + self.interval) / span)
+        return int(order.amount * progress) - order.filled - order.pending
+
+    async def step(self) -> Optional[Slice]:
+        """Plan and send at most one slice on the current reserves"""
+        now = self.clock()
+        if self.estimated:
+            self._expire_estimates(now)
+        if self.in_flight:
+            self._reconcile_overdue(now)
+        if not self.orders or self.in_flight:
+            return None
+        order = next((o for o in self.orders.values() if self._due(o, now) > 0 and o.remaining > 0), None)
+        if order is None:
+            return None
+        pool = await self.pool_source()
+        if pool is None:
+            return None
+        direction = 0 if pool.token0 == self.sell_token else 1
+        price = marginal_price(pool, direction)
+        if order.reference_price is None:
+            order.reference_price = price
+            self._journal("priced", id=order.order_id, price=price)
+        elif price < order.reference_price * (1 - self.max_price_drop_bps / FEE_DENOMINATOR):
+            # Selling into a falling pool only deepens the drop; wait for it to recover
+            self.stats["paused"] += 1
+            logger.debug("⏸️ %s paused: price %.3g is below %.3g", order.order_id, price, order.reference_price)
+            return None
+
+        # Behind schedule: sell a full impact budget, since every swap also pays gas
+        cap = impact_cap(pool, direction, self.impact_bps)
+        amount = min(order.remaining, cap)
+        if amount == cap:
+            self.stats["capped"] += 1
+        if amount < self.min_slice and amount < order.remaining:
+            return None
+        quoted = pool.amount_out(amount, direction)
+        item = Slice(f"{order.order_id}:{self._next_slice}", order.order_id, amount, quoted,
+                     int(quoted * (FEE_DENOMINATOR - self.slippage_bps) // FEE_DENOMINATOR), now)
+        self._next_slice += 1
+        self.stats["slices"] += 1
+        self.in_flight[item.slice_id] = item
+        order.pending += amount
+        self._journal("slice", **item.to_dict())
+        try:
+            out = await self.executor(item)
+        except Exception as e:
+            logger.error("Slice %s failed: %s", item.slice_id, e)
+            self.fail(item.slice_id, str(e))
+            return None
+        if out is not None:
+            self.settle(item.slice_id, out)
+        return item
+
+    async def run(self, heartbeat: Optional[Callable[[], None]] = None):
+        """Plan a slice every interval (or on a new order or fill); meant to run under a Supervisor"""
+        while True:
+            if heartbeat:
+                heartbeat()
+            self._wakeup.clear()
+            await self.step()
+            if self._journal_events > COMPACT_EVERY_EVENTS:
+                self._compact()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    @property
+    def backlog(self) -> int:
+        """Amount still to be sold across open orders"""
+        return sum(order.amount - order.filled for order in self.orders.values())
+
+    def status(self) -> Dict:
+        totals = dict(self.totals)
+        for order in self.orders.values():
+            totals["sold"] += order.filled
+            totals["received"] += order.received
+            totals["quoted"] += int(order.filled * (order.reference_price or 0))
+        shortfall = (totals["quoted"] - totals["received"]) / totals["quoted"] if totals["quoted"] else 0.0
+        return {
+            "open_orders": len(self.orders),
+            "backlog": self.backlog,
+            "in_flight": list(self.in_flight),
+            "shortfall_bps": round(shortfall * FEE_DENOMINATOR, 1),
+            **totals,
+            **self.stats
+        }
+
+
+def build_execution_engine(settings: ExecutionSettings, pool_source, executor, sell_token: str,
+                           reconcile: Optional[Callable[[Slice], str]] = None,
+                           clock: Callable[[], float] = time.time) -> ExecutionEngine:
+    return ExecutionEngine(
+        pool_source, executor, sell_token, impact_bps=settings.impact_bps, window=settings.window,
+        interval=settings.interval, slippage_bps=settings.slippage_bps,
+        max_price_drop_bps=settings.max_price_drop_bps, slice_timeout=settings.slice_timeout,
+        reconcile=reconcile, journal_path=settings.journal_path, clock=clock
+    )
+
+
+# --- Simulation -----------------------------------------------------------------
+
+
+class PoolSimulator:
+    """A pool that external arbitrageurs pull back toward a fair price
+
+    The gap between the pool price and the fair price closes with the given
+    half-life, and the fair price itself follows a random walk.
+    """
+
+    def __init__(self, pool: Pool, half_life: float = 120.0, volatility_bps: float = 50.0, seed: int = 1):
+        self.pool = pool
+        self.fair = pool.reserve1 / pool.reserve0
+        self.half_life = half_life
+        self.volatility = volatility_bps / FEE_DENOMINATOR  # per sqrt(hour)
+        self.random = random.Random(seed)
+
+    def swap(self, amount: int, direction: int) -> int:
+        out = self.pool.amount_out(amount, direction)
+        if direction == 0:
+            self.pool.reserve0 += amount
+            self.pool.reserve1 -= out
+        else:
+            self.pool.reserve1 += amount
+            self.pool.reserve0 -= out
+        return out
+
+    def advance(self, seconds: float):
+        self.fair *= math.exp(self.random.gauss(0.0, self.volatility * math.sqrt(seconds / 3600)))
+        price = self.pool.reserve1 / self.pool.reserve0
+        price *= (self.fair / price) ** (1 - 0.5 ** (seconds / self.half_life))
+        k = self.pool.reserve0 * self.pool.reserve1
+        self.pool.reserve0 = int(math.sqrt(k / price))
+        self.pool.reserve1 = int(math.sqrt(k * price))
+
+
+def simulate(strategy: str, reserve_in: int, reserve_out: int, order: int, every: float, hours: float,
+             settings: Dict, tick: float = 10.0, seed: int = 1) -> Dict:
+    """Sell `order` every `every` seconds for `hours`, either at once ("dump") or sliced"""
+    now = [0.0]
+    simulator = PoolSimulator(Pool("pool", "JETTON", "TON", reserve_in, reserve_out), settings["half_life"],
+                              seed=seed)
+    impacts: List[float] = []
+
+    async def pool_source() -> Pool:
+        return simulator.pool
+
+    async def executor(item: Slice) -> int:
+        price = marginal_price(simulator.pool, 0)
+        out = simulator.swap(item.amount, 0)
+        impacts.append(1 - out / (item.amount * price))
+        return out
+
+    journal_dir = tempfile.TemporaryDirectory(prefix="execution-sim-")
+    engine = ExecutionEngine(pool_source, executor, "JETTON", impact_bps=settings["impact_bps"],
+                             window=settings["window"], interval=settings["interval"],
+                             journal_path=os.path.join(journal_dir.name, f"{strategy}.jsonl"),
+                             clock=lambda: now[0])
+
+    async def run():
+        next_order = next_step = 0.0
+        while now[0] < hours * 3600:
+            if now[0] >= next_order:
+                if strategy == "dump":
+                    engine.submit(order, window=1e-6)
+                    engine.impact_bps = FEE_DENOMINATOR - 1  # no cap: one swap for the whole order
+                    engine.max_price_drop_bps = FEE_DENOMINATOR
+                else:
+                    engine.submit(order)
+                next_order += every
+                next_step = now[0]
+            if now[0] >= next_step:
+                await engine.step()
+                next_step += engine.interval
+            now[0] += tick
+            simulator.advance(tick)
+
+    with journal_dir:
+        asyncio.run(run())
+    status = engine.status()
+    impacts.sort()
+    status["p99_slice_impact_bps"] = impacts[int(len(impacts) * 0.99)] * FEE_DENOMINATOR if impacts else 0.0
+    status["submitted"] = int(hours * 3600 / every + 0.999) * order
+    return status
+
+
+def run_benchmark(reserve_in: float, reserve_out: float, order: float, every: float, hours: float,
+                  impact_bps: float, window: float, interval: float, half_life: float, gas: float, seed: int = 1):
+    unit = 10**9
+    settings = {"impact_bps": impact_bps, "window": window, "interval": interval, "half_life": half_life}
+    print(f"Pool:  {reserve_in:,.0f} JETTON / {reserve_out:,.0f} TON, refill half-life {half_life:.0f}s")
+    print(f"Flow:  {order:,.0f} JETTON every {every:.0f}s for {hours:g}h "
+          f"({order / reserve_in:.2%} of the pool per order)")
+    for strategy in ("dump", "sliced"):
+        s = simulate(strategy, int(reserve_in * unit), int(reserve_out * unit), int(order * unit), every, hours,
+                     settings, seed=seed)
+        sold_per_day = s["sold"] / unit * 24 / hours
+        net = s["received"] / unit - gas * s["slices"]
+        print(f"{strategy:>6}: sold {s['sold'] / unit:,.0f} of {s['submitted'] / unit:,.0f} "
+              f"({sold_per_day:,.0f}/day) in {s['slices']} swaps")
+        print(f"        received {s['received'] / unit:,.2f} TON ({net:,.2f} after gas), "
+              f"shortfall vs arrival price {s['shortfall_bps']:.1f} bps, "
+              f"p99 swap impact {s['p99_slice_impact_bps']:.1f} bps")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate sliced vs immediate selling into a pool")
+    parser.add_argument("--reserve-in", type=float, default=1_000_000, help="jetton reserve")
+    parser.add_argument("--reserve-out", type=float, default=5_000, help="TON reserve")
+    parser.add_argument("--order", type=float, default=50_000, help="jettons per sell order")
+    parser.add_argument("--every", type=float, default=3600, help="seconds between sell orders")
+    parser.add_argument("--hours", type=float, default=24)
+    parser.add_argument("--impact-bps", type=float, default=50)
+    parser.add_argument("--window", type=float, default=3600)
+    parser.add_argument("--interval", type=float, default=60)
+    parser.add_argument("--half-life", type=float, default=300, help="seconds for arbitrageurs to close half the gap")
+    parser.add_argument("--gas", type=float, default=0.15, help="TON spent per swap")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    run_benchmark(args.reserve_in, args.reserve_out, args.order, args.every, args.hours,
+                  args.impact_bps, args.window, args.interval, args.half_life, args.gas, args.seed)
+
+
+if __name__ == "__main__":
+    main()
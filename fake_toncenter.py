@@ -0,0 +1,330 @@
+"""
+Tuxido Mining Bot - Fake Toncenter
+In-memory stand-in for the toncenter v2 API with wallet seqno semantics, for
+exercising the wallet sender and other on-chain code without a network.
+FakeToncenter has the ToncenterClient interface; FakeToncenterServer exposes
+it over HTTP POST /jsonRPC for code that talks to a real endpoint
+
+    python fake_toncenter.py --port 8081
+"""
+
+import time
+import base64
+import random
+import asyncio
+import argparse
+import logging
+import json
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from boc import deserialize_boc, format_address
+from toncenter_client import ToncenterError, stack_int
+
+logger = logging.getLogger(__name__)
+
+
+class FakeWallet:
+    """Account state for one wallet v3/v4 contract"""
+
+    def __init__(self, address: str, seqno: int = 0, subwallet_id: int = 698983191, balance: int = 10**12):
+        self.address = address
+        self.seqno = seqno
+        self.subwallet_id = subwallet_id
+        self.balance = balance
+        self.transactions: List[Dict] = []  # newest first
+
+
+def parse_external(boc: bytes) -> Dict:
+    """Fields of a wallet v3/v4 external message: destination, seqno, valid_until, messages"""
+    external = deserialize_boc(boc)[0]
+    bits, value = external.bits, external.value
+
+    def take(n: int) -> int:
+        nonlocal bits
+        bits -= n
+        return (value >> bits) & ((1 << n) - 1)
+
+    if take(2) != 0b10 or take(2) != 0:
+        raise ToncenterError("Not an external inbound message")
+    take(3)
+    workchain, account = take(8), take(256)
+    dest = format_address(workchain - 256 if workchain > 127 else workchain, account.to_bytes(32, "big"))
+    take(4)  # import_fee
+    if take(1):
+        raise ToncenterError("State init is not supported by the fake")
+    body = external.refs[0] if take(1) else None
+    if body is None:
+        raise ToncenterError("Inline bodies are not supported by the fake")
+
+    bits, value = body.bits, body.value
+    signature = take(512)
+    subwallet_id, valid_until, seqno = take(32), take(32), take(32)
+    if bits == 8 * len(body.refs) + 8:
+        take(8)  # v4 op
+    modes = [take(8) for _ in body.refs]
+
+    messages = []
+    for mode, cell in zip(modes, body.refs):
+        bits, value = cell.bits, cell.value
+        take(1)  # int_msg_info
+        flags = take(3)
+        take(2 + 3)  # src addr_none, dest addr_std prefix
+        workchain, account = take(8), take(256)
+        grams = take(take(4) * 8)
+        messages.append({
+            "destination": format_address(workchain - 256 if workchain > 127 else workchain,
+                                          account.to_bytes(32, "big")),
+            "value": grams, "mode": mode, "bounce": bool(flags & 0b010),
+            "body": cell.refs[0] if cell.refs else None
+        })
+    return {"destination": dest, "signature": signature, "subwallet_id": subwallet_id,
+            "valid_until": valid_until, "seqno": seqno, "messages": messages,
+            "hash": base64.b64encode(external.hash()).decode()}
+
+
+class FakeToncenter:
+    """Toncenter with wallets that accept messages by seqno after a delay
+
+    latency delays when an accepted message lands on chain; drop_rate makes
+    that fraction of sends vanish silently, as messages that never reach a
+    validator do.
+    """
+
+    def __init__(self, latency: float = 0.0, drop_rate: float = 0.0, clock: Callable[[], float] = time.time,
+                 seed: Optional[int] = None):
+        self.latency = latency
+        self.drop_rate = drop_rate
+        self.clock = clock
+        self.random = random.Random(seed)
+        self.wallets: Dict[str, FakeWallet] = {}
+        self.get_methods: Dict[tuple, Callable[[Sequence], List]] = {}
+        self.calls: Dict[str, int] = {}
+        self.sent: List[Dict] = []
+        self._lt = 1_000_000
+        self._pending: List[asyncio.Task] = []
+
+    def add_wallet(self, address: str, **kwargs) -> FakeWallet:
+        wallet = self.wallets[address] = FakeWallet(address, **kwargs)
+        return wallet
+
+    def register_get_method(self, address: str, method: str, handler: Callable[[Sequence], List]):
+        """Serve run_get_method(address, method) from handler(stack) -> stack"""
+        self.get_methods[(address, method)] = handler
+
+    def _count(self, method: str):
+        self.calls[method] = self.calls.get(method, 0) + 1
+
+    async def call(self, method: str, params: Optional[Dict] = None, priority: Optional[int] = None) -> Any:
+        params = params or {}
+        if method == "runGetMethod":
+            stack = await self.run_get_method(params["address"], params["method"], params.get("stack", ()))
+            return {"exit_code": 0, "stack": stack}
+        if method == "getTransactions":
+            return await self.get_transactions(params["address"], int(params.get("limit", 20)),
+                                               params.get("lt"), params.get("hash"))
+        if method in ("sendBoc", "sendBocReturnHash"):
+            return await self.send_boc(base64.b64decode(params["boc"]))
+        if method == "getMasterchainInfo":
+            return await self.get_masterchain_info()
+        if method == "getAddressInformation":
+            return await self.get_address_information(params["address"])
+        raise ToncenterError(f"Unknown method {method}", 404)
+
+    async def run_get_method(self, address: str, method: str, stack: Sequence = ()) -> List:
+        self._count("runGetMethod")
+        handler = self.get_methods.get((address, method))
+        if handler is not None:
+            return handler(stack)
+        wallet = self.wallets.get(address)
+        if wallet is None:
+            raise ToncenterError(f"{method} on {address} exited with -13", -13)
+        if method == "seqno":
+            return [["num", hex(wallet.seqno)]]
+        raise ToncenterError(f"{method} on {address} exited with 11", 11)
+
+    async def get_seqno(self, address: str) -> int:
+        try:
+            return stack_int((await self.run_get_method(address, "seqno"))[0])
+        except ToncenterError as e:
+            if e.code in (-13, -14):
+                return 0
+            raise
+
+    async def get_address_information(self, address: str) -> Dict:
+        self._count("getAddressInformation")
+        wallet = self.wallets.get(address)
+        last = wallet.transactions[0]["transaction_id"] if wallet and wallet.transactions else {"lt": "0", "hash": ""}
+        return {"balance": str(wallet.balance if wallet else 0), "state": "active" if wallet else "uninitialized",
+                "last_transaction_id": last}
+
+    async def get_last_lts(self, addresses: Sequence[str]) -> Dict[str, int]:
+        self._count("accountStates")
+        lts = {}
+        for address in addresses:
+            wallet = self.wallets.get(address)
+            if wallet is not None:
+                lts[address] = int(wallet.transactions[0]["transaction_id"]["lt"]) if wallet.transactions else 0
+        return lts
+
+    async def get_masterchain_info(self) -> Dict:
+        self._count("getMasterchainInfo")
+        return {"last": {"workchain": -1, "seqno": self._lt // 1000}}
+
+    async def get_transactions(self, address: str, limit: int = 20, lt: Optional[int] = None,
+                               tx_hash: Optional[str] = None, to_lt: Optional[int] = None,
+                               archival: bool = False) -> List[Dict]:
+        self._count("getTransactions")
+        wallet = self.wallets.get(address)
+        if wallet is None:
+            return []
+        transactions = wallet.transactions
+        if lt is not None:
+            transactions = [tx for tx in transactions if int(tx["transaction_id"]["lt"]) <= int(lt)]
+        if to_lt is not None:
+            transactions = [tx for tx in transactions if int(tx["transaction_id"]["lt"]) > int(to_lt)]
+        return transactions[:limit]
+
+    async def send_boc(self, boc: bytes) -> Dict:
+        self._count("sendBoc")
+        message = parse_external(boc)
+        wallet = self.wallets.get(message["destination"])
+        if wallet is None:
+            raise ToncenterError("Account not found", 500)
+        if message["subwallet_id"] != wallet.subwallet_id:
+            raise ToncenterError("Wrong subwallet id (exit code 34)", 500)
+        if message["valid_until"] <= self.clock():
+            raise ToncenterError("Message expired (exit code 36)", 500)
+        if message["seqno"] != wallet.seqno:
+            raise ToncenterError("Wrong seqno (exit code 33)", 500)
+        if self.random.random() >= self.drop_rate:
+            self._pending.append(asyncio.ensure_future(self._land(wallet, message)))
+        return {"hash": message["hash"]}
+
+    async def _land(self, wallet: FakeWallet, message: Dict):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        # Re-check against chain state at inclusion time, like a validator would
+        if message["seqno"] != wallet.seqno or message["valid_until"] <= self.clock():
+            return
+        wallet.seqno += 1
+        self._lt += 1000
+        wallet.transactions.insert(0, {
+            "transaction_id": {"lt": str(self._lt), "hash": base64.b64encode(self._lt.to_bytes(32, "big")).decode()},
+            "utime": int(self.clock()),
+            "in_msg": {"hash": message["hash"], "source": "", "destination": wallet.address, "value": "0"},
+            "out_msgs": [{"destination": m["destination"], "value": str(m["value"])} for m in message["messages"]]
+        })
+        self.sent.append(message)
+
+    def touch(self, address: str, **transaction) -> Dict:
+        """Record an incoming transaction on an account (a swap on a pool, a transfer to a wallet)"""
+        wallet = self.wallets.get(address) or self.add_wallet(address)
+        self._lt += 1000
+        record = {
+            "transaction_id": {"lt": str(self._lt), "hash": base64.b64encode(self._lt.to_bytes(32, "big")).decode()},
+            "utime": int(self.clock()),
+            "in_msg": {"hash": "", "source": "", "destination": address, "value": "0"},
+            "out_msgs": [],
+            **transaction
+        }
+        wallet.transactions.insert(0, record)
+        return record
+
+    async def settle(self):
+        """Wait for every accepted message to land"""
+        while self._pending:
+            pending, self._pending = self._pending, []
+            await asyncio.gather(*pending)
+
+
+class FakeToncenterServer:
+    """Minimal HTTP/1.1 front end serving POST /jsonRPC from a FakeToncenter"""
+
+    def __init__(self, backend: FakeToncenter, host: str = "127.0.0.1", port: int = 0):
+        self.backend = backend
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def endpoint(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("🧪 Fake toncenter listening on %s", self.endpoint)
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                length, keep_alive = 0, True
+                while True:
+                    line = (await reader.readline()).strip()
+                    if not line:
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    if name.lower() == "content-length":
+                        length = int(value)
+                    elif name.lower() == "connection" and value.strip().lower() == "close":
+                        keep_alive = False
+                body = await reader.readexactly(length) if length else b""
+                status, payload = 200, await self._dispatch(request_line, body)
+                data = json.dumps(payload).encode()
+                writer.write(b"HTTP/1.1 %d OK\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n"
+                             % (status, len(data)) + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, request_line: bytes, body: bytes) -> Dict:
+        parts = request_line.split()
+        if len(parts) < 2 or parts[0] != b"POST" or not parts[1].endswith(b"/jsonRPC"):
+            return {"ok": False, "error": "Only POST /jsonRPC is served", "code": 404}
+        try:
+            request = json.loads(body)
+            result = await self.backend.call(request["method"], request.get("params"))
+            return {"ok": True, "result": result, "id": request.get("id"), "jsonrpc": "2.0"}
+        except ToncenterError as e:
+            return {"ok": False, "error": str(e), "code": e.code}
+        except Exception as e:
+            return {"ok": False, "error": str(e), "code": 500}
+
+
+async def _serve(port: int, wallets: List[str], latency: float):
+    backend = FakeToncenter(latency=latency)
+    for address in wallets:
+        backend.add_wallet(address)
+    server = FakeToncenterServer(backend, port=port)
+    await server.start()
+    print(f"Fake toncenter at {server.endpoint}/jsonRPC with {len(wallets)} wallet(s)")
+    await asyncio.Event().wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local fake toncenter for testing")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--wallet", action="append", default=[], help="wallet address to create (repeatable)")
+    parser.add_argument("--latency", type=float, default=2.0, help="seconds until sent messages land")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_serve(args.port, args.wallet, args.latency))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
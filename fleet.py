@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Tuxido Mining Bot - Miner Fleet
+Hosts many wallet miners on one event loop with shared market data, HTTP
+pool and StonFi pool index, scheduled earliest-deadline-first
+
+Usage: python fleet.py fleet.json
+       python fleet.py --bench 1000 [--seconds 5]
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import heapq
+import asyncio
+import logging
+import argparse
+import itertools
+import tempfile
+import tracemalloc
+from collections import deque
+from types import FunctionType, MethodType, ModuleType
+from typing import Dict, List, Optional
+
+from http_client import close_session
+from main import AdvancedTuxidoMiner, load_stonfi_manager_class
+from market_data import MarketDataFeed
+from quota import build_quota_backend
+from runtime_config import config_store
+from resource_governor import CRITICAL, MEMORY, get_governor, register_process_responders
+from supervisor import Supervisor
+
+logger = logging.getLogger(__name__)
+
+# Yield to the event loop at least this often when every miner is overdue
+MAX_STEPS_WITHOUT_YIELD = 64
+
+_UNSIZED_TYPES = (type, ModuleType, FunctionType, MethodType, logging.Logger)
+
+
+def deep_sizeof(root, exclude_ids=frozenset()) -> int:
+    """Approximate bytes reachable from root, not counting shared objects"""
+    seen = set(exclude_ids)
+    stack = [root]
+    total = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, _UNSIZED_TYPES):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+            stack.extend(obj)
+        elif isinstance(obj, (str, bytes, int, float, bool)) or obj is None:
+            continue
+        else:
+            if hasattr(obj, "__dict__"):
+                stack.append(obj.__dict__)
+            for slot in getattr(type(obj), "__slots__", ()):
+                if hasattr(obj, slot):
+                    stack.append(getattr(obj, slot))
+    return total
+
+
+def load_fleet_spec(path: str) -> List[Dict]:
+    """Read wallets from a JSON list or {"wallets": [...]} file"""
+    with open(path, "r") as f:
+        spec = json.load(f)
+    wallets = spec.get("wallets", []) if isinstance(spec, dict) else spec
+    return [w if isinstance(w, dict) else {"wallet_address": w} for w in wallets]
+
+
+class MinerFleet:
+    """Runs many AdvancedTuxidoMiner instances on a single scheduler task"""
+
+    def __init__(self, wallets: Optional[List[Dict]] = None, state_root: str = "data/fleet"):
+        self.settings = config_store.current
+        self.state_root = state_root
+        self.market_feed = MarketDataFeed()
+
+        # One StonFi manager (pool index, price monitor) for every wallet
+        self.stonfi_manager = None
+        jetton = self.settings.stonfi.jetton_address
+        if self.settings.stonfi.enabled and jetton:
+            manager_class = load_stonfi_manager_class()
+            if manager_class:
+                self.stonfi_manager = manager_class(
+                    jetton, warm_cache_path=self.settings.startup.warm_cache_path
+                )
+
+        # One quota backend (SQLite file or coordinator connection) for every wallet
+        self.quota_backend = build_quota_backend(self.settings.quota) if self.settings.quota.enabled else None
+
+        self.miners: Dict[str, AdvancedTuxidoMiner] = {}
+        self.running = False
+        self._heap = []
+        self._sequence = itertools.count()
+        self._wakeup = asyncio.Event()
+        self.supervisor = Supervisor("fleet")
+        self.stats = {"steps": 0, "idle_checks": 0, "max_lag_s": 0.0}
+
+        for wallet in wallets or []:
+            self.add_miner(wallet["wallet_address"], wallet.get("chat_id"))
+
+    def _state_dir(self, wallet_address: str) -> str:
+        return os.path.join(self.state_root, re.sub(r"[^A-Za-z0-9_-]", "_", wallet_address))
+
+    def add_miner(self, wallet_address: str, chat_id: Optional[str] = None) -> AdvancedTuxidoMiner:
+        """Register a wallet; when the fleet is running it starts mining immediately"""
+        if wallet_address in self.miners:
+            return self.miners[wallet_address]
+        miner = AdvancedTuxidoMiner(
+            wallet_address=wallet_address,
+            chat_id=chat_id,
+            market_feed=self.market_feed,
+            stonfi_manager=self.stonfi_manager,
+            state_dir=self._state_dir(wallet_address),
+            managed=True,
+            quota_backend=self.quota_backend
+        )
+        self.miners[wallet_address] = miner
+        if self.running:
+            self._start_miner(wallet_address)
+        return miner
+
+    def remove_miner(self, wallet_address: str):
+        """Stop and drop a wallet; its scheduler entry is discarded lazily"""
+        miner = self.miners.pop(wallet_address, None)
+        if miner:
+            miner.stop_mining()
+            miner.close()
+            if self.running:
+                asyncio.ensure_future(miner.release_quotas())
+
+    def _start_miner(self, wallet_address: str):
+        miner = self.miners[wallet_address]
+        miner.begin_session()
+        self._push(miner.pacer.next_due(), wallet_address)
+
+    def _push(self, due: float, wallet_address: str):
+        heapq.heappush(self._heap, (due, next(self._sequence), wallet_address))
+        self._wakeup.set()
+
+    async def run(self):
+        """Warm up shared integrations and drive every miner until stopped"""
+        logger.info("🚀 Starting miner fleet with %d wallets", len(self.miners))
+        self.running = True
+
+        warmup = [self.market_feed.refresh_in_background()]
+        if self.stonfi_manager:
+            self.stonfi_manager.load_warm_cache()
+            warmup.append(asyncio.ensure_future(self.stonfi_manager.initialize()))
+
+        for wallet_address, miner in list(self.miners.items()):
+            self._start_miner(wallet_address)
+            for quota in (miner.mined_quota, miner.trade_quota):
+                if quota:
+                    warmup.append(asyncio.ensure_future(quota.ensure_available()))
+
+        self.supervisor.add("optimizer", self._optimize_loop, liveness_timeout=3 * self.settings.control.interval)
+        self.supervisor.add("config_watch", config_store.watch)
+
+        governor = get_governor()
+        register_process_responders(governor)
+        responder = governor.register(
+            "fleet_notifications_pause", MEMORY, CRITICAL,
+            lambda: self._set_notifications_paused(True),
+            lambda: self._set_notifications_paused(False)
+        )
+        self.supervisor.add(
+            "resource_governor",
+            lambda: governor.run(heartbeat=lambda: self.supervisor.heartbeat("resource_governor")),
+            liveness_timeout=6 * governor.interval
+        )
+        self.supervisor.start()
+        try:
+            await self._schedule()
+        finally:
+            for task in warmup:
+                task.cancel()
+            self.stop()
+            await self.supervisor.stop()
+            governor.unregister(responder)
+            await asyncio.gather(
+                *(miner.release_quotas() for miner in self.miners.values()), return_exceptions=True
+            )
+
+    def _set_notifications_paused(self, paused: bool):
+        for miner in self.miners.values():
+            miner.notifications_paused = paused
+
+    def stop(self):
+        """Stop all miners and persist their daily counters"""
+        self.running = False
+        self._wakeup.set()
+        for miner in self.miners.values():
+            if miner.mining_active:
+                miner.stop_mining()
+
+    async def _schedule(self):
+        """Earliest-deadline-first over all miners; ties run in FIFO order"""
+        steps_since_yield = 0
+        while self.running:
+            if not self._heap:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            due, _, wallet_address = self._heap[0]
+            delay = due - time.monotonic()
+            if delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                steps_since_yield = 0
+                continue
+
+            heapq.heappop(self._heap)
+            miner = self.miners.get(wallet_address)
+            if miner is None or not miner.mining_active:
+                continue
+
+            self.stats["max_lag_s"] = max(self.stats["max_lag_s"], -delay)
+            if miner.daily_target_met():
+                await miner.announce_daily_target()
+                self.stats["idle_checks"] += 1
+                wait = min(60.0, max(0.5, miner.rollover.seconds_until_boundary()))
+                self._push(time.monotonic() + wait, wallet_address)
+            else:
+                miner.pacer.tick()
+                await miner.mine_step()
+                self.stats["steps"] += 1
+                self._push(miner.pacer.next_due(), wallet_address)
+
+            steps_since_yield += 1
+            if steps_since_yield >= MAX_STEPS_WITHOUT_YIELD:
+                steps_since_yield = 0
+                await asyncio.sleep(0)
+
+    async def _optimize_loop(self):
+        """Run each miner's auto-optimizer on the shared cadence"""
+        while self.running:
+            self.supervisor.heartbeat("optimizer")
+            await asyncio.sleep(self.settings.control.interval)
+            if not self.settings.mining.auto_optimize:
+                continue
+            for miner in list(self.miners.values()):
+                await miner.auto_optimize_mining()
+
+    def memory_report(self) -> Dict:
+        """Per-instance memory footprint, excluding state shared across the fleet"""
+        shared = {id(self.market_feed), id(self.market_feed.data), id(config_store.current),
+                  id(self.quota_backend)}
+        if self.stonfi_manager:
+            shared.add(id(self.stonfi_manager))
+        for miner in self.miners.values():
+            shared.add(id(miner.settings))
+        sizes = {wallet: deep_sizeof(miner, shared) for wallet, miner in self.miners.items()}
+        total = sum(sizes.values())
+        return {
+            "instances": len(sizes),
+            "total_bytes": total,
+            "avg_bytes": total / len(sizes) if sizes else 0,
+            "max_bytes": max(sizes.values()) if sizes else 0,
+            "per_instance": sizes
+        }
+
+
+async def run_benchmark(instances: int, seconds: float, block_rate: float):
+    """Measure instance density and aggregate block throughput"""
+    with tempfile.TemporaryDirectory() as state_root:
+        config_store.update("mining", block_rate=block_rate, log_interval=10**9)
+        config_store.update("telegram", notifications_enabled=False)
+        config_store.update("stonfi", enabled=False)
+
+        tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        fleet = MinerFleet(state_root=state_root)
+        for i in range(instances):
+            fleet.add_miner(f"EQ_bench_wallet_{i:06d}")
+        after, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        traced_per_instance = (after - before) / instances
+        report = fleet.memory_report()
+
+        runner = asyncio.create_task(fleet.run())
+        started = time.monotonic()
+        await asyncio.sleep(seconds)
+        steps = fleet.stats["steps"]
+        elapsed = time.monotonic() - started
+        fleet.stop()
+        await asyncio.gather(runner, return_exceptions=True)
+        for wallet in list(fleet.miners):
+            fleet.remove_miner(wallet)
+        await close_session()
+
+    target = instances * block_rate
+    print(f"Instances:               {instances}")
+    print(f"Traced bytes/instance:   {traced_per_instance:,.0f}")
+    print(f"Deep-size bytes/instance:{report['avg_bytes']:>10,.0f}")
+    print(f"Instances per GB:        {(1 << 30) / max(traced_per_instance, 1):,.0f}")
+    print(f"Blocks/s achieved:       {steps / elapsed:,.1f} (target {target:,.1f})")
+    print(f"Max scheduling lag:      {fleet.stats['max_lag_s'] * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tuxido miner fleet")
+    parser.add_argument("spec", nargs="?", default=os.getenv("FLEET_FILE", "fleet.json"))
+    parser.add_argument("--bench", type=int, metavar="N", help="benchmark N in-memory instances")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--block-rate", type=float, default=2.0)
+    args = parser.parse_args()
+
+    if args.bench:
+        logging.disable(logging.ERROR)
+        asyncio.run(run_benchmark(args.bench, args.seconds, args.block_rate))
+        return
+
+    from logging_setup import configure_logging
+    configure_logging(config_store.current.logging.to_dict())
+    fleet = MinerFleet(load_fleet_spec(args.spec))
+    asyncio.run(fleet.run())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""
+Tuxido Mining Bot - Game Contract State
+Local model and cached on-chain reader for contracts/GameContract.tact.
+GameModel replays the contract's state transitions in memory, so what-if
+questions and whole-population simulations never touch the chain.
+GameStateReader reads deployed contracts in bulk through the `status`
+getter, re-reading only accounts with new transactions; contracts deployed
+before the getter existed are followed by replaying their "lock" messages
+through the model
+
+    python game_state.py --players 5000 --locks 100000
+"""
+
+import time
+import random
+import asyncio
+import argparse
+import logging
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from pool_reader import GetMethodReader, stack_number
+from toncenter_client import ToncenterError, transactions_since
+
+logger = logging.getLogger(__name__)
+
+LOCK = "lock"
+GET_STATUS = "get_status"
+METHOD_NOT_FOUND = 11  # TVM exit code for a missing get-method
+
+
+class GameState:
+    """level and lockedTokens of one GameContract"""
+
+    __slots__ = ("owner", "level", "locked_tokens")
+
+    def __init__(self, owner: Optional[str] = None, level: int = 1, locked_tokens: int = 0):
+        self.owner = owner
+        self.level = level
+        self.locked_tokens = locked_tokens
+
+    def copy(self) -> "GameState":
+        return GameState(self.owner, self.level, self.locked_tokens)
+
+    def to_dict(self) -> Dict:
+        return {"owner": self.owner, "level": self.level, "locked": self.locked_tokens}
+
+
+def apply(state: GameState, comment: str, value: int) -> Optional[Tuple[int, int]]:
+    """One incoming text message; returns the (level, locked) reply of get_status
+
+    Mirrors the contract: "lock" adds the whole message value and one level,
+    "get_status" only replies, and any other text is rejected without a
+    state change.
+    """
+    if comment == LOCK:
+        state.locked_tokens += value
+        state.level += 1
+    elif comment == GET_STATUS:
+        return state.level, state.locked_tokens
+    return None
+
+
+def what_if(state: GameState, amounts: Iterable[int]) -> GameState:
+    """State after locking each of `amounts` in turn, leaving `state` untouched"""
+    future = state.copy()
+    for amount in amounts:
+        apply(future, LOCK, amount)
+    return future
+
+
+class GameModel:
+    """Deterministic in-memory GameContract per owner"""
+
+    def __init__(self):
+        self.states: Dict[str, GameState] = {}
+
+    def deploy(self, owner: str) -> GameState:
+        """init(owner): level 1, nothing locked; deploying again keeps the existing state"""
+        state = self.states.get(owner)
+        if state is None:
+            state = self.states[owner] = GameState(owner)
+        return state
+
+    def send(self, owner: str, comment: str, value: int = 0) -> Optional[Tuple[int, int]]:
+        return apply(self.deploy(owner), comment, value)
+
+    def status(self, owner: str) -> Tuple[int, int]:
+        """get_status answered locally"""
+        state = self.states.get(owner)
+        return (state.level, state.locked_tokens) if state else (1, 0)
+
+    def simulate(self, messages: Iterable[Tuple[str, str, int]]) -> int:
+        """Apply (owner, comment, value) messages in order; returns how many changed state"""
+        states, changed = self.states, 0
+        for owner, comment, value in messages:
+            state = states.get(owner)
+            if state is None:
+                state = states[owner] = GameState(owner)
+            if comment == LOCK:
+                state.locked_tokens += value
+                state.level += 1
+                changed += 1
+        return changed
+
+    def leaderboard(self, top: int = 10) -> List[GameState]:
+        return sorted(self.states.values(), key=lambda s: (s.level, s.locked_tokens), reverse=True)[:top]
+
+
+def decode_status(stack: Sequence) -> Tuple[int, int]:
+    """(level, locked) from the `status` getter, whether the struct comes flat or as a tuple"""
+    if stack and stack[0][0] == "tuple":
+        elements = stack[0][1]["elements"]
+        return tuple(int(e["number"]["number"]) for e in elements[:2])
+    return stack_number(stack[0]), stack_number(stack[1])
+
+
+def message_text(transaction: Dict) -> str:
+    """Text comment of a transaction's incoming message as toncenter v2 decodes it"""
+    return (transaction.get("in_msg") or {}).get("message") or ""
+
+
+class GameStateReader(GetMethodReader):
+    """Cached state of many deployed GameContracts
+
+    Reads go through the `status` getter. A contract without it (exit code
+    11) is followed from its transaction history instead: only transactions
+    newer than the last one replayed are fetched, and their "lock" messages
+    go through the local model.
+    """
+
+    method = "status"
+
+    def __init__(self, client, page_size: int = 50, **kwargs):
+        super().__init__(client, **kwargs)
+        self.page_size = page_size
+        self._no_getter = set()
+        self._replayed: Dict[str, int] = {}  # lt of the newest transaction replayed per contract
+        self.stats["replayed"] = 0
+
+    def decode(self, address: str, stack: List, cached: Optional[GameState]) -> GameState:
+        level, locked = decode_status(stack)
+        return GameState(cached.owner if cached else None, level, locked)
+
+    async def _fetch(self, address: str, cached: Optional[GameState]) -> GameState:
+        if address not in self._no_getter:
+            try:
+                return await super()._fetch(address, cached)
+            except ToncenterError as e:
+                if e.code != METHOD_NOT_FOUND:
+                    raise
+                self._no_getter.add(address)
+                logger.info("ℹ️ %s has no status getter, following its transactions", address)
+        return await self._replay(address, cached)
+
+    async def _replay(self, address: str, cached: Optional[GameState]) -> GameState:
+        since = self._replayed.get(address)
+        state = cached.copy() if cached is not None and since is not None else GameState()
+        async with self._budget:
+            new = await transactions_since(self.client, address, since, self.page_size)
+        for transaction in new:
+            # The lock receiver has no checks, so every delivered "lock" counts
+            apply(state, message_text(transaction), int((transaction.get("in_msg") or {}).get("value") or 0))
+        if new:
+            self._replayed[address] = int(new[-1]["transaction_id"]["lt"])
+        elif since is None:
+            self._replayed[address] = 0
+        self.stats["replayed"] += len(new)
+        return state
+
+    def set_owner(self, address: str, owner: str):
+        """Record who a contract belongs to; the getter does not return it"""
+        state = self.values.get(address)
+        if state is not None:
+            state.owner = owner
+
+
+def run_benchmark(players: int, locks: int, contracts: int, rounds: int, active: float, latency: float,
+                  seed: int = 1):
+    from boc import format_address
+    from fake_toncenter import FakeToncenter
+
+    rng = random.Random(seed)
+    owners = [f"player{i}" for i in range(players)]
+    messages = [(rng.choice(owners), LOCK if rng.random() < 0.8 else GET_STATUS, rng.randint(10**8, 10**10))
+                for _ in range(locks)]
+    model = GameModel()
+    started = time.perf_counter()
+    model.simulate(messages)
+    elapsed = time.perf_counter() - started
+    best = model.leaderboard(1)[0]
+    print(f"Model: {locks:,} messages over {players:,} players in {elapsed * 1000:.0f} ms "
+          f"({locks / elapsed:,.0f} per second); top level {best.level}")
+
+    check = GameModel()
+    for owner, comment, value in messages[:1000]:
+        check.send(owner, comment, value)
+    assert all(check.status(o) == (s.level, s.locked_tokens) for o, s in check.states.items())
+
+    fake = FakeToncenter(seed=seed)
+    chain = {}
+    addresses = [format_address(0, bytes([3]) + i.to_bytes(31, "big")) for i in range(contracts)]
+    for i, address in enumerate(addresses):
+        chain[address] = GameState()
+        fake.touch(address)
+        if i % 2:
+            # Half expose the getter; the others were deployed before it existed
+            fake.register_get_method(address, "status", lambda stack, address=address: [
+                ["num", hex(chain[address].level)], ["num", hex(chain[address].locked_tokens)]])
+
+    def lock(address: str):
+        value = rng.randint(10**8, 10**10)
+        apply(chain[address], LOCK, value)
+        fake.touch(address, in_msg={"hash": "", "source": "", "destination": address, "value": str(value),
+                                    "message": LOCK})
+
+    async def slow(method, *args, **kwargs):
+        await asyncio.sleep(latency)
+        return await method(*args, **kwargs)
+
+    class SlowClient:
+        async def get_masterchain_info(self):
+            return await slow(fake.get_masterchain_info)
+
+        async def get_address_information(self, addr):
+            return await slow(fake.get_address_information, addr)
+
+        async def get_last_lts(self, addrs):
+            return await slow(fake.get_last_lts, addrs)
+
+        async def run_get_method(self, addr, method, stack=()):
+            return await slow(fake.run_get_method, addr, method, stack)
+
+        async def get_transactions(self, addr, **kwargs):
+            return await slow(fake.get_transactions, addr, **kwargs)
+
+    async def run():
+        # One masterchain block per round: reads within a round trust its seqno
+        block = [0.0]
+        reader = GameStateReader(SlowClient(), concurrency=16, block_ttl=1.0, clock=lambda: block[0])
+        started = time.perf_counter()
+        for _ in range(rounds):
+            block[0] += 1.0
+            for address in rng.sample(addresses, int(contracts * active)):
+                lock(address)
+            result = await reader.refresh(addresses)
+            assert all((result[a].level, result[a].locked_tokens) == (chain[a].level, chain[a].locked_tokens)
+                       for a in addresses)
+            # Status queries between refreshes are answered from the cache
+            for address in rng.choices(addresses, k=100):
+                await reader.read(address)
+        return reader, time.perf_counter() - started
+
+    reader, elapsed = asyncio.run(run())
+    stats = reader.stats
+    print(f"Reader: {contracts:,} contracts, {active:.0%} active per round, {rounds} rounds, "
+          f"{latency * 1000:.0f} ms per call")
+    print(f"getter runs {stats['get_methods']:,}, transactions replayed {stats['replayed']:,}, "
+          f"{stats['lt_unchanged']:,} skipped on unchanged lt, {stats['block_hits']:,} answered from cache; "
+          f"toncenter calls {sum(fake.calls.values()):,}")
+    print(f"Time per refresh: {elapsed / rounds * 1000:.0f} ms; asking every contract by message each round "
+          f"would be {contracts * rounds:,} on-chain messages")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="GameContract model and reader benchmark")
+    parser.add_argument("--players", type=int, default=5000)
+    parser.add_argument("--locks", type=int, default=100000)
+    parser.add_argument("--contracts", type=int, default=300)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--active", type=float, default=0.05, help="fraction of contracts locking per round")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per toncenter call")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    run_benchmark(args.players, args.locks, args.contracts, args.rounds, args.active, args.latency, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Tuxido Mining Bot - Shared HTTP Client
+One pooled aiohttp session per event loop, shared by the miner, StonFi
+integration, AI assistant and every fleet instance. Every request goes
+through the per-host rate limiter; pass
+trace_request_ctx=priority_context(...) to change a call's priority class
+"""
+
+import os
+import asyncio
+import logging
+import weakref
+from typing import Optional
+
+from lazy_imports import lazy_import
+from rate_limiter import get_rate_limiter
+
+aiohttp = lazy_import("aiohttp")
+
+logger = logging.getLogger(__name__)
+
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "100"))
+HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "30"))
+
+_sessions: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+async def get_session() -> "aiohttp.ClientSession":
+    """Return the pooled session for the running event loop, creating it on first use"""
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(limit=HTTP_POOL_SIZE, ttl_dns_cache=300)
+        session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=HTTP_TIMEOUT),
+            trace_configs=[get_rate_limiter().trace_config()]
+        )
+        _sessions[loop] = session
+        logger.debug("Created shared HTTP session (pool size %d)", HTTP_POOL_SIZE)
+    return session
+
+
+async def close_session():
+    """Close the running loop's shared session, if any"""
+    loop = asyncio.get_running_loop()
+    session: Optional["aiohttp.ClientSession"] = _sessions.pop(loop, None)
+    if session is not None and not session.closed:
+        await session.close()
@@ -0,0 +1,391 @@
+"""
+Tuxido Mining Bot - Jetton Wallet Watcher
+Follows our TUXIDO jetton wallet on chain. The wallet address is resolved
+from the jetton master with get_wallet_address. After that only transactions
+newer than a persisted cursor are fetched, decoded into inbound/outbound
+transfers and appended to a compact JSONL store, and subscribers hear about
+every change. The balance is read with get_wallet_data whenever new
+transactions arrive. Polling backs off while the wallet is idle
+
+    python jetton_watcher.py --hours 24 --transfers 300
+"""
+
+import json
+import base64
+import random
+import asyncio
+import argparse
+import logging
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional
+
+from boc import begin_cell, deserialize_boc
+from storage_utils import append_bytes, atomic_write_bytes
+from toncenter_client import ToncenterError, stack_address, stack_int, transactions_since
+
+logger = logging.getLogger(__name__)
+
+# Jetton (TEP-74) opcodes
+TRANSFER = 0x0F8A7EA5
+INTERNAL_TRANSFER = 0x178D4519
+BURN = 0x595F07BC
+BOUNCED = 0xFFFFFFFF
+
+IN, OUT = "in", "out"
+
+
+class Transfer:
+    """One jetton movement through our wallet"""
+
+    __slots__ = ("lt", "tx_hash", "at", "direction", "kind", "amount", "counterparty", "query_id")
+
+    def __init__(self, lt: int, tx_hash: str, at: int, direction: str, kind: str, amount: int,
+                 counterparty: Optional[str], query_id: int):
+        self.lt = lt
+        self.tx_hash = tx_hash
+        self.at = at
+        self.direction = direction
+        self.kind = kind                  # transfer, burn or bounce
+        self.amount = amount
+        self.counterparty = counterparty  # owner on the other side, when the message names one
+        self.query_id = query_id
+
+    def to_dict(self) -> Dict:
+        return {"lt": self.lt, "hash": self.tx_hash, "at": self.at, "dir": self.direction, "kind": self.kind,
+                "amount": self.amount, "counterparty": self.counterparty, "query_id": self.query_id}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Transfer":
+        return cls(data["lt"], data["hash"], data["at"], data["dir"], data["kind"], data["amount"],
+                   data.get("counterparty"), data.get("query_id", 0))
+
+
+def message_body(message: Dict) -> Optional[bytes]:
+    """Raw body BOC of a toncenter v2 message, None for text comments and empty bodies"""
+    data = message.get("msg_data") or {}
+    if data.get("@type") != "msg.dataRaw" or not data.get("body"):
+        return None
+    return base64.b64decode(data["body"])
+
+
+def parse_transfer(transaction: Dict) -> Optional[Transfer]:
+    """Jetton movement carried by a wallet transaction's incoming message, if any
+
+    Only what the message claims; a transfer the wallet refused still parses,
+    which is why balances come from get_wallet_data and not from this log.
+    """
+    in_msg = transaction.get("in_msg") or {}
+    try:
+        body = message_body(in_msg)
+        if body is None:
+            return None
+        reader = deserialize_boc(body)[0].begin_parse()
+        if reader.remaining_bits < 32:
+            return None
+        op = reader.load_uint(32)
+        kind = "transfer"
+        if op == BOUNCED:
+            # Our internal_transfer came back from the receiver's wallet: the tokens are ours again
+            op, kind = reader.load_uint(32), "bounce"
+            if op != INTERNAL_TRANSFER:
+                return None
+        if op == INTERNAL_TRANSFER:
+            query_id, amount = reader.load_uint(64), reader.load_coins()
+            counterparty = reader.load_address() if kind == "transfer" else None
+            direction = IN
+        elif op == TRANSFER:
+            query_id, amount = reader.load_uint(64), reader.load_coins()
+            counterparty, direction = reader.load_address(), OUT
+        elif op == BURN:
+            query_id, amount = reader.load_uint(64), reader.load_coins()
+            counterparty, direction, kind = None, OUT, "burn"
+        else:
+            return None
+    except (ValueError, KeyError, IndexError) as e:
+        logger.debug("Unreadable jetton message in %s: %s", transaction.get("transaction_id"), e)
+        return None
+    transaction_id = transaction["transaction_id"]
+    return Transfer(int(transaction_id["lt"]), transaction_id["hash"], int(transaction.get("utime") or 0),
+                    direction, kind, amount, counterparty or in_msg.get("source") or None, query_id)
+
+
+class JettonWatcher:
+    """Balance and transfer log of one owner's jetton wallet
+
+    The store holds the wallet record, the last `keep_transfers` transfers
+    and the cursor (last transaction seen, balance). New transfers and the
+    cursor that covers them are appended in one write, so a crash never
+    books a transfer twice. Subscribers get callback(transfers, balance).
+    """
+
+    def __init__(self, client, master: str, owner: str, min_interval: float = 5, max_interval: float = 120,
+                 backoff: float = 2.0, store_path: str = "data/jetton_transfers.jsonl",
+                 keep_transfers: int = 2000, page_size: int = 50):
+        self.client = client
+        self.master = master
+        self.owner = owner
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.store_path = store_path
+        self.keep_transfers = keep_transfers
+        self.page_size = page_size
+
+        self.wallet: Optional[str] = None
+        self.cursor: Optional[Dict] = None  # {"lt", "hash"} of the newest transaction processed
+        self.balance: Optional[int] = None
+        self.totals = {IN: 0, OUT: 0}
+        self.transfers: Deque[Transfer] = deque(maxlen=keep_transfers)
+        self.interval = min_interval
+        self.stats = {"polls": 0, "idle_polls": 0, "transactions": 0, "transfers": 0, "errors": 0}
+        self._subscribers: List[Callable[[List[Transfer], int], None]] = []
+        self._store_events = 0
+        self._wakeup = asyncio.Event()
+        self._restore()
+
+    # --- Store -----------------------------------------------------------
+
+    def _restore(self):
+        """Load the store for this master/owner pair, then compact it"""
+        records = []
+        try:
+            with open(self.store_path, "rb") as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        continue  # torn final line after a crash
+        except FileNotFoundError:
+            return
+        wallet = next((r for r in records if r["e"] == "wallet"), None)
+        if not wallet or (wallet["master"], wallet["owner"]) != (self.master, self.owner):
+            logger.info("📒 Jetton store belongs to another wallet, starting over")
+            return
+        self.wallet = wallet["wallet"]
+        batch: List[Transfer] = []
+        for record in records:
+            if record["e"] == "transfer":
+                batch.append(Transfer.from_dict(record))
+            elif record["e"] == "cursor":
+                # Transfers count only once the cursor written with them made it to disk
+                self.transfers.extend(batch)
+                batch = []
+                self.cursor = {"lt": record["lt"], "hash": record["hash"]}
+                self.balance = record["balance"]
+                self.totals = record["totals"]
+        self._compact()
+        logger.info("📒 Jetton wallet %s restored: balance %s, %d transfers", self.wallet, self.balance,
+                    len(self.transfers))
+
+    def _records(self, transfers: List[Transfer]) -> bytes:
+        lines = [{"e": "transfer", **transfer.to_dict()} for transfer in transfers]
+        lines.append({"e": "cursor", **self.cursor, "balance": self.balance, "totals": self.totals})
+        return "".join(json.dumps(line, separators=(",", ":")) + "\n" for line in lines).encode()
+
+    def _compact(self):
+        wallet = {"e": "wallet", "master": self.master, "owner": self.owner, "wallet": self.wallet}
+        data = json.dumps(wallet, separators=(",", ":")).encode() + b"\n"
+        if self.cursor is not None:
+            data += self._records(list(self.transfers))
+        atomic_write_bytes(self.store_path, data)
+        self._store_events = 0
+
+    # --- Chain -------------------------------------------------------------
+
+    async def resolve(self) -> str:
+        """Our jetton wallet address, from the master's get_wallet_address"""
+        if self.wallet is None:
+            owner = begin_cell().store_address(self.owner).end_cell().to_boc()
+            stack = await self.client.run_get_method(
+                self.master, "get_wallet_address", [["tvm.Slice", base64.b64encode(owner).decode()]]
+            )
+            self.wallet = stack_address(stack[0])
+            self._compact()
+            logger.info("👛 Jetton wallet for %s: %s", self.owner, self.wallet)
+        return self.wallet
+
+    async def _read_balance(self) -> int:
+        try:
+            return stack_int((await self.client.run_get_method(self.wallet, "get_wallet_data"))[0])
+        except ToncenterError as e:
+            if e.code in (-13, -14):
+                return 0  # wallet not deployed yet: nothing was ever received
+            raise
+
+    async def poll(self) -> List[Transfer]:
+        """Fetch transactions since the cursor; returns the transfers they carried"""
+        await self.resolve()
+        self.stats["polls"] += 1
+        if self.cursor is None:
+            # First start: begin at the current head; the balance already reflects everything before it
+            head = await self.client.get_transactions(self.wallet, limit=1)
+            transaction_id = head[0]["transaction_id"] if head else {"lt": "0", "hash": ""}
+            self.cursor = {"lt": int(transaction_id["lt"]), "hash": transaction_id["hash"]}
+            self.balance = await self._read_balance()
+            append_bytes(self.store_path, self._records([]))
+            self._notify([])
+            return []
+        new = await transactions_since(self.client, self.wallet, self.cursor["lt"], self.page_size)
+        if not new:
+            self.stats["idle_polls"] += 1
+            return []
+        transfers = [transfer for transfer in map(parse_transfer, new) if transfer is not None]
+        previous = self.balance
+        self.balance = await self._read_balance()
+        last = new[-1]["transaction_id"]
+        self.cursor = {"lt": int(last["lt"]), "hash": last["hash"]}
+        for transfer in transfers:
+            self.totals[transfer.direction] += transfer.amount
+        self.transfers.extend(transfers)
+        append_bytes(self.store_path, self._records(transfers))
+        self._store_events += len(transfers) + 1
+        self.stats["transactions"] += len(new)
+        self.stats["transfers"] += len(transfers)
+        for transfer in transfers:
+            logger.info("%s %s %d TUXIDO %s %s", "📥" if transfer.direction == IN else "📤", transfer.kind,
+                        transfer.amount, "from" if transfer.direction == IN else "to", transfer.counterparty)
+        if transfers or self.balance != previous:
+            self._notify(transfers)
+        return transfers
+
+    def _notify(self, transfers: List[Transfer]):
+        for callback in self._subscribers:
+            try:
+                callback(transfers, self.balance)
+            except Exception as e:
+                logger.error("Jetton watcher subscriber failed: %s", e)
+
+    # --- Loop --------------------------------------------------------------
+
+    def subscribe(self, callback: Callable[[List[Transfer], int], None]):
+        """Call callback(transfers, balance) on every balance change or new transfer"""
+        self._subscribers.append(callback)
+
+    def poke(self):
+        """Poll now and at the fastest rate again, e.g. after sending a transfer"""
+        self.interval = self.min_interval
+        self._wakeup.set()
+
+    def _pace(self, active: bool) -> float:
+        """Busy wallets are polled at min_interval; each idle poll waits backoff times longer"""
+        self.interval = self.min_interval if active else min(self.max_interval, self.interval * self.backoff)
+        return self.interval
+
+    async def run(self, heartbeat: Optional[Callable[[], None]] = None):
+        """Poll until cancelled; meant to run under a Supervisor"""
+        while True:
+            if heartbeat:
+                heartbeat()
+            self._wakeup.clear()
+            active = False
+            try:
+                before = self.stats["transactions"]
+                await self.poll()
+                active = self.stats["transactions"] > before
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.error("Jetton wallet poll failed: %s", e)
+            if self._store_events > self.keep_transfers:
+                self._compact()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._pace(active))
+            except asyncio.TimeoutError:
+                pass
+
+    def status(self) -> Dict:
+        return {"wallet": self.wallet, "balance": self.balance, "cursor_lt": self.cursor and self.cursor["lt"],
+                "interval": self.interval, "received": self.totals[IN], "sent": self.totals[OUT], **self.stats}
+
+
+def build_jetton_watcher(settings, client, master: str, owner: str) -> JettonWatcher:
+    """Watcher from a JettonWatchSettings section"""
+    return JettonWatcher(client, master, owner, settings.min_interval, settings.max_interval, settings.backoff,
+                         settings.store_path, settings.keep_transfers)
+
+
+def run_benchmark(hours: float, transfers: int, burst: float, seed: int = 1):
+    """Simulated day of a wallet with bursty traffic: adaptive polling against a fixed interval"""
+    import os
+    import tempfile
+    from boc import format_address
+    from fake_toncenter import FakeToncenter
+
+    rng = random.Random(seed)
+    span = hours * 3600
+    # Transfers arrive in a few bursts, the way mining payouts and sells do
+    centres = [rng.uniform(0, span) for _ in range(max(1, int(hours / 4)))]
+    arrivals = sorted(min(span, max(0.0, rng.choice(centres) + rng.expovariate(1 / burst)))
+                      for _ in range(transfers))
+
+    def simulate(adaptive: bool) -> Dict:
+        now = [0.0]
+        fake = FakeToncenter(clock=lambda: now[0], seed=seed)
+        master = format_address(0, b"\x0a" * 32)
+        owner = format_address(0, b"\x0b" * 32)
+        wallet = format_address(0, b"\x0c" * 32)
+        sender = format_address(0, b"\x0d" * 32)
+        balance = [0]
+        fake.register_get_method(master, "get_wallet_address", lambda stack: [
+            ["cell", {"bytes": base64.b64encode(begin_cell().store_address(wallet).end_cell().to_boc()).decode()}]])
+        fake.register_get_method(wallet, "get_wallet_data", lambda stack: [["num", hex(balance[0])]])
+        fake.touch(wallet)
+
+        def arrive():
+            amount = rng.randint(10**9, 10**11)
+            incoming = rng.random() < 0.7 or balance[0] < amount
+            if incoming:
+                body = (begin_cell().store_uint(INTERNAL_TRANSFER, 32).store_uint(0, 64).store_coins(amount)
+                        .store_address(sender).end_cell())
+            else:
+                body = (begin_cell().store_uint(TRANSFER, 32).store_uint(0, 64).store_coins(amount)
+                        .store_address(sender).end_cell())
+            balance[0] += amount if incoming else -amount
+            fake.touch(wallet, in_msg={"hash": "", "source": sender if incoming else owner, "destination": wallet,
+                                       "value": "50000000",
+                                       "msg_data": {"@type": "msg.dataRaw",
+                                                    "body": base64.b64encode(body.to_boc()).decode()}})
+
+        path = os.path.join(tempfile.mkdtemp(), "transfers.jsonl")
+        watcher = JettonWatcher(fake, master, owner, min_interval=5, max_interval=120 if adaptive else 5,
+                                store_path=path)
+        lags = []
+
+        async def run():
+            pending = list(arrivals)
+            waiting: List[float] = []
+            while now[0] < span:
+                while pending and pending[0] <= now[0]:
+                    waiting.append(pending.pop(0))
+                    arrive()
+                before = watcher.stats["transactions"]
+                if await watcher.poll():
+                    lags.extend(now[0] - at for at in waiting)
+                    waiting.clear()
+                now[0] += watcher._pace(watcher.stats["transactions"] > before)
+
+        asyncio.run(run())
+        lags.sort()
+        calls = sum(fake.calls.values())
+        return {"calls": calls, "polls": watcher.stats["polls"], "p50": lags[len(lags) // 2] if lags else 0,
+                "p99": lags[int(len(lags) * 0.99)] if lags else 0, "balance_ok": watcher.balance == balance[0]}
+
+    fixed, adaptive = simulate(False), simulate(True)
+    print(f"{transfers} transfers in bursts over {hours:g} h")
+    for name, result in (("Fixed 5 s polling", fixed), ("Adaptive 5-120 s", adaptive)):
+        print(f"{name:18s}: {result['polls']:6,} polls, {result['calls']:6,} toncenter calls, "
+              f"detection lag p50 {result['p50']:.1f} s p99 {result['p99']:.1f} s, "
+              f"balance {'matches' if result['balance_ok'] else 'DIFFERS'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Jetton watcher polling benchmark on a simulated wallet")
+    parser.add_argument("--hours", type=float, default=24)
+    parser.add_argument("--transfers", type=int, default=300)
+    parser.add_argument("--burst", type=float, default=600, help="mean spread of a burst in seconds")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    run_benchmark(args.hours, args.transfers, args.burst, args.seed)
+
+
+if __name__ == "__main__":
+    main()
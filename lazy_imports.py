@@ -0,0 +1,57 @@
+"""
+Tuxido Mining Bot - Deferred Imports
+Heavy third-party modules are loaded on first attribute access so that
+entry points start mining before networking and AI stacks are imported
+"""
+
+import sys
+import importlib
+import threading
+from types import ModuleType
+
+
+class LazyModule(ModuleType):
+    """Module proxy that performs the real import on first use"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_module"] = None
+        self.__dict__["_lazy_lock"] = threading.Lock()
+
+    def _load(self) -> ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            with self.__dict__["_lazy_lock"]:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_lazy_module"] is not None else "deferred"
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Return the module if already imported, otherwise a deferred proxy"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
+
+
+def is_loaded(module: ModuleType) -> bool:
+    """True if a (possibly lazy) module has actually been imported"""
+    if isinstance(module, LazyModule):
+        return module.__dict__["_lazy_module"] is not None
+    return True
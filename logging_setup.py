@@ -0,0 +1,168 @@
+"""
+Tuxido Mining Bot - Logging Pipeline
+Non-blocking logging: records are queued on the calling thread and formatted,
+written, rotated and compressed on a background listener thread
+"""
+
+import os
+import gzip
+import queue
+import atexit
+import shutil
+import logging
+import logging.handlers
+from typing import Any, Dict, Optional
+
+from project_config import ProjectConfig
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+BLOCK_LOGGER_NAME = "main.blocks"
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queue records without formatting them on the caller's thread"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The listener runs in this process, so the record (including args and
+        # exc_info) can be handed over as-is and formatted by the listener.
+        return record
+
+
+class SamplingFilter(logging.Filter):
+    """Pass one in every N records below WARNING; warnings and errors always pass"""
+
+    def __init__(self, every_n: int = 1):
+        super().__init__()
+        self.every_n = max(1, int(every_n))
+        self.seen = 0
+        self.dropped = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or self.every_n == 1:
+            return True
+        self.seen += 1
+        if (self.seen - 1) % self.every_n == 0:
+            return True
+        self.dropped += 1
+        return False
+
+
+def _gzip_rotator(source: str, dest: str):
+    with open(source, "rb") as f_in, gzip.open(dest, "wb") as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+
+def _gzip_namer(name: str) -> str:
+    return f"{name}.gz"
+
+
+def build_file_handler(path: str, max_log_size_mb: int, backup_count: int,
+                       compress: bool = True) -> logging.Handler:
+    """Size-rotated file handler, optionally gzip-compressing rotated files"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    handler = logging.handlers.RotatingFileHandler(
+        path,
+        maxBytes=max(1, max_log_size_mb) * 1024 * 1024,
+        backupCount=backup_count,
+        encoding="utf-8",
+        delay=True
+    )
+    if compress:
+        handler.rotator = _gzip_rotator
+        handler.namer = _gzip_namer
+    return handler
+
+
+def set_sampling(logger_name: str, every_n: int) -> SamplingFilter:
+    """Install (or replace) a sampling filter on a high-frequency logger"""
+    target = logging.getLogger(logger_name)
+    for existing in list(target.filters):
+        if isinstance(existing, SamplingFilter):
+            target.removeFilter(existing)
+    sampler = SamplingFilter(every_n)
+    target.addFilter(sampler)
+    return sampler
+
+
+def prune_log_backups(keep: int) -> int:
+    """Delete rotated log files beyond the newest keep; returns bytes freed"""
+    freed = 0
+    handlers = _listener.handlers if _listener is not None else ()
+    for handler in handlers:
+        if not isinstance(handler, logging.handlers.RotatingFileHandler):
+            continue
+        for index in range(keep + 1, handler.backupCount + 1):
+            for candidate in (f"{handler.baseFilename}.{index}", handler.rotation_filename(f"{handler.baseFilename}.{index}")):
+                try:
+                    freed += os.path.getsize(candidate)
+                    os.remove(candidate)
+                except OSError:
+                    pass
+        handler.backupCount = min(handler.backupCount, keep)
+    return freed
+
+
+def restore_log_backups(count: int):
+    """Let file handlers keep count rotated files again, after prune_log_backups lowered it"""
+    handlers = _listener.handlers if _listener is not None else ()
+    for handler in handlers:
+        if isinstance(handler, logging.handlers.RotatingFileHandler):
+            handler.backupCount = count
+
+
+def configure_logging(options: Optional[Dict[str, Any]] = None,
+                      log_file: Optional[str] = None) -> logging.handlers.QueueListener:
+    """Route all logging through a queue drained by a listener thread
+
+    options is the ``logging`` config section as a dict (defaults to the
+    current environment); log_file overrides its file_path.
+    """
+    global _listener
+    if options is None:
+        options = ProjectConfig().get("logging", default={})
+
+    shutdown_logging()
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = [logging.StreamHandler()]
+    if options.get("file_enabled", True):
+        handlers.append(build_file_handler(
+            log_file or options.get("file_path", "tuxido_bot.log"),
+            int(options.get("max_log_size_mb", 10)),
+            int(options.get("backup_count", 5)),
+            compress=bool(options.get("compress_backups", True))
+        ))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+        existing.close()
+    root.addHandler(DeferredQueueHandler(log_queue))
+    root.setLevel(getattr(logging, str(options.get("level", "INFO")).upper(), logging.INFO))
+
+    set_sampling(BLOCK_LOGGER_NAME, int(options.get("block_sample_rate", 1)))
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
@@ -12,76 +12,95 @@ from datetime import datetime, timedelta
 import json
 import os
 import random
-import aiohttp
+import time
+from functools import lru_cache
+from typing import Optional
+
+from block_history import BlockHistory, register_history
+from controllers import ControlObservation, build_controller
+from http_client import get_session
+from logging_setup import BLOCK_LOGGER_NAME, configure_logging
+from market_data import MarketDataFeed
+from metrics_engine import MetricsEngine
+from pacer import RatePacer
+from rate_limiter import BACKGROUND, get_rate_limiter, priority_context
+from resource_governor import CRITICAL, DISK, HIGH, MEMORY, get_governor, register_process_responders
+from quota import ChunkedQuota, build_quota_backend, default_node_id
+from rollover import DailyRollover
+from runtime_config import config_store, keep_tuned, ConfigSnapshot
+from supervisor import Supervisor
+from wallet_sender import build_wallet_sender
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
-
-# Import StonFi integration
-try:
-    from stonfi_integration import TuxidoStonFiManager
-    STONFI_AVAILABLE = True
-except ImportError:
-    STONFI_AVAILABLE = False
-    logger.warning("StonFi integration not available")
+block_logger = logging.getLogger(BLOCK_LOGGER_NAME)
+
+@lru_cache(maxsize=None)
+def load_stonfi_manager_class():
+    """Import the StonFi integration on first use"""
+    try:
+        from stonfi_integration import TuxidoStonFiManager
+        return TuxidoStonFiManager
+    except ImportError:
+        logger.warning("StonFi integration not available")
+        return None
+
+@lru_cache(maxsize=None)
+def load_token_config_module():
+    """Import token_config once; a missing module is remembered instead of retried"""
+    try:
+        import token_config
+        return token_config
+    except ImportError:
+        logger.warning("Token configuration not available")
+        return None
 
 class AdvancedTuxidoMiner:
-    def __init__(self):
-        # Enhanced Mining Configuration for Maximum Profit
-        self.mining_config = {
-            "min_hash_rate": 5,      # Increased for higher profits
-            "max_hash_rate": 20,     # Increased for higher profits
-            "log_interval": 50,      # More frequent logging
-            "mining_delay": 0.5,     # Faster mining
-            "dynamic_adjustment": True,
-            "profit_optimization": True
-        }
+    def __init__(self, wallet_address: Optional[str] = None, chat_id: Optional[str] = None,
+                 market_feed: Optional[MarketDataFeed] = None, stonfi_manager=None,
+                 state_dir: str = "data", managed: bool = False, quota_backend=None):
+        # Typed configuration snapshot (mining, p2e, telegram, blockchain, ...)
+        self.settings = config_store.current
+        self._configured = self.settings  # as last published, before runtime tuning
+        config_store.subscribe(self.apply_settings)
+        
+        # Per-wallet identity; managed instances share integrations owned by a fleet
+        self.wallet_address = wallet_address or self.settings.blockchain.wallet_address
+        self.chat_id = chat_id
+        self.managed = managed
         
         # Token Configuration Integration
-        try:
-            from token_config import TuxidoTokenConfig, TuxidoAirdropManager
-            self.token_config = TuxidoTokenConfig()
-            self.airdrop_manager = TuxidoAirdropManager(self.token_config)
-            TOKEN_CONFIG_AVAILABLE = True
-        except ImportError:
-            TOKEN_CONFIG_AVAILABLE = False
-            logger.warning("Token configuration not available")
+        token_config = None if managed else load_token_config_module()
+        if token_config:
+            self.token_config = token_config.TuxidoTokenConfig()
+            self.airdrop_manager = token_config.TuxidoAirdropManager(self.token_config)
 
         # StonFi Integration with Enhanced Trading
         self.jetton_master_address = (
-            self.token_config.get_token_address() if TOKEN_CONFIG_AVAILABLE else 
-            os.getenv("TUXIDO_JETTON_ADDRESS", "")
+            self.token_config.get_token_address() if token_config else 
+            self.settings.stonfi.jetton_address
+        )
+        self.stonfi_manager = stonfi_manager
+        if not managed and self.settings.stonfi.enabled and self.jetton_master_address:
+            manager_class = load_stonfi_manager_class()
+            if manager_class:
+                self.stonfi_manager = manager_class(
+                    self.jetton_master_address,
+                    warm_cache_path=self.settings.startup.warm_cache_path
+                )
+
+        # Outbound transactions from our wallet (only when it can sign)
+        self.wallet_sender = None if managed else build_wallet_sender(self.settings)
+        if self.stonfi_manager and self.wallet_sender:
+            self.stonfi_manager.attach_wallet_sender(self.wallet_sender)
+
+        # Block pacing at an absolute target rate
+        self.pacer = RatePacer(
+            self.settings.mining.block_rate,
+            policy=self.settings.mining.pacing_policy,
+            max_catch_up=self.settings.mining.max_catch_up_ticks
         )
-        self.stonfi_manager = None
-        if STONFI_AVAILABLE and self.jetton_master_address:
-            self.stonfi_manager = TuxidoStonFiManager(self.jetton_master_address)
-
-        # TON Blockchain Configuration
-        self.ton_config = {
-            "network": "mainnet",
-            "wallet_address": os.getenv("TON_WALLET_ADDRESS", ""),
-            "private_key": os.getenv("TON_PRIVATE_KEY", ""),
-        }
-
-        # Enhanced Telegram Bot Configuration
-        self.telegram_config = {
-            "bot_token": os.getenv("TELEGRAM_BOT_TOKEN", ""),
-            "chat_id": os.getenv("TELEGRAM_CHAT_ID", ""),
-            "notifications_enabled": True,  # Enable for profit tracking
-            "profit_alerts": True,
-            "performance_reports": True
-        }
-
-        # Enhanced P2E Configuration for Maximum Rewards
-        self.p2e_config = {
-            "rewards_per_block": 15,     # Increased rewards
-            "bonus_multiplier": 1.5,     # Higher multiplier
-            "daily_limit": 15000,        # Higher daily target
-            "streak_bonus": 1.2,         # Streak rewards
-            "efficiency_bonus": 1.3,     # Efficiency rewards
-            "profit_sharing": True
-        }
 
         # Advanced Mining State
         self.mining_active = False
@@ -90,6 +109,34 @@ class AdvancedTuxidoMiner:
         self.start_time = None
         self.blocks_mined = 0
         self.daily_mined = 0
+        self.daily_blocks = 0
+        
+        # Mining-day boundaries, daily archive and streak bookkeeping
+        self.rollover = DailyRollover(
+            self.settings.p2e.timezone, self.settings.p2e.day_start_hour,
+            state_path=os.path.join(state_dir, "daily_state.json"),
+            archive_path=os.path.join(state_dir, "daily_history.jsonl")
+        )
+        self.checkpoint_interval = 60
+        
+        # Recent per-block records for analytics and the dashboard
+        history = self.settings.history
+        capacity = history.fleet_capacity if managed else history.capacity
+        self.block_history: Optional[BlockHistory] = None
+        if capacity > 0:
+            self.block_history = BlockHistory(
+                capacity, history.segment_size,
+                spill_path=os.path.join(state_dir, "block_history.bin") if history.spill_enabled else None,
+                max_spill_mb=history.max_spill_mb
+            )
+            register_history(self.wallet_address or "default", self.block_history)
+        
+        # Daily budgets shared with other nodes mining this wallet
+        self.mined_quota: Optional[ChunkedQuota] = None
+        self.trade_quota: Optional[ChunkedQuota] = None
+        if self.settings.quota.enabled:
+            self.setup_quotas(quota_backend or build_quota_backend(self.settings.quota))
+        self._last_checkpoint = 0.0
         self.ai_mode = True  # Always in AI mode for profit optimization
         
         # Profit Tracking
@@ -104,20 +151,61 @@ class AdvancedTuxidoMiner:
             "performance_score": 0.0
         }
         
-        # Market Data
-        self.market_data = {
-            "ton_price_usd": 0.0,
-            "tuxido_price_ton": 0.0,
-            "last_updated": None
-        }
+        # Sliding-window rates and percentiles; fleet instances skip the percentile sketches
+        self.metrics = MetricsEngine(percentiles=not managed)
         
-        # Auto-optimization settings
-        self.auto_optimization = {
-            "enabled": True,
-            "efficiency_threshold": 80.0,
-            "profit_threshold": 10.0,
-            "adjustment_frequency": 300  # 5 minutes
-        }
+        # Market Data (shared with other instances when a feed is passed in)
+        self.market_feed = market_feed or MarketDataFeed()
+        self.market_data = self.market_feed.data
+        self._background_tasks = set()
+        # Owns monitors and watchers while start_mining runs; fleets supervise their own
+        self.supervisor: Optional[Supervisor] = None
+        self._stop_requested: Optional[asyncio.Event] = None
+        # Set by the resource governor under critical memory pressure
+        self.notifications_paused = False
+        
+        # Closed-loop block rate control toward the daily target (see controllers.py)
+        self.controller = build_controller(self.settings.control)
+        self._last_control: Optional[float] = None
+
+    def setup_quotas(self, backend):
+        """Draw mined tokens and transactions from coordinator-managed chunks"""
+        quota = self.settings.quota
+        node_id = quota.node_id or default_node_id()
+        self.mined_quota = ChunkedQuota(
+            backend, f"mined:{self.wallet_address}", quota.mined_chunk,
+            lambda: self.settings.p2e.daily_limit, self.rollover.day_key,
+            node_id=node_id, lease_ttl=quota.lease_ttl
+        )
+        self.trade_quota = ChunkedQuota(
+            backend, f"transactions:{self.wallet_address}", quota.transaction_chunk,
+            lambda: self.settings.security.max_daily_transactions, self.rollover.day_key,
+            node_id=node_id, lease_ttl=quota.lease_ttl
+        )
+
+    async def release_quotas(self):
+        """Hand unused budget back so other nodes can mine it"""
+        for quota in (self.mined_quota, self.trade_quota):
+            if quota:
+                await quota.release_all()
+
+    def reserve_transaction(self) -> bool:
+        """Take one unit of today's transaction budget without waiting"""
+        return self.trade_quota is None or self.trade_quota.try_consume(1)
+
+    def apply_settings(self, settings: ConfigSnapshot):
+        """Adopt a hot-reloaded configuration snapshot"""
+        if settings.control != self.settings.control:
+            self.controller = build_controller(settings.control)
+        configured, self._configured = self._configured, settings
+        if settings.mining.auto_optimize:
+            # The controller owns block_rate; only a changed configured value replaces its tuning
+            settings = keep_tuned(settings, configured, self.settings)
+        self.settings = settings
+        if settings.mining.block_rate != self.pacer.rate:
+            self.pacer.set_rate(settings.mining.block_rate)
+        if self.stonfi_manager:
+            self.stonfi_manager.auto_trade_enabled = settings.stonfi.auto_trade
 
     async def start_mining(self):
         """Start the enhanced mining process with profit optimization"""
@@ -125,53 +213,232 @@ class AdvancedTuxidoMiner:
             logger.warning("Mining is already active!")
             return
 
-        # Initialize StonFi integration with enhanced trading
-        if self.stonfi_manager:
-            await self.stonfi_manager.initialize()
-            # Enable auto-trading for profit maximization
-            self.stonfi_manager.auto_trade_enabled = True
-            asyncio.create_task(self.stonfi_manager.start_trading_monitor())
+        self.supervisor = Supervisor("miner")
+        self.supervisor.start()
+        self._stop_requested = asyncio.Event()
 
-        # Update market data
-        await self.update_market_data()
+        if self.settings.startup.fast_start:
+            # Mine immediately; integrations warm up in the background
+            if self.stonfi_manager:
+                self.stonfi_manager.load_warm_cache()
+            self.supervisor.add("warmup", self.warm_up_integrations, restart=False)
+        else:
+            await self.warm_up_integrations()
 
-        self.mining_active = True
-        self.start_time = datetime.now()
+        self.begin_session()
         logger.info("🚀 Starting PROFIT-OPTIMIZED Tuxido mining on TON blockchain...")
-        logger.info(f"📊 Network: {self.ton_config['network']}")
-        logger.info(f"🎯 Daily target: {self.p2e_config['daily_limit']} Tx")
-        logger.info(f"💰 Profit optimization: ENABLED")
-        logger.info(f"🤖 AI management: ACTIVE")
+        logger.info("📊 Network: %s", self.settings.blockchain.network)
+        logger.info("🎯 Daily target: %d Tx", self.settings.p2e.daily_limit)
+        logger.info("💰 Profit optimization: ENABLED")
+        logger.info("🤖 AI management: ACTIVE")
         
         if self.stonfi_manager:
             logger.info("🌊 StonFi DEX integration: ENHANCED")
 
-        # Start optimization monitoring
-        asyncio.create_task(self.monitor_and_optimize())
+        # Start optimization monitoring and configuration hot reload
+        self.supervisor.add(
+            "optimizer", self.monitor_and_optimize,
+            liveness_timeout=3 * self.settings.control.interval
+        )
+        self.supervisor.add("config_watch", config_store.watch)
+        if self.wallet_sender:
+            self.supervisor.add(
+                "wallet_sender",
+                lambda: self.wallet_sender.run(heartbeat=lambda: self.supervisor.heartbeat("wallet_sender")),
+                liveness_timeout=30 * self.settings.wallet.poll_interval
+            )
+        if self.stonfi_manager and self.stonfi_manager.watcher:
+            self.supervisor.add(
+                "jetton_watch",
+                lambda: self.stonfi_manager.watcher.run(heartbeat=lambda: self.supervisor.heartbeat("jetton_watch")),
+                liveness_timeout=3 * self.settings.jetton_watch.max_interval
+            )
+        if self.stonfi_manager and self.stonfi_manager.execution:
+            self.supervisor.add(
+                "execution",
+                lambda: self.stonfi_manager.execution.run(heartbeat=lambda: self.supervisor.heartbeat("execution")),
+                liveness_timeout=5 * self.settings.execution.interval
+            )
+
+        # Degrade optional work instead of running out of memory or disk
+        governor = get_governor()
+        register_process_responders(governor)
+        responders = [governor.register(
+            "telegram_notifications_pause", MEMORY, CRITICAL,
+            lambda: setattr(self, "notifications_paused", True),
+            lambda: setattr(self, "notifications_paused", False)
+        )]
+        if self.block_history:
+            full_capacity = self.block_history.capacity
+            spill_enabled = self.block_history.spill_enabled
+            responders.append(governor.register(
+                "block_history_downsample", MEMORY, HIGH,
+                lambda: self.block_history.resize(full_capacity // 4),
+                lambda: self.block_history.resize(full_capacity)
+            ))
+            responders.append(governor.register(
+                "block_history_spill_pause", DISK, HIGH,
+                lambda: setattr(self.block_history, "spill_enabled", False),
+                lambda: setattr(self.block_history, "spill_enabled", spill_enabled)
+            ))
+        self.supervisor.add(
+            "resource_governor",
+            lambda: governor.run(heartbeat=lambda: self.supervisor.heartbeat("resource_governor")),
+            liveness_timeout=6 * governor.interval
+        )
+
+        while self.mining_active:
+            if self.daily_target_met():
+                await self.finish_day()
+                continue
+                
+            await self.pacer.wait()
+            await self.mine_step()
 
-        while self.mining_active and self.daily_mined < self.p2e_config['daily_limit']:
-            await self.mine_block_optimized()
-            await asyncio.sleep(self.mining_config['mining_delay'])
+        await self.supervisor.stop()
+        for responder in responders:
+            governor.unregister(responder)
+        await self.release_quotas()
 
-        if self.daily_mined >= self.p2e_config['daily_limit']:
+    def begin_session(self):
+        """Mark the miner active and resume today's counters"""
+        self.mining_active = True
+        self.start_time = datetime.now()
+        self.restore_daily_state()
+
+    def daily_target_met(self) -> bool:
+        """Roll over to a new day if needed, then report whether today's target is met"""
+        if self.rollover.day_changed():
+            self.roll_over_day()
+        if self.mined_quota and self.mined_quota.exhausted:
+            return True
+        return self.daily_mined >= self.settings.p2e.daily_limit
+
+    async def mine_step(self):
+        """Mine one block and checkpoint; pacing is up to the caller"""
+        # Only waits on the coordinator when the local chunk ran dry before a refill
+        if self.mined_quota and not await self.mined_quota.ensure_available():
+            return
+        await self.mine_block_optimized()
+        self.checkpoint_daily_state()
+
+    async def dispatch(self, coro):
+        """Run a network side effect; managed instances must not stall the shared scheduler"""
+        if not self.managed:
+            return await coro
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    def close(self):
+        """Detach from the shared configuration store"""
+        config_store.unsubscribe(self.apply_settings)
+
+    def stop_mining(self):
+        """Stop mining and persist the current day's counters"""
+        self.mining_active = False
+        if self.supervisor:
+            self.supervisor.request_stop()
+        if self._stop_requested:
+            self._stop_requested.set()
+        self.rollover.record(self.daily_mined, self.daily_blocks, False)
+        self.rollover.checkpoint(fsync=True)
+        logger.info("🛑 Mining stopped")
+
+    def restore_daily_state(self):
+        """Resume today's counters and streak bookkeeping from disk"""
+        state = self.rollover.restore()
+        self.daily_mined = state["daily_mined"]
+        self.daily_blocks = state["blocks"]
+        self.profit_metrics["profit_streak"] = state["profit_streak"]
+        self.profit_metrics["best_day"] = state["best_day"]
+
+    def roll_over_day(self):
+        """Archive the finished day and reset daily counters (no awaits: atomic on the loop)"""
+        self.rollover.record(
+            self.daily_mined, self.daily_blocks,
+            self.daily_mined >= self.settings.p2e.daily_limit
+        )
+        self.rollover.roll()
+        self.daily_mined = 0
+        self.daily_blocks = 0
+        self.profit_metrics["profit_streak"] = self.rollover.state["profit_streak"]
+        self.profit_metrics["best_day"] = self.rollover.state["best_day"]
+        self.pacer.reset()
+        self.controller.reset()
+
+    def checkpoint_daily_state(self, force: bool = False):
+        """Periodically persist daily counters so restarts resume the same day"""
+        now = time.monotonic()
+        if force or now - self._last_checkpoint >= self.checkpoint_interval:
+            self._last_checkpoint = now
+            self.rollover.record(self.daily_mined, self.daily_blocks, False)
+            self.rollover.checkpoint()
+
+    async def finish_day(self):
+        """Announce the daily target once, then idle until the next mining day"""
+        await self.announce_daily_target()
+            
+        # Sleep in short slices so day changes and returned quota are noticed; stop_mining wakes us at once
+        while self.mining_active and self.daily_target_met():
+            try:
+                await asyncio.wait_for(
+                    self._stop_requested.wait(),
+                    timeout=min(60.0, max(0.5, self.rollover.seconds_until_boundary()))
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    async def announce_daily_target(self):
+        """Record and announce today's target the first time it is reached"""
+        if not self.rollover.state["target_reached"]:
+            self.rollover.record(self.daily_mined, self.daily_blocks, True)
+            self.rollover.checkpoint(fsync=True)
             logger.info("🎯 Daily mining target achieved!")
-            await self.send_profit_summary()
-            self.stop_mining()
+            await self.dispatch(self.send_profit_summary())
+            logger.info(
+                "😴 Resuming at %s (in %.0f min)",
+                self.rollover.next_boundary().isoformat(), self.rollover.seconds_until_boundary() / 60
+            )
+
+    async def warm_up_integrations(self):
+        """Initialize StonFi and market data concurrently"""
+        startup_tasks = [self.market_feed.refresh_in_background()]
+        for quota in (self.mined_quota, self.trade_quota):
+            if quota:
+                startup_tasks.append(quota.ensure_available())
+        if self.stonfi_manager:
+            startup_tasks.append(self.stonfi_manager.initialize())
+        await asyncio.gather(*startup_tasks, return_exceptions=True)
+
+        if self.stonfi_manager:
+            # Enable auto-trading for profit maximization
+            self.stonfi_manager.auto_trade_enabled = self.settings.stonfi.auto_trade
+            if self.supervisor:
+                self.supervisor.add(
+                    "trading_monitor",
+                    lambda: self.stonfi_manager.start_trading_monitor(
+                        heartbeat=lambda: self.supervisor.heartbeat("trading_monitor")
+                    ),
+                    liveness_timeout=300
+                )
+        logger.info("🔥 Integrations warmed up")
 
     async def mine_block_optimized(self):
         """Enhanced mining with dynamic optimization"""
+        settings = self.settings
+        mining = settings.mining
+        p2e = settings.p2e
+
         # Dynamic hash rate calculation based on market conditions
-        base_hash_rate = random.randint(
-            self.mining_config['min_hash_rate'],
-            self.mining_config['max_hash_rate']
-        )
+        base_hash_rate = random.randint(mining.min_hash_rate, mining.max_hash_rate)
 
         # Apply market-based multiplier
         market_multiplier = await self.get_market_multiplier()
         
         # Apply all bonuses for maximum profit
         total_multiplier = (
-            self.p2e_config['bonus_multiplier'] * 
+            p2e.bonus_multiplier * 
             market_multiplier * 
             self.get_efficiency_bonus() *
             self.get_streak_bonus()
@@ -180,55 +447,55 @@ class AdvancedTuxidoMiner:
         self.hash_rate = int(base_hash_rate * total_multiplier)
 
         # Calculate enhanced rewards
-        block_reward = self.hash_rate * self.p2e_config['rewards_per_block']
+        block_reward = self.hash_rate * p2e.rewards_per_block
+        if self.mined_quota:
+            block_reward = self.mined_quota.consume_up_to(block_reward)
         self.total_mined += block_reward
         self.daily_mined += block_reward
+        self.daily_blocks += 1
         self.blocks_mined += 1
+        if self.block_history is not None:
+            self.block_history.append(time.time(), self.hash_rate, block_reward, market_multiplier, total_multiplier)
 
         # Update profit metrics
         await self.update_profit_metrics(block_reward)
 
         # Enhanced logging with profit information
-        if self.total_mined % self.mining_config['log_interval'] == 0:
-            runtime = datetime.now() - self.start_time if self.start_time else datetime.now()
-            hourly_rate = (self.total_mined / runtime.total_seconds()) * 3600 if runtime.total_seconds() > 0 else 0
+        if self.total_mined % mining.log_interval == 0 and block_logger.isEnabledFor(logging.INFO):
+            runtime = datetime.now() - self.start_time if self.start_time else timedelta(0)
+            hourly_rate = self.profit_metrics["hourly_rate"]
             
-            logger.info(f"⛏️ Block #{self.blocks_mined} | Mined {self.total_mined:,} Tx | Rate: {self.hash_rate} Tx/s")
-            logger.info(f"💰 Hourly Rate: {hourly_rate:.0f} Tx/h | Efficiency: {self.profit_metrics['performance_score']:.1f}%")
-            logger.info(f"📈 Est. Value: ${self.profit_metrics['daily_earnings']:.2f} | Runtime: {runtime}")
+            block_logger.info(
+                "⛏️ Block #%d | Mined %d Tx | Rate: %d Tx/s\n"
+                "💰 Hourly Rate: %.0f Tx/h | Efficiency: %.1f%%\n"
+                "📈 Est. Value: $%.2f | Runtime: %s",
+                self.blocks_mined, self.total_mined, self.hash_rate,
+                hourly_rate, self.profit_metrics['performance_score'],
+                self.profit_metrics['daily_earnings'], runtime
+            )
 
         # Enhanced Telegram notifications with profit data
-        if self.telegram_config['notifications_enabled'] and self.total_mined % 500 == 0:
-            await self.send_profit_notification()
+        if settings.telegram.notifications_enabled and not self.notifications_paused and self.total_mined % 500 == 0:
+            await self.dispatch(self.send_profit_notification())
             
         # Enhanced StonFi auto-trading for maximum profit
-        if self.stonfi_manager and self.total_mined % 300 == 0:  # More frequent trading
-            await self.stonfi_manager.auto_trade_mined_tokens(block_reward)
+        if self.stonfi_manager and self.total_mined % 300 == 0 and self.reserve_transaction():  # More frequent trading
+            await self.dispatch(self.stonfi_manager.auto_trade_mined_tokens(block_reward))
 
     async def update_market_data(self):
         """Update real-time market data"""
-        try:
-            async with aiohttp.ClientSession() as session:
-                # Get TON price from CoinGecko
-                url = "https://api.coingecko.com/api/v3/simple/price?ids=the-open-network&vs_currencies=usd"
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        self.market_data["ton_price_usd"] = data.get("the-open-network", {}).get("usd", 2.5)
-                        self.market_data["last_updated"] = datetime.now().isoformat()
-                        
-        except Exception as e:
-            logger.error(f"Market data update error: {e}")
-            # Fallback to default price
-            self.market_data["ton_price_usd"] = 2.5
+        await self.market_feed.refresh()
 
     async def get_market_multiplier(self) -> float:
         """Get market-based multiplier for mining optimization"""
         try:
             # Update market data periodically
-            if (not self.market_data["last_updated"] or 
-                datetime.now() - datetime.fromisoformat(self.market_data["last_updated"]) > timedelta(minutes=10)):
-                await self.update_market_data()
+            if self.market_feed.is_stale():
+                if self.settings.startup.fast_start:
+                    # Refresh in the background and keep mining on the last known price
+                    self.market_feed.refresh_in_background()
+                else:
+                    await self.update_market_data()
             
             # Calculate multiplier based on TON price
             ton_price = self.market_data["ton_price_usd"]
@@ -243,13 +510,13 @@ class AdvancedTuxidoMiner:
                 return 1.0
                 
         except Exception as e:
-            logger.error(f"Market multiplier calculation error: {e}")
+            logger.error("Market multiplier calculation error: %s", e)
             return 1.0
 
     def get_efficiency_bonus(self) -> float:
         """Calculate efficiency bonus"""
         if self.profit_metrics["performance_score"] > 90:
-            return self.p2e_config["efficiency_bonus"]
+            return self.settings.p2e.efficiency_bonus
         elif self.profit_metrics["performance_score"] > 80:
             return 1.2
         elif self.profit_metrics["performance_score"] > 70:
@@ -260,7 +527,7 @@ class AdvancedTuxidoMiner:
     def get_streak_bonus(self) -> float:
         """Calculate streak bonus"""
         if self.profit_metrics["profit_streak"] > 7:
-            return self.p2e_config["streak_bonus"]
+            return self.settings.p2e.streak_bonus
         elif self.profit_metrics["profit_streak"] > 3:
             return 1.1
         else:
@@ -269,12 +536,11 @@ class AdvancedTuxidoMiner:
     async def update_profit_metrics(self, block_reward: int):
         """Update comprehensive profit metrics"""
         try:
-            runtime = datetime.now() - self.start_time if self.start_time else timedelta(seconds=1)
-            runtime_hours = runtime.total_seconds() / 3600
+            self.metrics.record_block(block_reward, self.hash_rate)
             
-            # Calculate performance metrics
-            tokens_per_hour = self.total_mined / max(runtime_hours, 0.01)
-            self.profit_metrics["hourly_rate"] = tokens_per_hour
+            # Windowed rates, so restarts and regime changes show up within minutes
+            self.profit_metrics["hourly_rate"] = self.metrics.tokens_per_hour("1h")
+            recent_per_hour = self.metrics.tokens_per_hour("15m")
             
             # Estimate USD value (assuming 0.001 TON per token)
             token_value_ton = 0.001
@@ -283,51 +549,93 @@ class AdvancedTuxidoMiner:
             
             self.profit_metrics.update({
                 "daily_earnings": estimated_value,
-                "mining_efficiency": min(tokens_per_hour / 1000, 1.0) * 100,  # Efficiency score
-                "performance_score": min(tokens_per_hour / 800, 1.0) * 100,   # Performance score
+                "mining_efficiency": min(recent_per_hour / 1000, 1.0) * 100,  # Efficiency score
+                "performance_score": min(recent_per_hour / 800, 1.0) * 100,   # Performance score
                 "total_revenue_usd": estimated_value
             })
             
         except Exception as e:
-            logger.error(f"Profit metrics update error: {e}")
+            logger.error("Profit metrics update error: %s", e)
 
     async def monitor_and_optimize(self):
-        """Continuous monitoring and optimization"""
-        while self.mining_active:
+        """Continuous monitoring and optimization; runs until the supervisor cancels it"""
+        while True:
+            self.supervisor.heartbeat("optimizer")
             try:
                 # Check if optimization is needed
-                if self.auto_optimization["enabled"]:
+                if self.settings.mining.auto_optimize:
                     await self.auto_optimize_mining()
                 
-                await asyncio.sleep(self.auto_optimization["adjustment_frequency"])
+                await asyncio.sleep(self.settings.control.interval)
                 
             except Exception as e:
-                logger.error(f"Optimization monitoring error: {e}")
+                logger.error("Optimization monitoring error: %s", e)
                 await asyncio.sleep(60)
 
+    def control_observation(self, pacing: dict) -> ControlObservation:
+        """Today's shortfall, time to the control deadline and measured rates"""
+        control = self.settings.control
+        snapshot = self.metrics.snapshot()
+        window = control.window if control.window in snapshot["tokens_per_hour"] else "15m"
+        deadline_offset = (24 - control.deadline_hours) * 3600
+        return ControlObservation(
+            remaining=self.settings.p2e.daily_limit - self.daily_mined,
+            seconds_left=self.rollover.seconds_until_boundary() - deadline_offset,
+            reward_rate=snapshot["tokens_per_hour"][window] / 3600,
+            block_rate=snapshot["blocks_per_second"][window],
+            achieved_rate=pacing["achieved_rate"],
+            target_rate=self.pacer.rate
+        )
+
     async def auto_optimize_mining(self):
-        """Automatic mining optimization based on performance"""
+        """Steer the block rate toward today's target with the configured controller"""
         try:
-            efficiency = self.profit_metrics["mining_efficiency"]
+            # Read the window now rather than the per-block value, so stalls register too
+            efficiency = min(self.metrics.tokens_per_hour("15m") / 1000, 1.0) * 100
+            self.profit_metrics["mining_efficiency"] = efficiency
+            pacing = self.pacer.stats()
             
-            # Adjust mining parameters based on efficiency
-            if efficiency < self.auto_optimization["efficiency_threshold"]:
-                # Increase mining rate to improve efficiency
-                self.mining_config["max_hash_rate"] = min(25, self.mining_config["max_hash_rate"] + 1)
-                self.mining_config["mining_delay"] = max(0.3, self.mining_config["mining_delay"] - 0.1)
-                logger.info(f"🔧 Auto-optimization: Increased mining rate (Efficiency: {efficiency:.1f}%)")
-                
-            elif efficiency > 95:
-                # Efficiency is very high, we can optimize for stability
-                self.mining_config["mining_delay"] = min(1.0, self.mining_config["mining_delay"] + 0.1)
-                logger.info(f"🔧 Auto-optimization: Optimized for stability (Efficiency: {efficiency:.1f}%)")
+            now = time.monotonic()
+            dt = now - self._last_control if self._last_control is not None else self.settings.control.interval
+            self._last_control = now
+            observation = self.control_observation(pacing)
+            block_rate = self.controller.update(observation, dt)
+            if block_rate != self.pacer.rate:
+                logger.info(
+                    "🎛️ %s: block rate %.2f -> %.2f/s (need %.0f Tx/s, measuring %.0f Tx/s, %.1fh to deadline)",
+                    self.controller.name, self.pacer.rate, block_rate,
+                    self.controller.setpoint(observation), observation.reward_rate,
+                    observation.seconds_left / 3600
+                )
+                self.settings = self.settings.with_changes("mining", block_rate=block_rate)
+                self.pacer.set_rate(block_rate)
+            logger.info(
+                "⏱️ Block pacing: target %.2f/s, achieved %.2f/s, dropped %d ticks",
+                self.pacer.rate, pacing["achieved_rate"], pacing["dropped_ticks"]
+            )
+            for host, limits in get_rate_limiter().metrics().items():
+                if limits["throttled"] or sum(limits["queue_depth"].values()):
+                    logger.info(
+                        "🚦 %s: %.0f/%.0f req/min, queued %s, throttled %d times",
+                        host, limits["effective_per_min"], limits["limit_per_min"],
+                        limits["queue_depth"], limits["throttled"]
+                    )
+            if self.supervisor:
+                for name, task in self.supervisor.status().items():
+                    if task["state"] != "finished" and (task["restarts"] or not task["alive"]):
+                        logger.info(
+                            "🩺 %s: %s, %d restarts, last error: %s",
+                            name, task["state"], task["restarts"], task["last_error"]
+                        )
                 
         except Exception as e:
-            logger.error(f"Auto-optimization error: {e}")
+            logger.error("Auto-optimization error: %s", e)
 
     async def send_profit_notification(self):
         """Send enhanced profit notification via Telegram"""
-        if not self.telegram_config['bot_token'] or not self.telegram_config['chat_id']:
+        telegram = self.settings.telegram
+        chat_id = self.chat_id or telegram.chat_id
+        if not telegram.bot_token or not chat_id:
             return
 
         try:
@@ -339,7 +647,7 @@ class AdvancedTuxidoMiner:
 ⛏️ <b>Mining Progress:</b>
 • Total Mined: {self.total_mined:,} Tx
 • Blocks Mined: {self.blocks_mined:,}
-• Daily Progress: {self.daily_mined:,}/{self.p2e_config['daily_limit']:,} Tx
+• Daily Progress: {self.daily_mined:,}/{self.settings.p2e.daily_limit:,} Tx
 
 💰 <b>Profit Metrics:</b>
 • Estimated Value: ${self.profit_metrics['daily_earnings']:.2f}
@@ -355,23 +663,25 @@ class AdvancedTuxidoMiner:
 🎯 <b>On track for ${self.profit_metrics['daily_earnings'] * 24 / max(runtime.total_seconds() / 3600, 1):.2f} daily!</b>
             """
 
-            url = f"https://api.telegram.org/bot{self.telegram_config['bot_token']}/sendMessage"
+            url = f"https://api.telegram.org/bot{telegram.bot_token}/sendMessage"
             data = {
-                "chat_id": self.telegram_config['chat_id'],
+                "chat_id": chat_id,
                 "text": message,
                 "parse_mode": "HTML"
             }
 
-            async with aiohttp.ClientSession() as session:
-                await session.post(url, data=data)
+            session = await get_session()
+            async with session.post(url, data=data, trace_request_ctx=priority_context(BACKGROUND)):
                 logger.info("📱 Profit notification sent")
 
         except Exception as e:
-            logger.error(f"Failed to send profit notification: {e}")
+            logger.error("Failed to send profit notification: %s", e)
 
     async def send_profit_summary(self):
         """Send daily profit summary"""
-        if not self.telegram_config['bot_token']:
+        telegram = self.settings.telegram
+        chat_id = self.chat_id or telegram.chat_id
+        if not telegram.bot_token:
             return
             
         try:
@@ -396,13 +706,24 @@ class AdvancedTuxidoMiner:
 Ready for tomorrow's profit maximization! 🚀
             """
             
-            url = f"https://api.telegram.org/bot{self.telegram_config['bot_token']}/sendMessage"
+            url = f"https://api.telegram.org/bot{telegram.bot_token}/sendMessage"
             data = {
-                "chat_id": self.telegram_config['chat_id'],
+                "chat_id": chat_id,
                 "text": summary,
                 "parse_mode": "HTML"
             }
 
-            async with aiohttp.ClientSession() as session:
-                await session.post(url, data=data)
+            session = await get_session()
+            async with session.post(url, data=data, trace_request_ctx=priority_context(BACKGROUND)):
+                logger.info("📱 Profit summary sent")
 
+        except Exception as e:
+            logger.error("Failed to send profit summary: %s", e)
+
+if __name__ == "__main__":
+    configure_logging(config_store.current.logging.to_dict())
+    if config_store.current.debug.web_interface_enabled:
+        from web_interface import serve_in_background
+        serve_in_background()
+    miner = AdvancedTuxidoMiner()
+    asyncio.run(miner.start_mining())
@@ -0,0 +1,69 @@
+"""
+Tuxido Mining Bot - Shared Market Data Feed
+A single TON and TUXIDO price cache refreshed from the price oracle at most
+once per interval, shared by every miner instance in the process
+"""
+
+import time
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from price_oracle import TON_USD, TUXIDO_TON, get_price_oracle
+
+logger = logging.getLogger(__name__)
+
+
+class MarketDataFeed:
+    """Single-flight, time-bounded cache of market prices"""
+
+    def __init__(self, max_age: timedelta = timedelta(minutes=10), retry_interval: float = 60.0):
+        self.max_age = max_age
+        self.retry_interval = retry_interval
+        self._next_attempt = 0.0
+        # Miners hold a reference to this dict, so it is updated in place
+        self.data = {
+            "ton_price_usd": 0.0,
+            "tuxido_price_ton": 0.0,
+            "last_updated": None
+        }
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def is_stale(self) -> bool:
+        if time.monotonic() < self._next_attempt:
+            # A refresh failed recently; keep using the last known prices until the retry time
+            return False
+        last_updated = self.data["last_updated"]
+        if not last_updated:
+            return True
+        return datetime.now() - datetime.fromisoformat(last_updated) > self.max_age
+
+    def refresh_in_background(self) -> asyncio.Task:
+        """Start a refresh unless one is already running; concurrent callers share it"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh())
+        return self._refresh_task
+
+    async def refresh(self) -> Dict:
+        """Refresh prices, joining an in-flight refresh if there is one"""
+        await asyncio.shield(self.refresh_in_background())
+        return self.data
+
+    async def _refresh(self):
+        try:
+            readings = await get_price_oracle().prices([TON_USD, TUXIDO_TON])
+            ton, tuxido = readings[TON_USD], readings[TUXIDO_TON]
+            if tuxido:
+                self.data["tuxido_price_ton"] = tuxido.price
+            if ton:
+                self.data["ton_price_usd"] = ton.price
+                self.data["price_sources"] = ton.sources
+                self.data["last_updated"] = datetime.now().isoformat()
+            else:
+                # Keep the last known price rather than inventing one
+                self._next_attempt = time.monotonic() + self.retry_interval
+
+        except Exception as e:
+            logger.error("Market data update error: %s", e)
+            self._next_attempt = time.monotonic() + self.retry_interval
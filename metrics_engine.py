@@ -0,0 +1,230 @@
+"""
+Tuxido Mining Bot - Streaming Metrics Engine
+O(1)-update mining metrics over sliding windows: exponentially weighted
+rates, fixed-window (1m/15m/1h) rates and relative-error percentile sketches,
+so rates track the current regime instead of the whole run
+"""
+
+import math
+import time
+from array import array
+from typing import Callable, Dict, Optional, Tuple
+
+# name -> (window seconds, buckets)
+WINDOWS: Tuple[Tuple[str, float, int], ...] = (
+    ("1m", 60.0, 60),
+    ("15m", 900.0, 60),
+    ("1h", 3600.0, 60),
+)
+EWMA_TIME_CONSTANT = 300.0  # seconds; ~5 minute memory
+SKETCH_ACCURACY = 0.01      # percentiles within 1% relative error
+
+
+class EWMARate:
+    """Event rate with exponential decay (units of value per second)"""
+
+    __slots__ = ("tau", "rate", "updated")
+
+    def __init__(self, tau: float = EWMA_TIME_CONSTANT):
+        self.tau = tau
+        self.rate = 0.0
+        self.updated: Optional[float] = None
+
+    def add(self, value: float, now: float):
+        if self.updated is not None:
+            self.rate *= math.exp(-(now - self.updated) / self.tau)
+        self.rate += value / self.tau
+        self.updated = now
+
+    def value(self, now: float) -> float:
+        if self.updated is None:
+            return 0.0
+        return self.rate * math.exp(-(now - self.updated) / self.tau)
+
+
+class WindowedCounter:
+    """Sum and count over a sliding window, bucketed so updates stay O(1)"""
+
+    __slots__ = ("window", "width", "sums", "counts", "total", "events", "_last", "started")
+
+    def __init__(self, window: float, buckets: int = 60):
+        self.window = window
+        self.width = window / buckets
+        self.sums = array("d", bytes(8 * buckets))
+        self.counts = array("q", bytes(8 * buckets))
+        self.total = 0.0
+        self.events = 0
+        self._last: Optional[int] = None
+        self.started: Optional[float] = None
+
+    def _advance(self, now: float) -> int:
+        index = int(now // self.width)
+        if self._last is None:
+            self._last = index
+        elif index > self._last:
+            # Clear buckets that slid out of the window (at most one full lap)
+            n = len(self.sums)
+            for stale in range(self._last + 1, min(index, self._last + n) + 1):
+                slot = stale % n
+                self.total -= self.sums[slot]
+                self.events -= self.counts[slot]
+                self.sums[slot] = 0.0
+                self.counts[slot] = 0
+            self._last = index
+        return index
+
+    def add(self, value: float, now: float):
+        if self.started is None:
+            self.started = now
+        slot = self._advance(now) % len(self.sums)
+        self.sums[slot] += value
+        self.counts[slot] += 1
+        self.total += value
+        self.events += 1
+
+    def covered(self, now: float) -> float:
+        """Seconds of data the window currently spans (less than window right after start)
+
+        Floored at a tenth of the window so a burst of startup blocks does not
+        read as an enormous rate.
+        """
+        if self.started is None:
+            return 0.0
+        return min(self.window, max(now - self.started, self.window / 10))
+
+    def rate(self, now: float) -> float:
+        """Sum per second over the window"""
+        self._advance(now)
+        covered = self.covered(now)
+        return self.total / covered if covered else 0.0
+
+    def event_rate(self, now: float) -> float:
+        """Events per second over the window"""
+        self._advance(now)
+        covered = self.covered(now)
+        return self.events / covered if covered else 0.0
+
+
+class QuantileSketch:
+    """Log-bucketed quantile sketch (DDSketch-style) with bounded relative error"""
+
+    __slots__ = ("gamma", "log_gamma", "bins", "zeros", "count")
+
+    def __init__(self, relative_accuracy: float = SKETCH_ACCURACY):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.bins: Dict[int, int] = {}
+        self.zeros = 0
+        self.count = 0
+
+    def add(self, value: float):
+        self.count += 1
+        if value <= 0:
+            self.zeros += 1
+            return
+        key = math.ceil(math.log(value) / self.log_gamma)
+        self.bins[key] = self.bins.get(key, 0) + 1
+
+    def merge(self, other: "QuantileSketch"):
+        self.count += other.count
+        self.zeros += other.zeros
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                return 2 * self.gamma ** key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.bins) / (self.gamma + 1)
+
+    def clear(self):
+        self.bins.clear()
+        self.zeros = 0
+        self.count = 0
+
+
+class WindowedSketch:
+    """Quantiles over a sliding window from a ring of per-slice sketches"""
+
+    __slots__ = ("slice_width", "slices", "_last")
+
+    def __init__(self, window: float = 3600.0, slices: int = 12,
+                 relative_accuracy: float = SKETCH_ACCURACY):
+        self.slice_width = window / slices
+        self.slices = [QuantileSketch(relative_accuracy) for _ in range(slices)]
+        self._last: Optional[int] = None
+
+    def _advance(self, now: float) -> int:
+        index = int(now // self.slice_width)
+        if self._last is not None and index > self._last:
+            n = len(self.slices)
+            for stale in range(self._last + 1, min(index, self._last + n) + 1):
+                self.slices[stale % n].clear()
+        self._last = index if self._last is None else max(self._last, index)
+        return index
+
+    def add(self, value: float, now: float):
+        self.slices[self._advance(now) % len(self.slices)].add(value)
+
+    def quantiles(self, qs, now: float) -> Dict[float, float]:
+        self._advance(now)
+        merged = QuantileSketch()
+        merged.gamma, merged.log_gamma = self.slices[0].gamma, self.slices[0].log_gamma
+        for sketch in self.slices:
+            merged.merge(sketch)
+        return {q: merged.quantile(q) for q in qs}
+
+
+class MetricsEngine:
+    """Per-miner streaming metrics fed once per block"""
+
+    __slots__ = ("clock", "ewma", "windows", "reward_sketch", "hash_rate_sketch", "blocks", "tokens")
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic, percentiles: bool = True):
+        self.clock = clock
+        self.ewma = EWMARate()
+        self.windows = {name: WindowedCounter(window, buckets) for name, window, buckets in WINDOWS}
+        self.reward_sketch = WindowedSketch() if percentiles else None
+        self.hash_rate_sketch = WindowedSketch() if percentiles else None
+        self.blocks = 0
+        self.tokens = 0
+
+    def record_block(self, reward: float, hash_rate: float, now: Optional[float] = None):
+        """O(1) update for one mined block"""
+        now = self.clock() if now is None else now
+        self.ewma.add(reward, now)
+        for counter in self.windows.values():
+            counter.add(reward, now)
+        if self.reward_sketch is not None:
+            self.reward_sketch.add(reward, now)
+            self.hash_rate_sketch.add(hash_rate, now)
+        self.blocks += 1
+        self.tokens += reward
+
+    def tokens_per_hour(self, window: str = "15m", now: Optional[float] = None) -> float:
+        now = self.clock() if now is None else now
+        return self.windows[window].rate(now) * 3600
+
+    def snapshot(self, now: Optional[float] = None) -> Dict:
+        """Current rates and percentiles, for the optimizer, reports and the AI assistant"""
+        now = self.clock() if now is None else now
+        snapshot = {
+            "tokens_per_hour": {name: counter.rate(now) * 3600 for name, counter in self.windows.items()},
+            "blocks_per_second": {name: counter.event_rate(now) for name, counter in self.windows.items()},
+            "ewma_tokens_per_hour": self.ewma.value(now) * 3600,
+            "blocks": self.blocks,
+            "tokens": self.tokens
+        }
+        if self.reward_sketch is not None:
+            rewards = self.reward_sketch.quantiles((0.5, 0.95, 0.99), now)
+            hash_rates = self.hash_rate_sketch.quantiles((0.5, 0.95), now)
+            snapshot["reward_percentiles_1h"] = {"p50": rewards[0.5], "p95": rewards[0.95], "p99": rewards[0.99]}
+            snapshot["hash_rate_percentiles_1h"] = {"p50": hash_rates[0.5], "p95": hash_rates[0.95]}
+        return snapshot
@@ -0,0 +1,120 @@
+"""
+Tuxido Mining Bot - Rate Pacer
+Drift-free scheduling of work at an absolute rate using monotonic deadlines
+"""
+
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+CATCH_UP = "catch_up"  # run late ticks back-to-back, up to max_catch_up
+DROP = "drop"          # skip ticks that are already overdue
+PACING_POLICIES = (CATCH_UP, DROP)
+
+
+class RatePacer:
+    """Paces ticks at a target rate regardless of how long each tick's work takes"""
+
+    def __init__(self, rate: float, policy: str = CATCH_UP, max_catch_up: int = 5,
+                 window: int = 120, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable = asyncio.sleep):
+        if policy not in PACING_POLICIES:
+            raise ValueError(f"Unknown pacing policy: {policy}")
+        self.policy = policy
+        self.max_catch_up = max(0, int(max_catch_up))
+        self.clock = clock
+        self.sleep = sleep
+        self.interval = 1.0
+        self.set_rate(rate)
+
+        self._next_deadline = None
+        self._started_at = None
+        self._recent = deque(maxlen=max(2, window))
+        self.ticks = 0
+        self.dropped = 0
+        self.max_lag = 0.0
+
+    @property
+    def rate(self) -> float:
+        return 1.0 / self.interval
+
+    def set_rate(self, rate: float):
+        """Change the target rate; takes effect from the next deadline"""
+        if rate <= 0:
+            raise ValueError("Pacer rate must be positive")
+        self.interval = 1.0 / rate
+
+    def reset(self):
+        """Forget the schedule, e.g. after a pause; the next tick fires immediately"""
+        self._next_deadline = None
+        self._recent.clear()
+
+    def next_due(self) -> float:
+        """Monotonic time at which the next tick is due"""
+        if self._next_deadline is None:
+            return self.clock()
+        return self._next_deadline
+
+    async def wait(self):
+        """Block until the next tick is due"""
+        delay = self.next_due() - self.clock()
+        if delay > 0:
+            await self.sleep(delay)
+        self.tick()
+
+    def tick(self, now: float = None):
+        """Record a tick at now; external schedulers call this instead of wait()"""
+        now = self.clock() if now is None else now
+        if self._next_deadline is None:
+            self._next_deadline = now
+            if self._started_at is None:
+                self._started_at = now
+
+        lag = now - self._next_deadline
+        if lag > 0:
+            self._absorb_lag(now, lag)
+
+        self._next_deadline += self.interval
+        self.ticks += 1
+        self._recent.append(now)
+
+    def _absorb_lag(self, now: float, lag: float):
+        """Apply the configured policy when we are behind schedule"""
+        self.max_lag = max(self.max_lag, lag)
+        missed = int(lag / self.interval)
+        if missed <= 0:
+            return
+        if self.policy == DROP:
+            self.dropped += missed
+            self._next_deadline += missed * self.interval
+        elif missed > self.max_catch_up:
+            # Bound the burst: keep at most max_catch_up overdue ticks
+            skipped = missed - self.max_catch_up
+            self.dropped += skipped
+            self._next_deadline += skipped * self.interval
+
+    def achieved_rate(self) -> float:
+        """Tick rate over the recent window"""
+        if len(self._recent) < 2:
+            return 0.0
+        span = self._recent[-1] - self._recent[0]
+        return (len(self._recent) - 1) / span if span > 0 else 0.0
+
+    def stats(self) -> Dict[str, float]:
+        """Target vs achieved rate and schedule health"""
+        elapsed = (self.clock() - self._started_at) if self._started_at is not None else 0.0
+        lag = max(0.0, self.clock() - self._next_deadline) if self._next_deadline is not None else 0.0
+        return {
+            "target_rate": self.rate,
+            "achieved_rate": self.achieved_rate(),
+            "lifetime_rate": self.ticks / elapsed if elapsed > 0 else 0.0,
+            "ticks": self.ticks,
+            "dropped_ticks": self.dropped,
+            "current_lag_s": lag,
+            "max_lag_s": self.max_lag,
+            "policy": self.policy
+        }
@@ -0,0 +1,270 @@
+"""
+Tuxido Mining Bot - On-chain Pool Reserves
+Reads StonFi pool reserves straight from the chain with the pool's
+get_pool_data get-method through toncenter. Results are cached per
+masterchain block. After a new block the last transaction lt of every
+pool is fetched in bulk, and only pools whose lt moved run the get-method
+again: the others' reserves cannot have changed. GetMethodReader holds
+that caching for any contract read through one get-method
+
+    python pool_reader.py --pools 500 --rounds 20 --active 0.05
+"""
+
+import time
+import base64
+import random
+import asyncio
+import argparse
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from arbitrage import Pool
+from boc import format_address
+from toncenter_client import ToncenterError, stack_address
+
+logger = logging.getLogger(__name__)
+
+# get_pool_data stack: reserve0, reserve1, token0, token1, lp_fee, protocol_fee, ref_fee, ...
+RESERVE0, RESERVE1, TOKEN0, TOKEN1, LP_FEE, PROTOCOL_FEE = range(6)
+
+
+def stack_number(entry: Sequence) -> int:
+    value = entry[1]
+    return int(value, 16) if isinstance(value, str) else int(value)
+
+
+def decode_pool_data(address: str, stack: Sequence, tokens: Optional[Tuple[str, str]] = None) -> Pool:
+    """Pool from a get_pool_data stack; pass the known token pair to skip decoding its cells
+
+    Decoded tokens are the router's jetton wallets (StonFi v1), not the jetton masters.
+    """
+    if tokens is None:
+        tokens = (stack_address(stack[TOKEN0]), stack_address(stack[TOKEN1]))
+    return Pool(address, tokens[0], tokens[1], stack_number(stack[RESERVE0]), stack_number(stack[RESERVE1]),
+                stack_number(stack[LP_FEE]) + stack_number(stack[PROTOCOL_FEE]))
+
+
+class GetMethodReader:
+    """Cached get-method results for many accounts of one contract type
+
+    Within one masterchain block nothing is re-read. After a new block the
+    accounts' last transaction lts are fetched `batch_size` accounts per
+    request, and only accounts with a newer lt run the get-method. At most
+    `concurrency` requests are in flight, and concurrent reads of the same
+    account share one request. Subclasses name the method and decode it.
+    """
+
+    method = ""
+
+    def __init__(self, client, concurrency: int = 8, batch_size: int = 100, block_ttl: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.client = client
+        self.batch_size = batch_size
+        self.block_ttl = block_ttl  # how long a masterchain seqno is trusted before asking again
+        self.clock = clock
+        self._budget = asyncio.Semaphore(concurrency)
+        self._seqno: Optional[int] = None
+        self._seqno_at = -block_ttl
+        self._seqno_lock = asyncio.Lock()
+        self.values: Dict[str, Any] = {}
+        self._lts: Dict[str, int] = {}
+        self._read_at: Dict[str, int] = {}  # masterchain seqno each pool was last checked at
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"block_hits": 0, "lt_batches": 0, "lt_probes": 0, "lt_unchanged": 0,
+                      "get_methods": 0, "errors": 0}
+
+    async def _block(self) -> Optional[int]:
+        async with self._seqno_lock:
+            if self.clock() - self._seqno_at >= self.block_ttl:
+                info = await self.client.get_masterchain_info()
+                self._seqno = int(info["last"]["seqno"])
+                self._seqno_at = self.clock()
+            return self._seqno
+
+    async def _last_lt(self, address: str) -> int:
+        async with self._budget:
+            self.stats["lt_probes"] += 1
+            info = await self.client.get_address_information(address)
+        return int((info.get("last_transaction_id") or {}).get("lt") or 0)
+
+    async def _last_lts(self, addresses: List[str]) -> Dict[str, int]:
+        """Bulk lts, batch by batch; empty for a batch the endpoint could not serve"""
+        async def batch(chunk: List[str]) -> Dict[str, int]:
+            async with self._budget:
+                self.stats["lt_batches"] += 1
+                try:
+                    return await self.client.get_last_lts(chunk)
+                except Exception as e:
+                    logger.debug("Bulk account states failed, probing one by one: %s", e)
+                    return {}
+        chunks = [addresses[i:i + self.batch_size] for i in range(0, len(addresses), self.batch_size)]
+        lts: Dict[str, int] = {}
+        for result in await asyncio.gather(*(batch(chunk) for chunk in chunks)):
+            lts.update(result)
+        return lts
+
+    def decode(self, address: str, stack: List, cached: Any) -> Any:
+        raise NotImplementedError
+
+    async def _fetch(self, address: str, cached: Any) -> Any:
+        async with self._budget:
+            self.stats["get_methods"] += 1
+            stack = await self.client.run_get_method(address, self.method)
+        return self.decode(address, stack, cached)
+
+    async def _load(self, address: str, seqno: int, lt: Optional[int] = None) -> Any:
+        try:
+            cached = self.values.get(address)
+            if lt is None:
+                lt = await self._last_lt(address)
+            if cached is not None and lt == self._lts.get(address):
+                self.stats["lt_unchanged"] += 1
+            else:
+                self.values[address] = await self._fetch(address, cached)
+                self._lts[address] = lt
+            self._read_at[address] = seqno
+            return self.values[address]
+        except (ToncenterError, KeyError, IndexError, ValueError) as e:
+            self.stats["errors"] += 1
+            logger.debug("%s on %s failed: %s", self.method, address, e)
+            return self.values.get(address)
+
+    async def read(self, address: str, seqno: Optional[int] = None, lt: Optional[int] = None) -> Any:
+        """Value of one account as of the latest masterchain block"""
+        if seqno is None:
+            seqno = await self._block()
+        if self._read_at.get(address) == seqno:
+            self.stats["block_hits"] += 1
+            return self.values[address]
+        future = self._inflight.get(address)
+        if future is None:
+            future = self._inflight[address] = asyncio.ensure_future(self._load(address, seqno, lt))
+            future.add_done_callback(lambda _: self._inflight.pop(address, None))
+        return await asyncio.shield(future)
+
+    async def refresh(self, addresses: Iterable[str]) -> Dict[str, Any]:
+        """Values of many accounts at once; accounts that could not be read are left out"""
+        addresses = list(dict.fromkeys(addresses))
+        seqno = await self._block()
+        stale = [address for address in addresses if self._read_at.get(address) != seqno]
+        lts = await self._last_lts(stale) if len(stale) > 1 else {}
+        values = await asyncio.gather(*(self.read(address, seqno, lts.get(address)) for address in addresses))
+        return {address: value for address, value in zip(addresses, values) if value is not None}
+
+    def status(self) -> Dict:
+        return {"accounts": len(self.values), "seqno": self._seqno, **self.stats}
+
+
+class PoolReserveReader(GetMethodReader):
+    """Cached on-chain reserves for many StonFi pools
+
+    get_pool_data names the router's jetton wallets, not the jetton masters
+    the rest of the bot trades by. Give each pool its master pair with
+    set_pair (from the pool listing) and reads report that pair; pools
+    without one report the wallets.
+    """
+
+    method = "get_pool_data"
+
+    def __init__(self, client, **kwargs):
+        super().__init__(client, **kwargs)
+        self.pairs: Dict[str, Tuple[str, str]] = {}
+
+    def set_pair(self, address: str, token0: str, token1: str):
+        """Master addresses of a pool's token0 and token1"""
+        self.pairs[address] = (token0, token1)
+        cached = self.values.get(address)
+        if cached is not None:
+            cached.token0, cached.token1 = token0, token1
+
+    def decode(self, address: str, stack: List, cached: Optional[Pool]) -> Pool:
+        # A pool's token pair never changes, so only the first read decodes it
+        tokens = self.pairs.get(address) or ((cached.token0, cached.token1) if cached else None)
+        return decode_pool_data(address, stack, tokens)
+
+
+def run_benchmark(pools: int, rounds: int, active: float, latency: float, seed: int = 1):
+    from boc import begin_cell
+    from fake_toncenter import FakeToncenter
+
+    rng = random.Random(seed)
+    fake = FakeToncenter(latency=0.0, seed=seed)
+
+    def address(i: int, prefix: int) -> str:
+        return format_address(0, bytes([prefix]) + i.to_bytes(31, "big"))
+
+    def slice_entry(addr: str) -> List:
+        cell = begin_cell().store_address(addr).end_cell()
+        return ["cell", {"bytes": base64.b64encode(cell.to_boc()).decode()}]
+
+    reserves = {}
+    addresses = [address(i, 1) for i in range(pools)]
+    token_entries = [slice_entry(address(i, 2)) for i in range(pools + 1)]
+    for i, pool_address in enumerate(addresses):
+        reserves[pool_address] = [rng.randint(10**12, 10**15), rng.randint(10**12, 10**15)]
+        fake.add_wallet(pool_address)
+        fake.touch(pool_address)
+
+        def handler(stack, pool_address=pool_address, i=i):
+            r0, r1 = reserves[pool_address]
+            return [["num", hex(r0)], ["num", hex(r1)], token_entries[i], token_entries[i + 1],
+                    ["num", "0x14"], ["num", "0xa"], ["num", "0xa"]]
+        fake.register_get_method(pool_address, "get_pool_data", handler)
+
+    async def slow(method, *args):
+        await asyncio.sleep(latency)
+        return await method(*args)
+
+    class SlowClient:
+        """The fake with a fixed round trip per call"""
+
+        async def get_masterchain_info(self):
+            return await slow(fake.get_masterchain_info)
+
+        async def get_address_information(self, addr):
+            return await slow(fake.get_address_information, addr)
+
+        async def get_last_lts(self, addrs):
+            return await slow(fake.get_last_lts, addrs)
+
+        async def run_get_method(self, addr, method, stack=()):
+            return await slow(fake.run_get_method, addr, method, stack)
+
+    async def run():
+        reader = PoolReserveReader(SlowClient(), concurrency=16, block_ttl=0.0)
+        naive_calls = 0
+        started = time.perf_counter()
+        for _ in range(rounds):
+            for pool_address in rng.sample(addresses, int(pools * active)):
+                reserves[pool_address][0] += rng.randint(1, 10**10)
+                fake.touch(pool_address)
+            result = await reader.refresh(addresses)
+            assert all(result[a].reserve0 == reserves[a][0] for a in addresses)
+            naive_calls += pools
+        elapsed = time.perf_counter() - started
+        return reader, naive_calls, elapsed
+
+    reader, naive_calls, elapsed = asyncio.run(run())
+    stats = reader.stats
+    print(f"Pools: {pools}, {active:.0%} change per round, {rounds} rounds, {latency * 1000:.0f} ms per call")
+    calls = stats["get_methods"] + stats["lt_batches"] + stats["lt_probes"] + rounds
+    print(f"get_pool_data runs: {stats['get_methods']:,} (re-running every pool: {naive_calls:,}); "
+          f"{stats['lt_unchanged']:,} skipped on unchanged lt")
+    print(f"toncenter calls: {calls:,} ({stats['lt_batches']:,} bulk lt requests); "
+          f"re-running every pool: {naive_calls:,}")
+    print(f"Time per refresh of all pools: {elapsed / rounds * 1000:.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the on-chain pool reserve reader against the fake")
+    parser.add_argument("--pools", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--active", type=float, default=0.05, help="fraction of pools traded per round")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per toncenter call")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    run_benchmark(args.pools, args.rounds, args.active, args.latency, args.seed)
+
+
+if __name__ == "__main__":
+    main()
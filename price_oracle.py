@@ -0,0 +1,404 @@
+"""
+Tuxido Mining Bot - Price Oracle
+Prices from several sources queried concurrently. A price is returned as
+soon as `quorum` sources agree within a tolerance of their median, so one
+slow source cannot delay it and one broken source cannot move it. Each
+source keeps latency, error and rejection stats, and every aggregated
+price is appended to a history file that doubles as a replay source
+
+    python price_oracle.py --rounds 200
+"""
+
+import json
+import time
+import random
+import asyncio
+import argparse
+import logging
+import statistics
+from typing import Callable, Dict, List, Optional, Sequence
+
+from http_client import get_session
+from rate_limiter import BACKGROUND, priority_context
+from runtime_config import config_store, ConfigSnapshot
+from storage_utils import append_bytes, compact_lines
+
+logger = logging.getLogger(__name__)
+
+TON_USD = "ton_usd"
+TUXIDO_TON = "tuxido_ton"
+
+COINGECKO_TON_URL = "https://api.coingecko.com/api/v3/simple/price?ids=the-open-network&vs_currencies=usd"
+HISTORY_KEEP_RECORDS = 10000
+
+
+class PriceSource:
+    """One way of reading one quantity; fetch() returns None when it has no price
+
+    Fallback sources are asked only when the live sources reach no quorum.
+    """
+
+    name = "source"
+    fallback = False
+
+    def __init__(self, quantity: str):
+        self.quantity = quantity
+
+    async def fetch(self) -> Optional[float]:
+        raise NotImplementedError
+
+
+class HttpJsonSource(PriceSource):
+    """A price read from a JSON document with extract(document)"""
+
+    def __init__(self, name: str, quantity: str, url: str, extract: Callable[[Dict], Optional[float]],
+                 params: Optional[Dict] = None):
+        super().__init__(quantity)
+        self.name = name
+        self.url = url
+        self.extract = extract
+        self.params = params
+
+    async def fetch(self) -> Optional[float]:
+        session = await get_session()
+        async with session.get(self.url, params=self.params,
+                               trace_request_ctx=priority_context(BACKGROUND)) as response:
+            if response.status != 200:
+                raise ConnectionError(f"HTTP {response.status}")
+            value = self.extract(await response.json())
+        return float(value) if value else None
+
+
+class PoolImpliedSource(PriceSource):
+    """Marginal price of base in quote from the deepest constant-product pool across venues"""
+
+    def __init__(self, name: str, quantity: str, router, base_token: str, quote_token: str,
+                 base_decimals: int = 9, quote_decimals: int = 9):
+        super().__init__(quantity)
+        self.name = name
+        self.router = router
+        self.base_token = base_token
+        self.quote_token = quote_token
+        self.scale = 10 ** (base_decimals - quote_decimals)
+
+    async def fetch(self) -> Optional[float]:
+        venues = await self.router.pools(self.base_token, self.quote_token)
+        if not venues:
+            return None
+        _, pool, direction = max(venues, key=lambda venue: venue[1].reserves(venue[2])[0])
+        reserve_base, reserve_quote = pool.reserves(direction)
+        return reserve_quote / reserve_base * self.scale
+
+
+class ReplaySource(PriceSource):
+    """The last price recorded in the local history, while it is younger than max_age"""
+
+    name = "replay"
+    fallback = True  # our own earlier output must not vote alongside live sources
+
+    def __init__(self, quantity: str, history: "PriceHistory", max_age: float = 900.0,
+                 clock: Callable[[], float] = time.time):
+        super().__init__(quantity)
+        self.history = history
+        self.max_age = max_age
+        self.clock = clock
+
+    async def fetch(self) -> Optional[float]:
+        record = self.history.last.get(self.quantity)
+        if record is None or self.clock() - record[0] > self.max_age:
+            return None
+        return record[1]
+
+
+class SimulatedSource(PriceSource):
+    """Benchmark source: a true price with noise, random latency and a chance of failing or lying"""
+
+    def __init__(self, name: str, quantity: str, truth: Callable[[], float], latency: float,
+                 jitter: float = 0.0, error_rate: float = 0.0, bias: float = 0.0, noise: float = 0.001,
+                 seed: Optional[int] = None):
+        super().__init__(quantity)
+        self.name = name
+        self.truth = truth
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.bias = bias
+        self.noise = noise
+        self.random = random.Random(seed)
+
+    async def fetch(self) -> Optional[float]:
+        await asyncio.sleep(self.latency + (self.random.expovariate(1 / self.jitter) if self.jitter else 0.0))
+        if self.random.random() < self.error_rate:
+            raise ConnectionError(f"{self.name} unavailable")
+        return self.truth() * (1 + self.bias) * (1 + self.random.gauss(0.0, self.noise))
+
+
+class PriceHistory:
+    """Append-only JSON-lines record of aggregated prices, with the latest one per quantity in memory"""
+
+    def __init__(self, path: str, keep_records: int = HISTORY_KEEP_RECORDS):
+        self.path = path
+        self.keep_records = keep_records
+        self.last: Dict[str, tuple] = {}  # quantity -> (timestamp, price)
+        self._appended = 0
+        try:
+            with open(path, "rb") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.last[record["q"]] = (record["t"], record["p"])
+        except FileNotFoundError:
+            pass
+
+    def record(self, quantity: str, price: float, timestamp: float):
+        self.last[quantity] = (timestamp, price)
+        append_bytes(self.path, json.dumps({"t": timestamp, "q": quantity, "p": price},
+                                           separators=(",", ":")).encode() + b"\n")
+        self._appended += 1
+        if self._appended >= self.keep_records:
+            compact_lines(self.path, self.keep_records)
+            self._appended = 0
+
+
+class PriceReading:
+    """An aggregated price and the sources behind it"""
+
+    __slots__ = ("quantity", "price", "sources", "rejected", "latency_ms", "timestamp")
+
+    def __init__(self, quantity: str, price: float, sources: List[str], rejected: List[str],
+                 latency_ms: float, timestamp: float):
+        self.quantity = quantity
+        self.price = price
+        self.sources = sources
+        self.rejected = rejected
+        self.latency_ms = latency_ms
+        self.timestamp = timestamp
+
+    def to_dict(self) -> Dict:
+        return {"quantity": self.quantity, "price": self.price, "sources": self.sources,
+                "rejected": self.rejected, "latency_ms": round(self.latency_ms, 1)}
+
+
+def agreeing(values: Dict[str, float], tolerance: float, quorum: int = 1) -> List[str]:
+    """Names of the largest group of values within tolerance (relative) of that group's median
+
+    Empty when that group has fewer than quorum members: no value is trusted on its own say-so.
+    """
+    best: List[str] = []
+    for center in values.values():
+        group = [name for name, value in values.items() if abs(value - center) <= tolerance * center]
+        if len(group) > len(best):
+            best = group
+    if len(best) > 2:
+        median = statistics.median(values[name] for name in best)
+        best = [name for name in best if abs(values[name] - median) <= tolerance * median]
+    return best if len(best) >= max(1, quorum) else []
+
+
+class PriceOracle:
+    """Fastest-quorum aggregation over concurrently queried sources
+
+    A query ends as soon as `quorum` sources agree within `tolerance`, when
+    every source has answered, or after `timeout`; the price is the median
+    of the largest agreeing group. Outstanding requests are cancelled.
+    Without a quorum the live values are discarded and the fallback sources
+    (the last agreed price) answer instead, or the price is None.
+    """
+
+    def __init__(self, sources: Sequence[PriceSource], quorum: int = 2, timeout: float = 2.0,
+                 tolerance: float = 0.02, history: Optional[PriceHistory] = None,
+                 clock: Callable[[], float] = time.time):
+        self.sources: Dict[str, List[PriceSource]] = {}
+        for source in sources:
+            self.sources.setdefault(source.quantity, []).append(source)
+        self.quorum = quorum
+        self.timeout = timeout
+        self.tolerance = tolerance
+        self.history = history
+        self.clock = clock
+        self.stats: Dict[str, Dict] = {
+            f"{s.quantity}/{s.name}": {"requests": 0, "answers": 0, "errors": 0, "cancelled": 0,
+                                       "rejected": 0, "latency_ms": 0.0}
+            for s in sources
+        }
+
+    async def _timed(self, source: PriceSource) -> Optional[float]:
+        stats = self.stats[f"{source.quantity}/{source.name}"]
+        stats["requests"] += 1
+        started = time.perf_counter()
+        try:
+            value = await source.fetch()
+        except asyncio.CancelledError:
+            stats["cancelled"] += 1
+            raise
+        except Exception as e:
+            stats["errors"] += 1
+            logger.debug("Price source %s failed: %s", source.name, e)
+            return None
+        elapsed = (time.perf_counter() - started) * 1000
+        stats["latency_ms"] += (elapsed - stats["latency_ms"]) * 0.2
+        if value is not None and value > 0:
+            stats["answers"] += 1
+            return value
+        return None
+
+    async def price(self, quantity: str) -> Optional[PriceReading]:
+        """Aggregated price, or None when no quorum agreed and no fallback answered"""
+        sources = [source for source in self.sources.get(quantity, []) if not source.fallback]
+        fallbacks = [source for source in self.sources.get(quantity, []) if source.fallback]
+        started = time.perf_counter()
+        tasks = {asyncio.ensure_future(self._timed(source)): source for source in sources}
+        values: Dict[str, float] = {}
+        group: List[str] = []
+        pending = set(tasks)
+        deadline = started + self.timeout
+        quorum = min(self.quorum, len(sources))
+        try:
+            while pending and len(group) < quorum:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    value = task.result()
+                    if value is not None:
+                        values[tasks[task].name] = value
+                group = agreeing(values, self.tolerance, quorum)
+        finally:
+            for task in pending:
+                task.cancel()
+        live = bool(group)
+        if not live:
+            if values:
+                # Disagreeing or too few answers: none of them can be told apart from a bad source
+                logger.debug("⚖️ %s: no %d sources agree among %s", quantity, quorum,
+                             ", ".join(f"{name}={value:.6g}" for name, value in values.items()))
+            values = {}
+            for source in fallbacks:
+                value = await self._timed(source)
+                if value is not None:
+                    values[source.name] = value
+                    group = [source.name]
+                    break
+        if not group:
+            return None
+
+        rejected = [name for name in values if name not in group]
+        for name in rejected:
+            self.stats[f"{quantity}/{name}"]["rejected"] += 1
+        reading = PriceReading(quantity, statistics.median(values[name] for name in group), group, rejected,
+                               (time.perf_counter() - started) * 1000, self.clock())
+        if rejected:
+            logger.debug("⚖️ %s: rejected %s against %.6g from %s", quantity,
+                         ", ".join(f"{name}={values[name]:.6g}" for name in rejected), reading.price,
+                         ", ".join(group))
+        if self.history is not None and live:
+            self.history.record(quantity, reading.price, reading.timestamp)
+        return reading
+
+    async def prices(self, quantities: Sequence[str]) -> Dict[str, Optional[PriceReading]]:
+        readings = await asyncio.gather(*(self.price(quantity) for quantity in quantities))
+        return dict(zip(quantities, readings))
+
+    def status(self) -> Dict:
+        return {name: dict(stats, latency_ms=round(stats["latency_ms"], 1)) for name, stats in self.stats.items()}
+
+
+def build_price_oracle(settings: ConfigSnapshot) -> PriceOracle:
+    """CoinGecko, StonFi and pool-implied sources for TON/USD and TUXIDO/TON, plus local replay"""
+    from dex import TON, StonFiAdapter, build_router
+    from stonfi_integration import StonFiIntegration
+
+    oracle_settings, stonfi_settings = settings.oracle, settings.stonfi
+    api = stonfi_settings.api_endpoint.rstrip("/")
+    stonfi = StonFiIntegration()
+    router = build_router(settings.dex, [StonFiAdapter(stonfi)])
+    history = PriceHistory(oracle_settings.history_path)
+
+    sources: List[PriceSource] = [
+        HttpJsonSource("coingecko", TON_USD, COINGECKO_TON_URL,
+                       lambda data: data.get("the-open-network", {}).get("usd")),
+        HttpJsonSource("stonfi", TON_USD, f"{api}/assets/{stonfi.pton_address}",
+                       lambda data: data.get("asset", {}).get("dex_usd_price")),
+        PoolImpliedSource("pool", TON_USD, router, TON, oracle_settings.usd_token, 9, oracle_settings.usd_decimals),
+        ReplaySource(TON_USD, history, oracle_settings.replay_max_age)
+    ]
+    jetton = stonfi_settings.jetton_address
+    if jetton:
+        sources += [
+            HttpJsonSource("stonfi", TUXIDO_TON, f"{api}/rates", lambda data: data.get("rate"),
+                           params={"base": jetton, "quote": "TON"}),
+            PoolImpliedSource("pool", TUXIDO_TON, router, jetton, TON),
+            ReplaySource(TUXIDO_TON, history, oracle_settings.replay_max_age)
+        ]
+    return PriceOracle(sources, quorum=oracle_settings.quorum, timeout=oracle_settings.timeout,
+                       tolerance=oracle_settings.tolerance_bps / 10000, history=history)
+
+
+_oracle: Optional[PriceOracle] = None
+
+
+def get_price_oracle() -> PriceOracle:
+    """Process-wide oracle for the configured sources"""
+    global _oracle
+    if _oracle is None:
+        _oracle = build_price_oracle(config_store.current)
+    return _oracle
+
+
+def run_benchmark(rounds: int, quorum: int, timeout: float, seed: int = 1):
+    truth = [2.5]
+    rng = random.Random(seed)
+
+    def current() -> float:
+        return truth[0]
+
+    # A fast, a typical and a slow honest source, one that lies by 30%, and one that often fails
+    sources = [
+        SimulatedSource("fast", TON_USD, current, 0.02, 0.02, seed=seed),
+        SimulatedSource("typical", TON_USD, current, 0.05, 0.10, seed=seed + 1),
+        SimulatedSource("slow", TON_USD, current, 0.20, 0.40, seed=seed + 2),
+        SimulatedSource("broken", TON_USD, current, 0.01, 0.01, bias=0.3, seed=seed + 3),
+        SimulatedSource("flaky", TON_USD, current, 0.05, 0.05, error_rate=0.3, seed=seed + 4),
+    ]
+    single = PriceOracle(sources[2:3], quorum=1, timeout=timeout)  # one slow source, as before
+    oracle = PriceOracle(sources, quorum=quorum, timeout=timeout)
+
+    async def run():
+        results = {"single": [], "oracle": []}
+        for _ in range(rounds):
+            truth[0] *= 1 + rng.gauss(0, 0.002)
+            for name, instance in (("single", single), ("oracle", oracle)):
+                reading = await instance.price(TON_USD)
+                error = abs(reading.price / truth[0] - 1) * 10000 if reading else None
+                results[name].append((reading.latency_ms if reading else timeout * 1000, error))
+        return results
+
+    results = asyncio.run(run())
+    print(f"Sources: fast, typical, slow, broken (+30%), flaky (30% errors); quorum {quorum}, "
+          f"deadline {timeout * 1000:.0f} ms")
+    for name, samples in results.items():
+        latencies = sorted(latency for latency, _ in samples)
+        errors = sorted(error for _, error in samples if error is not None)
+        print(f"{name:>7}: latency p50 {latencies[len(latencies) // 2]:.0f} ms, "
+              f"p99 {latencies[int(len(latencies) * 0.99)]:.0f} ms; "
+              f"error vs truth p50 {errors[len(errors) // 2]:.1f} bps, max {errors[-1]:.1f} bps; "
+              f"{rounds - len(errors)} without a price")
+    for name, stats in oracle.status().items():
+        print(f"  {name:<20} {stats}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fastest-quorum price aggregation")
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--quorum", type=int, default=2)
+    parser.add_argument("--timeout", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    run_benchmark(args.rounds, args.quorum, args.timeout, args.seed)
+
+
+if __name__ == "__main__":
+    main()
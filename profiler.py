@@ -0,0 +1,146 @@
+"""
+Tuxido Mining Bot - On-Demand Profiling
+Statistical stack sampling and tracemalloc snapshot diffs that can be run
+briefly against a live process (served by web_interface /debug endpoints)
+"""
+
+import os
+import sys
+import time
+import logging
+import threading
+import tracemalloc
+from collections import Counter
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 0.01   # 100 samples/s keeps overhead to a few percent of one core
+MIN_INTERVAL = 0.001
+MAX_DEPTH = 64
+
+# One profile or memory capture at a time; concurrent requests are refused
+_capture_lock = threading.Lock()
+
+
+class ProfilerBusy(RuntimeError):
+    """Another profile or memory capture is already running"""
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class StackSampler:
+    """Samples every thread's Python stack at a fixed interval"""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL, max_depth: int = MAX_DEPTH):
+        self.interval = max(MIN_INTERVAL, interval)
+        self.max_depth = max_depth
+        self.counts: Counter = Counter()
+        self.samples = 0
+
+    def sample_once(self):
+        own_id = threading.get_ident()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            # Thread name as the root keeps the event-loop thread(s) separable
+            stack.append(names.get(thread_id, f"thread-{thread_id}"))
+            self.counts[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def run(self, seconds: float) -> Counter:
+        """Sample for the given duration from the calling thread"""
+        deadline = time.monotonic() + seconds
+        next_sample = time.monotonic()
+        while next_sample < deadline:
+            self.sample_once()
+            next_sample += self.interval
+            delay = next_sample - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # Sampling fell behind; skip ahead instead of bursting
+                next_sample = time.monotonic()
+        return self.counts
+
+    def collapsed(self) -> str:
+        """Brendan Gregg collapsed-stack format, ready for flamegraph.pl or speedscope"""
+        return "\n".join(f"{stack} {count}" for stack, count in self.counts.most_common())
+
+
+def profile(seconds: float, interval: float = DEFAULT_INTERVAL) -> Dict:
+    """Run a stack profile of the whole process; raises ProfilerBusy if one is running"""
+    if not _capture_lock.acquire(blocking=False):
+        raise ProfilerBusy("a profile is already running")
+    try:
+        logger.info("🔬 Sampling stacks for %.0fs every %.1fms", seconds, interval * 1000)
+        sampler = StackSampler(interval)
+        started = time.monotonic()
+        cpu_started = time.process_time()
+        sampler.run(seconds)
+        return {
+            "collapsed": sampler.collapsed(),
+            "samples": sampler.samples,
+            "wall_s": time.monotonic() - started,
+            "process_cpu_s": time.process_time() - cpu_started
+        }
+    finally:
+        _capture_lock.release()
+
+
+def memory_diff(seconds: float, top: int = 25, frames: int = 1) -> Dict:
+    """Allocation growth over a window, grouped by the top allocating sites
+
+    tracemalloc is switched on only for the window unless it was already
+    tracing, so a live process pays the tracing overhead only briefly.
+    """
+    if not _capture_lock.acquire(blocking=False):
+        raise ProfilerBusy("a capture is already running")
+    started_here = not tracemalloc.is_tracing()
+    try:
+        if started_here:
+            tracemalloc.start(frames)
+        before = tracemalloc.take_snapshot()
+        time.sleep(seconds)
+        after = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+
+        key = "traceback" if frames > 1 else "lineno"
+        stats = after.compare_to(before, key)
+        return {
+            "window_s": seconds,
+            "traced_current_bytes": current,
+            "traced_peak_bytes": peak,
+            "tracemalloc_was_running": not started_here,
+            "top_allocators": [
+                {
+                    "where": [str(frame) for frame in stat.traceback],
+                    "size_diff_bytes": stat.size_diff,
+                    "size_bytes": stat.size,
+                    "count_diff": stat.count_diff,
+                    "count": stat.count
+                }
+                for stat in stats[:top]
+            ]
+        }
+    finally:
+        if started_here:
+            tracemalloc.stop()
+        _capture_lock.release()
+
+
+def rss_bytes() -> Optional[int]:
+    """Resident set size from /proc, or None where unavailable"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
@@ -0,0 +1,109 @@
+"""
+Tuxido Mining Bot - Profit Report Emitter
+Writes the profit report only when its content changes, atomically,
+with an optional compact stream for downstream consumers
+"""
+
+import os
+import json
+import hashlib
+import logging
+from typing import Dict, Optional
+
+from storage_utils import atomic_write_json, append_bytes, compact_lines
+
+logger = logging.getLogger(__name__)
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
+
+# Keys that change every cycle without changing the report's meaning
+VOLATILE_KEYS = ("timestamp",)
+
+STREAM_FORMATS = ("ndjson", "msgpack")
+
+
+class ProfitReportEmitter:
+    """Emit profit reports with write-on-change and atomic replace semantics"""
+
+    def __init__(self, path: str = "data/profit_report.json",
+                 stream_format: Optional[str] = None,
+                 stream_path: Optional[str] = None):
+        self.path = path
+        self.stream_format = stream_format if stream_format in STREAM_FORMATS else None
+        if stream_format and not self.stream_format:
+            logger.warning(f"Unknown profit report stream format: {stream_format}")
+        if self.stream_format == "msgpack" and not MSGPACK_AVAILABLE:
+            logger.warning("msgpack not installed, falling back to ndjson report stream")
+            self.stream_format = "ndjson"
+        if self.stream_format and not stream_path:
+            base, _ = os.path.splitext(path)
+            stream_path = f"{base}.{self.stream_format}"
+        self.stream_path = stream_path
+
+        self.last_digest = self._digest_existing()
+        self.stats = {"written": 0, "skipped": 0}
+        # Set by the resource governor when disk space runs low
+        self.stream_paused = False
+
+    @classmethod
+    def from_env(cls, path: str = "data/profit_report.json") -> "ProfitReportEmitter":
+        """Build an emitter configured from PROFIT_REPORT_STREAM / PROFIT_REPORT_STREAM_PATH"""
+        return cls(
+            path=path,
+            stream_format=os.getenv("PROFIT_REPORT_STREAM") or None,
+            stream_path=os.getenv("PROFIT_REPORT_STREAM_PATH") or None,
+        )
+
+    @staticmethod
+    def content_digest(report: Dict) -> str:
+        """Hash the report content, ignoring volatile keys such as the timestamp"""
+        stable = {k: v for k, v in report.items() if k not in VOLATILE_KEYS}
+        encoded = json.dumps(stable, sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.blake2b(encoded.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _digest_existing(self) -> Optional[str]:
+        """Seed the change detector from the report already on disk"""
+        try:
+            with open(self.path, "r") as f:
+                return self.content_digest(json.load(f))
+        except Exception:
+            return None
+
+    def emit(self, report: Dict) -> bool:
+        """Persist the report if its content changed. Returns True when written."""
+        digest = self.content_digest(report)
+        if digest == self.last_digest:
+            self.stats["skipped"] += 1
+            return False
+
+        atomic_write_json(self.path, report, indent=2)
+        if self.stream_format and not self.stream_paused:
+            self._append_stream(report)
+
+        self.last_digest = digest
+        self.stats["written"] += 1
+        return True
+
+    def compact_stream(self, keep_records: int = 1000) -> int:
+        """Drop all but the newest ndjson stream records; returns bytes freed"""
+        if self.stream_format != "ndjson":
+            return 0
+        freed = compact_lines(self.stream_path, keep_records)
+        if freed:
+            logger.info(f"🗜️ Compacted profit report stream to {keep_records} records ({freed} bytes freed)")
+        return freed
+
+    def _append_stream(self, report: Dict):
+        """Append one compact record to the downstream stream file"""
+        try:
+            if self.stream_format == "msgpack":
+                record = msgpack.packb(report, default=str, use_bin_type=True)
+            else:
+                record = (json.dumps(report, separators=(",", ":"), default=str) + "\n").encode("utf-8")
+            append_bytes(self.stream_path, record)
+        except Exception as e:
+            logger.error(f"Profit report stream write error: {e}")
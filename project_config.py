@@ -6,6 +6,19 @@ Integrates settings for both local and remote repositories
 import os
 from typing import Dict, Any
 
+
+def _block_rate() -> float:
+    """Target blocks per second from BLOCK_RATE, or 1 / MINING_DELAY for older setups"""
+    if os.getenv("BLOCK_RATE"):
+        name, rate = "BLOCK_RATE", float(os.getenv("BLOCK_RATE"))
+    else:
+        name, delay = "MINING_DELAY", float(os.getenv("MINING_DELAY", "0.5"))
+        rate = 1.0 / delay if delay > 0 else 0.0
+    if not 0 < rate < float("inf"):
+        raise ValueError(f"{name} must be a positive number, got {os.getenv(name)!r}")
+    return rate
+
+
 class ProjectConfig:
     """Unified configuration manager for Tuxido Mining Bot"""
 
@@ -27,11 +40,16 @@ class ProjectConfig:
 
             # Mining Configuration
             "mining": {
-                "min_hash_rate": int(os.getenv("MIN_HASH_RATE", "1")),
-                "max_hash_rate": int(os.getenv("MAX_HASH_RATE", "10")),
-                "log_interval": int(os.getenv("LOG_INTERVAL", "100")),
-                "mining_delay": float(os.getenv("MINING_DELAY", "1.0")),
-                "auto_optimize": os.getenv("AUTO_OPTIMIZE", "true").lower() == "true"
+                "min_hash_rate": int(os.getenv("MIN_HASH_RATE", "5")),
+                "max_hash_rate": int(os.getenv("MAX_HASH_RATE", "20")),
+                "log_interval": int(os.getenv("LOG_INTERVAL", "50")),
+                # Target blocks per second; MINING_DELAY (seconds per block) is still honoured
+                "block_rate": _block_rate(),
+                "pacing_policy": os.getenv("PACING_POLICY", "catch_up"),
+                "max_catch_up_ticks": int(os.getenv("MAX_CATCH_UP_TICKS", "5")),
+                "auto_optimize": os.getenv("AUTO_OPTIMIZE", "true").lower() == "true",
+                "dynamic_adjustment": os.getenv("DYNAMIC_ADJUSTMENT", "true").lower() == "true",
+                "profit_optimization": os.getenv("PROFIT_OPTIMIZATION", "true").lower() == "true"
             },
 
             # TON Blockchain Configuration
@@ -40,6 +58,7 @@ class ProjectConfig:
                 "wallet_address": os.getenv("TON_WALLET_ADDRESS", ""),
                 "private_key": os.getenv("TON_PRIVATE_KEY", ""),
                 "rpc_endpoint": os.getenv("TON_RPC_ENDPOINT", ""),
+                "toncenter_api_key": os.getenv("TONCENTER_API_KEY", ""),
                 "explorer_url": "https://tonscan.org"
             },
 
@@ -63,21 +82,25 @@ class ProjectConfig:
 
             # P2E Configuration
             "p2e": {
-                "rewards_per_block": int(os.getenv("REWARDS_PER_BLOCK", "10")),
-                "bonus_multiplier": float(os.getenv("BONUS_MULTIPLIER", "1.0")),
-                "daily_limit": int(os.getenv("DAILY_LIMIT", "10000")),
-                "streak_bonus": float(os.getenv("STREAK_BONUS", "1.1")),
-                "achievement_system": os.getenv("ACHIEVEMENT_SYSTEM", "true").lower() == "true"
+                "rewards_per_block": int(os.getenv("REWARDS_PER_BLOCK", "15")),
+                "bonus_multiplier": float(os.getenv("BONUS_MULTIPLIER", "1.5")),
+                "daily_limit": int(os.getenv("DAILY_LIMIT", "15000")),
+                "streak_bonus": float(os.getenv("STREAK_BONUS", "1.2")),
+                "efficiency_bonus": float(os.getenv("EFFICIENCY_BONUS", "1.3")),
+                "profit_sharing": os.getenv("PROFIT_SHARING", "true").lower() == "true",
+                "achievement_system": os.getenv("ACHIEVEMENT_SYSTEM", "true").lower() == "true",
+                "timezone": os.getenv("MINING_TIMEZONE", "UTC"),
+                "day_start_hour": int(os.getenv("MINING_DAY_START_HOUR", "0"))
             },
 
             # AI Assistant Configuration
             "ai": {
                 "enabled": os.getenv("OPENAI_API_KEY", "") != "",
-                "model": os.getenv("AI_MODEL", "gpt-4"),
-                "max_tokens": int(os.getenv("AI_MAX_TOKENS", "2000")),
-                "temperature": float(os.getenv("AI_TEMPERATURE", "0.3")),
-                "upgrade_interval": int(os.getenv("AI_UPGRADE_INTERVAL", "1800")),
-                "monitoring_interval": int(os.getenv("AI_MONITORING_INTERVAL", "120")),
+                "model": os.getenv("AI_MODEL", "gpt-3.5-turbo"),
+                "max_tokens": int(os.getenv("AI_MAX_TOKENS", "3000")),
+                "temperature": float(os.getenv("AI_TEMPERATURE", "0.2")),
+                "upgrade_interval": int(os.getenv("AI_UPGRADE_INTERVAL", "900")),
+                "monitoring_interval": int(os.getenv("AI_MONITORING_INTERVAL", "60")),
                 "auto_commit": os.getenv("AI_AUTO_COMMIT", "true").lower() == "true",
                 "optimization_enabled": os.getenv("AI_OPTIMIZATION", "true").lower() == "true"
             },
@@ -98,12 +121,138 @@ class ProjectConfig:
                 "disk_space_threshold_mb": int(os.getenv("DISK_THRESHOLD_MB", "100"))
             },
 
+            # Startup Configuration
+            "startup": {
+                "fast_start": os.getenv("FAST_START", "true").lower() == "true",
+                "warm_cache_path": os.getenv("WARM_CACHE_PATH", "data/stonfi_warm_cache.json")
+            },
+
+            # Per-Block History (ring buffer + disk spill)
+            "history": {
+                "capacity": int(os.getenv("BLOCK_HISTORY_CAPACITY", "7200")),
+                "fleet_capacity": int(os.getenv("FLEET_BLOCK_HISTORY_CAPACITY", "0")),
+                "segment_size": int(os.getenv("BLOCK_HISTORY_SEGMENT", "600")),
+                "spill_enabled": os.getenv("BLOCK_HISTORY_SPILL", "true").lower() == "true",
+                "max_spill_mb": int(os.getenv("BLOCK_HISTORY_MAX_SPILL_MB", "64"))
+            },
+
+            # Daily Quota Coordination (multi-node)
+            "quota": {
+                "enabled": os.getenv("QUOTA_ENABLED", "false").lower() == "true",
+                "backend": os.getenv("QUOTA_BACKEND", "sqlite"),
+                "sqlite_path": os.getenv("QUOTA_DB", "data/quota.db"),
+                "coordinator_host": os.getenv("QUOTA_HOST", "127.0.0.1"),
+                "coordinator_port": int(os.getenv("QUOTA_PORT", "8765")),
+                "node_id": os.getenv("QUOTA_NODE_ID", ""),
+                "mined_chunk": int(os.getenv("QUOTA_MINED_CHUNK", "500")),
+                "transaction_chunk": int(os.getenv("QUOTA_TX_CHUNK", "20")),
+                "lease_ttl": float(os.getenv("QUOTA_LEASE_TTL", "300"))
+            },
+
+            # Web Dashboard & Live Debugging
+            "debug": {
+                "web_interface_enabled": os.getenv("WEB_INTERFACE_ENABLED", "false").lower() == "true",
+                "web_host": os.getenv("WEB_HOST", "0.0.0.0"),
+                "web_port": int(os.getenv("WEB_PORT", "5000")),
+                "debug_endpoints": os.getenv("DEBUG_ENDPOINTS", "false").lower() == "true",
+                "max_profile_seconds": int(os.getenv("MAX_PROFILE_SECONDS", "60"))
+            },
+
+            # Block-rate Controller (auto-optimization)
+            "control": {
+                "controller": os.getenv("CONTROLLER", "pid"),
+                "interval": int(os.getenv("CONTROL_INTERVAL", "60")),
+                "window": os.getenv("CONTROL_WINDOW", "15m"),
+                "deadline_hours": float(os.getenv("CONTROL_DEADLINE_HOURS", "6")),
+                "headroom": float(os.getenv("CONTROL_HEADROOM", "0.1")),
+                "min_block_rate": float(os.getenv("MIN_BLOCK_RATE", "1.0")),
+                "max_block_rate": float(os.getenv("MAX_BLOCK_RATE", "3.3")),
+                "max_step": float(os.getenv("CONTROL_MAX_STEP", "0.25")),
+                "kp": float(os.getenv("CONTROL_KP", "0.5")),
+                "ki": float(os.getenv("CONTROL_KI", "0.0005")),
+                "kd": float(os.getenv("CONTROL_KD", "0")),
+                "exploration": float(os.getenv("CONTROL_EXPLORATION", "0.3"))
+            },
+
+            # Outbound Wallet Transactions
+            "wallet": {
+                "enabled": os.getenv("WALLET_SENDER_ENABLED", "false").lower() == "true",
+                "version": os.getenv("WALLET_VERSION", "v4r2"),
+                "subwallet_id": int(os.getenv("WALLET_SUBWALLET_ID", "698983191")),
+                "max_messages": int(os.getenv("WALLET_MAX_MESSAGES", "4")),
+                "message_ttl": int(os.getenv("WALLET_MESSAGE_TTL", "60")),
+                "poll_interval": float(os.getenv("WALLET_POLL_INTERVAL", "3")),
+                "journal_path": os.getenv("WALLET_JOURNAL", "data/wallet_journal.jsonl")
+            },
+
+            # Bulk Jetton Airdrops
+            "airdrop": {
+                "decimals": int(os.getenv("AIRDROP_DECIMALS", "9")),
+                "transfer_value": int(os.getenv("AIRDROP_TRANSFER_VALUE", "50000000")),
+                "forward_amount": int(os.getenv("AIRDROP_FORWARD_AMOUNT", "0")),
+                "window": int(os.getenv("AIRDROP_WINDOW", "64")),
+                "checkpoint_dir": os.getenv("AIRDROP_CHECKPOINT_DIR", "data"),
+                "report_interval": float(os.getenv("AIRDROP_REPORT_INTERVAL", "30"))
+            },
+
+            # Arbitrage Scanner (profit is measured in base_token, pTON by default)
+            "arbitrage": {
+                "base_token": os.getenv("ARBITRAGE_BASE_TOKEN", "EQCM3B12QK1e4yZSf8GtBRT0aLMNyEsBc_DhVfRRtOEffLez"),
+                "max_hops": int(os.getenv("ARBITRAGE_MAX_HOPS", "3")),
+                "min_profit_bps": float(os.getenv("ARBITRAGE_MIN_PROFIT_BPS", "20")),
+                "gas_per_hop": int(os.getenv("ARBITRAGE_GAS_PER_HOP", "200000000"))
+            },
+
+            # Sliced Execution of auto-trade sells (impact budget per slice, schedule window in seconds)
+            "execution": {
+                "enabled": os.getenv("EXECUTION_ENABLED", "true").lower() == "true",
+                "impact_bps": float(os.getenv("EXECUTION_IMPACT_BPS", "50")),
+                "window": float(os.getenv("EXECUTION_WINDOW", "3600")),
+                "interval": float(os.getenv("EXECUTION_INTERVAL", "60")),
+                "slippage_bps": float(os.getenv("EXECUTION_SLIPPAGE_BPS", "100")),
+                "max_price_drop_bps": float(os.getenv("EXECUTION_MAX_PRICE_DROP_BPS", "1000")),
+                "slice_timeout": float(os.getenv("EXECUTION_SLICE_TIMEOUT", "600")),
+                "journal_path": os.getenv("EXECUTION_JOURNAL", "data/execution_journal.jsonl")
+            },
+
+            # DEX Routing (pool snapshots reused for quote_ttl seconds, venues queried under a deadline)
+            "dex": {
+                "quote_ttl": float(os.getenv("DEX_QUOTE_TTL", "2")),
+                "concurrency": int(os.getenv("DEX_CONCURRENCY", "4")),
+                "timeout": float(os.getenv("DEX_TIMEOUT", "1.5")),
+                "onchain_reserves": os.getenv("DEX_ONCHAIN_RESERVES", "true").lower() == "true"
+            },
+
+            # Price Oracle (a price needs quorum sources agreeing within tolerance_bps)
+            "oracle": {
+                "quorum": int(os.getenv("ORACLE_QUORUM", "2")),
+                "timeout": float(os.getenv("ORACLE_TIMEOUT", "2")),
+                "tolerance_bps": float(os.getenv("ORACLE_TOLERANCE_BPS", "200")),
+                "usd_token": os.getenv("ORACLE_USD_TOKEN", "EQCxE6mUtQJKFnGfaROTKOt1lZbDiiX1kCixRv7Nw2Id_sDs"),
+                "usd_decimals": int(os.getenv("ORACLE_USD_DECIMALS", "6")),
+                "history_path": os.getenv("ORACLE_HISTORY", "data/price_history.jsonl"),
+                "replay_max_age": float(os.getenv("ORACLE_REPLAY_MAX_AGE", "900"))
+            },
+
+            # Jetton Wallet Watcher (polls every min_interval, backing off to max_interval while idle)
+            "jetton_watch": {
+                "enabled": os.getenv("JETTON_WATCH_ENABLED", "true").lower() == "true",
+                "min_interval": float(os.getenv("JETTON_WATCH_MIN_INTERVAL", "5")),
+                "max_interval": float(os.getenv("JETTON_WATCH_MAX_INTERVAL", "120")),
+                "backoff": float(os.getenv("JETTON_WATCH_BACKOFF", "2")),
+                "store_path": os.getenv("JETTON_WATCH_STORE", "data/jetton_transfers.jsonl"),
+                "keep_transfers": int(os.getenv("JETTON_WATCH_KEEP", "2000"))
+            },
+
             # Logging Configuration
             "logging": {
                 "level": os.getenv("LOG_LEVEL", "INFO"),
                 "file_enabled": os.getenv("LOG_FILE_ENABLED", "true").lower() == "true",
                 "max_log_size_mb": int(os.getenv("MAX_LOG_SIZE_MB", "10")),
-                "backup_count": int(os.getenv("LOG_BACKUP_COUNT", "5"))
+                "backup_count": int(os.getenv("LOG_BACKUP_COUNT", "5")),
+                "file_path": os.getenv("LOG_FILE", "tuxido_bot.log"),
+                "compress_backups": os.getenv("LOG_COMPRESS", "true").lower() == "true",
+                "block_sample_rate": int(os.getenv("LOG_BLOCK_SAMPLE_RATE", "1"))
             }
         }
 
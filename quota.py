@@ -0,0 +1,464 @@
+#!/usr/bin/env python3
+"""
+Tuxido Mining Bot - Distributed Daily Quota
+Lease-based sharing of daily budgets (mined tokens, transactions) between
+nodes mining the same wallet. Nodes claim budget in chunks, renew their
+leases, and hand back unused budget on shutdown.
+
+Backends:
+  SQLiteQuotaBackend  - single host, file-locked via SQLite transactions
+  RemoteQuotaBackend  - talks to a QuotaCoordinatorServer over TCP
+
+Usage: python quota.py serve [--host 0.0.0.0] [--port 8765] [--db data/quota.db]
+"""
+
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import asyncio
+import logging
+import argparse
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS quota_budget (
+    resource TEXT NOT NULL,
+    day TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    granted INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (resource, day)
+);
+CREATE TABLE IF NOT EXISTS quota_lease (
+    lease_id TEXT PRIMARY KEY,
+    resource TEXT NOT NULL,
+    day TEXT NOT NULL,
+    node_id TEXT NOT NULL,
+    amount INTEGER NOT NULL,
+    used INTEGER NOT NULL DEFAULT 0,
+    expires_at REAL NOT NULL,
+    released INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS quota_lease_open ON quota_lease (released, expires_at);
+"""
+
+
+def default_node_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class SQLiteQuotaBackend:
+    """Quota ledger in a SQLite file; safe across processes on one host"""
+
+    def __init__(self, path: str = "data/quota.db"):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _reclaim_expired(self, conn: sqlite3.Connection, now: float):
+        """Return the unused part of expired leases to their budgets"""
+        expired = conn.execute(
+            "SELECT lease_id, resource, day, amount, used FROM quota_lease "
+            "WHERE released = 0 AND expires_at < ?", (now,)
+        ).fetchall()
+        for lease_id, resource, day, amount, used in expired:
+            conn.execute(
+                "UPDATE quota_budget SET granted = granted - ? WHERE resource = ? AND day = ?",
+                (amount - used, resource, day)
+            )
+            conn.execute("UPDATE quota_lease SET released = 1 WHERE lease_id = ?", (lease_id,))
+        if expired:
+            logger.info("♻️ Reclaimed %d expired quota leases", len(expired))
+
+    def claim_sync(self, resource: str, day: str, node_id: str, amount: int,
+                   total: int, ttl: float) -> Dict:
+        now = time.time()
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            self._reclaim_expired(conn, now)
+            conn.execute(
+                "INSERT INTO quota_budget (resource, day, total, granted) VALUES (?, ?, ?, 0) "
+                "ON CONFLICT (resource, day) DO UPDATE SET total = excluded.total",
+                (resource, day, total)
+            )
+            granted_total, = conn.execute(
+                "SELECT granted FROM quota_budget WHERE resource = ? AND day = ?", (resource, day)
+            ).fetchone()
+            grant = max(0, min(amount, total - granted_total))
+            lease_id = None
+            if grant > 0:
+                lease_id = uuid.uuid4().hex
+                conn.execute(
+                    "INSERT INTO quota_lease (lease_id, resource, day, node_id, amount, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (lease_id, resource, day, node_id, grant, now + ttl)
+                )
+                conn.execute(
+                    "UPDATE quota_budget SET granted = granted + ? WHERE resource = ? AND day = ?",
+                    (grant, resource, day)
+                )
+            conn.execute("COMMIT")
+            return {"lease_id": lease_id, "amount": grant, "expires_at": now + ttl,
+                    "remaining_budget": total - granted_total - grant}
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def renew_sync(self, lease_id: str, used: int, ttl: float) -> Dict:
+        conn = self._connect()
+        try:
+            cursor = conn.execute(
+                "UPDATE quota_lease SET used = MIN(amount, ?), expires_at = ? "
+                "WHERE lease_id = ? AND released = 0",
+                (used, time.time() + ttl, lease_id)
+            )
+            return {"ok": cursor.rowcount == 1}
+        finally:
+            conn.close()
+
+    def release_sync(self, lease_id: str, used: int) -> Dict:
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT resource, day, amount FROM quota_lease WHERE lease_id = ? AND released = 0",
+                (lease_id,)
+            ).fetchone()
+            returned = 0
+            if row:
+                resource, day, amount = row
+                used = max(0, min(used, amount))
+                returned = amount - used
+                conn.execute(
+                    "UPDATE quota_lease SET used = ?, released = 1 WHERE lease_id = ?", (used, lease_id)
+                )
+                conn.execute(
+                    "UPDATE quota_budget SET granted = granted - ? WHERE resource = ? AND day = ?",
+                    (returned, resource, day)
+                )
+            conn.execute("COMMIT")
+            return {"ok": row is not None, "returned": returned}
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def status_sync(self, resource: str, day: str) -> Dict:
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT total, granted FROM quota_budget WHERE resource = ? AND day = ?", (resource, day)
+            ).fetchone()
+            leases = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(used), 0) FROM quota_lease "
+                "WHERE resource = ? AND day = ? AND released = 0", (resource, day)
+            ).fetchone()
+            total, granted = row if row else (0, 0)
+            return {"total": total, "granted": granted, "open_leases": leases[0], "reported_used": leases[1]}
+        finally:
+            conn.close()
+
+    async def claim(self, *args) -> Dict:
+        return await asyncio.to_thread(self.claim_sync, *args)
+
+    async def renew(self, *args) -> Dict:
+        return await asyncio.to_thread(self.renew_sync, *args)
+
+    async def release(self, *args) -> Dict:
+        return await asyncio.to_thread(self.release_sync, *args)
+
+    async def status(self, *args) -> Dict:
+        return await asyncio.to_thread(self.status_sync, *args)
+
+
+class QuotaCoordinatorServer:
+    """JSON-lines TCP front end for a SQLiteQuotaBackend"""
+
+    OPERATIONS = {"claim", "renew", "release", "status"}
+
+    def __init__(self, backend: SQLiteQuotaBackend, host: str = "127.0.0.1", port: int = 8765):
+        self.backend = backend
+        self.host = host
+        self.port = port
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("🧮 Quota coordinator listening on %s:%d", self.host, self.port)
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    op = request.pop("op")
+                    if op not in self.OPERATIONS:
+                        raise ValueError(f"unknown op {op}")
+                    result = await getattr(self.backend, op)(*request["args"])
+                    response = {"ok": True, "result": result}
+                except Exception as e:
+                    response = {"ok": False, "error": str(e)}
+                writer.write((json.dumps(response) + "\n").encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+class RemoteQuotaBackend:
+    """Client for QuotaCoordinatorServer with the same interface as SQLiteQuotaBackend"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8765, timeout: float = 10.0):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._reader = None
+        self._writer = None
+        self._lock = asyncio.Lock()
+
+    async def _call(self, op: str, *args) -> Dict:
+        async with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._writer is None or self._writer.is_closing():
+                        self._reader, self._writer = await asyncio.wait_for(
+                            asyncio.open_connection(self.host, self.port), self.timeout
+                        )
+                    self._writer.write((json.dumps({"op": op, "args": list(args)}) + "\n").encode())
+                    await self._writer.drain()
+                    line = await asyncio.wait_for(self._reader.readline(), self.timeout)
+                    if not line:
+                        raise ConnectionError("coordinator closed the connection")
+                    response = json.loads(line)
+                    if not response["ok"]:
+                        raise RuntimeError(response["error"])
+                    return response["result"]
+                except (ConnectionError, OSError, asyncio.TimeoutError):
+                    self._writer = None
+                    if attempt:
+                        raise
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    async def claim(self, *args) -> Dict:
+        return await self._call("claim", *args)
+
+    async def renew(self, *args) -> Dict:
+        return await self._call("renew", *args)
+
+    async def release(self, *args) -> Dict:
+        return await self._call("release", *args)
+
+    async def status(self, *args) -> Dict:
+        return await self._call("status", *args)
+
+
+class ChunkedQuota:
+    """Local view of one daily budget, refilled chunk by chunk from a backend
+
+    Consumption is a local, synchronous operation; the backend is only
+    contacted when a chunk runs low (prefetch) or runs out.
+    """
+
+    def __init__(self, backend, resource: str, chunk_size: int,
+                 total_provider: Callable[[], int], day_provider: Callable[[], str],
+                 node_id: Optional[str] = None, lease_ttl: float = 300.0,
+                 low_watermark: float = 0.25, retry_interval: float = 60.0):
+        self.backend = backend
+        self.resource = resource
+        self.chunk_size = max(1, int(chunk_size))
+        self.total_provider = total_provider
+        self.day_provider = day_provider
+        self.node_id = node_id or default_node_id()
+        self.lease_ttl = lease_ttl
+        self.low_watermark = max(1, int(self.chunk_size * low_watermark))
+        self.retry_interval = retry_interval
+
+        self.day = day_provider()
+        self.leases: List[Dict] = []
+        # Other nodes may hand budget back, so an empty pool is re-polled after retry_interval
+        self._exhausted_until = 0.0
+        self._claiming: Optional[asyncio.Task] = None
+        self._renewer: Optional[asyncio.Task] = None
+        self.stats = {"claims": 0, "granted": 0, "consumed": 0, "denied": 0}
+
+    @property
+    def remaining(self) -> int:
+        return sum(lease["amount"] - lease["used"] for lease in self.leases)
+
+    @property
+    def exhausted(self) -> bool:
+        """True while today's shared budget is used up and nothing is held locally"""
+        self._check_day()
+        return not self.leases and time.monotonic() < self._exhausted_until
+
+    def consume_up_to(self, amount: int) -> int:
+        """Take up to amount from local leases without waiting; returns what was granted"""
+        self._check_day()
+        taken = 0
+        for lease in self.leases:
+            if taken >= amount:
+                break
+            take = min(amount - taken, lease["amount"] - lease["used"])
+            lease["used"] += take
+            taken += take
+        self.stats["consumed"] += taken
+        self._retire_spent_leases()
+        if self.remaining < self.low_watermark:
+            self._prefetch()
+        return taken
+
+    def try_consume(self, amount: int = 1) -> bool:
+        """All-or-nothing local consumption; schedules a refill when short"""
+        self._check_day()
+        if self.remaining < amount:
+            self.stats["denied"] += 1
+            self._prefetch()
+            return False
+        self.consume_up_to(amount)
+        return True
+
+    async def ensure_available(self) -> bool:
+        """Make sure some budget is held locally, claiming a chunk if needed"""
+        self._check_day()
+        if self.remaining > 0:
+            return True
+        if self.exhausted:
+            return False
+        await self._prefetch()
+        return self.remaining > 0
+
+    def _prefetch(self) -> asyncio.Future:
+        if time.monotonic() < self._exhausted_until:
+            return asyncio.ensure_future(asyncio.sleep(0))
+        if self._claiming is None or self._claiming.done():
+            self._claiming = asyncio.ensure_future(self._claim())
+        return self._claiming
+
+    async def _claim(self):
+        day = self.day
+        try:
+            result = await self.backend.claim(
+                self.resource, day, self.node_id, self.chunk_size,
+                int(self.total_provider()), self.lease_ttl
+            )
+        except Exception as e:
+            logger.error("Quota claim for %s failed: %s", self.resource, e)
+            return
+        self.stats["claims"] += 1
+        if day != self.day:
+            # The day rolled over while claiming; hand the stale lease straight back
+            if result.get("lease_id"):
+                await self._release_lease({"lease_id": result["lease_id"], "used": 0})
+            return
+        if not result.get("lease_id"):
+            self._exhausted_until = time.monotonic() + self.retry_interval
+            logger.info("📉 Daily %s budget exhausted across nodes", self.resource)
+            return
+        self.leases.append({"lease_id": result["lease_id"], "amount": result["amount"], "used": 0})
+        self.stats["granted"] += result["amount"]
+        if self._renewer is None or self._renewer.done():
+            self._renewer = asyncio.create_task(self._renew_loop())
+
+    def _retire_spent_leases(self):
+        spent = [lease for lease in self.leases if lease["used"] >= lease["amount"]]
+        for lease in spent:
+            self.leases.remove(lease)
+            asyncio.ensure_future(self._release_lease(lease))
+
+    async def _release_lease(self, lease: Dict):
+        try:
+            await self.backend.release(lease["lease_id"], lease["used"])
+        except Exception as e:
+            logger.error("Quota lease release failed: %s", e)
+
+    async def _renew_loop(self):
+        """Keep held leases alive and report usage to the coordinator"""
+        while self.leases:
+            await asyncio.sleep(self.lease_ttl / 3)
+            for lease in list(self.leases):
+                try:
+                    result = await self.backend.renew(lease["lease_id"], lease["used"], self.lease_ttl)
+                except Exception as e:
+                    logger.error("Quota lease renew failed: %s", e)
+                    continue
+                if not result.get("ok") and lease in self.leases:
+                    # The coordinator already reclaimed it; stop spending it
+                    logger.warning("Quota lease %s expired before renewal", lease["lease_id"][:8])
+                    self.leases.remove(lease)
+
+    def _check_day(self):
+        """On a new mining day, hand yesterday's leases back and start over"""
+        today = self.day_provider()
+        if today == self.day:
+            return
+        self.day = today
+        self._exhausted_until = 0.0
+        if self.leases:
+            asyncio.ensure_future(self.release_all())
+
+    async def release_all(self):
+        """Return every unused unit to the shared budget"""
+        leases, self.leases = self.leases, []
+        if self._renewer:
+            self._renewer.cancel()
+            self._renewer = None
+        await asyncio.gather(*(self._release_lease(lease) for lease in leases))
+
+
+def build_quota_backend(quota_settings):
+    """Backend selected by the quota config section"""
+    if quota_settings.backend == "remote":
+        return RemoteQuotaBackend(quota_settings.coordinator_host, quota_settings.coordinator_port)
+    return SQLiteQuotaBackend(quota_settings.sqlite_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tuxido daily quota coordinator")
+    parser.add_argument("command", choices=["serve"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--db", default="data/quota.db")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    server = QuotaCoordinatorServer(SQLiteQuotaBackend(args.db), args.host, args.port)
+    asyncio.run(server.serve_forever())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+Tuxido Mining Bot - Outbound Rate Limiter
+Per-host token buckets enforcing security.api_rate_limit for every request
+made through the shared HTTP session, with priority classes and limits that
+back off on 429 / Retry-After and recover gradually
+"""
+
+import time
+import heapq
+import asyncio
+import logging
+import itertools
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from lazy_imports import lazy_import
+from runtime_config import config_store
+
+aiohttp = lazy_import("aiohttp")
+
+logger = logging.getLogger(__name__)
+
+# Priority classes; lower values are served first
+CRITICAL = 0    # trade execution and swap estimates
+NORMAL = 1      # mining-path market data, notifications
+BACKGROUND = 2  # dashboards, reports, AI assistant refreshes
+PRIORITY_NAMES = {CRITICAL: "critical", NORMAL: "normal", BACKGROUND: "background"}
+
+# Share of each bucket that background requests may not spend, kept for trades
+BACKGROUND_RESERVE = 0.2
+# Recovery step after a successful response, as a share of the configured rate
+RECOVERY_STEP = 0.05
+# Lowest rate a throttled host is backed off to, as a share of the configured rate
+MIN_RATE_FRACTION = 0.05
+THROTTLE_STATUSES = (429, 503)
+
+
+def priority_context(priority: int) -> Dict:
+    """trace_request_ctx for aiohttp calls: session.get(url, trace_request_ctx=priority_context(CRITICAL))"""
+    return {"priority": priority}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class HostBucket:
+    """Token bucket for one upstream host with a priority-ordered wait queue"""
+
+    def __init__(self, host: str, rate_per_minute: float, burst: Optional[int] = None,
+                 clock=time.monotonic):
+        self.host = host
+        self.clock = clock
+        self.configured_rate = rate_per_minute / 60.0
+        self.rate = self.configured_rate
+        self.capacity = float(burst or max(1, int(rate_per_minute / 6)))
+        self.tokens = self.capacity
+        self.updated = clock()
+        self.blocked_until = 0.0
+
+        self._waiters = []
+        self._sequence = itertools.count()
+        self._pump_task: Optional[asyncio.Task] = None
+
+        self.granted = {name: 0 for name in PRIORITY_NAMES.values()}
+        self.throttled = 0
+        self.total_wait = 0.0
+        self.max_queue_depth = 0
+
+    def set_configured_rate(self, rate_per_minute: float):
+        """Apply a new configured limit; an active backoff keeps its relative level"""
+        new_rate = rate_per_minute / 60.0
+        if self.configured_rate > 0:
+            self.rate = self.rate * new_rate / self.configured_rate
+        self.configured_rate = new_rate
+        self.capacity = float(max(1, int(rate_per_minute / 6)))
+        self.tokens = min(self.tokens, self.capacity)
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _needed(self, priority: int) -> float:
+        if priority >= BACKGROUND:
+            return 1.0 + self.capacity * BACKGROUND_RESERVE
+        return 1.0
+
+    def _delay_for(self, priority: int, now: float) -> float:
+        """Seconds until a request of this priority may be sent"""
+        delay = max(0.0, self.blocked_until - now)
+        shortfall = self._needed(priority) - self.tokens
+        if shortfall > 0:
+            delay = max(delay, shortfall / self.rate)
+        return delay
+
+    async def acquire(self, priority: int = NORMAL):
+        """Wait for a token; higher-priority waiters are always served first"""
+        now = self.clock()
+        self._refill(now)
+        if not self._waiters and self._delay_for(priority, now) == 0:
+            self._grant(priority, 0.0)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), now, future))
+        self.max_queue_depth = max(self.max_queue_depth, len(self._waiters))
+        if self._pump_task is None or self._pump_task.done():
+            self._pump_task = asyncio.create_task(self._pump())
+        await future
+
+    def _grant(self, priority: int, waited: float):
+        self.tokens -= 1.0
+        self.granted[PRIORITY_NAMES.get(priority, "background")] += 1
+        self.total_wait += waited
+
+    async def _pump(self):
+        """Release queued requests in priority order as tokens become available"""
+        while self._waiters:
+            priority, _, enqueued, future = self._waiters[0]
+            if future.done():
+                # Caller was cancelled while waiting
+                heapq.heappop(self._waiters)
+                continue
+            now = self.clock()
+            self._refill(now)
+            delay = self._delay_for(priority, now)
+            if delay > 0:
+                # A more urgent request arriving meanwhile is picked up on the next pass
+                await asyncio.sleep(min(delay, 1.0))
+                continue
+            heapq.heappop(self._waiters)
+            self._grant(priority, now - enqueued)
+            future.set_result(None)
+
+    def observe(self, status: int, retry_after: Optional[float] = None):
+        """Adapt the rate: halve and pause on throttling, creep back up on success"""
+        now = self.clock()
+        if status in THROTTLE_STATUSES:
+            self.throttled += 1
+            self.rate = max(self.configured_rate * MIN_RATE_FRACTION, self.rate / 2)
+            pause = retry_after if retry_after is not None else 1.0 / self.rate
+            self.blocked_until = max(self.blocked_until, now + pause)
+            self._refill(now)
+            self.tokens = min(self.tokens, 0.0)
+            logger.warning(
+                "🚦 %s throttled us (%d); pausing %.1fs, limit now %.1f/min",
+                self.host, status, pause, self.rate * 60
+            )
+        elif status < 400 and self.rate < self.configured_rate:
+            self.rate = min(self.configured_rate, self.rate + self.configured_rate * RECOVERY_STEP)
+
+    def queue_depth(self) -> Dict[str, int]:
+        depth = {name: 0 for name in PRIORITY_NAMES.values()}
+        for priority, _, _, future in self._waiters:
+            if not future.done():
+                depth[PRIORITY_NAMES.get(priority, "background")] += 1
+        return depth
+
+    def metrics(self) -> Dict:
+        granted = sum(self.granted.values())
+        return {
+            "limit_per_min": self.configured_rate * 60,
+            "effective_per_min": self.rate * 60,
+            "tokens": round(self.tokens, 2),
+            "blocked_for_s": max(0.0, self.blocked_until - self.clock()),
+            "queue_depth": self.queue_depth(),
+            "max_queue_depth": self.max_queue_depth,
+            "granted": dict(self.granted),
+            "throttled": self.throttled,
+            "avg_wait_s": self.total_wait / granted if granted else 0.0
+        }
+
+
+class RateLimiter:
+    """Shared limiter keyed by upstream host"""
+
+    def __init__(self, rate_per_minute: float, host_limits: Optional[Dict[str, float]] = None):
+        self.rate_per_minute = rate_per_minute
+        self.host_limits = dict(host_limits or {})
+        self.buckets: Dict[str, HostBucket] = {}
+
+    def bucket(self, host: str) -> HostBucket:
+        bucket = self.buckets.get(host)
+        if bucket is None:
+            bucket = self.buckets[host] = HostBucket(host, self.host_limits.get(host, self.rate_per_minute))
+        return bucket
+
+    def set_rate(self, rate_per_minute: float):
+        """Change the default per-host limit (hot-reloaded from security.api_rate_limit)"""
+        if rate_per_minute == self.rate_per_minute:
+            return
+        self.rate_per_minute = rate_per_minute
+        for host, bucket in self.buckets.items():
+            if host not in self.host_limits:
+                bucket.set_configured_rate(rate_per_minute)
+
+    async def acquire(self, host: str, priority: int = NORMAL):
+        await self.bucket(host).acquire(priority)
+
+    def observe(self, host: str, status: int, headers=None):
+        retry_after = parse_retry_after(headers.get("Retry-After")) if headers else None
+        self.bucket(host).observe(status, retry_after)
+
+    def metrics(self) -> Dict[str, Dict]:
+        return {host: bucket.metrics() for host, bucket in self.buckets.items()}
+
+    def trace_config(self) -> "aiohttp.TraceConfig":
+        """aiohttp hooks that gate every request on its host bucket"""
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_start(session, context, params):
+            request_ctx = context.trace_request_ctx or {}
+            await self.acquire(params.url.host, request_ctx.get("priority", NORMAL))
+
+        async def on_request_end(session, context, params):
+            self.observe(params.url.host, params.response.status, params.response.headers)
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_request_end.append(on_request_end)
+        return trace
+
+
+_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Process-wide limiter, following security.api_rate_limit on hot reload"""
+    global _limiter
+    if _limiter is None:
+        _limiter = RateLimiter(config_store.current.security.api_rate_limit)
+        config_store.subscribe(lambda settings: _limiter.set_rate(settings.security.api_rate_limit))
+    return _limiter
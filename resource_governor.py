@@ -0,0 +1,250 @@
+"""
+Tuxido Mining Bot - Resource Governor
+Keeps the process inside performance.memory_limit_mb and
+performance.disk_space_threshold_mb by escalating through graded responses
+(shrink caches, compact journals, downsample history, pause optional work)
+instead of letting the OS kill it mid-trade
+"""
+
+import gc
+import os
+import time
+import shutil
+import asyncio
+import logging
+import ctypes
+import ctypes.util
+from typing import Callable, Dict, List, Optional
+
+from profiler import rss_bytes
+from runtime_config import config_store, ConfigSnapshot
+
+logger = logging.getLogger(__name__)
+
+# Pressure levels, in escalation order
+OK, ELEVATED, HIGH, CRITICAL = range(4)
+LEVEL_NAMES = {OK: "ok", ELEVATED: "elevated", HIGH: "high", CRITICAL: "critical"}
+
+MEMORY = "memory"
+DISK = "disk"
+
+# Share of memory_limit_mb at which each level starts
+MEMORY_THRESHOLDS = ((CRITICAL, 1.0), (HIGH, 0.9), (ELEVATED, 0.75))
+# Multiples of disk_space_threshold_mb of free space below which each level starts
+DISK_THRESHOLDS = ((CRITICAL, 0.5), (HIGH, 1.0), (ELEVATED, 2.0))
+# Pressure has to fall this far below a threshold before a level is released
+HYSTERESIS = 0.05
+
+try:
+    _libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6")
+    _malloc_trim = _libc.malloc_trim
+    _malloc_trim.argtypes = [ctypes.c_size_t]
+except (OSError, AttributeError):
+    _malloc_trim = None
+
+
+def release_free_memory() -> int:
+    """Collect garbage and hand free heap pages back to the OS; returns objects collected"""
+    collected = gc.collect()
+    if _malloc_trim is not None:
+        _malloc_trim(0)
+    return collected
+
+
+class Responder:
+    """An action taken while pressure on one resource is at or above a level"""
+
+    __slots__ = ("name", "resource", "level", "on_enter", "on_exit", "active", "fired")
+
+    def __init__(self, name: str, resource: str, level: int,
+                 on_enter: Callable[[], None], on_exit: Optional[Callable[[], None]] = None):
+        self.name = name
+        self.resource = resource
+        self.level = level
+        self.on_enter = on_enter
+        self.on_exit = on_exit
+        self.active = False
+        self.fired = 0
+
+
+class ResourceGovernor:
+    """Samples RSS and free disk space and drives registered responders"""
+
+    def __init__(self, memory_limit_mb: int, disk_threshold_mb: int, disk_path: str = "data",
+                 interval: float = 10.0,
+                 rss_reader: Callable[[], Optional[int]] = rss_bytes,
+                 disk_reader: Optional[Callable[[str], int]] = None):
+        self.memory_limit_mb = memory_limit_mb
+        self.disk_threshold_mb = disk_threshold_mb
+        self.disk_path = disk_path
+        self.interval = interval
+        self.rss_reader = rss_reader
+        self.disk_reader = disk_reader or (lambda path: shutil.disk_usage(path).free)
+
+        self.responders: List[Responder] = []
+        self.levels = {MEMORY: OK, DISK: OK}
+        self.last_sample: Dict = {}
+        self.peak_rss = 0
+
+        # Built-in first responder: give freed memory back before anything degrades
+        self.register("release_free_memory", MEMORY, ELEVATED, release_free_memory)
+
+    def apply_settings(self, settings: ConfigSnapshot):
+        self.memory_limit_mb = settings.performance.memory_limit_mb
+        self.disk_threshold_mb = settings.performance.disk_space_threshold_mb
+
+    def register(self, name: str, resource: str, level: int,
+                 on_enter: Callable[[], None], on_exit: Optional[Callable[[], None]] = None) -> Responder:
+        """Run on_enter when resource pressure reaches level, on_exit once it has eased"""
+        responder = Responder(name, resource, level, on_enter, on_exit)
+        self.responders.append(responder)
+        if self.levels[resource] >= level:
+            self._enter(responder)
+        return responder
+
+    def unregister(self, responder: Responder):
+        if responder in self.responders:
+            self.responders.remove(responder)
+
+    def sample(self) -> Dict:
+        rss = self.rss_reader()
+        try:
+            disk_free = self.disk_reader(self.disk_path if os.path.exists(self.disk_path) else ".")
+        except OSError:
+            disk_free = None
+        if rss:
+            self.peak_rss = max(self.peak_rss, rss)
+        self.last_sample = {"rss_bytes": rss, "disk_free_bytes": disk_free, "at": time.time()}
+        return self.last_sample
+
+    def _memory_level(self, rss: Optional[int]) -> int:
+        if not rss or self.memory_limit_mb <= 0:
+            return OK
+        usage = rss / (self.memory_limit_mb * 1024 * 1024)
+        return self._graded(usage, MEMORY_THRESHOLDS, self.levels[MEMORY], rising=True)
+
+    def _disk_level(self, free: Optional[int]) -> int:
+        if free is None or self.disk_threshold_mb <= 0:
+            return OK
+        multiple = free / (self.disk_threshold_mb * 1024 * 1024)
+        return self._graded(multiple, DISK_THRESHOLDS, self.levels[DISK], rising=False)
+
+    @staticmethod
+    def _graded(value: float, thresholds, current: int, rising: bool) -> int:
+        """Level for value; the current level is kept until value clears its threshold by HYSTERESIS"""
+        for level, threshold in thresholds:
+            if level <= current:
+                # Already at this level: require a margin before stepping down
+                threshold = threshold - HYSTERESIS if rising else threshold + HYSTERESIS
+            if (value >= threshold) if rising else (value < threshold):
+                return level
+        return OK
+
+    def evaluate(self, sample: Optional[Dict] = None) -> Dict[str, int]:
+        """Move each resource to the level implied by sample (taken now if omitted)"""
+        sample = sample or self.sample()
+        new_levels = {
+            MEMORY: self._memory_level(sample["rss_bytes"]),
+            DISK: self._disk_level(sample["disk_free_bytes"])
+        }
+        for resource, level in new_levels.items():
+            previous = self.levels[resource]
+            if level == previous:
+                continue
+            self.levels[resource] = level
+            log = logger.warning if level > previous else logger.info
+            log("🧯 %s pressure %s -> %s (%s)", resource, LEVEL_NAMES[previous], LEVEL_NAMES[level], self._describe(resource))
+            self._apply(resource, level)
+        return new_levels
+
+    def _apply(self, resource: str, level: int):
+        """Enter newly reached responders (mildest first) and release eased ones (harshest first)"""
+        relevant = [r for r in self.responders if r.resource == resource]
+        for responder in sorted(relevant, key=lambda r: r.level):
+            if responder.level <= level and not responder.active:
+                self._enter(responder)
+        for responder in sorted(relevant, key=lambda r: -r.level):
+            if responder.level > level and responder.active:
+                self._exit(responder)
+
+    def _enter(self, responder: Responder):
+        responder.active = True
+        responder.fired += 1
+        try:
+            responder.on_enter()
+        except Exception as e:
+            logger.error("Resource responder %s failed: %s", responder.name, e)
+
+    def _exit(self, responder: Responder):
+        responder.active = False
+        if responder.on_exit:
+            try:
+                responder.on_exit()
+            except Exception as e:
+                logger.error("Resource responder %s failed to restore: %s", responder.name, e)
+
+    def _describe(self, resource: str) -> str:
+        headroom = self.headroom()
+        if resource == MEMORY:
+            return f"RSS {headroom['rss_mb']:.0f}/{self.memory_limit_mb} MB"
+        return f"{headroom['disk_free_mb']:.0f} MB free, threshold {self.disk_threshold_mb} MB"
+
+    def headroom(self) -> Dict:
+        """Headroom against both budgets, from the most recent sample"""
+        rss = self.last_sample.get("rss_bytes") or 0
+        free = self.last_sample.get("disk_free_bytes")
+        rss_mb = rss / (1024 * 1024)
+        free_mb = free / (1024 * 1024) if free is not None else None
+        return {
+            "rss_mb": rss_mb,
+            "peak_rss_mb": self.peak_rss / (1024 * 1024),
+            "memory_limit_mb": self.memory_limit_mb,
+            "memory_headroom_mb": self.memory_limit_mb - rss_mb,
+            "memory_headroom_pct": 100.0 * (1 - rss_mb / self.memory_limit_mb) if self.memory_limit_mb else None,
+            "disk_free_mb": free_mb,
+            "disk_threshold_mb": self.disk_threshold_mb,
+            "disk_headroom_mb": free_mb - self.disk_threshold_mb if free_mb is not None else None,
+            "memory_level": LEVEL_NAMES[self.levels[MEMORY]],
+            "disk_level": LEVEL_NAMES[self.levels[DISK]],
+            "active_responses": [r.name for r in self.responders if r.active]
+        }
+
+    async def run(self, heartbeat: Optional[Callable[[], None]] = None):
+        """Evaluate every interval; meant to run under a Supervisor"""
+        while True:
+            if heartbeat:
+                heartbeat()
+            # statvfs can block on slow filesystems, so sample off the loop
+            self.evaluate(await asyncio.to_thread(self.sample))
+            await asyncio.sleep(self.interval)
+
+
+def register_process_responders(governor: ResourceGovernor):
+    """Process-wide responses: trim rotated logs and sample block logging under disk pressure"""
+    from logging_setup import BLOCK_LOGGER_NAME, prune_log_backups, restore_log_backups, set_sampling
+
+    if any(r.name == "log_backups_prune" for r in governor.responders):
+        return
+    governor.register(
+        "log_backups_prune", DISK, ELEVATED,
+        lambda: prune_log_backups(1),
+        lambda: restore_log_backups(config_store.current.logging.backup_count)
+    )
+    governor.register(
+        "block_log_sampling", DISK, HIGH,
+        lambda: set_sampling(BLOCK_LOGGER_NAME, 100),
+        lambda: set_sampling(BLOCK_LOGGER_NAME, config_store.current.logging.block_sample_rate)
+    )
+
+
+_governor: Optional[ResourceGovernor] = None
+
+
+def get_governor() -> ResourceGovernor:
+    """Process-wide governor following the performance config section"""
+    global _governor
+    if _governor is None:
+        performance = config_store.current.performance
+        _governor = ResourceGovernor(performance.memory_limit_mb, performance.disk_space_threshold_mb)
+        config_store.subscribe(_governor.apply_settings)
+    return _governor
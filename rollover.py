@@ -0,0 +1,132 @@
+"""
+Tuxido Mining Bot - Daily Rollover
+Timezone-aware mining days with archived daily counters and streak bookkeeping
+"""
+
+import json
+import logging
+from datetime import datetime, timedelta, time as dt_time
+from typing import Dict, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from storage_utils import append_bytes, atomic_write_json, load_json
+
+logger = logging.getLogger(__name__)
+
+
+class DailyRollover:
+    """Tracks the current mining day and archives each finished day"""
+
+    def __init__(self, timezone: str = "UTC", day_start_hour: int = 0,
+                 state_path: str = "data/daily_state.json",
+                 archive_path: str = "data/daily_history.jsonl"):
+        try:
+            self.tz = ZoneInfo(timezone)
+        except (ZoneInfoNotFoundError, ValueError):
+            logger.warning("Unknown timezone %s, using UTC for mining days", timezone)
+            self.tz = ZoneInfo("UTC")
+        self.day_start_hour = day_start_hour % 24
+        self.state_path = state_path
+        self.archive_path = archive_path
+
+        self.state = {
+            "day": self.day_key(),
+            "daily_mined": 0,
+            "blocks": 0,
+            "target_reached": False,
+            "profit_streak": 0,
+            "best_day": 0,
+            "best_day_date": None
+        }
+
+    def now(self) -> datetime:
+        return datetime.now(self.tz)
+
+    def day_key(self, now: Optional[datetime] = None) -> str:
+        """Mining-day label; days start at day_start_hour local time"""
+        now = (now or self.now()).astimezone(self.tz)
+        return (now - timedelta(hours=self.day_start_hour)).date().isoformat()
+
+    def next_boundary(self, now: Optional[datetime] = None) -> datetime:
+        """Start of the next mining day, DST-aware"""
+        now = (now or self.now()).astimezone(self.tz)
+        day = datetime.fromisoformat(self.day_key(now)).date() + timedelta(days=1)
+        return datetime.combine(day, dt_time(hour=self.day_start_hour), tzinfo=self.tz)
+
+    def seconds_until_boundary(self, now: Optional[datetime] = None) -> float:
+        now = now or self.now()
+        return max(0.0, (self.next_boundary(now) - now).total_seconds())
+
+    def day_changed(self, now: Optional[datetime] = None) -> bool:
+        return self.day_key(now) != self.state["day"]
+
+    def restore(self) -> Dict:
+        """Load persisted state; a stale day is archived and rolled forward"""
+        saved = load_json(self.state_path, default=None)
+        if saved:
+            self.state.update(saved)
+            if self.day_changed():
+                self.roll()
+            else:
+                logger.info("📅 Resuming mining day %s at %d Tx", self.state["day"], self.state["daily_mined"])
+        return self.state
+
+    def record(self, daily_mined: int, blocks: int, target_reached: bool):
+        """Update the in-memory counters for the current day"""
+        self.state["daily_mined"] = daily_mined
+        self.state["blocks"] = blocks
+        self.state["target_reached"] = self.state["target_reached"] or target_reached
+
+    def checkpoint(self, fsync: bool = False):
+        """Persist current-day counters so a restart resumes the same day"""
+        try:
+            atomic_write_json(self.state_path, self.state, fsync=fsync)
+        except Exception as e:
+            logger.error("Daily state checkpoint error: %s", e)
+
+    def roll(self) -> Dict:
+        """Close the current day: archive it, update streak/best day, reset counters
+
+        Returns the archived record. Runs without awaiting, so on the event
+        loop the reset is atomic with respect to other tasks.
+        """
+        closed = {
+            "day": self.state["day"],
+            "daily_mined": self.state["daily_mined"],
+            "blocks": self.state["blocks"],
+            "target_reached": self.state["target_reached"],
+            "closed_at": self.now().isoformat()
+        }
+
+        self.state["profit_streak"] = self.state["profit_streak"] + 1 if closed["target_reached"] else 0
+        if closed["daily_mined"] > self.state["best_day"]:
+            self.state["best_day"] = closed["daily_mined"]
+            self.state["best_day_date"] = closed["day"]
+        closed["profit_streak"] = self.state["profit_streak"]
+
+        today = self.day_key()
+        following = (datetime.fromisoformat(closed["day"]).date() + timedelta(days=1)).isoformat()
+        if today > following:
+            # Whole days passed without mining; the streak is broken
+            self.state["profit_streak"] = 0
+
+        self.state.update({
+            "day": today,
+            "daily_mined": 0,
+            "blocks": 0,
+            "target_reached": False
+        })
+
+        try:
+            append_bytes(self.archive_path, (json.dumps(closed) + "\n").encode("utf-8"))
+        except Exception as e:
+            logger.error("Daily archive write error: %s", e)
+        self.checkpoint(fsync=True)
+
+        logger.info(
+            "📅 Day %s closed: %d Tx in %d blocks (target %s, streak %d, best %d)",
+            closed["day"], closed["daily_mined"], closed["blocks"],
+            "hit" if closed["target_reached"] else "missed",
+            self.state["profit_streak"], self.state["best_day"]
+        )
+        return closed
@@ -0,0 +1,629 @@
+"""
+Tuxido Mining Bot - Runtime Configuration Snapshots
+Typed, immutable configuration compiled once from ProjectConfig and swapped
+atomically when the override file changes
+"""
+
+import os
+import json
+import time
+import pickle
+import asyncio
+import logging
+import ctypes
+import ctypes.util
+from typing import Any, Callable, Dict, List, Optional, get_type_hints
+
+from project_config import ProjectConfig
+
+logger = logging.getLogger(__name__)
+
+
+class ConfigSection:
+    """Immutable, slotted group of typed settings"""
+
+    __slots__ = ()
+    _hints_cache: Dict[type, Dict[str, type]] = {}
+
+    def __init__(self, **values):
+        hints = self._hints()
+        for name in self.__slots__:
+            value = values.get(name)
+            expected = hints.get(name)
+            if value is not None and expected in (int, float, str, bool):
+                value = _coerce(value, expected)
+            object.__setattr__(self, name, value)
+
+    @classmethod
+    def _hints(cls) -> Dict[str, type]:
+        hints = ConfigSection._hints_cache.get(cls)
+        if hints is None:
+            hints = ConfigSection._hints_cache[cls] = get_type_hints(cls)
+        return hints
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self):
+        return (_rebuild, (type(self), self.to_dict()))
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __hash__(self):
+        return hash(tuple(getattr(self, name) for name in self.__slots__))
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def replace(self, **changes) -> "ConfigSection":
+        """Return a copy with the given fields changed"""
+        unknown = set(changes) - set(self.__slots__)
+        if unknown:
+            raise KeyError(f"Unknown {type(self).__name__} fields: {sorted(unknown)}")
+        values = self.to_dict()
+        values.update(changes)
+        return type(self)(**values)
+
+
+_TRUE_STRINGS = frozenset(("true", "1", "yes", "on"))
+_FALSE_STRINGS = frozenset(("false", "0", "no", "off"))
+
+
+def _coerce(value: Any, expected: type) -> Any:
+    """value as expected; raises ValueError rather than guess at a bool or truncate a float"""
+    if expected is bool:
+        text = str(value).strip().lower()
+        if text in _TRUE_STRINGS:
+            return True
+        if text in _FALSE_STRINGS:
+            return False
+        raise ValueError(f"Not a boolean: {value!r}")
+    if expected is int and isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError(f"Not an integer: {value!r}")
+        return int(value)
+    return expected(value)
+
+
+def _rebuild(cls, values):
+    return cls(**values)
+
+
+class ProjectSettings(ConfigSection):
+    __slots__ = ("name", "version", "description", "repository", "integrated_with", "ai_managed")
+    name: str
+    version: str
+    description: str
+    repository: str
+    integrated_with: str
+    ai_managed: bool
+
+
+class MiningSettings(ConfigSection):
+    __slots__ = ("min_hash_rate", "max_hash_rate", "log_interval", "block_rate",
+                 "pacing_policy", "max_catch_up_ticks",
+                 "auto_optimize", "dynamic_adjustment", "profit_optimization")
+    min_hash_rate: int
+    max_hash_rate: int
+    log_interval: int
+    block_rate: float
+    pacing_policy: str
+    max_catch_up_ticks: int
+    auto_optimize: bool
+    dynamic_adjustment: bool
+    profit_optimization: bool
+
+
+class BlockchainSettings(ConfigSection):
+    __slots__ = ("network", "wallet_address", "private_key", "rpc_endpoint", "toncenter_api_key",
+                 "explorer_url")
+    network: str
+    wallet_address: str
+    private_key: str
+    rpc_endpoint: str
+    toncenter_api_key: str
+    explorer_url: str
+
+
+class StonFiSettings(ConfigSection):
+    __slots__ = ("enabled", "jetton_address", "auto_trade", "trade_percentage",
+                 "api_endpoint", "router_address")
+    enabled: bool
+    jetton_address: str
+    auto_trade: bool
+    trade_percentage: float
+    api_endpoint: str
+    router_address: str
+
+
+class TelegramSettings(ConfigSection):
+    __slots__ = ("bot_token", "chat_id", "notifications_enabled", "update_interval")
+    bot_token: str
+    chat_id: str
+    notifications_enabled: bool
+    update_interval: int
+
+
+class P2ESettings(ConfigSection):
+    __slots__ = ("rewards_per_block", "bonus_multiplier", "daily_limit", "streak_bonus",
+                 "efficiency_bonus", "profit_sharing", "achievement_system",
+                 "timezone", "day_start_hour")
+    rewards_per_block: int
+    bonus_multiplier: float
+    daily_limit: int
+    streak_bonus: float
+    efficiency_bonus: float
+    profit_sharing: bool
+    achievement_system: bool
+    timezone: str
+    day_start_hour: int
+
+
+class AISettings(ConfigSection):
+    __slots__ = ("enabled", "model", "max_tokens", "temperature", "upgrade_interval",
+                 "monitoring_interval", "auto_commit", "optimization_enabled")
+    enabled: bool
+    model: str
+    max_tokens: int
+    temperature: float
+    upgrade_interval: int
+    monitoring_interval: int
+    auto_commit: bool
+    optimization_enabled: bool
+
+
+class SecuritySettings(ConfigSection):
+    __slots__ = ("enable_encryption", "api_rate_limit", "max_daily_transactions", "backup_enabled")
+    enable_encryption: bool
+    api_rate_limit: int
+    max_daily_transactions: int
+    backup_enabled: bool
+
+
+class PerformanceSettings(ConfigSection):
+    __slots__ = ("concurrent_miners", "memory_limit_mb", "cpu_limit_percent", "disk_space_threshold_mb")
+    concurrent_miners: int
+    memory_limit_mb: int
+    cpu_limit_percent: int
+    disk_space_threshold_mb: int
+
+
+class LoggingSettings(ConfigSection):
+    __slots__ = ("level", "file_enabled", "max_log_size_mb", "backup_count",
+                 "file_path", "compress_backups", "block_sample_rate")
+    level: str
+    file_enabled: bool
+    max_log_size_mb: int
+    backup_count: int
+    file_path: str
+    compress_backups: bool
+    block_sample_rate: int
+
+
+class StartupSettings(ConfigSection):
+    __slots__ = ("fast_start", "warm_cache_path")
+    fast_start: bool
+    warm_cache_path: str
+
+
+class HistorySettings(ConfigSection):
+    __slots__ = ("capacity", "fleet_capacity", "segment_size", "spill_enabled", "max_spill_mb")
+    capacity: int
+    fleet_capacity: int
+    segment_size: int
+    spill_enabled: bool
+    max_spill_mb: int
+
+
+class QuotaSettings(ConfigSection):
+    __slots__ = ("enabled", "backend", "sqlite_path", "coordinator_host", "coordinator_port",
+                 "node_id", "mined_chunk", "transaction_chunk", "lease_ttl")
+    enabled: bool
+    backend: str
+    sqlite_path: str
+    coordinator_host: str
+    coordinator_port: int
+    node_id: str
+    mined_chunk: int
+    transaction_chunk: int
+    lease_ttl: float
+
+
+class DebugSettings(ConfigSection):
+    __slots__ = ("web_interface_enabled", "web_host", "web_port", "debug_endpoints", "max_profile_seconds")
+    web_interface_enabled: bool
+    web_host: str
+    web_port: int
+    debug_endpoints: bool
+    max_profile_seconds: int
+
+
+class ControlSettings(ConfigSection):
+    __slots__ = ("controller", "interval", "window", "deadline_hours", "headroom",
+                 "min_block_rate", "max_block_rate", "max_step", "kp", "ki", "kd", "exploration")
+    controller: str
+    interval: int
+    window: str
+    deadline_hours: float
+    headroom: float
+    min_block_rate: float
+    max_block_rate: float
+    max_step: float
+    kp: float
+    ki: float
+    kd: float
+    exploration: float
+
+
+class WalletSettings(ConfigSection):
+    __slots__ = ("enabled", "version", "subwallet_id", "max_messages", "message_ttl",
+                 "poll_interval", "journal_path")
+    enabled: bool
+    version: str
+    subwallet_id: int
+    max_messages: int
+    message_ttl: int
+    poll_interval: float
+    journal_path: str
+
+
+class AirdropSettings(ConfigSection):
+    __slots__ = ("decimals", "transfer_value", "forward_amount", "window", "checkpoint_dir",
+                 "report_interval")
+    decimals: int
+    transfer_value: int
+    forward_amount: int
+    window: int
+    checkpoint_dir: str
+    report_interval: float
+
+
+class ArbitrageSettings(ConfigSection):
+    __slots__ = ("base_token", "max_hops", "min_profit_bps", "gas_per_hop")
+    base_token: str
+    max_hops: int
+    min_profit_bps: float
+    gas_per_hop: int
+
+
+class ExecutionSettings(ConfigSection):
+    __slots__ = ("enabled", "impact_bps", "window", "interval", "slippage_bps",
+                 "max_price_drop_bps", "slice_timeout", "journal_path")
+    enabled: bool
+    impact_bps: float
+    window: float
+    interval: float
+    slippage_bps: float
+    max_price_drop_bps: float
+    slice_timeout: float
+    journal_path: str
+
+
+class DexSettings(ConfigSection):
+    __slots__ = ("quote_ttl", "concurrency", "timeout", "onchain_reserves")
+    quote_ttl: float
+    concurrency: int
+    timeout: float
+    onchain_reserves: bool
+
+
+class OracleSettings(ConfigSection):
+    __slots__ = ("quorum", "timeout", "tolerance_bps", "usd_token", "usd_decimals",
+                 "history_path", "replay_max_age")
+    quorum: int
+    timeout: float
+    tolerance_bps: float
+    usd_token: str
+    usd_decimals: int
+    history_path: str
+    replay_max_age: float
+
+
+class JettonWatchSettings(ConfigSection):
+    __slots__ = ("enabled", "min_interval", "max_interval", "backoff", "store_path", "keep_transfers")
+    enabled: bool
+    min_interval: float
+    max_interval: float
+    backoff: float
+    store_path: str
+    keep_transfers: int
+
+
+SECTION_TYPES = {
+    "project": ProjectSettings,
+    "mining": MiningSettings,
+    "blockchain": BlockchainSettings,
+    "stonfi": StonFiSettings,
+    "telegram": TelegramSettings,
+    "p2e": P2ESettings,
+    "ai": AISettings,
+    "security": SecuritySettings,
+    "performance": PerformanceSettings,
+    "startup": StartupSettings,
+    "history": HistorySettings,
+    "quota": QuotaSettings,
+    "debug": DebugSettings,
+    "control": ControlSettings,
+    "wallet": WalletSettings,
+    "airdrop": AirdropSettings,
+    "arbitrage": ArbitrageSettings,
+    "execution": ExecutionSettings,
+    "dex": DexSettings,
+    "oracle": OracleSettings,
+    "jetton_watch": JettonWatchSettings,
+    "logging": LoggingSettings,
+}
+
+# Fields a controller tunes at runtime; the configured value is only its starting point
+CONTROLLER_OWNED: Dict[str, tuple] = {"mining": ("block_rate",)}
+
+
+class ConfigSnapshot:
+    """Immutable view of every configuration section with attribute access"""
+
+    __slots__ = tuple(SECTION_TYPES) + ("revision",)
+
+    def __init__(self, sections: Dict[str, ConfigSection], revision: int = 0):
+        for name in SECTION_TYPES:
+            object.__setattr__(self, name, sections[name])
+        object.__setattr__(self, "revision", revision)
+
+    @classmethod
+    def from_dict(cls, raw: Dict[str, Dict[str, Any]], revision: int = 0) -> "ConfigSnapshot":
+        """Compile a nested config dict into typed sections"""
+        sections = {
+            name: section_type(**raw.get(name, {}))
+            for name, section_type in SECTION_TYPES.items()
+        }
+        return cls(sections, revision)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ConfigSnapshot is immutable")
+
+    def __reduce__(self):
+        return (ConfigSnapshot, ({name: getattr(self, name) for name in SECTION_TYPES}, self.revision))
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        return {name: getattr(self, name).to_dict() for name in SECTION_TYPES}
+
+    def with_changes(self, section: str, **changes) -> "ConfigSnapshot":
+        """Return a new snapshot with fields of one section replaced"""
+        sections = {name: getattr(self, name) for name in SECTION_TYPES}
+        sections[section] = sections[section].replace(**changes)
+        return ConfigSnapshot(sections, self.revision)
+
+    def to_bytes(self) -> bytes:
+        """Serialize for hand-off to worker processes without re-parsing the environment"""
+        return pickle.dumps(self, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def from_bytes(data: bytes) -> "ConfigSnapshot":
+        snapshot = pickle.loads(data)
+        if not isinstance(snapshot, ConfigSnapshot):
+            raise TypeError("Payload is not a ConfigSnapshot")
+        return snapshot
+
+
+def keep_tuned(reloaded: ConfigSnapshot, configured: ConfigSnapshot, tuned: ConfigSnapshot) -> ConfigSnapshot:
+    """reloaded, with controller-owned fields still at their tuned values
+
+    configured is the snapshot the tuned one started from: a field the reload
+    itself changes is a new operator setting and wins over the tuned value.
+    """
+    snapshot = reloaded
+    for section, fields in CONTROLLER_OWNED.items():
+        kept = {
+            field: getattr(getattr(tuned, section), field) for field in fields
+            if getattr(getattr(reloaded, section), field) == getattr(getattr(configured, section), field)
+        }
+        if kept:
+            snapshot = snapshot.with_changes(section, **kept)
+    return snapshot
+
+
+# inotify constants from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_EVENT_HEADER = 16
+
+
+class FileWatcher:
+    """Watch a single file for changes via inotify, falling back to mtime polling"""
+
+    def __init__(self, path: str, poll_interval: float = 2.0):
+        self.path = os.path.abspath(path)
+        self.poll_interval = poll_interval
+        self._fd = None
+
+    def _open_inotify(self) -> Optional[int]:
+        libc_name = ctypes.util.find_library("c")
+        if not libc_name:
+            return None
+        try:
+            libc = ctypes.CDLL(libc_name, use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0:
+                return None
+            directory = os.path.dirname(self.path)
+            mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_MODIFY
+            if libc.inotify_add_watch(fd, directory.encode(), mask) < 0:
+                os.close(fd)
+                return None
+            return fd
+        except (AttributeError, OSError):
+            return None
+
+    def _drain_events(self) -> bool:
+        """Read pending inotify events; True if any concern the watched file"""
+        target = os.path.basename(self.path).encode()
+        matched = False
+        while True:
+            try:
+                buffer = os.read(self._fd, 4096)
+            except BlockingIOError:
+                return matched
+            if not buffer:
+                return matched
+            offset = 0
+            while offset + IN_EVENT_HEADER <= len(buffer):
+                name_len = int.from_bytes(buffer[offset + 12:offset + 16], "little")
+                name = buffer[offset + IN_EVENT_HEADER:offset + IN_EVENT_HEADER + name_len].rstrip(b"\0")
+                if name == target:
+                    matched = True
+                offset += IN_EVENT_HEADER + name_len
+
+    async def watch(self, on_change: Callable[[], None]):
+        """Invoke on_change whenever the file is written or replaced"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._fd = self._open_inotify()
+        if self._fd is None:
+            logger.info(f"inotify unavailable, polling {self.path} every {self.poll_interval}s")
+            await self._poll(on_change)
+            return
+
+        loop = asyncio.get_running_loop()
+        changed = asyncio.Event()
+
+        def _readable():
+            if self._drain_events():
+                changed.set()
+
+        loop.add_reader(self._fd, _readable)
+        try:
+            while True:
+                await changed.wait()
+                changed.clear()
+                # Let editors finish multi-step saves before reloading
+                await asyncio.sleep(0.05)
+                on_change()
+        finally:
+            loop.remove_reader(self._fd)
+            os.close(self._fd)
+            self._fd = None
+
+    async def _poll(self, on_change: Callable[[], None]):
+        last_mtime = self._mtime()
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            mtime = self._mtime()
+            if mtime != last_mtime:
+                last_mtime = mtime
+                on_change()
+
+    def _mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+
+class ConfigStore:
+    """Holds the current ConfigSnapshot and swaps it atomically on reload"""
+
+    def __init__(self, override_path: Optional[str] = None):
+        self.override_path = override_path or os.getenv("TUXIDO_CONFIG_FILE", "tuxido_config.json")
+        self._base = ProjectConfig().config
+        self._listeners: List[Callable[[ConfigSnapshot], None]] = []
+        self._revision = 0
+        try:
+            self._snapshot = self._compile()
+        except Exception as e:
+            # A broken override file must not stop the bot from importing; reload() retries it
+            logger.error(f"Ignoring config overrides in {self.override_path}: {e}")
+            self._snapshot = self._compile(overrides={})
+
+    @property
+    def current(self) -> ConfigSnapshot:
+        """The active snapshot; callers should re-read this rather than caching it forever"""
+        return self._snapshot
+
+    def subscribe(self, listener: Callable[[ConfigSnapshot], None]):
+        """Register a callback invoked with each new snapshot"""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[ConfigSnapshot], None]):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _load_overrides(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.override_path, "r") as f:
+                overrides = json.load(f)
+        except FileNotFoundError:
+            return {}
+        if not isinstance(overrides, dict):
+            raise ValueError("Config override file must contain a JSON object")
+        return overrides
+
+    def _compile(self, overrides: Optional[Dict[str, Dict[str, Any]]] = None) -> ConfigSnapshot:
+        merged = {name: dict(values) for name, values in self._base.items()}
+        overrides = self._load_overrides() if overrides is None else overrides
+        for section, values in overrides.items():
+            if section not in SECTION_TYPES:
+                logger.warning(f"Ignoring unknown config section: {section}")
+                continue
+            if not isinstance(values, dict):
+                raise ValueError(f"Config section {section} must be a JSON object")
+            unknown = sorted(set(values) - set(SECTION_TYPES[section].__slots__))
+            if unknown:
+                logger.warning(f"Ignoring unknown keys in config section {section}: {', '.join(unknown)}")
+            merged.setdefault(section, {}).update(values)
+        self._revision += 1
+        return ConfigSnapshot.from_dict(merged, revision=self._revision)
+
+    def reload(self) -> bool:
+        """Re-read the override file; keeps the previous snapshot if it is invalid"""
+        try:
+            snapshot = self._compile()
+        except Exception as e:
+            logger.error(f"Config reload failed, keeping revision {self._snapshot.revision}: {e}")
+            return False
+        self._publish(snapshot)
+        logger.info(f"⚙️ Configuration reloaded (revision {snapshot.revision})")
+        return True
+
+    def update(self, section: str, **changes) -> ConfigSnapshot:
+        """Apply in-process tuning changes and publish the resulting snapshot"""
+        snapshot = self._snapshot.with_changes(section, **changes)
+        self._revision += 1
+        snapshot = ConfigSnapshot(
+            {name: getattr(snapshot, name) for name in SECTION_TYPES}, self._revision
+        )
+        self._publish(snapshot)
+        return snapshot
+
+    def _publish(self, snapshot: ConfigSnapshot):
+        self._snapshot = snapshot
+        for listener in list(self._listeners):
+            try:
+                listener(snapshot)
+            except Exception as e:
+                logger.error(f"Config listener error: {e}")
+
+    async def watch(self):
+        """Hot-reload the snapshot whenever the override file changes"""
+        started = time.monotonic()
+        logger.info(f"👀 Watching {self.override_path} for configuration changes")
+        try:
+            await FileWatcher(self.override_path).watch(self.reload)
+        finally:
+            logger.info(f"Config watcher stopped after {time.monotonic() - started:.0f}s")
+
+
+# Global configuration store shared by all modules
+config_store = ConfigStore()
+
+
+def get_settings() -> ConfigSnapshot:
+    """Return the active configuration snapshot"""
+    return config_store.current
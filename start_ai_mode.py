@@ -11,15 +11,10 @@ import asyncio
 import logging
 from datetime import datetime
 
-# Configure enhanced logging for profit optimization
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('profit_ai_assistant.log'),
-        logging.StreamHandler()
-    ]
-)
+from logging_setup import configure_logging
+
+# Configure enhanced logging for profit optimization (queued, rotated, compressed)
+configure_logging(log_file=os.getenv("LOG_FILE", "profit_ai_assistant.log"))
 
 logger = logging.getLogger(__name__)
 
@@ -72,3 +67,20 @@ async def main():
     logger.info("🔗 Integrated with https://replit.com/@s9igma/TuxidoMineBot")
     logger.info("🎯 Target: $100+ daily revenue through advanced optimization")
     logger.info("🔮 Sit back and watch the AI maximize your profits!")
+    
+    if not setup_profit_environment():
+        return
+    
+    # Deferred so the environment defaults above are visible to the config snapshot
+    from ai_assistant import ProfitMaximizedAIManager
+    from runtime_config import config_store
+    if config_store.current.debug.web_interface_enabled:
+        # Same process as the miner and assistant, so /debug endpoints can profile them
+        from web_interface import serve_in_background
+        serve_in_background()
+    
+    ai_manager = ProfitMaximizedAIManager()
+    await ai_manager.start_profit_maximization_mode()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,13 +1,34 @@
 
 import asyncio
 import logging
-from typing import Dict, Optional
-import aiohttp
+from typing import Callable, Dict, List, Optional, Tuple
 import json
 from datetime import datetime
+from decimal import Decimal
+
+from arbitrage import FEE_DENOMINATOR, Pool
+from boc import parse_address
+from dex import TON, StonFiAdapter, build_router, token_key
+from execution import Slice, build_execution_engine
+from http_client import get_session
+from jetton_watcher import IN, build_jetton_watcher
+from pool_reader import PoolReserveReader
+from rate_limiter import CRITICAL, priority_context
+from runtime_config import config_store
+from storage_utils import atomic_write_json, load_json
+from swap_builder import SwapMessageBuilder, SwapOrder
+from wallet_sender import OutboundMessage
 
 logger = logging.getLogger(__name__)
 
+
+def slice_of(key: str) -> Optional[str]:
+    """Slice id behind a wallet key: slice:{id} for one leg, slice:{id}/{venue} per leg otherwise"""
+    if not key.startswith("slice:"):
+        return None
+    return key[len("slice:"):].split("/", 1)[0]
+
+
 class StonFiIntegration:
     """StonFi DEX integration for Tuxido Jetton"""
     
@@ -17,6 +38,7 @@ class StonFiIntegration:
         
         # StonFi Router contract addresses
         self.router_v1 = "EQB3ncyBUTjZUA5EnFKR5_EnOMI9V1tTEAAPaiU71gc4TiUt"  # StonFi Router v1
+        self.pton_address = "EQCM3B12QK1e4yZSf8GtBRT0aLMNyEsBc_DhVfRRtOEffLez"  # Proxy TON v1
         
         # Your Jetton configuration
         self.jetton_config = {
@@ -32,76 +54,142 @@ class StonFiIntegration:
             "TUXIDO/USDT": ""  # Will be populated with pool address if exists
         }
         
+        # Router's own jetton wallet per ask token (pTON wallet for TON), needed in swap payloads
+        self.router_wallets: Dict[str, str] = {}
+        self._swap_builders: Dict[bool, SwapMessageBuilder] = {}  # by whether the swap pays out TON
+        self._pool_reader: Optional[PoolReserveReader] = None
+        
     async def initialize_jetton_info(self, jetton_master_address: str):
         """Initialize Jetton information from StonFi"""
         try:
             self.jetton_config["master_address"] = jetton_master_address
             
             # Get Jetton info from StonFi API
-            async with aiohttp.ClientSession() as session:
-                url = f"{self.stonfi_api_base}/assets/{jetton_master_address}"
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        logger.info(f"🪙 Jetton found on StonFi: {data}")
+            session = await get_session()
+            url = f"{self.stonfi_api_base}/assets/{jetton_master_address}"
+            async with session.get(url) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    logger.info(f"🪙 Jetton found on StonFi: {data}")
                         
-                        # Update jetton config
-                        self.jetton_config.update({
-                            "name": data.get("display_name", "Tuxido"),
-                            "symbol": data.get("symbol", "TUXIDO"),
-                            "decimals": data.get("decimals", 9),
-                            "image": data.get("image_url", "")
-                        })
+                    # Update jetton config
+                    self.jetton_config.update({
+                        "name": data.get("display_name", "Tuxido"),
+                        "symbol": data.get("symbol", "TUXIDO"),
+                        "decimals": data.get("decimals", 9),
+                        "image": data.get("image_url", "")
+                    })
                         
-                        return True
-                    else:
-                        logger.warning(f"Jetton not found on StonFi API: {response.status}")
-                        return False
+                    return True
+                else:
+                    logger.warning(f"Jetton not found on StonFi API: {response.status}")
+                    return False
                         
         except Exception as e:
             logger.error(f"Failed to initialize Jetton info: {e}")
             return False
     
-    async def get_pools_info(self):
-        """Get available pools for Tuxido Jetton"""
+    def export_warm_state(self) -> Dict:
+        """Jetton metadata and pool addresses worth persisting across restarts"""
+        return {
+            "jetton_config": dict(self.jetton_config),
+            "trading_pairs": dict(self.trading_pairs),
+            "router_wallets": dict(self.router_wallets),
+            "saved_at": datetime.now().isoformat()
+        }
+    
+    def load_warm_state(self, state: Dict) -> bool:
+        """Restore metadata saved by export_warm_state for the same jetton"""
+        jetton_config = state.get("jetton_config", {})
+        if not jetton_config.get("master_address"):
+            return False
+        self.jetton_config.update(jetton_config)
+        self.trading_pairs.update(state.get("trading_pairs", {}))
+        self.router_wallets.update(state.get("router_wallets", {}))
+        return True
+    
+    def record_pool_addresses(self, pools):
+        """Populate trading_pairs from the pool list returned by StonFi"""
+        master = self.jetton_config["master_address"]
+        for pool in pools or []:
+            other = pool.get("token1_address") if pool.get("token0_address") == master else pool.get("token0_address")
+            symbol = "TON" if other == self.pton_address else other
+            pair = f"{self.jetton_config['symbol']}/{symbol}"
+            self.trading_pairs[pair] = pool.get("address", self.trading_pairs.get(pair, ""))
+    
+    async def get_all_pools(self) -> Optional[list]:
+        """Every StonFi pool, or None when the list could not be fetched"""
         try:
-            async with aiohttp.ClientSession() as session:
-                # Get all pools from StonFi
-                url = f"{self.stonfi_api_base}/pools"
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        pools_data = await response.json()
-                        
-                        # Filter pools containing our Jetton
-                        tuxido_pools = []
-                        for pool in pools_data.get("pool_list", []):
-                            if (self.jetton_config["master_address"] in [
-                                pool.get("token0_address"),
-                                pool.get("token1_address")
-                            ]):
-                                tuxido_pools.append(pool)
-                                logger.info(f"🌊 Found TUXIDO pool: {pool}")
-                        
-                        return tuxido_pools
+            session = await get_session()
+            url = f"{self.stonfi_api_base}/pools"
+            async with session.get(url) as response:
+                if response.status == 200:
+                    pools_data = await response.json()
+                    return pools_data.get("pool_list", [])
                     
         except Exception as e:
             logger.error(f"Failed to get pools info: {e}")
-            return []
+            return None
+    
+    async def get_pools_info(self):
+        """Get available pools for Tuxido Jetton"""
+        # Filter pools containing our Jetton
+        tuxido_pools = []
+        for pool in await self.get_all_pools() or []:
+            if (self.jetton_config["master_address"] in [
+                pool.get("token0_address"),
+                pool.get("token1_address")
+            ]):
+                tuxido_pools.append(pool)
+                logger.info(f"🌊 Found TUXIDO pool: {pool}")
+        
+        return tuxido_pools
+    
+    def pool_reader(self) -> Optional[PoolReserveReader]:
+        """On-chain reserve reader through toncenter, when enabled"""
+        if self._pool_reader is None and config_store.current.dex.onchain_reserves:
+            from toncenter_client import get_toncenter
+            self._pool_reader = PoolReserveReader(get_toncenter())
+        return self._pool_reader
+    
+    async def get_pool(self, pool_address: str, tokens: Optional[Tuple[str, str]] = None) -> Optional[Pool]:
+        """Current reserves of one pool, from the chain when possible and the REST API otherwise
+
+        The chain only names the router's jetton wallets, so on-chain reads
+        need the pool's (token0, token1) master addresses from the listing.
+        """
+        reader = self.pool_reader() if tokens else None
+        if reader:
+            reader.set_pair(pool_address, *tokens)
+            pool = await reader.read(pool_address)
+            if pool is not None:
+                return pool
+        try:
+            session = await get_session()
+            url = f"{self.stonfi_api_base}/pools/{pool_address}"
+            async with session.get(url, trace_request_ctx=priority_context(CRITICAL)) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    return Pool.from_api(data.get("pool", data))
+                
+        except Exception as e:
+            logger.error(f"Failed to get pool {pool_address}: {e}")
+            return None
     
     async def get_jetton_price(self) -> Optional[float]:
         """Get current TUXIDO price from StonFi"""
         try:
-            async with aiohttp.ClientSession() as session:
-                # Get price from StonFi API
-                url = f"{self.stonfi_api_base}/rates"
-                params = {"base": self.jetton_config["master_address"], "quote": "TON"}
+            session = await get_session()
+            # Get price from StonFi API
+            url = f"{self.stonfi_api_base}/rates"
+            params = {"base": self.jetton_config["master_address"], "quote": "TON"}
                 
-                async with session.get(url, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        price = float(data.get("rate", 0))
-                        logger.info(f"💰 TUXIDO price: {price} TON")
-                        return price
+            async with session.get(url, params=params) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    price = float(data.get("rate", 0))
+                    logger.info(f"💰 TUXIDO price: {price} TON")
+                    return price
                         
         except Exception as e:
             logger.error(f"Failed to get Jetton price: {e}")
@@ -110,44 +198,88 @@ class StonFiIntegration:
     async def estimate_swap(self, from_token: str, to_token: str, amount: int):
         """Estimate swap output"""
         try:
-            async with aiohttp.ClientSession() as session:
-                url = f"{self.stonfi_api_base}/reverse_estimation"
-                params = {
-                    "ask_jetton_address": to_token,
-                    "offer_jetton_address": from_token,
-                    "ask_amount": str(amount)
-                }
+            session = await get_session()
+            url = f"{self.stonfi_api_base}/reverse_estimation"
+            params = {
+                "ask_jetton_address": to_token,
+                "offer_jetton_address": from_token,
+                "ask_amount": str(amount)
+            }
                 
-                async with session.get(url, params=params) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return data
+            # Swap quotes gate trades, so they jump ahead of monitoring traffic
+            async with session.get(url, params=params, trace_request_ctx=priority_context(CRITICAL)) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    return data
                         
         except Exception as e:
             logger.error(f"Failed to estimate swap: {e}")
             return None
     
-    async def create_swap_transaction(self, from_token: str, to_token: str, amount: int):
-        """Create swap transaction payload"""
+    def to_units(self, amount) -> int:
+        """Whole tokens to raw jetton units (what transfers, pools and swaps count in)"""
+        return int(Decimal(str(amount)) * 10 ** int(self.jetton_config["decimals"]))
+    
+    def from_units(self, units: int) -> Decimal:
+        """Raw jetton units to whole tokens, for display"""
+        return Decimal(units) / 10 ** int(self.jetton_config["decimals"])
+    
+    def swap_builder(self, to_token: str = "TON") -> Optional[SwapMessageBuilder]:
+        """Builder for our wallet's swaps into to_token, once the wallet addresses are known"""
+        owner = config_store.current.blockchain.wallet_address
+        jetton_wallet = self.jetton_config.get("wallet_address")
+        if not owner or not jetton_wallet:
+            return None
+        # TON payouts go through pTON and need less gas than jetton -> jetton swaps
+        to_ton = token_key(to_token) == TON
+        builder = self._swap_builders.get(to_ton)
+        if builder is None or (builder.owner_address, builder.jetton_wallet) != (owner, jetton_wallet):
+            builder = self._swap_builders[to_ton] = SwapMessageBuilder(self.router_v1, owner, jetton_wallet,
+                                                                       to_ton=to_ton)
+        return builder
+    
+    def _ask_wallet(self, to_token: str) -> Optional[str]:
+        return self.router_wallets.get(self.pton_address if to_token == "TON" else to_token)
+    
+    async def create_swap_transaction(self, from_token: str, to_token: str, amount: int, min_out: int = 0):
+        """Create swap transaction payload
+        
+        The message goes from our wallet to our jetton wallet, carrying a jetton
+        transfer to the router with the swap as forward payload. Without the
+        wallet addresses only the swap description is returned (no payload).
+        """
         try:
-            # This would create a swap transaction payload for TON blockchain
-            # You'll need to implement proper transaction building using TON SDK
-            
             swap_data = {
                 "router_address": self.router_v1,
                 "from_token": from_token,
                 "to_token": to_token,
                 "amount": amount,
+                "min_out": min_out,
                 "timestamp": datetime.now().isoformat()
             }
             
-            logger.info(f"🔄 Created swap transaction: {swap_data}")
+            builder = self.swap_builder(to_token)
+            ask_wallet = self._ask_wallet(to_token)
+            if builder and ask_wallet:
+                swap_data["message"] = builder.build(SwapOrder(amount, min_out, ask_wallet)).to_dict()
+            else:
+                logger.debug("Swap payload not built: jetton wallet or router wallet for %s unknown", to_token)
+            
+            logger.debug("🔄 Created swap transaction: %s", swap_data)
             return swap_data
             
         except Exception as e:
             logger.error(f"Failed to create swap transaction: {e}")
             return None
     
+    def create_swap_messages(self, to_token: str, orders) -> list:
+        """Build many swaps of our jetton at once from (amount, min_out) pairs"""
+        builder = self.swap_builder(to_token)
+        ask_wallet = self._ask_wallet(to_token)
+        if not builder or not ask_wallet:
+            return []
+        return builder.build_many(SwapOrder(amount, min_out, ask_wallet) for amount, min_out in orders)
+    
     async def get_liquidity_stats(self):
         """Get liquidity statistics for TUXIDO"""
         try:
@@ -171,46 +303,184 @@ class StonFiIntegration:
             logger.error(f"Failed to get liquidity stats: {e}")
             return {}
     
-    async def monitor_trading_activity(self):
-        """Monitor trading activity for TUXIDO"""
-        try:
-            # Monitor swaps and transactions
-            while True:
-                price = await self.get_jetton_price()
-                liquidity = await self.get_liquidity_stats()
-                
-                trading_data = {
-                    "timestamp": datetime.now().isoformat(),
-                    "price_ton": price,
-                    "liquidity": liquidity,
-                    "volume_24h": 0  # Would need to calculate from transactions
-                }
-                
-                # Save trading data
-                with open("data/trading_activity.json", "w") as f:
-                    json.dump(trading_data, f, indent=2)
-                
-                await asyncio.sleep(60)  # Check every minute
-                
-        except Exception as e:
-            logger.error(f"Trading monitoring error: {e}")
+    async def monitor_trading_activity(self, heartbeat: Optional[Callable[[], None]] = None):
+        """Monitor trading activity for TUXIDO
+
+        Errors propagate so the caller's supervisor can restart the monitor
+        instead of it dying silently.
+        """
+        # Monitor swaps and transactions
+        while True:
+            if heartbeat:
+                heartbeat()
+            price = await self.get_jetton_price()
+            liquidity = await self.get_liquidity_stats()
+            
+            trading_data = {
+                "timestamp": datetime.now().isoformat(),
+                "price_ton": price,
+                "liquidity": liquidity,
+                "volume_24h": 0  # Would need to calculate from transactions
+            }
+            
+            # Save trading data
+            atomic_write_json("data/trading_activity.json", trading_data, indent=2)
+            
+            await asyncio.sleep(60)  # Check every minute
 
 class TuxidoStonFiManager:
     """Manager for Tuxido mining bot with StonFi integration"""
     
-    def __init__(self, jetton_master_address: str):
+    def __init__(self, jetton_master_address: str, warm_cache_path: Optional[str] = None):
         self.stonfi = StonFiIntegration()
         self.jetton_master = jetton_master_address
         self.auto_trade_enabled = False
+        self.warm_cache_path = warm_cache_path
+        self.ready = False
+        self.wallet_sender = None  # set by the miner when the wallet can sign
+        self.execution = None      # sliced selling, once there is a wallet to send swaps from
+        self._slice_legs: Dict[str, List[str]] = {}  # wallet keys of each slice in flight
+        self.router = build_router(config_store.current.dex, [StonFiAdapter(self.stonfi)])
+        self.watcher = None  # our jetton wallet on chain, when we have a wallet and watching is enabled
+        owner = config_store.current.blockchain.wallet_address
+        if config_store.current.jetton_watch.enabled and owner and jetton_master_address:
+            from toncenter_client import get_toncenter
+            self.watcher = build_jetton_watcher(config_store.current.jetton_watch, get_toncenter(),
+                                                jetton_master_address, owner)
+            self.watcher.subscribe(self._on_jetton_change)
+            if self.watcher.wallet:
+                self.stonfi.jetton_config["wallet_address"] = self.watcher.wallet
+    
+    def _on_jetton_change(self, transfers, balance):
+        self.stonfi.jetton_config["wallet_address"] = self.watcher.wallet
+        logger.info("👛 TUXIDO balance: %s (%d new transfers)", self.stonfi.from_units(balance), len(transfers))
+        if self.execution:
+            router = parse_address(self.stonfi.router_v1)
+            for transfer in transfers:
+                # Tokens the router sends back are a swap it refunded, e.g. when min_out was not met
+                if transfer.direction == IN and transfer.counterparty and \
+                        parse_address(transfer.counterparty) == router:
+                    self.execution.refund(transfer.amount)
+    
+    def available_tokens(self) -> Optional[int]:
+        """Raw jetton units on chain not already scheduled for sale; None until the watcher has read it"""
+        if not self.watcher or self.watcher.balance is None:
+            return None
+        return max(0, self.watcher.balance - (self.execution.backlog if self.execution else 0))
+        
+    def attach_wallet_sender(self, sender):
+        """Send swaps from sender and sell through the sliced execution engine when enabled"""
+        self.wallet_sender = sender
+        if self.watcher:
+            # Our own swaps move the balance: look right after they confirm
+            sender.subscribe(lambda keys: self.watcher.poke())
+        settings = config_store.current.execution
+        if not settings.enabled:
+            return
+        self.execution = build_execution_engine(settings, self._sell_pool, self._send_slice, self.jetton_master,
+                                                reconcile=self._reconcile_slice)
+        sender.subscribe(self._on_confirmed)
+        # Slices whose legs were queued before a restart, some possibly confirmed while we were down
+        for key in sender.known:
+            slice_id = slice_of(key)
+            if slice_id in self.execution.in_flight:
+                self._slice_legs.setdefault(slice_id, []).append(key)
+        self._settle_confirmed(list(self._slice_legs))
+    
+    async def _sell_pool(self) -> Optional[Pool]:
+        """Deepest TUXIDO/TON pool across venues; slices are sized against it"""
+        venues = await self.router.pools(self.jetton_master, TON)
+        if not venues:
+            return None
+        return max(venues, key=lambda venue: venue[1].reserves(venue[2])[0])[1]
+    
+    async def _direct_min_out(self, amount: int) -> Optional[int]:
+        """Least nanoTON a direct Ston.fi sale of amount may return, or None without a pool quote"""
+        venues = await self.router.pools(self.jetton_master, TON)
+        quote = next(((pool, direction) for venue, pool, direction in venues if venue.name == StonFiAdapter.name),
+                     None)
+        if quote is None:
+            return None
+        slippage_bps = config_store.current.execution.slippage_bps
+        return int(quote[0].amount_out(amount, quote[1]) * (FEE_DENOMINATOR - slippage_bps) // FEE_DENOMINATOR)
+    
+    async def _send_slice(self, item: Slice) -> None:
+        route = await self.router.best_route(self.jetton_master, TON, item.amount)
+        messages = await self.router.build_swaps(route, item.min_out) if route else []
+        if not messages:
+            raise RuntimeError("swap payload unavailable")
+        # Legs may land in different wallet batches; the slice settles once every leg has confirmed
+        keys = [f"slice:{item.slice_id}"] if len(messages) == 1 else [
+            f"slice:{item.slice_id}/{leg.venue}" for leg in route.legs
+        ]
+        self._slice_legs[item.slice_id] = keys
+        self.wallet_sender.enqueue_many(
+            OutboundMessage(key, message["to"], message["amount"], message["payload"])
+            for key, message in zip(keys, messages)
+        )
+        logger.info("🔪 Selling slice %s over %s: %s TUXIDO for at least %d nanoTON", item.slice_id,
+                    "+".join(leg.venue for leg in route.legs), self.stonfi.from_units(item.amount), item.min_out)
+    
+    def _on_confirmed(self, keys):
+        self._settle_confirmed({slice_of(key) for key in keys} - {None})
+
+    def _settle_confirmed(self, slice_ids):
+        # The wallet transaction does not carry the router's payout, so fills are booked at their quote
+        # until the jetton watcher sees the router send tokens back
+        for slice_id in slice_ids:
+            legs = self._slice_legs.get(slice_id)
+            if legs and all(key in self.wallet_sender.done for key in legs):
+                del self._slice_legs[slice_id]
+                self.execution.settle(slice_id)
+    
+    def _reconcile_slice(self, item: Slice) -> str:
+        """Where an overdue slice stands in the wallet journal: done, pending or unknown"""
+        legs = self._slice_legs.get(item.slice_id)
+        if not legs:
+            return "unknown"
+        if all(key in self.wallet_sender.done for key in legs):
+            del self._slice_legs[item.slice_id]
+            return "done"
+        return "pending"
+
+    def load_warm_cache(self) -> bool:
+        """Restore jetton metadata and pool addresses persisted by a previous run"""
+        if not self.warm_cache_path:
+            return False
+        state = load_json(self.warm_cache_path, default={}) or {}
+        if state.get("jetton_config", {}).get("master_address") != self.jetton_master:
+            return False
+        if self.stonfi.load_warm_state(state):
+            self.ready = True
+            logger.info(f"♨️ StonFi warm cache loaded ({len(self.stonfi.trading_pairs)} pairs)")
+            return True
+        return False
+        
+    def save_warm_cache(self):
+        """Persist jetton metadata and pool addresses for the next start"""
+        if not self.warm_cache_path:
+            return
+        try:
+            atomic_write_json(self.warm_cache_path, self.stonfi.export_warm_state(), indent=2)
+        except Exception as e:
+            logger.error(f"Failed to save StonFi warm cache: {e}")
         
     async def initialize(self):
         """Initialize StonFi integration"""
         logger.info("🚀 Initializing StonFi integration for TUXIDO...")
         
-        success = await self.stonfi.initialize_jetton_info(self.jetton_master)
+        # Jetton info, pools and price are independent requests
+        self.stonfi.jetton_config["master_address"] = self.jetton_master
+        success, pools, price = await asyncio.gather(
+            self.stonfi.initialize_jetton_info(self.jetton_master),
+            self.stonfi.get_pools_info(),
+            self.stonfi.get_jetton_price()
+        )
         if success:
-            pools = await self.stonfi.get_pools_info()
-            price = await self.stonfi.get_jetton_price()
+            pools = pools or []
+            self.stonfi.record_pool_addresses(pools)
+            self.ready = True
+            self.save_warm_cache()
             
             logger.info(f"✅ StonFi integration initialized!")
             logger.info(f"💰 Current TUXIDO price: {price} TON")
@@ -221,28 +491,52 @@ class TuxidoStonFiManager:
             logger.warning("❌ Failed to initialize StonFi integration")
             return False
     
-    async def start_trading_monitor(self):
+    async def start_trading_monitor(self, heartbeat: Optional[Callable[[], None]] = None):
         """Start trading activity monitoring"""
         logger.info("📊 Starting trading activity monitor...")
-        await self.stonfi.monitor_trading_activity()
+        await self.stonfi.monitor_trading_activity(heartbeat)
     
     async def auto_trade_mined_tokens(self, mined_amount: int):
         """Auto-trade a portion of mined tokens"""
-        if not self.auto_trade_enabled:
+        if not self.auto_trade_enabled or not self.ready:
             return
         
         try:
-            # Trade 10% of mined tokens to TON
-            trade_amount = int(mined_amount * 0.1)
+            # Trade the configured share of mined tokens to TON; mined amounts are whole
+            # tokens, everything from here on counts raw jetton units
+            share = Decimal(str(mined_amount)) * Decimal(str(config_store.current.stonfi.trade_percentage)) / 100
+            trade_amount = self.stonfi.to_units(share)
+            # Mined amounts are simulated; never sell more than the wallet actually holds
+            available = self.available_tokens()
+            if available is not None and trade_amount > available:
+                logger.info("👛 Trade capped at the on-chain balance: %s of %s TUXIDO",
+                            self.stonfi.from_units(available), self.stonfi.from_units(trade_amount))
+                trade_amount = available
+            
+            if trade_amount > 0 and self.execution:
+                order_id = self.execution.submit(trade_amount)
+                logger.info("🔄 Scheduled %s TUXIDO for sliced sale as %s", self.stonfi.from_units(trade_amount), order_id)
+                return {"order_id": order_id, "amount": trade_amount}
             
             if trade_amount > 0:
+                min_out = await self._direct_min_out(trade_amount)
+                if not min_out:
+                    logger.warning("⚠️ No Ston.fi quote for %s TUXIDO; not auto-trading without a minimum output",
+                                   self.stonfi.from_units(trade_amount))
+                    return None
                 swap_data = await self.stonfi.create_swap_transaction(
                     self.jetton_master,
                     "TON",
-                    trade_amount
+                    trade_amount,
+                    min_out
                 )
                 
-                logger.info(f"🔄 Auto-trading {trade_amount} TUXIDO tokens")
+                logger.info("🔄 Auto-trading %s TUXIDO tokens", self.stonfi.from_units(trade_amount))
+                message = swap_data and swap_data.get("message")
+                if message and self.wallet_sender:
+                    self.wallet_sender.enqueue(OutboundMessage(
+                        f"swap:{message['query_id']}", message["to"], message["amount"], message["payload"]
+                    ))
                 return swap_data
                 
         except Exception as e:
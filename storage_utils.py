@@ -0,0 +1,73 @@
+"""
+Tuxido Mining Bot - Storage Utilities
+Crash-safe file writes shared by reports, caches and journals
+"""
+
+import os
+import json
+import tempfile
+import logging
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+def atomic_write_bytes(path: str, data: bytes, fsync: bool = True) -> None:
+    """Write bytes to path via a temp file + rename so readers never see a partial file"""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=os.path.basename(path))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write_json(path: str, obj: Any, indent: int = None, fsync: bool = True) -> None:
+    """Serialize obj as JSON and write it atomically"""
+    separators = None if indent else (",", ":")
+    payload = json.dumps(obj, indent=indent, separators=separators, default=str)
+    atomic_write_bytes(path, payload.encode("utf-8"), fsync=fsync)
+
+
+def append_bytes(path: str, data: bytes) -> None:
+    """Append a record to a log-structured file, creating its directory if needed"""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    with open(path, "ab") as f:
+        f.write(data)
+
+
+def compact_lines(path: str, keep_last: int) -> int:
+    """Atomically rewrite a line-oriented journal keeping its last keep_last lines; returns bytes freed"""
+    try:
+        size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            lines = f.readlines()
+    except FileNotFoundError:
+        return 0
+    if len(lines) <= keep_last:
+        return 0
+    atomic_write_bytes(path, b"".join(lines[-keep_last:]))
+    return size - os.path.getsize(path)
+
+
+def load_json(path: str, default: Any = None) -> Any:
+    """Load JSON from path, returning default when missing or unreadable"""
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+    except Exception as e:
+        logger.error(f"Failed to load {path}: {e}")
+        return default
@@ -0,0 +1,175 @@
+"""
+Tuxido Mining Bot - Task Supervision
+Runs long-lived background loops (monitors, optimizers, watchers) inside a
+TaskGroup, restarts them with exponential backoff when they crash or stop
+heartbeating, and cancels them within a deadline on shutdown
+"""
+
+import time
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SupervisedTask:
+    """Restart policy and liveness record for one background loop"""
+
+    def __init__(self, name: str, factory: Callable[[], Awaitable], restart: bool = True,
+                 liveness_timeout: Optional[float] = None):
+        self.name = name
+        self.factory = factory
+        self.restart = restart
+        self.liveness_timeout = liveness_timeout
+
+        self.state = "pending"
+        self.restarts = 0
+        self.last_error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.last_heartbeat: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def is_stale(self, now: float) -> bool:
+        if self.liveness_timeout is None or self.last_heartbeat is None:
+            return False
+        return now - self.last_heartbeat > self.liveness_timeout
+
+    def status(self, now: float) -> Dict:
+        return {
+            "state": self.state,
+            "alive": self.state == "running" and not self.is_stale(now),
+            "restarts": self.restarts,
+            "last_error": self.last_error,
+            "uptime_s": now - self.started_at if self.state == "running" and self.started_at else 0.0,
+            "heartbeat_age_s": now - self.last_heartbeat if self.last_heartbeat else None
+        }
+
+
+class Supervisor:
+    """Owns background tasks: restarts failures, reports liveness, drains on stop"""
+
+    def __init__(self, name: str = "supervisor", initial_backoff: float = 1.0,
+                 max_backoff: float = 300.0, stable_after: float = 60.0,
+                 shutdown_timeout: float = 10.0):
+        self.name = name
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.stable_after = stable_after
+        self.shutdown_timeout = shutdown_timeout
+
+        self.tasks: Dict[str, SupervisedTask] = {}
+        self._group: Optional[asyncio.TaskGroup] = None
+        self._runner: Optional[asyncio.Task] = None
+        self._stopping = asyncio.Event()
+
+    def add(self, name: str, factory: Callable[[], Awaitable], restart: bool = True,
+            liveness_timeout: Optional[float] = None) -> SupervisedTask:
+        """Register a loop; factory is called again for every restart"""
+        if name in self.tasks and self.tasks[name].state in ("pending", "running", "backoff"):
+            return self.tasks[name]
+        spec = self.tasks[name] = SupervisedTask(name, factory, restart, liveness_timeout)
+        if self._group is not None:
+            spec.task = self._group.create_task(self._supervise(spec), name=f"{self.name}:{name}")
+        return spec
+
+    def heartbeat(self, name: str):
+        """Called by a supervised loop on every iteration to prove it is making progress"""
+        spec = self.tasks.get(name)
+        if spec:
+            spec.last_heartbeat = time.monotonic()
+
+    def start(self) -> asyncio.Task:
+        """Run the supervisor in the background"""
+        if self._runner is None or self._runner.done():
+            self._stopping.clear()
+            self._runner = asyncio.create_task(self.run(), name=self.name)
+        return self._runner
+
+    async def run(self):
+        """Supervise every registered task until stop() is called"""
+        try:
+            async with asyncio.TaskGroup() as group:
+                self._group = group
+                for spec in self.tasks.values():
+                    if spec.state == "pending":
+                        spec.task = group.create_task(self._supervise(spec), name=f"{self.name}:{spec.name}")
+                await self._stopping.wait()
+                for spec in self.tasks.values():
+                    if spec.task:
+                        spec.task.cancel()
+        finally:
+            self._group = None
+
+    async def stop(self, timeout: Optional[float] = None) -> bool:
+        """Cancel every task and wait for them to finish; False if the deadline passed"""
+        self._stopping.set()
+        if self._runner is None:
+            return True
+        timeout = self.shutdown_timeout if timeout is None else timeout
+        done, _ = await asyncio.wait({self._runner}, timeout=timeout)
+        if not done:
+            stuck = [name for name, spec in self.tasks.items() if spec.task and not spec.task.done()]
+            logger.error("⏱️ %s: tasks still running after %.0fs shutdown deadline: %s", self.name, timeout, stuck)
+            self._runner.cancel()
+            return False
+        return True
+
+    def request_stop(self):
+        """Synchronous variant of stop() for callers outside a coroutine"""
+        self._stopping.set()
+
+    async def _supervise(self, spec: SupervisedTask):
+        backoff = self.initial_backoff
+        while not self._stopping.is_set():
+            spec.state = "running"
+            spec.started_at = spec.last_heartbeat = time.monotonic()
+            try:
+                await self._run_once(spec)
+                if not spec.restart:
+                    spec.state = "finished"
+                    return
+                logger.warning("🔁 %s exited; restarting", spec.name)
+            except asyncio.CancelledError:
+                spec.state = "stopped"
+                raise
+            except Exception as e:
+                spec.last_error = f"{type(e).__name__}: {e}"
+                logger.error("💥 Background task %s crashed: %s", spec.name, spec.last_error, exc_info=True)
+                if not spec.restart:
+                    spec.state = "failed"
+                    return
+
+            # Runs that lasted a while count as healthy and reset the backoff
+            if time.monotonic() - spec.started_at >= self.stable_after:
+                backoff = self.initial_backoff
+            spec.restarts += 1
+            spec.state = "backoff"
+            logger.info("⏳ Restarting %s in %.0fs (restart #%d)", spec.name, backoff, spec.restarts)
+            await asyncio.sleep(backoff)
+            backoff = min(self.max_backoff, backoff * 2)
+        spec.state = "stopped"
+
+    async def _run_once(self, spec: SupervisedTask):
+        """Await one run of the task, cancelling it if its heartbeat goes stale"""
+        if spec.liveness_timeout is None:
+            await spec.factory()
+            return
+        inner = asyncio.ensure_future(spec.factory())
+        try:
+            while True:
+                done, _ = await asyncio.wait({inner}, timeout=spec.liveness_timeout / 2)
+                if done:
+                    inner.result()
+                    return
+                if spec.is_stale(time.monotonic()):
+                    inner.cancel()
+                    raise TimeoutError(f"no heartbeat for {spec.liveness_timeout:g}s")
+        finally:
+            if not inner.done():
+                inner.cancel()
+
+    def status(self) -> Dict[str, Dict]:
+        """Per-task liveness and restart counts"""
+        now = time.monotonic()
+        return {name: spec.status(now) for name, spec in self.tasks.items()}
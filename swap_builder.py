@@ -0,0 +1,199 @@
+"""
+Tuxido Mining Bot - Swap Message Builder
+Jetton transfer (TEP-74) bodies carrying StonFi v1 swap payloads, built from
+cached pre-encoded constant parts so a batch of swaps costs a few big-int
+operations and one BOC serialization each
+
+    python swap_builder.py --bench 20000
+"""
+
+import time
+import base64
+import argparse
+import itertools
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from boc import Cell, address_bits, coins_bits, serialize_boc, deserialize_boc
+
+JETTON_TRANSFER_OP = 0x0F8A7EA5
+STONFI_SWAP_OP = 0x25938561
+
+# Gas attached to the jetton wallet and forwarded to the router (StonFi v1 SDK defaults)
+JETTON_TO_TON_GAS = 170_000_000
+JETTON_TO_TON_FORWARD_GAS = 125_000_000
+JETTON_TO_JETTON_GAS = 265_000_000
+JETTON_TO_JETTON_FORWARD_GAS = 205_000_000
+
+_query_ids = itertools.count(int(time.time() * 1000) << 16)
+
+
+class SwapOrder:
+    """One jetton -> X swap through the router"""
+
+    __slots__ = ("offer_amount", "min_out", "ask_jetton_wallet", "query_id")
+
+    def __init__(self, offer_amount: int, min_out: int, ask_jetton_wallet: str,
+                 query_id: Optional[int] = None):
+        self.offer_amount = offer_amount          # jetton units sent to the router
+        self.min_out = min_out                    # minimum ask units or the swap refunds
+        self.ask_jetton_wallet = ask_jetton_wallet  # router's wallet of the ask token (pTON for TON)
+        self.query_id = next(_query_ids) & 0xFFFFFFFFFFFFFFFF if query_id is None else query_id
+
+
+class SwapMessage:
+    """Internal message for our wallet to send: value and body go to our jetton wallet"""
+
+    __slots__ = ("destination", "value", "body", "query_id")
+
+    def __init__(self, destination: str, value: int, body: Cell, query_id: int):
+        self.destination = destination
+        self.value = value
+        self.body = body
+        self.query_id = query_id
+
+    def boc(self) -> bytes:
+        return serialize_boc([self.body])
+
+    def to_dict(self) -> Dict:
+        return {
+            "to": self.destination,
+            "amount": self.value,
+            "payload": base64.b64encode(self.boc()).decode(),
+            "query_id": self.query_id
+        }
+
+
+class SwapMessageBuilder:
+    """Builds swap messages for one owner wallet, jetton wallet and router
+
+    Everything that does not change between swaps is encoded once: the
+    router/response address block of the transfer, the forward gas amount,
+    and per ask token the swap op plus ask wallet prefix and the recipient
+    suffix. Building a message then only splices in the amounts.
+    """
+
+    def __init__(self, router_address: str, owner_address: str, jetton_wallet: str,
+                 referral_address: Optional[str] = None, to_ton: bool = True):
+        self.router_address = router_address
+        self.owner_address = owner_address
+        self.jetton_wallet = jetton_wallet
+        self.gas = JETTON_TO_TON_GAS if to_ton else JETTON_TO_JETTON_GAS
+        forward_gas = JETTON_TO_TON_FORWARD_GAS if to_ton else JETTON_TO_JETTON_FORWARD_GAS
+
+        router, router_len = address_bits(router_address)
+        owner, owner_len = address_bits(owner_address)
+        # destination:router response_destination:owner custom_payload:nothing
+        self._transfer_middle = ((router << owner_len | owner) << 1, router_len + owner_len + 1)
+        # forward_ton_amount, then forward_payload stored as a reference (Either right = 1)
+        fwd, fwd_len = coins_bits(forward_gas)
+        self._transfer_tail = ((fwd << 1) | 1, fwd_len + 1)
+
+        # to_address, then the optional referral address
+        if referral_address:
+            referral, referral_len = address_bits(referral_address)
+            self._swap_suffix = (((owner << 1) | 1) << referral_len | referral, owner_len + 1 + referral_len)
+        else:
+            self._swap_suffix = (owner << 1, owner_len + 1)
+        self._swap_prefixes: Dict[str, Tuple[int, int]] = {}
+
+    def _swap_prefix(self, ask_jetton_wallet: str) -> Tuple[int, int]:
+        prefix = self._swap_prefixes.get(ask_jetton_wallet)
+        if prefix is None:
+            wallet, wallet_len = address_bits(ask_jetton_wallet)
+            prefix = self._swap_prefixes[ask_jetton_wallet] = (STONFI_SWAP_OP << wallet_len | wallet, 32 + wallet_len)
+        return prefix
+
+    def swap_payload(self, min_out: int, ask_jetton_wallet: str) -> Cell:
+        """swap#25938561 token_wallet min_out to_address referral_address:(Maybe MsgAddress)"""
+        prefix, prefix_len = self._swap_prefix(ask_jetton_wallet)
+        amount, amount_len = coins_bits(min_out)
+        suffix, suffix_len = self._swap_suffix
+        value = ((prefix << amount_len | amount) << suffix_len) | suffix
+        return Cell(prefix_len + amount_len + suffix_len, value)
+
+    def build(self, order: SwapOrder) -> SwapMessage:
+        """transfer#0f8a7ea5 query_id amount destination response custom forward_amount forward_payload"""
+        payload = self.swap_payload(order.min_out, order.ask_jetton_wallet)
+        amount, amount_len = coins_bits(order.offer_amount)
+        middle, middle_len = self._transfer_middle
+        tail, tail_len = self._transfer_tail
+        value = (JETTON_TRANSFER_OP << 64 | order.query_id) << amount_len | amount
+        value = ((value << middle_len | middle) << tail_len) | tail
+        body = Cell(96 + amount_len + middle_len + tail_len, value, (payload,))
+        return SwapMessage(self.jetton_wallet, self.gas, body, order.query_id)
+
+    def build_many(self, orders: Iterable[SwapOrder]) -> List[SwapMessage]:
+        build = self.build
+        return [build(order) for order in orders]
+
+    def serialize_many(self, orders: Iterable[SwapOrder]) -> List[bytes]:
+        """BOCs of the transfer bodies for a batch of swaps"""
+        return [serialize_boc([message.body]) for message in self.build_many(orders)]
+
+
+def decode_swap_body(boc: bytes) -> Dict:
+    """Fields of a transfer body built above (for logging and verification)"""
+    body = deserialize_boc(boc)[0]
+    bits, value = body.bits, body.value
+
+    def take(n: int) -> int:
+        nonlocal bits
+        bits -= n
+        return (value >> bits) & ((1 << n) - 1)
+
+    def coins() -> int:
+        return take(take(4) * 8)
+
+    def address() -> Tuple[int, str]:
+        take(3)
+        workchain = take(8)
+        return (workchain - 256 if workchain > 127 else workchain), f"{take(256):064x}"
+
+    op, query_id, amount = take(32), take(64), coins()
+    destination, response = address(), address()
+    custom, forward = take(1), coins()
+    either = take(1)
+    payload = body.refs[0]
+    bits, value = payload.bits, payload.value
+    swap_op, ask_wallet, min_out, to_address = take(32), address(), coins(), address()
+    return {
+        "op": op, "query_id": query_id, "amount": amount, "destination": destination,
+        "response_destination": response, "custom_payload": custom, "forward_ton_amount": forward,
+        "forward_payload_ref": either, "swap_op": swap_op, "ask_jetton_wallet": ask_wallet,
+        "min_out": min_out, "to_address": to_address, "has_referral": take(1)
+    }
+
+
+def run_benchmark(count: int):
+    """Messages/sec for building and for building plus serializing"""
+    router = "EQB3ncyBUTjZUA5EnFKR5_EnOMI9V1tTEAAPaiU71gc4TiUt"
+    pton = "EQCM3B12QK1e4yZSf8GtBRT0aLMNyEsBc_DhVfRRtOEffLez"
+    builder = SwapMessageBuilder(router, pton, router)
+    orders = [SwapOrder(10**9 + i, 10**8 + i, pton, query_id=i) for i in range(count)]
+
+    started = time.perf_counter()
+    messages = builder.build_many(orders)
+    built = time.perf_counter() - started
+
+    started = time.perf_counter()
+    bocs = [serialize_boc([message.body]) for message in messages]
+    serialized = time.perf_counter() - started
+
+    decoded = decode_swap_body(bocs[-1])
+    assert decoded["amount"] == orders[-1].offer_amount and decoded["min_out"] == orders[-1].min_out
+    print(f"Messages:            {count:,}")
+    print(f"Build:               {count / built:,.0f} msg/s")
+    print(f"Serialize:           {count / serialized:,.0f} msg/s")
+    print(f"Build + serialize:   {count / (built + serialized):,.0f} msg/s")
+    print(f"BOC size:            {len(bocs[-1])} bytes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="StonFi swap message builder")
+    parser.add_argument("--bench", type=int, metavar="N", default=20000, help="benchmark N swap messages")
+    args = parser.parse_args()
+    run_benchmark(args.bench)
+
+
+if __name__ == "__main__":
+    main()
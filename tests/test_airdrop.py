@@ -0,0 +1,25 @@
+"""Airdrop CSV rows with amounts a transfer cannot carry are skipped, not fatal"""
+
+from airdrop import MAX_JETTON_UNITS, stream_recipients, to_units
+
+TUXIDO = "EQCxE6mUtQJKFnGfaROTKOt1lZbDiiX1kCixRv7Nw2Id_sDs"
+ROUTER = "EQB3ncyBUTjZUA5EnFKR5_EnOMI9V1tTEAAPaiU71gc4TiUt"
+PTON = "EQCM3B12QK1e4yZSf8GtBRT0aLMNyEsBc_DhVfRRtOEffLez"
+
+
+def test_out_of_range_amounts_are_invalid_rows(tmp_path):
+    path = tmp_path / "drop.csv"
+    path.write_text("address,amount\n"
+                    f"{TUXIDO},inf\n{TUXIDO},nan\n{TUXIDO},-1\n{TUXIDO},1e9999\n{TUXIDO},0\n"
+                    f"{ROUTER},12.5\n{PTON},{MAX_JETTON_UNITS - 1}e-9\n")
+    stats = {}
+
+    recipients = list(stream_recipients(str(path), 9, stats))
+
+    assert [(r.address, r.amount) for r in recipients] == [(ROUTER, 12_500_000_000), (PTON, MAX_JETTON_UNITS - 1)]
+    assert stats == {"rows": 7, "invalid": 5, "duplicates": 0}
+
+
+def test_amounts_near_the_limit_are_not_rounded():
+    assert to_units(str(MAX_JETTON_UNITS - 1), 0) == MAX_JETTON_UNITS - 1
+    assert to_units("1.000000000000000000000000000000001", 33) == 10**33 + 1
@@ -0,0 +1,82 @@
+"""Auto-traded rewards reach the swap body in raw jetton units, with a quoted minimum output"""
+
+import base64
+import asyncio
+
+from arbitrage import FEE_DENOMINATOR, Pool
+from dex import MockDexAdapter, build_router
+from runtime_config import config_store
+from stonfi_integration import TuxidoStonFiManager
+from swap_builder import SwapMessageBuilder, decode_swap_body
+
+ROUTER = "EQB3ncyBUTjZUA5EnFKR5_EnOMI9V1tTEAAPaiU71gc4TiUt"
+PTON = "EQCM3B12QK1e4yZSf8GtBRT0aLMNyEsBc_DhVfRRtOEffLez"
+TUXIDO = "EQCxE6mUtQJKFnGfaROTKOt1lZbDiiX1kCixRv7Nw2Id_sDs"
+
+
+def _quote_from(manager, venue):
+    pool = Pool("pool", TUXIDO, "TON", 10**15, 10**12)
+    manager.router = build_router(config_store.current.dex, [MockDexAdapter(venue, [pool])])
+    return pool
+
+
+def test_mined_tokens_are_sold_in_raw_units():
+    manager = TuxidoStonFiManager(TUXIDO)
+    manager.ready = manager.auto_trade_enabled = True
+    manager.watcher = manager.execution = None
+    manager.stonfi.router_wallets[PTON] = PTON
+    manager.stonfi.swap_builder = lambda to_token="TON": SwapMessageBuilder(ROUTER, PTON, ROUTER)
+    pool = _quote_from(manager, "stonfi")
+
+    swap = asyncio.run(manager.auto_trade_mined_tokens(15))
+
+    percentage = config_store.current.stonfi.trade_percentage
+    expected = int(15 * percentage / 100 * 10**9)
+    assert swap["amount"] == expected
+    body = decode_swap_body(base64.b64decode(swap["message"]["payload"]))
+    assert body["amount"] == expected
+    slippage_bps = config_store.current.execution.slippage_bps
+    assert body["min_out"] == int(pool.amount_out(expected, 0) * (FEE_DENOMINATOR - slippage_bps) // FEE_DENOMINATOR)
+    assert body["min_out"] > 0
+
+
+class _Watcher:
+    def __init__(self, balance):
+        self.balance = balance
+
+
+def test_sale_is_capped_at_on_chain_balance():
+    manager = TuxidoStonFiManager(TUXIDO)
+    manager.ready = manager.auto_trade_enabled = True
+    manager.execution = None
+    manager.watcher = _Watcher(123_456_789)  # 0.123456789 TUXIDO in raw units
+    manager.stonfi.router_wallets[PTON] = PTON
+    manager.stonfi.swap_builder = lambda to_token="TON": SwapMessageBuilder(ROUTER, PTON, ROUTER)
+    _quote_from(manager, "stonfi")
+
+    swap = asyncio.run(manager.auto_trade_mined_tokens(15))
+
+    assert swap["amount"] == 123_456_789
+    body = decode_swap_body(base64.b64decode(swap["message"]["payload"]))
+    assert body["amount"] == 123_456_789
+
+
+class _Sender:
+    def __init__(self):
+        self.queued = []
+
+    def enqueue(self, message):
+        self.queued.append(message)
+
+
+def test_no_stonfi_quote_sends_nothing():
+    manager = TuxidoStonFiManager(TUXIDO)
+    manager.ready = manager.auto_trade_enabled = True
+    manager.watcher = manager.execution = None
+    manager.wallet_sender = _Sender()
+    manager.stonfi.router_wallets[PTON] = PTON
+    manager.stonfi.swap_builder = lambda to_token="TON": SwapMessageBuilder(ROUTER, PTON, ROUTER)
+    _quote_from(manager, "other-dex")
+
+    assert asyncio.run(manager.auto_trade_mined_tokens(15)) is None
+    assert manager.wallet_sender.queued == []
@@ -0,0 +1,38 @@
+"""Block history windows stay valid while the miner keeps appending"""
+
+import os
+from collections import deque
+
+from block_history import BlockHistory, read_spilled
+
+
+def _append(history, i):
+    history.append(float(i), i, i * 10, 1.0, 1.5)
+
+
+def test_appends_while_a_view_is_held_do_not_raise():
+    history = BlockHistory(capacity=20, segment_size=5)
+    held = history.window("reward", 5)  # e.g. the web dashboard thread mid-summary
+    for i in range(100):
+        _append(history, i)
+        summary = history.summary(10)
+    assert len(held) == 0
+    assert summary["blocks"] == 10
+    history.resize(10)
+    _append(history, 100)
+    assert list(history.window("reward", 3)) == [980, 990, 1000]
+
+
+def test_windows_match_a_reference_ring(tmp_path):
+    spill = os.path.join(tmp_path, "spill.bin")
+    history = BlockHistory(capacity=12, segment_size=4, spill_path=spill)
+    reference = deque(maxlen=12)
+    for i in range(61):
+        _append(history, i)
+        reference.append(i)
+        for n in (1, 5, 12):
+            assert list(history.window("hash_rate", n)) == list(reference)[-n:]
+    assert [row["hash_rate"] for row in history.rows()] == list(reference)
+    spilled = [value for segment in read_spilled(spill) for value in segment["hash_rate"]]
+    assert spilled == list(range(len(spilled)))
+    assert len(spilled) == history.spilled == 52  # whole segments, once their first row is overwritten
@@ -0,0 +1,50 @@
+"""Cells and BOCs against fixtures from an independent implementation"""
+
+import base64
+
+from boc import FIXTURES, Cell, check_fixtures, deserialize_boc, serialize_boc
+from runtime_config import config_store
+from stonfi_integration import StonFiIntegration
+from swap_builder import (JETTON_TO_JETTON_GAS, JETTON_TO_TON_GAS, SwapMessageBuilder, SwapOrder,
+                          decode_swap_body)
+
+ROUTER = "EQB3ncyBUTjZUA5EnFKR5_EnOMI9V1tTEAAPaiU71gc4TiUt"
+PTON = "EQCM3B12QK1e4yZSf8GtBRT0aLMNyEsBc_DhVfRRtOEffLez"
+TUXIDO = "EQCxE6mUtQJKFnGfaROTKOt1lZbDiiX1kCixRv7Nw2Id_sDs"
+OWNER = "UQBvb29vb29vb29vb29vb29vb29vb29vb29vb29vb29vb3J8"
+
+
+def test_fixtures_round_trip():
+    assert check_fixtures()
+
+
+def test_swap_builder_matches_stonfi_v1_fixtures():
+    to_ton = SwapMessageBuilder(ROUTER, OWNER, TUXIDO).build(SwapOrder(3_000_000_000, 123_456_789, PTON,
+                                                                       1234567890123))
+    assert to_ton.body.hash().hex() == FIXTURES["stonfi_v1_swap"][1]
+    to_jetton = SwapMessageBuilder(ROUTER, OWNER, TUXIDO, referral_address=ROUTER, to_ton=False)
+    message = to_jetton.build(SwapOrder(10**18, 1, TUXIDO, 42))
+    assert message.body.hash().hex() == FIXTURES["stonfi_v1_swap_referral"][1]
+
+
+def test_deep_chain_does_not_recurse():
+    cell = Cell(8, 1)
+    for i in range(3000):
+        cell = Cell(8, i & 0xFF, (cell,))
+    assert cell.depth() == 3000
+    boc = serialize_boc([cell])
+    assert deserialize_boc(boc)[0].hash() == cell.hash()
+
+
+def test_swap_gas_follows_the_ask_token(monkeypatch):
+    monkeypatch.setattr(config_store, "_snapshot",
+                        config_store.current.with_changes("blockchain", wallet_address=OWNER))
+    stonfi = StonFiIntegration()
+    stonfi.jetton_config["wallet_address"] = TUXIDO
+    stonfi.router_wallets.update({PTON: PTON, ROUTER: ROUTER})
+
+    to_ton = stonfi.create_swap_messages("TON", [(10**9, 1)])[0]
+    to_jetton = stonfi.create_swap_messages(ROUTER, [(10**9, 1)])[0]
+    assert to_ton.value == JETTON_TO_TON_GAS
+    assert to_jetton.value == JETTON_TO_JETTON_GAS
+    assert decode_swap_body(base64.b64decode(to_jetton.to_dict()["payload"]))["amount"] == 10**9
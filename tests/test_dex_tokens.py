@@ -0,0 +1,47 @@
+"""Pool direction from on-chain reserves, whose tokens are router jetton wallets"""
+
+import base64
+import asyncio
+
+from boc import begin_cell, format_address, parse_address
+from dex import TON, DexRouter, StonFiAdapter
+from fake_toncenter import FakeToncenter
+from pool_reader import PoolReserveReader
+from stonfi_integration import StonFiIntegration
+
+TUXIDO = "EQCxE6mUtQJKFnGfaROTKOt1lZbDiiX1kCixRv7Nw2Id_sDs"
+PTON = "EQCM3B12QK1e4yZSf8GtBRT0aLMNyEsBc_DhVfRRtOEffLez"
+POOL = format_address(0, b"\x01" * 32)
+
+
+def _cell(address):
+    return ["cell", {"bytes": base64.b64encode(begin_cell().store_address(address).end_cell().to_boc()).decode()}]
+
+
+def test_onchain_pool_keeps_listing_pair_and_direction():
+    fake = FakeToncenter()
+    fake.touch(POOL)
+    # TUXIDO is token0 with 1000 raw units against 5 nanoTON; the chain names router wallets
+    router_wallets = (format_address(0, b"\x02" * 32), format_address(0, b"\x03" * 32))
+    fake.register_get_method(POOL, "get_pool_data", lambda stack: [
+        ["num", hex(1000)], ["num", hex(5)], _cell(router_wallets[0]), _cell(router_wallets[1]),
+        ["num", "0x14"], ["num", "0xa"]])
+
+    stonfi = StonFiIntegration()
+    stonfi._pool_reader = PoolReserveReader(fake, block_ttl=0)
+
+    async def listing():
+        # Raw form on purpose: the router must not depend on the address form
+        workchain, account = parse_address(TUXIDO)
+        return [{"address": POOL, "token0_address": f"{workchain}:{account.hex()}", "token1_address": PTON}]
+    stonfi.get_all_pools = listing
+
+    router = DexRouter([StonFiAdapter(stonfi)], quote_ttl=0)
+    venues = asyncio.run(router.pools(TUXIDO, TON))
+    assert len(venues) == 1
+    _, pool, direction = venues[0]
+    assert direction == 0
+    assert pool.reserves(direction) == (1000, 5)
+
+    venues = asyncio.run(router.pools(TON, TUXIDO))
+    assert venues[0][2] == 1
@@ -0,0 +1,85 @@
+"""Fills booked at their quote are taken back when the router returns the tokens"""
+
+import asyncio
+
+from arbitrage import Pool
+from execution import ExecutionEngine
+from jetton_watcher import IN, Transfer
+from stonfi_integration import TuxidoStonFiManager
+
+TUXIDO = "EQCxE6mUtQJKFnGfaROTKOt1lZbDiiX1kCixRv7Nw2Id_sDs"
+ROUTER = "EQB3ncyBUTjZUA5EnFKR5_EnOMI9V1tTEAAPaiU71gc4TiUt"
+
+
+def _engine(path, reserve_in, now):
+    async def pool_source():
+        return Pool("pool", "JETTON", "TON", reserve_in, reserve_in // 100)
+
+    async def executor(item):
+        return None
+
+    return ExecutionEngine(pool_source, executor, "JETTON", window=1e-6, journal_path=str(path),
+                           clock=lambda: now[0])
+
+
+def test_refund_of_a_closed_order_corrects_the_totals(tmp_path):
+    now = [0.0]
+    engine = _engine(tmp_path / "journal.jsonl", 10**15, now)
+    engine.submit(10**9)
+    item = asyncio.run(engine.step())
+    engine.settle(item.slice_id)
+    assert engine.totals["sold"] == 10**9 and not engine.orders
+
+    assert engine.refund(10**9) == item.slice_id
+    assert (engine.totals["sold"], engine.totals["received"]) == (0, 0)
+    assert engine.refund(10**9) is None
+
+    restored = _engine(tmp_path / "journal.jsonl", 10**15, now)
+    assert restored.totals == engine.totals and not restored.estimated
+
+
+def test_refund_reopens_the_amount_of_an_open_order(tmp_path):
+    now = [0.0]
+    engine = _engine(tmp_path / "journal.jsonl", 10**11, now)
+    order_id = engine.submit(10**9)
+    item = asyncio.run(engine.step())
+    engine.settle(item.slice_id)
+    order = engine.orders[order_id]
+    assert 0 < order.filled < order.amount
+
+    engine.refund(item.amount)
+    assert (order.filled, order.received, order.remaining) == (0, 0, 10**9)
+    assert _engine(tmp_path / "journal.jsonl", 10**11, now).orders[order_id].filled == 0
+
+
+def test_estimates_older_than_slice_timeout_are_final(tmp_path):
+    now = [0.0]
+    engine = _engine(tmp_path / "journal.jsonl", 10**15, now)
+    engine.submit(10**9)
+    engine.settle(asyncio.run(engine.step()).slice_id)
+    now[0] = engine.slice_timeout + 1
+    assert engine.refund(10**9) is None
+    assert engine.totals["sold"] == 10**9
+
+
+class _Execution:
+    def __init__(self):
+        self.refunds = []
+
+    def refund(self, amount):
+        self.refunds.append(amount)
+
+
+class _Watcher:
+    wallet = TUXIDO
+
+
+def test_router_payouts_are_reported_as_refunds():
+    manager = TuxidoStonFiManager(TUXIDO)
+    manager.watcher, manager.execution = _Watcher(), _Execution()
+    transfers = [Transfer(1, "a", 0, IN, "transfer", 500, ROUTER, 1),
+                 Transfer(2, "b", 0, IN, "transfer", 700, TUXIDO, 2)]
+
+    manager._on_jetton_change(transfers, 1200)
+
+    assert manager.execution.refunds == [500]
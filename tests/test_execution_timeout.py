@@ -0,0 +1,53 @@
+"""Overdue slices are reconciled against the wallet instead of blocking the engine forever"""
+
+import asyncio
+
+from arbitrage import Pool
+from execution import ExecutionEngine
+
+
+def _engine(tmp_path, states):
+    now = [0.0]
+    sent = []
+
+    async def pool_source():
+        return Pool("pool", "JETTON", "TON", 10**15, 10**13)
+
+    async def executor(item):
+        sent.append(item.slice_id)
+        return None  # the fill arrives later, through settle()
+
+    engine = ExecutionEngine(pool_source, executor, "JETTON", window=1e-6, slice_timeout=600,
+                             reconcile=lambda item: states.pop(0), journal_path=str(tmp_path / "journal.jsonl"),
+                             clock=lambda: now[0])
+    engine.submit(10**9)
+    return engine, now, sent
+
+
+def test_slice_never_sent_is_planned_again_after_timeout(tmp_path):
+    engine, now, sent = _engine(tmp_path, ["unknown"])
+    asyncio.run(engine.step())
+    asyncio.run(engine.step())
+    assert len(sent) == 1
+
+    now[0] = 601
+    asyncio.run(engine.step())
+    assert len(sent) == 2
+    assert sent[0] != sent[1]
+    assert list(engine.in_flight) == [sent[1]]
+    assert engine.stats["timeouts"] == 1
+
+
+def test_slice_still_with_the_wallet_keeps_waiting(tmp_path):
+    engine, now, sent = _engine(tmp_path, ["pending", "done"])
+    asyncio.run(engine.step())
+
+    now[0] = 601
+    asyncio.run(engine.step())
+    assert list(engine.in_flight) == sent
+
+    now[0] = 700
+    asyncio.run(engine.step())
+    assert engine.stats["fills"] == 1
+    assert engine.stats["timeouts"] == 0
+    assert not engine.orders
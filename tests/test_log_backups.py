@@ -0,0 +1,23 @@
+"""Disk-pressure log pruning is undone once the pressure eases"""
+
+import logging.handlers
+
+import logging_setup
+from resource_governor import DISK, ELEVATED, OK, ResourceGovernor, register_process_responders
+from runtime_config import config_store
+
+
+def test_backup_count_is_restored_after_disk_pressure(tmp_path):
+    logging_setup.configure_logging({"file_path": str(tmp_path / "bot.log"), "backup_count": 5})
+    try:
+        handler = next(h for h in logging_setup._listener.handlers
+                       if isinstance(h, logging.handlers.RotatingFileHandler))
+        governor = ResourceGovernor(1024, 100, disk_path=str(tmp_path))
+        register_process_responders(governor)
+
+        governor._apply(DISK, ELEVATED)
+        assert handler.backupCount == 1
+        governor._apply(DISK, OK)
+        assert handler.backupCount == config_store.current.logging.backup_count
+    finally:
+        logging_setup.shutdown_logging()
@@ -0,0 +1,46 @@
+"""A lone or outvoted source never sets the price"""
+
+import os
+import asyncio
+
+from price_oracle import TUXIDO_TON, PriceHistory, PriceOracle, PriceSource, ReplaySource
+
+
+class _Fixed(PriceSource):
+    def __init__(self, name, value, delay):
+        super().__init__(TUXIDO_TON)
+        self.name = name
+        self.value = value
+        self.delay = delay
+
+    async def fetch(self):
+        await asyncio.sleep(self.delay)
+        return self.value
+
+
+def test_fast_liar_without_quorum_gives_no_live_price(tmp_path):
+    history = PriceHistory(os.path.join(tmp_path, "prices.jsonl"))
+    oracle = PriceOracle([_Fixed("liar", 1.3, 0.0), _Fixed("honest", 1.0, 0.01)],
+                         quorum=2, timeout=1.0, history=history)
+
+    assert asyncio.run(oracle.price(TUXIDO_TON)) is None
+    assert all(stats["rejected"] == 0 for stats in oracle.stats.values())
+    assert TUXIDO_TON not in history.last
+
+
+def test_without_quorum_the_last_agreed_price_answers(tmp_path):
+    history = PriceHistory(os.path.join(tmp_path, "prices.jsonl"))
+    history.record(TUXIDO_TON, 1.0, 0.0)
+    replay = ReplaySource(TUXIDO_TON, history, max_age=60, clock=lambda: 10.0)
+    oracle = PriceOracle([_Fixed("liar", 1.3, 0.0), _Fixed("honest", 1.0, 0.01), replay],
+                         quorum=2, timeout=1.0, history=history)
+
+    reading = asyncio.run(oracle.price(TUXIDO_TON))
+    assert reading.price == 1.0 and reading.sources == ["replay"]
+
+
+def test_agreeing_sources_set_the_price():
+    oracle = PriceOracle([_Fixed("liar", 1.3, 0.0), _Fixed("a", 1.0, 0.01), _Fixed("b", 1.001, 0.02)],
+                         quorum=2, timeout=1.0)
+    reading = asyncio.run(oracle.price(TUXIDO_TON))
+    assert sorted(reading.sources) == ["a", "b"]
@@ -0,0 +1,19 @@
+"""Block pacing settings from the environment"""
+
+import pytest
+
+from project_config import ProjectConfig
+
+
+@pytest.mark.parametrize("value", ["0", "-0.5"])
+def test_non_positive_mining_delay_is_rejected(monkeypatch, value):
+    monkeypatch.delenv("BLOCK_RATE", raising=False)
+    monkeypatch.setenv("MINING_DELAY", value)
+    with pytest.raises(ValueError, match="MINING_DELAY"):
+        ProjectConfig()
+
+
+def test_mining_delay_sets_block_rate(monkeypatch):
+    monkeypatch.delenv("BLOCK_RATE", raising=False)
+    monkeypatch.setenv("MINING_DELAY", "0.25")
+    assert ProjectConfig().config["mining"]["block_rate"] == 4.0
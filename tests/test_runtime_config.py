@@ -0,0 +1,65 @@
+"""Override file handling, value coercion and controller-tuned fields across reloads"""
+
+import json
+import logging
+
+import pytest
+
+from runtime_config import ConfigStore, MiningSettings, keep_tuned
+
+
+def test_malformed_override_file_falls_back_to_environment(tmp_path):
+    path = tmp_path / "overrides.json"
+    path.write_text('{"mining": {"log_interval": 7,')
+
+    store = ConfigStore(str(path))
+
+    assert store.current.mining.log_interval == ConfigStore(str(tmp_path / "missing.json")).current.mining.log_interval
+    assert not store.reload()
+    path.write_text(json.dumps({"mining": {"log_interval": 7}}))
+    assert store.reload()
+    assert store.current.mining.log_interval == 7
+
+
+def test_unknown_override_keys_are_reported(tmp_path, caplog):
+    path = tmp_path / "overrides.json"
+    path.write_text(json.dumps({"mining": {"log_interval": 7, "blok_rate": 3}}))
+
+    with caplog.at_level(logging.WARNING, logger="runtime_config"):
+        store = ConfigStore(str(path))
+
+    assert store.current.mining.log_interval == 7
+    assert "blok_rate" in caplog.text
+
+
+def test_reload_keeps_tuned_block_rate_unless_it_was_edited(tmp_path):
+    path = tmp_path / "overrides.json"
+    path.write_text(json.dumps({"mining": {"block_rate": 2.0}}))
+    store = ConfigStore(str(path))
+    configured = store.current
+    tuned = configured.with_changes("mining", block_rate=3.1)
+
+    path.write_text(json.dumps({"mining": {"block_rate": 2.0, "log_interval": 7}}))
+    store.reload()
+    kept = keep_tuned(store.current, configured, tuned)
+    assert (kept.mining.block_rate, kept.mining.log_interval) == (3.1, 7)
+
+    path.write_text(json.dumps({"mining": {"block_rate": 1.5}}))
+    store.reload()
+    assert keep_tuned(store.current, configured, tuned).mining.block_rate == 1.5
+
+
+def test_override_values_are_coerced_strictly(tmp_path):
+    settings = MiningSettings(auto_optimize="on", dynamic_adjustment="0", log_interval=30.0)
+    assert (settings.auto_optimize, settings.dynamic_adjustment, settings.log_interval) == (True, False, 30)
+    with pytest.raises(ValueError):
+        MiningSettings(auto_optimize="ture")
+    with pytest.raises(ValueError):
+        MiningSettings(log_interval=3.7)
+
+    path = tmp_path / "overrides.json"
+    path.write_text(json.dumps({"mining": {"log_interval": 7}}))
+    store = ConfigStore(str(path))
+    path.write_text(json.dumps({"mining": {"log_interval": 7.5}}))
+    assert not store.reload()
+    assert store.current.mining.log_interval == 7
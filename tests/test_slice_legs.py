@@ -0,0 +1,63 @@
+"""A multi-leg slice settles only once every leg's wallet message has confirmed"""
+
+import stonfi_integration
+from stonfi_integration import TuxidoStonFiManager
+
+TUXIDO = "EQCxE6mUtQJKFnGfaROTKOt1lZbDiiX1kCixRv7Nw2Id_sDs"
+
+
+class _Sender:
+    def __init__(self, known=(), done=()):
+        self.known = set(known)
+        self.done = set(done)
+        self.subscribers = []
+
+    def subscribe(self, callback):
+        self.subscribers.append(callback)
+
+    def confirm(self, *keys):
+        self.done.update(keys)
+        for callback in self.subscribers:
+            callback(list(keys))
+
+
+class _Engine:
+    def __init__(self, in_flight):
+        self.in_flight = dict.fromkeys(in_flight)
+        self.settled = []
+
+    def settle(self, slice_id):
+        self.in_flight.pop(slice_id)
+        self.settled.append(slice_id)
+
+
+def _attach(monkeypatch, sender, in_flight):
+    engine = _Engine(in_flight)
+    monkeypatch.setattr(stonfi_integration, "build_execution_engine", lambda *args, **kwargs: engine)
+    manager = TuxidoStonFiManager(TUXIDO)
+    manager.watcher = None
+    manager.attach_wallet_sender(sender)
+    return engine
+
+
+def test_restart_settles_slices_by_their_leg_keys(monkeypatch):
+    sender = _Sender(
+        known=["slice:order-1:1/stonfi", "slice:order-1:1/dedust", "slice:order-1:2/stonfi",
+               "slice:order-1:2/dedust", "slice:order-2:3"],
+        done=["slice:order-1:1/stonfi", "slice:order-1:1/dedust", "slice:order-1:2/stonfi", "slice:order-2:3"],
+    )
+    engine = _attach(monkeypatch, sender, ["order-1:1", "order-1:2", "order-2:3"])
+
+    assert sorted(engine.settled) == ["order-1:1", "order-2:3"]
+    sender.confirm("slice:order-1:2/dedust")
+    assert engine.settled[-1] == "order-1:2"
+
+
+def test_partially_confirmed_slice_stays_in_flight(monkeypatch):
+    sender = _Sender(known=["slice:order-1:1/stonfi", "slice:order-1:1/dedust"])
+    engine = _attach(monkeypatch, sender, ["order-1:1"])
+
+    sender.confirm("slice:order-1:1/stonfi")
+    assert engine.settled == []
+    sender.confirm("slice:order-1:1/dedust")
+    assert engine.settled == ["order-1:1"]
@@ -0,0 +1,133 @@
+"""An earlier attempt landing at a seqno confirms its messages instead of counting as a conflict"""
+
+import asyncio
+
+from wallet_sender import OutboundMessage, WalletSender
+
+WALLET = "EQCxE6mUtQJKFnGfaROTKOt1lZbDiiX1kCixRv7Nw2Id_sDs"
+DESTINATION = "EQB3ncyBUTjZUA5EnFKR5_EnOMI9V1tTEAAPaiU71gc4TiUt"
+
+
+class _Chain:
+    def __init__(self):
+        self.seqno = 0
+        self.transactions = []
+
+    async def get_seqno(self, address):
+        return self.seqno
+
+    async def send_boc(self, boc):
+        return {}
+
+    async def get_transactions(self, address, limit=20, lt=None, tx_hash=None):
+        return self.transactions[:limit]
+
+    def land(self, message_hash):
+        self.seqno += 1
+        self.transactions.insert(0, {"in_msg": {"hash": message_hash},
+                                     "transaction_id": {"lt": str(self.seqno), "hash": ""}, "utime": 0})
+
+
+def _sender(chain, journal, now):
+    return WalletSender(chain, WALLET, lambda data: bytes(64), journal_path=str(journal),
+                        message_ttl=60, poll_interval=1, clock=lambda: now[0])
+
+
+def _message(key):
+    return OutboundMessage(key, DESTINATION, 10**8)
+
+
+def test_earlier_attempt_landing_is_not_a_conflict(tmp_path):
+    chain, now = _Chain(), [1000.0]
+    sender = _sender(chain, tmp_path / "journal.jsonl", now)
+    sender.enqueue_many([_message("a"), _message("b")])
+    confirmed = []
+    sender.subscribe(confirmed.extend)
+
+    async def scenario():
+        first = sender.build_batch(0, [sender.queue.popleft()])
+        await sender._send(first)
+        now[0] += 120
+        assert await sender._check(first) == "expired"
+        # Resent with "b" at the same seqno, but the first external message is the one that lands
+        second = sender.build_batch(0, sender._take_batch())
+        await sender._send(second)
+        chain.land(first.message_hash)
+        return await sender._check(second)
+
+    assert asyncio.run(scenario()) == "superseded"
+    assert confirmed == ["a"]
+    assert sender.done == {"a"}
+    assert [m.key for m in sender.queue] == ["b"]
+    assert sender.stats["conflicts"] == 0
+
+
+def test_attempt_landed_while_down_is_confirmed_on_restart(tmp_path):
+    chain, now = _Chain(), [1000.0]
+    journal = tmp_path / "journal.jsonl"
+    sender = _sender(chain, journal, now)
+    sender.enqueue_many([_message("a"), _message("b")])
+
+    async def before_crash():
+        batch = sender.build_batch(0, sender._take_batch())
+        await sender._send(batch)
+        now[0] += 120
+        assert await sender._check(batch) == "expired"
+        return batch
+
+    batch = asyncio.run(before_crash())
+    chain.land(batch.message_hash)
+
+    restarted = _sender(chain, journal, now)
+    assert [m.key for m in restarted.queue] == ["a", "b"]
+
+    async def start():
+        task = asyncio.ensure_future(restarted.run())
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+    asyncio.run(start())
+    assert restarted.done == {"a", "b"}
+    assert not restarted.queue and restarted.in_flight is None
+
+
+def test_failed_transaction_lookup_keeps_the_batch_in_flight(tmp_path):
+    chain, now = _Chain(), [1000.0]
+    sender = _sender(chain, tmp_path / "journal.jsonl", now)
+    sender.enqueue(_message("a"))
+    lookup = chain.get_transactions
+
+    async def unavailable(*args, **kwargs):
+        raise ConnectionError("toncenter unavailable")
+
+    async def scenario():
+        batch = sender.build_batch(0, sender._take_batch())
+        await sender._send(batch)
+        chain.land(batch.message_hash)
+        chain.get_transactions = unavailable
+        assert await sender._check(batch) is None
+        assert sender.in_flight is batch and 0 in sender.attempts
+        chain.get_transactions = lookup
+        return await sender._check(batch)
+
+    assert asyncio.run(scenario()) == "confirmed"
+    assert sender.done == {"a"} and sender.in_flight is None
+
+
+def test_spent_seqno_without_our_transaction_requeues_its_messages(tmp_path):
+    chain, now = _Chain(), [1000.0]
+    sender = _sender(chain, tmp_path / "journal.jsonl", now)
+    sender.enqueue(_message("a"))
+
+    async def scenario():
+        await sender._send(sender.build_batch(0, sender._take_batch()))
+        # The batch was dropped from in-flight before its seqno was resolved
+        sender.in_flight = None
+        chain.seqno = 1
+        task = asyncio.ensure_future(sender.run())
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+    asyncio.run(scenario())
+    assert sender.in_flight is not None and sender.in_flight.keys == ["a"]
+    assert sender.in_flight.seqno == 1
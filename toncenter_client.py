@@ -0,0 +1,164 @@
+"""
+Tuxido Mining Bot - Toncenter Client
+Thin async client for the toncenter v2 JSON-RPC API (get-methods, seqno,
+transactions, sending BOCs) over the shared, rate-limited HTTP session
+"""
+
+import base64
+import logging
+import itertools
+from typing import Any, Dict, List, Optional, Sequence
+
+from boc import deserialize_boc, parse_address
+from http_client import get_session
+from rate_limiter import NORMAL, priority_context
+from runtime_config import config_store, BlockchainSettings
+
+logger = logging.getLogger(__name__)
+
+MAINNET_ENDPOINT = "https://toncenter.com/api/v2"
+TESTNET_ENDPOINT = "https://testnet.toncenter.com/api/v2"
+
+
+class ToncenterError(RuntimeError):
+    """Toncenter returned ok=false or a TVM exit code other than 0/1"""
+
+    def __init__(self, message: str, code: Optional[int] = None):
+        super().__init__(message)
+        self.code = code
+
+
+def stack_int(entry: Sequence) -> int:
+    """Integer from a get-method stack entry such as ["num", "0x1a"]"""
+    kind, value = entry[0], entry[1]
+    if kind != "num":
+        raise ToncenterError(f"Expected a number on the stack, got {kind}")
+    return int(value, 16) if isinstance(value, str) else int(value)
+
+
+def stack_address(entry: Sequence) -> Optional[str]:
+    """Address from a slice on the stack (["cell", {"bytes": <boc>}] or ["slice", ...]); None for addr_none"""
+    value = entry[1]
+    data = value.get("bytes") if isinstance(value, dict) else value
+    return deserialize_boc(base64.b64decode(data))[0].begin_parse().load_address()
+
+
+async def transactions_since(client, address: str, since_lt: Optional[int], page_size: int = 50) -> List[Dict]:
+    """Transactions newer than since_lt (the whole history for None), oldest first
+
+    Pages backwards from the newest transaction until since_lt is reached;
+    the whole history needs an archival node.
+    """
+    page_size = max(page_size, 2)
+    transactions: List[Dict] = []
+    lt = tx_hash = None
+    while True:
+        page = await client.get_transactions(address, limit=page_size, lt=lt, tx_hash=tx_hash,
+                                             to_lt=since_lt, archival=since_lt is None)
+        if lt is not None:
+            page = page[1:]  # paging from lt/hash returns that transaction again
+        transactions.extend(page)
+        if not page or len(page) < page_size - (lt is not None):
+            break
+        lt, tx_hash = page[-1]["transaction_id"]["lt"], page[-1]["transaction_id"]["hash"]
+    transactions.reverse()
+    return transactions
+
+
+class ToncenterClient:
+    """toncenter v2 JSON-RPC; every call goes through the shared per-host rate limiter"""
+
+    def __init__(self, endpoint: str = MAINNET_ENDPOINT, api_key: str = "", priority: int = NORMAL):
+        self.endpoint = endpoint.rstrip("/")
+        self.api_key = api_key
+        self.priority = priority
+        self._ids = itertools.count(1)
+
+    async def call(self, method: str, params: Optional[Dict] = None, priority: Optional[int] = None) -> Any:
+        """One JSON-RPC call; returns the result or raises ToncenterError"""
+        session = await get_session()
+        headers = {"X-API-Key": self.api_key} if self.api_key else {}
+        request = {"id": next(self._ids), "jsonrpc": "2.0", "method": method, "params": params or {}}
+        context = priority_context(self.priority if priority is None else priority)
+        async with session.post(f"{self.endpoint}/jsonRPC", json=request, headers=headers,
+                                trace_request_ctx=context) as response:
+            data = await response.json(content_type=None)
+        if not data.get("ok", "result" in data):
+            raise ToncenterError(data.get("error", f"{method} failed"), data.get("code"))
+        return data.get("result")
+
+    async def run_get_method(self, address: str, method: str, stack: Sequence = ()) -> List:
+        """Run a get-method and return its stack; non-zero TVM exit codes raise"""
+        result = await self.call("runGetMethod", {"address": address, "method": method, "stack": list(stack)})
+        exit_code = result.get("exit_code", 0)
+        if exit_code not in (0, 1):
+            raise ToncenterError(f"{method} on {address} exited with {exit_code}", exit_code)
+        return result.get("stack", [])
+
+    async def get_seqno(self, address: str) -> int:
+        """Wallet seqno; 0 for a wallet that is not deployed yet"""
+        try:
+            return stack_int((await self.run_get_method(address, "seqno"))[0])
+        except ToncenterError as e:
+            if e.code in (-13, -14):  # uninitialized account
+                return 0
+            raise
+
+    async def get_address_information(self, address: str) -> Dict:
+        return await self.call("getAddressInformation", {"address": address})
+
+    async def get_masterchain_info(self) -> Dict:
+        return await self.call("getMasterchainInfo")
+
+    async def get_transactions(self, address: str, limit: int = 20, lt: Optional[int] = None,
+                               tx_hash: Optional[str] = None, to_lt: Optional[int] = None,
+                               archival: bool = False) -> List[Dict]:
+        """Newest-first transactions; pass lt/tx_hash of the last one seen to page backwards"""
+        params: Dict[str, Any] = {"address": address, "limit": limit, "archival": archival}
+        if lt is not None:
+            params["lt"] = str(lt)
+            params["hash"] = tx_hash
+        if to_lt is not None:
+            params["to_lt"] = str(to_lt)
+        return await self.call("getTransactions", params)
+
+    async def get_last_lts(self, addresses: Sequence[str]) -> Dict[str, int]:
+        """Last transaction lt of many accounts in one toncenter v3 accountStates request"""
+        session = await get_session()
+        headers = {"X-API-Key": self.api_key} if self.api_key else {}
+        url = self.endpoint.replace("/api/v2", "/api/v3") + "/accountStates"
+        params = [("address", address) for address in addresses] + [("include_boc", "false")]
+        async with session.get(url, params=params, headers=headers,
+                               trace_request_ctx=priority_context(self.priority)) as response:
+            data = await response.json(content_type=None)
+            if response.status != 200:
+                raise ToncenterError(data.get("error", "accountStates failed"), response.status)
+        # v3 answers with raw addresses; map them back to the form we asked with
+        asked = {parse_address(address): address for address in addresses}
+        lts = {}
+        for account in data.get("accounts", []):
+            address = asked.get(parse_address(account["address"]), account["address"])
+            lts[address] = int(account.get("last_transaction_lt") or 0)
+        return lts
+
+    async def send_boc(self, boc: bytes) -> Dict:
+        """Broadcast a serialized external message; returns toncenter's message hash"""
+        return await self.call("sendBocReturnHash", {"boc": base64.b64encode(boc).decode()})
+
+
+def endpoint_for(settings: BlockchainSettings) -> str:
+    if settings.rpc_endpoint:
+        return settings.rpc_endpoint
+    return TESTNET_ENDPOINT if settings.network == "testnet" else MAINNET_ENDPOINT
+
+
+_client: Optional[ToncenterClient] = None
+
+
+def get_toncenter() -> ToncenterClient:
+    """Process-wide client for the configured network"""
+    global _client
+    if _client is None:
+        blockchain = config_store.current.blockchain
+        _client = ToncenterClient(endpoint_for(blockchain), blockchain.toncenter_api_key)
+    return _client
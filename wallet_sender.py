@@ -0,0 +1,519 @@
+"""
+Tuxido Mining Bot - Wallet Sender
+Pipelined outbound transactions for the configured wallet: messages are
+packed up to the wallet's per-external limit, signed with a locally tracked
+seqno, confirmed by polling toncenter and re-sent when they expire. Every
+message carries an idempotency key recorded in an append-only journal, so a
+restart never sends the same message twice
+"""
+
+import json
+import time
+import base64
+import asyncio
+import logging
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from boc import Cell, address_bits, coins_bits, deserialize_boc, parse_address, serialize_boc
+from storage_utils import append_bytes, atomic_write_bytes
+from runtime_config import ConfigSnapshot
+
+logger = logging.getLogger(__name__)
+
+try:
+    from nacl.signing import SigningKey
+
+    def _make_signer(seed: bytes) -> Callable[[bytes], bytes]:
+        key = SigningKey(seed)
+        return lambda data: key.sign(data).signature
+
+    SIGNING_AVAILABLE = True
+except ImportError:
+    try:
+        from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+
+        def _make_signer(seed: bytes) -> Callable[[bytes], bytes]:
+            return Ed25519PrivateKey.from_private_bytes(seed).sign
+
+        SIGNING_AVAILABLE = True
+    except ImportError:
+        _make_signer = None
+        SIGNING_AVAILABLE = False
+
+DEFAULT_SUBWALLET_ID = 698983191
+# Messages per external message that wallet v3/v4 contracts accept
+WALLET_MESSAGE_LIMITS = {"v3r2": 4, "v4r2": 4}
+SEND_MODE_PAY_FEES_SEPARATELY = 1
+SEND_MODE_IGNORE_ERRORS = 2
+# Rewrite the journal down to live state after this many appended events
+COMPACT_EVERY_EVENTS = 10000
+
+
+def load_signer(private_key: str) -> Callable[[bytes], bytes]:
+    """Ed25519 signer from a hex seed (32 bytes) or secret key (64 bytes, seed first)"""
+    if not SIGNING_AVAILABLE:
+        raise RuntimeError("Signing requires PyNaCl or cryptography")
+    key = bytes.fromhex(private_key.strip())
+    if len(key) not in (32, 64):
+        raise ValueError("TON_PRIVATE_KEY must be a 32-byte seed or 64-byte secret key in hex")
+    return _make_signer(key[:32])
+
+
+class OutboundMessage:
+    """One internal message to send from the wallet"""
+
+    __slots__ = ("key", "destination", "value", "payload", "bounce", "mode")
+
+    def __init__(self, key: str, destination: str, value: int, payload: Optional[str] = None,
+                 bounce: bool = True, mode: int = SEND_MODE_PAY_FEES_SEPARATELY | SEND_MODE_IGNORE_ERRORS):
+        self.key = key                  # idempotency key
+        self.destination = destination
+        self.value = value              # nanotons
+        self.payload = payload          # base64 BOC of the body, if any
+        self.bounce = bounce
+        self.mode = mode
+
+    def to_dict(self) -> Dict:
+        return {"key": self.key, "to": self.destination, "value": self.value,
+                "payload": self.payload, "bounce": self.bounce, "mode": self.mode}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "OutboundMessage":
+        return cls(data["key"], data["to"], data["value"], data.get("payload"),
+                   data.get("bounce", True), data.get("mode", 3))
+
+    def cell(self) -> Cell:
+        """int_msg_info$0 ihr_disabled bounce bounced src dest value ihr_fee fwd_fee lt at init body"""
+        dest, dest_len = address_bits(self.destination)
+        value, value_len = coins_bits(self.value)
+        # ihr_disabled=1, bounce, bounced=0, src=addr_none
+        head = (0b01 << 1 | int(self.bounce)) << 3
+        bits = ((head << dest_len | dest) << value_len) | value
+        # extra currencies (empty dict), ihr_fee=0, fwd_fee=0, created_lt, created_at, no state init
+        bits = bits << (1 + 4 + 4 + 64 + 32 + 1)
+        length = 6 + dest_len + value_len + 106
+        if self.payload:
+            return Cell(length + 1, bits << 1 | 1, (deserialize_boc(base64.b64decode(self.payload))[0],))
+        return Cell(length + 1, bits << 1)
+
+
+class WalletBatch:
+    """One signed external message and the messages it carries"""
+
+    __slots__ = ("seqno", "valid_until", "messages", "boc", "message_hash", "sent_at", "attempts")
+
+    def __init__(self, seqno: int, valid_until: int, messages: List[OutboundMessage],
+                 boc: bytes = b"", message_hash: str = "", sent_at: float = 0.0, attempts: int = 0):
+        self.seqno = seqno
+        self.valid_until = valid_until
+        self.messages = messages
+        self.boc = boc
+        self.message_hash = message_hash  # base64 hash of the external message, as toncenter reports it
+        self.sent_at = sent_at
+        self.attempts = attempts
+
+    @property
+    def keys(self) -> List[str]:
+        return [message.key for message in self.messages]
+
+
+class WalletSender:
+    """Sends queued messages from one wallet, one external message in flight at a time
+
+    While a batch waits for confirmation the next one is packed and signed
+    against the following seqno, so it can go out as soon as the previous
+    seqno lands.
+    """
+
+    def __init__(self, client, wallet_address: str, signer: Callable[[bytes], bytes],
+                 journal_path: str = "data/wallet_journal.jsonl", version: str = "v4r2",
+                 subwallet_id: int = DEFAULT_SUBWALLET_ID, max_messages: Optional[int] = None,
+                 message_ttl: float = 60.0, poll_interval: float = 3.0,
+                 clock: Callable[[], float] = time.time):
+        if version not in WALLET_MESSAGE_LIMITS:
+            raise ValueError(f"Unsupported wallet version: {version}")
+        self.client = client
+        self.wallet_address = wallet_address
+        self.signer = signer
+        self.journal_path = journal_path
+        self.version = version
+        self.subwallet_id = subwallet_id
+        self.max_messages = min(max_messages or WALLET_MESSAGE_LIMITS[version], WALLET_MESSAGE_LIMITS[version])
+        self.message_ttl = message_ttl
+        self.poll_interval = poll_interval
+        self.clock = clock
+
+        self.queue: Deque[OutboundMessage] = deque()
+        self.known: Set[str] = set()  # every key ever accepted, for idempotency
+        self.done: Set[str] = set()
+        self.in_flight: Optional[WalletBatch] = None
+        self.prepared: Optional[WalletBatch] = None  # signed for the seqno after in_flight
+        self.seqno: Optional[int] = None
+        # Every external message sent per seqno not yet seen used: hash -> (messages, sent_at).
+        # An earlier attempt we gave up on can still be the one that lands.
+        self.attempts: Dict[int, Dict[str, Tuple[List[OutboundMessage], float]]] = {}
+        self._subscribers: List[Callable[[List[str]], None]] = []
+        self._journal_events = 0
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self.stats = {"sent_batches": 0, "confirmed_messages": 0, "expired_batches": 0,
+                      "conflicts": 0, "superseded": 0, "send_errors": 0}
+        self._restore()
+
+    # --- Journal ---------------------------------------------------------
+
+    def _journal(self, event: str, **fields):
+        fields["e"] = event
+        self._journal_events += 1
+        append_bytes(self.journal_path, json.dumps(fields, separators=(",", ":")).encode() + b"\n")
+
+    def _restore(self):
+        """Rebuild queue, in-flight batch and done keys from the journal, then compact it"""
+        pending: Dict[str, OutboundMessage] = {}
+        in_flight = None
+        try:
+            with open(self.journal_path, "rb") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # torn final line after a crash
+                    event = record["e"]
+                    if event == "queued":
+                        message = OutboundMessage.from_dict(record["msg"])
+                        pending.setdefault(message.key, message)
+                    elif event in ("sent", "attempt"):
+                        messages = [pending[key] for key in record["keys"] if key in pending]
+                        self.attempts.setdefault(record["seqno"], {})[record["hash"]] = (messages, record["at"])
+                        if event == "sent":
+                            in_flight = record
+                    elif event == "done":
+                        for key in record["keys"]:
+                            self.done.add(key)
+                            pending.pop(key, None)
+                        if in_flight and set(record["keys"]) >= set(in_flight["keys"]):
+                            in_flight = None
+                        if "seqno" in record:
+                            self._forget_attempts(record["seqno"])
+                    elif event == "requeued":
+                        in_flight = None
+        except FileNotFoundError:
+            return
+
+        self.known = set(self.done) | set(pending)
+        if in_flight and all(key in pending for key in in_flight["keys"]):
+            messages = [pending.pop(key) for key in in_flight["keys"]]
+            self.in_flight = WalletBatch(
+                in_flight["seqno"], in_flight["valid_until"], messages,
+                base64.b64decode(in_flight["boc"]), in_flight["hash"], in_flight["at"]
+            )
+        self.queue.extend(pending.values())
+        if self.queue or self.in_flight:
+            self._idle.clear()
+        self._compact()
+        logger.info("📒 Wallet journal restored: %d queued, %s in flight, %d done",
+                    len(self.queue), "1 batch" if self.in_flight else "nothing", len(self.done))
+
+    def _compact(self):
+        lines = [json.dumps({"e": "done", "keys": sorted(self.done)}, separators=(",", ":"))]
+        batch_messages = [m for batch in (self.in_flight, self.prepared) if batch for m in batch.messages]
+        for message in batch_messages + list(self.queue):
+            lines.append(json.dumps({"e": "queued", "msg": message.to_dict()}, separators=(",", ":")))
+        for seqno, attempts in self.attempts.items():
+            for message_hash, (messages, sent_at) in attempts.items():
+                if not (self.in_flight and message_hash == self.in_flight.message_hash):
+                    keys = [message.key for message in messages]
+                    lines.append(json.dumps({"e": "attempt", "seqno": seqno, "hash": message_hash, "keys": keys,
+                                             "at": sent_at}, separators=(",", ":")))
+        if self.in_flight:
+            lines.append(json.dumps({"e": "sent", **self._sent_record(self.in_flight)}, separators=(",", ":")))
+        atomic_write_bytes(self.journal_path, ("\n".join(lines) + "\n").encode())
+        self._journal_events = 0
+
+    def _sent_record(self, batch: WalletBatch) -> Dict:
+        return {"seqno": batch.seqno, "valid_until": batch.valid_until, "keys": batch.keys,
+                "hash": batch.message_hash, "boc": base64.b64encode(batch.boc).decode(), "at": batch.sent_at}
+
+    # --- Queueing ----------------------------------------------------------
+
+    def enqueue(self, message: OutboundMessage) -> bool:
+        """Queue a message; False if its key was already queued or sent"""
+        if message.key in self.known:
+            return False
+        self.known.add(message.key)
+        self._journal("queued", msg=message.to_dict())
+        self.queue.append(message)
+        self._idle.clear()
+        self._wakeup.set()
+        return True
+
+    def enqueue_many(self, messages) -> int:
+        """Queue many messages with one journal write; returns how many were new"""
+        fresh = []
+        for message in messages:
+            if message.key not in self.known:
+                self.known.add(message.key)
+                fresh.append(message)
+        if fresh:
+            self._journal_events += len(fresh)
+            append_bytes(self.journal_path, b"".join(
+                json.dumps({"e": "queued", "msg": m.to_dict()}, separators=(",", ":")).encode() + b"\n"
+                for m in fresh
+            ))
+            self.queue.extend(fresh)
+            self._idle.clear()
+            self._wakeup.set()
+        return len(fresh)
+
+    def subscribe(self, callback: Callable[[List[str]], None]):
+        """Call callback(keys) whenever a batch of messages is confirmed"""
+        self._subscribers.append(callback)
+
+    async def drain(self, timeout: Optional[float] = None) -> bool:
+        """Wait until everything queued has been confirmed"""
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    # --- Building -------------------------------------------------------------
+
+    def build_batch(self, seqno: int, messages: List[OutboundMessage]) -> WalletBatch:
+        """Sign an external message carrying messages with the given seqno"""
+        valid_until = int(self.clock() + self.message_ttl)
+        header = (self.subwallet_id << 32 | valid_until) << 32 | seqno
+        header_len = 96
+        if self.version == "v4r2":
+            header, header_len = header << 8, header_len + 8  # op 0: simple send
+        for message in messages:
+            header, header_len = header << 8 | message.mode, header_len + 8
+        unsigned = Cell(header_len, header, [message.cell() for message in messages])
+        signature = int.from_bytes(self.signer(unsigned.hash()), "big")
+        body = Cell(512 + header_len, signature << header_len | header, unsigned.refs)
+
+        # ext_in_msg_info$10 src:addr_none dest import_fee:0 init:nothing body:^Cell
+        dest, dest_len = address_bits(self.wallet_address)
+        external = Cell(4 + dest_len + 6, ((0b1000 << dest_len | dest) << 6) | 0b000001, (body,))
+        message_hash = base64.b64encode(external.hash()).decode()
+        return WalletBatch(seqno, valid_until, messages, serialize_boc([external]), message_hash)
+
+    def _take_batch(self) -> List[OutboundMessage]:
+        return [self.queue.popleft() for _ in range(min(self.max_messages, len(self.queue)))]
+
+    # --- Sending and confirmation ---------------------------------------------
+
+    async def run(self, heartbeat: Optional[Callable[[], None]] = None):
+        """Send and confirm until cancelled; meant to run under a Supervisor"""
+        self.seqno = await self.client.get_seqno(self.wallet_address)
+        # Attempts that may have landed while we were down, other than the in-flight batch checked below
+        for seqno in sorted(s for s in self.attempts if s < self.seqno):
+            if not (self.in_flight and self.in_flight.seqno == seqno):
+                attempts = self.attempts[seqno]
+                if await self._resolve_attempts(seqno) is None:
+                    self._requeue_unsent(attempts, seqno)
+        logger.info("💼 Wallet sender ready for %s at seqno %d", self.wallet_address, self.seqno)
+        while True:
+            if heartbeat:
+                heartbeat()
+            if self.in_flight:
+                if self.prepared is None and self.queue:
+                    # Pipeline: sign the next batch against the seqno after the one in flight
+                    self.prepared = self.build_batch(self.in_flight.seqno + 1, self._take_batch())
+                outcome = await self._check(self.in_flight)
+                if outcome is None:
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+                if outcome != "confirmed" and self.prepared:
+                    # The next seqno is unusable; put its messages back in order
+                    self.queue.extendleft(reversed(self.prepared.messages))
+                    self.prepared = None
+                if self._journal_events > COMPACT_EVERY_EVENTS:
+                    self._compact()
+                continue
+
+            if self.prepared is None and self.queue:
+                self.prepared = self.build_batch(self.seqno, self._take_batch())
+            batch = self.prepared
+            if batch is None:
+                self._idle.set()
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval * 10)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            if batch.seqno != self.seqno or batch.valid_until < self.clock() + self.poll_interval:
+                batch = self.build_batch(self.seqno, batch.messages)
+            self.prepared = None
+            await self._send(batch)
+
+    async def _send(self, batch: WalletBatch):
+        batch.sent_at = self.clock()
+        batch.attempts += 1
+        self.in_flight = batch
+        self.attempts.setdefault(batch.seqno, {})[batch.message_hash] = (batch.messages, batch.sent_at)
+        self._journal("sent", **self._sent_record(batch))
+        try:
+            await self.client.send_boc(batch.boc)
+            self.stats["sent_batches"] += 1
+            logger.debug("📤 Sent %d message(s) at seqno %d", len(batch.messages), batch.seqno)
+        except Exception as e:
+            # The message may still have reached a validator; confirmation or expiry decides
+            self.stats["send_errors"] += 1
+            logger.warning("Wallet send at seqno %d failed: %s", batch.seqno, e)
+
+    async def _check(self, batch: WalletBatch) -> Optional[str]:
+        """'confirmed', 'superseded', 'expired' or 'conflict' once the batch is settled, None while pending
+
+        'superseded' means an earlier attempt at the same seqno landed instead.
+        """
+        try:
+            chain_seqno = await self.client.get_seqno(self.wallet_address)
+        except Exception as e:
+            logger.warning("Seqno poll failed: %s", e)
+            return None
+
+        if chain_seqno > batch.seqno:
+            try:
+                landed = await self._resolve_attempts(batch.seqno, batch.message_hash)
+            except Exception as e:
+                # Keep the batch in flight and its attempts until we know which one landed
+                logger.warning("Transaction lookup for seqno %d failed: %s", batch.seqno, e)
+                return None
+            self.seqno = chain_seqno
+            self.in_flight = None
+            if landed is not None and set(batch.keys) <= self.done:
+                logger.debug("✅ Seqno %d confirmed (%d messages)", batch.seqno, len(batch.messages))
+                return "confirmed"
+            rest = [message for message in batch.messages if message.key not in self.done]
+            if landed is None:
+                # Something else used this seqno (another sender on the same wallet)
+                self.stats["conflicts"] += 1
+                self._requeue(rest, batch.seqno, "seqno %d was used by another message" % batch.seqno)
+                return "conflict"
+            # An earlier attempt at this seqno landed instead, carrying other messages
+            self.stats["superseded"] += 1
+            self._requeue(rest, batch.seqno, "an earlier attempt used seqno %d" % batch.seqno)
+            return "superseded"
+
+        if self.clock() > batch.valid_until + self.poll_interval:
+            self.seqno = chain_seqno
+            self.in_flight = None
+            self.stats["expired_batches"] += 1
+            self._requeue(batch.messages, batch.seqno, "expired at seqno %d" % batch.seqno)
+            return "expired"
+        return None
+
+    async def _resolve_attempts(self, seqno: int, in_flight_hash: Optional[str] = None) -> Optional[str]:
+        """Confirm whichever of our attempts used seqno, now that it is spent; returns its hash
+
+        Lookup errors propagate with the attempts left in place.
+        """
+        attempts = self.attempts.get(seqno)
+        if not attempts:
+            return None
+        found = await self._find_transaction(attempts, min(at for _, at in attempts.values()))
+        self._forget_attempts(seqno)
+        if found is None:
+            return None
+        message_hash, lt = found
+        keys = [message.key for message in attempts[message_hash][0]]
+        self.done.update(keys)
+        self.stats["confirmed_messages"] += len(keys)
+        self._journal("done", keys=keys, seqno=seqno, lt=lt)
+        if message_hash != in_flight_hash:
+            # An older attempt: its messages were requeued since and may be queued or signed again
+            if self.prepared and any(key in self.done for key in self.prepared.keys):
+                self.queue.extendleft(reversed(self.prepared.messages))
+                self.prepared = None
+            self.queue = deque(message for message in self.queue if message.key not in self.done)
+        for callback in self._subscribers:
+            callback(keys)
+        return message_hash
+
+    def _requeue_unsent(self, attempts: Dict[str, Tuple[List[OutboundMessage], float]], seqno: int):
+        """Requeue messages of attempts that did not land and are not queued, signed or in flight"""
+        pending = {message.key for message in self.queue}
+        for batch in (self.in_flight, self.prepared):
+            if batch:
+                pending.update(batch.keys)
+        lost = {}
+        for messages, _ in attempts.values():
+            for message in messages:
+                if message.key not in self.done and message.key not in pending:
+                    lost.setdefault(message.key, message)
+        self._requeue(list(lost.values()), seqno, "no attempt at seqno %d landed" % seqno)
+        if lost:
+            self._idle.clear()
+
+    def _forget_attempts(self, seqno: int):
+        for spent in [s for s in self.attempts if s <= seqno]:
+            del self.attempts[spent]
+
+    async def _find_transaction(self, attempts: Dict[str, Tuple[List[OutboundMessage], float]],
+                                sent_at: float) -> Optional[Tuple[str, Optional[str]]]:
+        """(hash, lt) of the wallet transaction triggered by any of the attempts, if one landed"""
+        lt = tx_hash = None
+        oldest_relevant = sent_at - self.message_ttl
+        for _ in range(10):
+            transactions = await self.client.get_transactions(self.wallet_address, 20, lt, tx_hash)
+            for transaction in transactions:
+                message_hash = transaction.get("in_msg", {}).get("hash")
+                if message_hash in attempts:
+                    return message_hash, transaction.get("transaction_id", {}).get("lt")
+            if len(transactions) < 20 or transactions[-1].get("utime", 0) < oldest_relevant:
+                return None
+            last = transactions[-1]["transaction_id"]
+            lt, tx_hash = last["lt"], last["hash"]
+        return None
+
+    def _requeue(self, messages: List[OutboundMessage], seqno: int, reason: str):
+        if not messages:
+            return
+        logger.warning("🔁 Requeueing %d message(s): %s", len(messages), reason)
+        self._journal("requeued", keys=[message.key for message in messages], seqno=seqno)
+        self.queue.extendleft(reversed(messages))
+
+    @property
+    def idle(self) -> bool:
+        """Nothing queued, signed or awaiting confirmation"""
+        return self._idle.is_set()
+
+    @property
+    def backlog(self) -> int:
+        """Messages waiting to be sent, including a pre-signed batch"""
+        return len(self.queue) + (len(self.prepared.messages) if self.prepared else 0)
+
+    def status(self) -> Dict:
+        return {
+            "wallet": self.wallet_address,
+            "seqno": self.seqno,
+            "queued": self.backlog,
+            "in_flight": self.in_flight.keys if self.in_flight else [],
+            "done": len(self.done),
+            **self.stats
+        }
+
+
+def build_wallet_sender(settings: ConfigSnapshot, client=None) -> Optional[WalletSender]:
+    """Sender for the configured wallet, or None when it cannot sign"""
+    blockchain, wallet = settings.blockchain, settings.wallet
+    if not wallet.enabled or not blockchain.wallet_address or not blockchain.private_key:
+        return None
+    try:
+        parse_address(blockchain.wallet_address)
+        signer = load_signer(blockchain.private_key)
+    except (RuntimeError, ValueError) as e:
+        logger.error("Wallet sender disabled: %s", e)
+        return None
+    if client is None:
+        from toncenter_client import get_toncenter
+        client = get_toncenter()
+    return WalletSender(
+        client, blockchain.wallet_address, signer,
+        journal_path=wallet.journal_path, version=wallet.version, subwallet_id=wallet.subwallet_id,
+        max_messages=wallet.max_messages, message_ttl=wallet.message_ttl, poll_interval=wallet.poll_interval
+    )
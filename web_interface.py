@@ -5,14 +5,19 @@ Tuxido Mining Bot Web Interface
 Simple web dashboard for monitoring mining bot status
 """
 
-from flask import Flask, jsonify, render_template_string
+from flask import Flask, Response, jsonify, render_template_string, request
 import os
 import json
+import logging
 import threading
 import asyncio
 from datetime import datetime
 
+import profiler
+from runtime_config import config_store
+
 app = Flask(__name__)
+logger = logging.getLogger(__name__)
 
 # HTML template for the web interface
 HTML_TEMPLATE = '''
@@ -175,5 +180,96 @@ def start_mining():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+def _int_arg(name: str, default: int, low: int, high: int) -> int:
+    """Integer query argument clamped to [low, high]; ValueError names the bad argument"""
+    value = request.args.get(name, default)
+    try:
+        return max(low, min(int(value), high))
+    except ValueError:
+        raise ValueError(f"{name} must be an integer, got {value!r}") from None
+
+@app.route('/api/blocks')
+def api_blocks():
+    """Recent per-block records and windowed stats from the in-process miner"""
+    from block_history import get_history, history_names
+    history = get_history(request.args.get('wallet'))
+    if history is None:
+        return jsonify({"error": "no block history in this process", "available": history_names()}), 404
+    try:
+        n = _int_arg('n', 100, 1, history.capacity)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({
+        "summary": history.summary(n),
+        "blocks": history.rows(n),
+        "appended": history.appended,
+        "spilled": history.spilled
+    })
+
+@app.route('/api/resources')
+def api_resources():
+    """Memory and disk headroom from the resource governor of this process"""
+    from resource_governor import get_governor
+    governor = get_governor()
+    if not governor.last_sample:
+        governor.sample()
+    return jsonify(governor.headroom())
+
+def _debug_window(default: float) -> float:
+    """Requested capture length, clamped to debug.max_profile_seconds"""
+    seconds = float(request.args.get('seconds', default))
+    return max(0.1, min(seconds, config_store.current.debug.max_profile_seconds))
+
+@app.route('/debug/profile')
+def debug_profile():
+    """Collapsed stacks of every thread (event loops included) sampled for ?seconds=N"""
+    if not config_store.current.debug.debug_endpoints:
+        return jsonify({"error": "debug endpoints are disabled (DEBUG_ENDPOINTS=true)"}), 404
+    try:
+        interval = float(request.args.get('interval_ms', profiler.DEFAULT_INTERVAL * 1000)) / 1000
+        result = profiler.profile(_debug_window(10), interval)
+    except profiler.ProfilerBusy as e:
+        return jsonify({"error": str(e)}), 409
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if request.args.get('format') == 'json':
+        return jsonify(result)
+    headers = {
+        "X-Samples": str(result["samples"]),
+        "X-Process-CPU-Seconds": f"{result['process_cpu_s']:.3f}"
+    }
+    return Response(result["collapsed"] + "\n", mimetype='text/plain', headers=headers)
+
+@app.route('/debug/memory')
+def debug_memory():
+    """Top allocation sites by growth over ?seconds=N (tracemalloc snapshot diff)"""
+    if not config_store.current.debug.debug_endpoints:
+        return jsonify({"error": "debug endpoints are disabled (DEBUG_ENDPOINTS=true)"}), 404
+    try:
+        top = _int_arg('top', 25, 1, 1000)
+        frames = _int_arg('frames', 1, 1, 25)
+        result = profiler.memory_diff(_debug_window(5), top, frames)
+    except profiler.ProfilerBusy as e:
+        return jsonify({"error": str(e)}), 409
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    result["rss_bytes"] = profiler.rss_bytes()
+    return jsonify(result)
+
+def serve_in_background(host: str = None, port: int = None) -> threading.Thread:
+    """Run the dashboard on a daemon thread inside the bot process so /debug sees its event loop"""
+    debug = config_store.current.debug
+    host = host or debug.web_host
+    port = port or debug.web_port
+    thread = threading.Thread(
+        target=app.run,
+        kwargs={"host": host, "port": port, "debug": False, "use_reloader": False, "threaded": True},
+        name="web-interface",
+        daemon=True
+    )
+    thread.start()
+    logger.info("🌐 Web interface on http://%s:%d", host, port)
+    return thread
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=False)